@@ -0,0 +1,14 @@
+"""Offline tooling for the CBD Gold PyTeal contracts"""
+
+from .opcodes import APP_CALL_BUDGET, opcode_cost
+from .teal import TealProgram, parse_teal
+from .profiler import ContractProfile, profile_teal
+from .contracts import CONTRACT_MODULES, load_contract, load_contract_at
+from .interpreter import AvmError, Program
+from .ledger import GroupResult, Ledger, app_call, asset_transfer, from_algosdk, payment
+
+__all__ = [
+    "APP_CALL_BUDGET", "opcode_cost", "TealProgram", "parse_teal",
+    "ContractProfile", "profile_teal", "CONTRACT_MODULES", "load_contract", "load_contract_at",
+    "AvmError", "Program", "GroupResult", "Ledger", "app_call", "asset_transfer", "from_algosdk", "payment"
+]
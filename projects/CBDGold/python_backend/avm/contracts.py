@@ -0,0 +1,35 @@
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Dict
+
+# The CBDGold* contract packages sit next to the CBDGold project
+CONTRACTS_ROOT = Path(__file__).resolve().parents[3]
+
+CONTRACT_MODULES: Dict[str, str] = {
+    "staking": "CBDGoldStaking.staking_contract",
+    "governance": "CBDGoldGovernance.governance_contract",
+    "prize": "CBDGoldPrize.prize_contract",
+}
+
+
+def load_contract(name: str) -> ModuleType:
+    """Import a contract module by short name (staking, governance, prize)"""
+    if name not in CONTRACT_MODULES:
+        raise KeyError(f"Unknown contract {name!r}; expected one of {', '.join(CONTRACT_MODULES)}")
+    if str(CONTRACTS_ROOT) not in sys.path:
+        sys.path.append(str(CONTRACTS_ROOT))
+    return importlib.import_module(CONTRACT_MODULES[name])
+
+
+def load_contract_at(name: str, ref: str) -> ModuleType:
+    """Load a contract module as it was at a git revision, for before/after comparisons"""
+    path = Path(load_contract(name).__file__)
+    source = subprocess.run(["git", "-C", str(path.parent), "show", f"{ref}:./{path.name}"],
+                            capture_output=True, text=True, check=True).stdout
+    module = ModuleType(f"{CONTRACT_MODULES[name]}@{ref}")
+    module.__file__ = str(path)
+    exec(compile(source, f"{path}@{ref}", "exec"), module.__dict__)
+    return module
@@ -0,0 +1,987 @@
+import base64
+import hashlib
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+from .opcodes import opcode_cost
+from .teal import TealProgram, parse_teal
+
+if TYPE_CHECKING:
+    from .ledger import Budget, Ledger
+
+Value = Union[int, bytes]
+
+UINT64 = 1 << 64
+MAX_STACK_DEPTH = 1000
+MAX_BYTES = 4096
+MAX_BIGINT_BYTES = 64
+MAX_LOGS = 32
+MAX_LOG_BYTES = 1024
+MAX_CALL_DEPTH = 8  # inner app call nesting
+
+NAMED_INTS = {
+    "NoOp": 0, "OptIn": 1, "CloseOut": 2, "ClearState": 3, "UpdateApplication": 4, "DeleteApplication": 5,
+    "unknown": 0, "pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6,
+}
+TYPE_NAMES = {1: b"pay", 2: b"keyreg", 3: b"acfg", 4: b"axfer", 5: b"afrz", 6: b"appl"}
+ARRAY_FIELDS = {"ApplicationArgs", "Accounts", "Applications", "Assets", "Logs"}
+ADDRESS_FIELDS = {"Sender", "Receiver", "CloseRemainderTo", "AssetSender", "AssetReceiver", "AssetCloseTo",
+                  "RekeyTo", "Accounts"}
+
+
+class AvmError(Exception):
+    """A program failed: an error opcode, a failed check or a rejection"""
+
+    def __init__(self, message: str, line: Optional[int] = None, app_id: Optional[int] = None):
+        where = " ".join(part for part in (f"app {app_id}" if app_id is not None else "",
+                                          f"line {line}" if line else "") if part)
+        super().__init__(f"{where}: {message}" if where else message)
+        self.reason = message
+        self.line = line
+        self.app_id = app_id
+
+
+def _unescape(literal: str) -> bytes:
+    out = bytearray()
+    i = 0
+    body = literal[1:-1]
+    while i < len(body):
+        char = body[i]
+        if char != "\\":
+            out += char.encode()
+            i += 1
+            continue
+        code = body[i + 1]
+        if code == "x":
+            out.append(int(body[i + 2:i + 4], 16))
+            i += 4
+            continue
+        out += {"n": b"\n", "r": b"\r", "t": b"\t", "\\": b"\\", '"': b'"'}[code]
+        i += 2
+    return bytes(out)
+
+
+def parse_bytes(tokens: List[str]) -> bytes:
+    """Decode a TEAL byte constant: "string", 0xhex, base64/b64 and base32/b32 forms"""
+    token = tokens[0]
+    if token.startswith('"'):
+        return _unescape(token)
+    if token.startswith("0x"):
+        return bytes.fromhex(token[2:])
+    for prefix, decode in (("base64", base64.b64decode), ("b64", base64.b64decode),
+                           ("base32", lambda s: base64.b32decode(s + "=" * (-len(s) % 8))),
+                           ("b32", lambda s: base64.b32decode(s + "=" * (-len(s) % 8)))):
+        if token == prefix:
+            return decode(tokens[1])
+        if token.startswith(prefix + "(") and token.endswith(")"):
+            return decode(token[len(prefix) + 1:-1])
+    raise ValueError(f"Unrecognized byte constant {' '.join(tokens)}")
+
+
+def parse_int(token: str) -> int:
+    if token in NAMED_INTS:
+        return NAMED_INTS[token]
+    return int(token, 0)
+
+
+def _method_selector(signature: str) -> bytes:
+    return hashlib.new("sha512_256", signature.encode()).digest()[:4]
+
+
+class Program:
+    """A TEAL program decoded once into (handler, immediates, cost, line) steps"""
+
+    def __init__(self, source: Union[str, TealProgram]):
+        self.teal = source if isinstance(source, TealProgram) else parse_teal(source)
+        self.version = self.teal.version
+        self.steps: List[Tuple[Callable, Any, int, int]] = []
+        for instr in self.teal.instructions:
+            handler = _OPS.get(instr.op)
+            if handler is None:
+                raise ValueError(f"Opcode {instr.op} (line {instr.line}) is not supported by the local AVM")
+            self.steps.append((handler, self._immediates(instr.op, instr.args), opcode_cost(instr.op, instr.args),
+                               instr.line))
+
+    def _immediates(self, op: str, args: List[str]) -> Any:
+        labels = self.teal.labels
+        if op in ("b", "bz", "bnz", "callsub"):
+            return labels[args[0]]
+        if op in ("switch", "match"):
+            return [labels[a] for a in args]
+        if op in ("int", "pushint"):
+            return parse_int(args[0])
+        if op in ("byte", "pushbytes"):
+            return parse_bytes(args)
+        if op == "addr":
+            from algosdk import encoding
+            return encoding.decode_address(args[0])
+        if op == "method":
+            return _method_selector(_unescape(args[0]).decode())
+        if op in ("intcblock", "pushints"):
+            return [parse_int(a) for a in args]
+        if op in ("bytecblock", "pushbytess"):
+            return [parse_bytes([a]) for a in args]
+        if op.startswith("intc_") or op.startswith("bytec_"):
+            return int(op.rsplit("_", 1)[1])
+        if op in ("txn", "txna", "txnas", "gtxn", "gtxna", "gtxnas", "gtxns", "gtxnsa", "gtxnsas", "itxn", "itxna",
+                  "itxn_field", "global", "asset_holding_get", "asset_params_get", "app_params_get",
+                  "acct_params_get", "ecdsa_verify", "ecdsa_pk_decompress"):
+            return tuple(int(a) if a.isdigit() else a for a in args)
+        return tuple(int(a) if a.lstrip("-").isdigit() else a for a in args)
+
+
+class Frame:
+    __slots__ = ("return_to", "height", "args", "returns")
+
+    def __init__(self, return_to: int, height: int):
+        self.return_to = return_to
+        self.height = height
+        self.args: Optional[int] = None
+        self.returns = 0
+
+
+class Evaluation:
+    """One run of an application program against the ledger"""
+
+    def __init__(self, ledger: "Ledger", program: Program, group: List[Dict[str, Any]], index: int,
+                 app_id: int, budget: "Budget", depth: int = 0, caller_app_id: int = 0):
+        self.ledger = ledger
+        self.program = program
+        self.group = group
+        self.index = index
+        self.txn = group[index]
+        self.app_id = app_id
+        self.budget = budget
+        self.depth = depth
+        self.caller_app_id = caller_app_id
+        self.stack: List[Value] = []
+        self.scratch: List[Value] = [0] * 256
+        self.frames: List[Frame] = []
+        self.intc: List[int] = []
+        self.bytec: List[bytes] = []
+        self.logs: List[bytes] = []
+        self.log_bytes = 0
+        self.cost = 0
+        self.pending: Optional[List[Dict[str, Any]]] = None  # inner group being built
+        self.inner: List[Dict[str, Any]] = []  # submitted inner transactions
+        self.pc = 0
+        self.line = 0
+
+    def fail(self, message: str):
+        raise AvmError(message, self.line, self.app_id)
+
+    # Stack helpers
+    def push(self, value: Value):
+        if len(self.stack) >= MAX_STACK_DEPTH:
+            self.fail("stack overflow")
+        self.stack.append(value)
+
+    def pop(self) -> Value:
+        if not self.stack:
+            self.fail("stack underflow")
+        return self.stack.pop()
+
+    def pop_int(self) -> int:
+        value = self.pop()
+        if not isinstance(value, int):
+            self.fail("expected uint64, got bytes")
+        return value
+
+    def pop_bytes(self) -> bytes:
+        value = self.pop()
+        if not isinstance(value, bytes):
+            self.fail("expected bytes, got uint64")
+        return value
+
+    def push_int(self, value: int):
+        if not 0 <= value < UINT64:
+            self.fail("uint64 overflow" if value > 0 else "uint64 underflow")
+        self.push(value)
+
+    def push_bytes(self, value: bytes):
+        if len(value) > MAX_BYTES:
+            self.fail(f"byte string longer than {MAX_BYTES}")
+        self.push(value)
+
+    def run(self) -> bool:
+        steps = self.program.steps
+        budget = self.budget
+        while self.pc < len(steps):
+            handler, immediates, cost, self.line = steps[self.pc]
+            self.cost += cost
+            budget.used += cost
+            if budget.used > budget.limit:
+                self.fail(f"dynamic cost budget exceeded ({budget.used} > {budget.limit})")
+            self.pc += 1
+            result = handler(self, immediates)
+            if result is not None:
+                return result
+        if len(self.stack) != 1:
+            self.fail(f"stack has {len(self.stack)} values at the end of the program")
+        value = self.stack[0]
+        if not isinstance(value, int):
+            self.fail("program ended with bytes on the stack")
+        return value != 0
+
+
+# ---------------------------------------------------------------- opcodes
+
+_OPS: Dict[str, Callable[[Evaluation, Any], Optional[bool]]] = {}
+
+
+def op(*names: str):
+    def register(fn):
+        for name in names:
+            _OPS[name] = fn
+        return fn
+    return register
+
+
+def _binary_int(fn: Callable[[Evaluation, int, int], int]):
+    def handler(ev: Evaluation, _):
+        b = ev.pop_int()
+        a = ev.pop_int()
+        ev.push_int(fn(ev, a, b))
+    return handler
+
+
+def _div(ev: Evaluation, a: int, b: int) -> int:
+    if b == 0:
+        ev.fail("division by zero")
+    return a // b
+
+
+def _mod(ev: Evaluation, a: int, b: int) -> int:
+    if b == 0:
+        ev.fail("modulo by zero")
+    return a % b
+
+
+def _exp(ev: Evaluation, a: int, b: int) -> int:
+    if a == 0 and b == 0:
+        ev.fail("0^0 is undefined")
+    if a > 1 and b >= 64:
+        ev.fail("uint64 overflow")
+    return a ** b
+
+
+def _shift(ev: Evaluation, b: int) -> int:
+    if b >= 64:
+        ev.fail("shift of 64 or more")
+    return b
+
+
+for _name, _fn in {
+    "+": lambda ev, a, b: a + b,
+    "-": lambda ev, a, b: a - b,
+    "*": lambda ev, a, b: a * b,
+    "/": _div,
+    "%": _mod,
+    "<": lambda ev, a, b: int(a < b),
+    ">": lambda ev, a, b: int(a > b),
+    "<=": lambda ev, a, b: int(a <= b),
+    ">=": lambda ev, a, b: int(a >= b),
+    "&&": lambda ev, a, b: int(bool(a and b)),
+    "||": lambda ev, a, b: int(bool(a or b)),
+    "|": lambda ev, a, b: a | b,
+    "&": lambda ev, a, b: a & b,
+    "^": lambda ev, a, b: a ^ b,
+    "exp": _exp,
+    "shl": lambda ev, a, b: (a << _shift(ev, b)) % UINT64,
+    "shr": lambda ev, a, b: a >> _shift(ev, b),
+}.items():
+    _OPS[_name] = _binary_int(_fn)
+
+
+def _equality(negate: bool):
+    def handler(ev: Evaluation, _):
+        b = ev.pop()
+        a = ev.pop()
+        if type(a) is not type(b):
+            ev.fail("cannot compare uint64 and bytes")
+        ev.push(int((a == b) != negate))
+    return handler
+
+
+_OPS["=="] = _equality(False)
+_OPS["!="] = _equality(True)
+
+
+@op("!")
+def _not(ev: Evaluation, _):
+    ev.push(int(ev.pop_int() == 0))
+
+
+@op("~")
+def _bitnot(ev: Evaluation, _):
+    ev.push(ev.pop_int() ^ (UINT64 - 1))
+
+
+@op("sqrt")
+def _sqrt(ev: Evaluation, _):
+    import math
+    ev.push(math.isqrt(ev.pop_int()))
+
+
+@op("bitlen")
+def _bitlen(ev: Evaluation, _):
+    value = ev.pop()
+    ev.push(value.bit_length() if isinstance(value, int) else int.from_bytes(value, "big").bit_length())
+
+
+@op("mulw")
+def _mulw(ev: Evaluation, _):
+    b = ev.pop_int()
+    a = ev.pop_int()
+    product = a * b
+    ev.push(product >> 64)
+    ev.push(product & (UINT64 - 1))
+
+
+@op("addw")
+def _addw(ev: Evaluation, _):
+    b = ev.pop_int()
+    a = ev.pop_int()
+    total = a + b
+    ev.push(total >> 64)
+    ev.push(total & (UINT64 - 1))
+
+
+@op("divw")
+def _divw(ev: Evaluation, _):
+    c = ev.pop_int()
+    low = ev.pop_int()
+    high = ev.pop_int()
+    if c == 0:
+        ev.fail("division by zero")
+    ev.push_int(((high << 64) | low) // c)
+
+
+@op("divmodw")
+def _divmodw(ev: Evaluation, _):
+    d_low = ev.pop_int()
+    d_high = ev.pop_int()
+    n_low = ev.pop_int()
+    n_high = ev.pop_int()
+    divisor = (d_high << 64) | d_low
+    if divisor == 0:
+        ev.fail("division by zero")
+    quotient, remainder = divmod((n_high << 64) | n_low, divisor)
+    for value in (quotient >> 64, quotient & (UINT64 - 1), remainder >> 64, remainder & (UINT64 - 1)):
+        ev.push(value)
+
+
+@op("expw")
+def _expw(ev: Evaluation, _):
+    b = ev.pop_int()
+    a = ev.pop_int()
+    if a == 0 and b == 0:
+        ev.fail("0^0 is undefined")
+    result = a ** b if a <= 1 or b < 128 else UINT64 ** 2
+    if result >= UINT64 ** 2:
+        ev.fail("expw overflow")
+    ev.push(result >> 64)
+    ev.push(result & (UINT64 - 1))
+
+
+@op("itob")
+def _itob(ev: Evaluation, _):
+    ev.push(ev.pop_int().to_bytes(8, "big"))
+
+
+@op("btoi")
+def _btoi(ev: Evaluation, _):
+    value = ev.pop_bytes()
+    if len(value) > 8:
+        ev.fail("btoi of more than 8 bytes")
+    ev.push(int.from_bytes(value, "big"))
+
+
+@op("len")
+def _len(ev: Evaluation, _):
+    ev.push(len(ev.pop_bytes()))
+
+
+@op("concat")
+def _concat(ev: Evaluation, _):
+    b = ev.pop_bytes()
+    a = ev.pop_bytes()
+    ev.push_bytes(a + b)
+
+
+@op("bzero")
+def _bzero(ev: Evaluation, _):
+    size = ev.pop_int()
+    if size > MAX_BYTES:
+        ev.fail(f"bzero of more than {MAX_BYTES} bytes")
+    ev.push(bytes(size))
+
+
+def _slice(ev: Evaluation, value: bytes, start: int, end: int) -> bytes:
+    if start > end or end > len(value):
+        ev.fail(f"extraction [{start}:{end}] out of range for {len(value)} bytes")
+    return value[start:end]
+
+
+@op("substring")
+def _substring(ev: Evaluation, immediates):
+    start, end = immediates
+    ev.push(_slice(ev, ev.pop_bytes(), start, end))
+
+
+@op("substring3")
+def _substring3(ev: Evaluation, _):
+    end = ev.pop_int()
+    start = ev.pop_int()
+    ev.push(_slice(ev, ev.pop_bytes(), start, end))
+
+
+@op("extract")
+def _extract(ev: Evaluation, immediates):
+    start, length = immediates
+    value = ev.pop_bytes()
+    ev.push(_slice(ev, value, start, len(value) if length == 0 else start + length))
+
+
+@op("extract3")
+def _extract3(ev: Evaluation, _):
+    length = ev.pop_int()
+    start = ev.pop_int()
+    ev.push(_slice(ev, ev.pop_bytes(), start, start + length))
+
+
+def _extract_uint(size: int):
+    def handler(ev: Evaluation, _):
+        start = ev.pop_int()
+        ev.push(int.from_bytes(_slice(ev, ev.pop_bytes(), start, start + size), "big"))
+    return handler
+
+
+_OPS["extract_uint16"] = _extract_uint(2)
+_OPS["extract_uint32"] = _extract_uint(4)
+_OPS["extract_uint64"] = _extract_uint(8)
+
+
+@op("replace2")
+def _replace2(ev: Evaluation, immediates):
+    replacement = ev.pop_bytes()
+    value = ev.pop_bytes()
+    ev.push(_replace(ev, value, immediates[0], replacement))
+
+
+@op("replace3")
+def _replace3(ev: Evaluation, _):
+    replacement = ev.pop_bytes()
+    start = ev.pop_int()
+    value = ev.pop_bytes()
+    ev.push(_replace(ev, value, start, replacement))
+
+
+def _replace(ev: Evaluation, value: bytes, start: int, replacement: bytes) -> bytes:
+    if start + len(replacement) > len(value):
+        ev.fail("replacement out of range")
+    return value[:start] + replacement + value[start + len(replacement):]
+
+
+@op("getbyte")
+def _getbyte(ev: Evaluation, _):
+    index = ev.pop_int()
+    value = ev.pop_bytes()
+    if index >= len(value):
+        ev.fail("getbyte out of range")
+    ev.push(value[index])
+
+
+@op("setbyte")
+def _setbyte(ev: Evaluation, _):
+    byte = ev.pop_int()
+    index = ev.pop_int()
+    value = ev.pop_bytes()
+    if index >= len(value) or byte > 255:
+        ev.fail("setbyte out of range")
+    ev.push(value[:index] + bytes([byte]) + value[index + 1:])
+
+
+@op("getbit")
+def _getbit(ev: Evaluation, _):
+    index = ev.pop_int()
+    value = ev.pop()
+    if isinstance(value, int):
+        if index >= 64:
+            ev.fail("getbit out of range")
+        ev.push((value >> index) & 1)
+    else:
+        if index >= len(value) * 8:
+            ev.fail("getbit out of range")
+        ev.push((value[index // 8] >> (7 - index % 8)) & 1)
+
+
+@op("setbit")
+def _setbit(ev: Evaluation, _):
+    bit = ev.pop_int()
+    index = ev.pop_int()
+    value = ev.pop()
+    if bit > 1:
+        ev.fail("setbit value must be 0 or 1")
+    if isinstance(value, int):
+        if index >= 64:
+            ev.fail("setbit out of range")
+        ev.push(value | (1 << index) if bit else value & ~(1 << index))
+    else:
+        if index >= len(value) * 8:
+            ev.fail("setbit out of range")
+        data = bytearray(value)
+        mask = 1 << (7 - index % 8)
+        data[index // 8] = data[index // 8] | mask if bit else data[index // 8] & ~mask
+        ev.push(bytes(data))
+
+
+def _hash(name: str):
+    def handler(ev: Evaluation, _):
+        ev.push(hashlib.new(name, ev.pop_bytes()).digest())
+    return handler
+
+
+_OPS["sha256"] = _hash("sha256")
+_OPS["sha3_256"] = _hash("sha3_256")
+_OPS["sha512_256"] = _hash("sha512_256")
+
+
+@op("keccak256")
+def _keccak256(ev: Evaluation, _):
+    from Crypto.Hash import keccak  # pycryptodome
+    ev.push(keccak.new(digest_bits=256, data=ev.pop_bytes()).digest())
+
+
+# Byte-string math on big-endian unsigned integers of up to 64 bytes
+def _pop_bigint(ev: Evaluation) -> int:
+    value = ev.pop_bytes()
+    if len(value) > MAX_BIGINT_BYTES:
+        ev.fail(f"math argument longer than {MAX_BIGINT_BYTES} bytes")
+    return int.from_bytes(value, "big")
+
+
+def _bigint_bytes(value: int) -> bytes:
+    return value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def _binary_bigint(fn: Callable[[Evaluation, int, int], Any], compare: bool = False):
+    def handler(ev: Evaluation, _):
+        b = _pop_bigint(ev)
+        a = _pop_bigint(ev)
+        result = fn(ev, a, b)
+        ev.push(int(result) if compare else _bigint_bytes(result))
+    return handler
+
+
+def _bigint_checked(ev: Evaluation, value: int) -> int:
+    if value < 0:
+        ev.fail("byte math underflow")
+    return value
+
+
+for _name, _fn, _compare in (
+    ("b+", lambda ev, a, b: a + b, False),
+    ("b-", lambda ev, a, b: _bigint_checked(ev, a - b), False),
+    ("b*", lambda ev, a, b: a * b, False),
+    ("b/", _div, False),
+    ("b%", _mod, False),
+    ("b<", lambda ev, a, b: a < b, True),
+    ("b>", lambda ev, a, b: a > b, True),
+    ("b<=", lambda ev, a, b: a <= b, True),
+    ("b>=", lambda ev, a, b: a >= b, True),
+    ("b==", lambda ev, a, b: a == b, True),
+    ("b!=", lambda ev, a, b: a != b, True),
+):
+    _OPS[_name] = _binary_bigint(_fn, _compare)
+
+
+def _bitwise_bytes(fn: Callable[[int, int], int]):
+    def handler(ev: Evaluation, _):
+        b = ev.pop_bytes()
+        a = ev.pop_bytes()
+        size = max(len(a), len(b))
+        a, b = a.rjust(size, b"\x00"), b.rjust(size, b"\x00")
+        ev.push(bytes(fn(x, y) for x, y in zip(a, b)))
+    return handler
+
+
+_OPS["b|"] = _bitwise_bytes(lambda x, y: x | y)
+_OPS["b&"] = _bitwise_bytes(lambda x, y: x & y)
+_OPS["b^"] = _bitwise_bytes(lambda x, y: x ^ y)
+
+
+@op("b~")
+def _bytes_not(ev: Evaluation, _):
+    ev.push(bytes(255 - x for x in ev.pop_bytes()))
+
+
+@op("bsqrt")
+def _bsqrt(ev: Evaluation, _):
+    import math
+    ev.push(_bigint_bytes(math.isqrt(_pop_bigint(ev))))
+
+
+# Constants
+@op("int", "pushint", "byte", "pushbytes", "addr", "method")
+def _push_constant(ev: Evaluation, value):
+    ev.push(value)
+
+
+@op("pushints", "pushbytess")
+def _push_constants(ev: Evaluation, values):
+    for value in values:
+        ev.push(value)
+
+
+@op("intcblock")
+def _intcblock(ev: Evaluation, values):
+    ev.intc = values
+
+
+@op("bytecblock")
+def _bytecblock(ev: Evaluation, values):
+    ev.bytec = values
+
+
+@op("intc", "intc_0", "intc_1", "intc_2", "intc_3")
+def _intc(ev: Evaluation, index):
+    index = index[0] if isinstance(index, tuple) else index
+    if index >= len(ev.intc):
+        ev.fail("intc index out of range")
+    ev.push(ev.intc[index])
+
+
+@op("bytec", "bytec_0", "bytec_1", "bytec_2", "bytec_3")
+def _bytec(ev: Evaluation, index):
+    index = index[0] if isinstance(index, tuple) else index
+    if index >= len(ev.bytec):
+        ev.fail("bytec index out of range")
+    ev.push(ev.bytec[index])
+
+
+# Stack manipulation
+@op("pop")
+def _pop(ev: Evaluation, _):
+    ev.pop()
+
+
+@op("popn")
+def _popn(ev: Evaluation, immediates):
+    for _ in range(immediates[0]):
+        ev.pop()
+
+
+@op("dup")
+def _dup(ev: Evaluation, _):
+    value = ev.pop()
+    ev.push(value)
+    ev.push(value)
+
+
+@op("dup2")
+def _dup2(ev: Evaluation, _):
+    b = ev.pop()
+    a = ev.pop()
+    for value in (a, b, a, b):
+        ev.push(value)
+
+
+@op("dupn")
+def _dupn(ev: Evaluation, immediates):
+    value = ev.pop()
+    for _ in range(immediates[0] + 1):
+        ev.push(value)
+
+
+def _depth(ev: Evaluation, n: int) -> int:
+    if n >= len(ev.stack):
+        ev.fail("stack underflow")
+    return len(ev.stack) - 1 - n
+
+
+@op("dig")
+def _dig(ev: Evaluation, immediates):
+    ev.push(ev.stack[_depth(ev, immediates[0])])
+
+
+@op("bury")
+def _bury(ev: Evaluation, immediates):
+    value = ev.pop()
+    ev.stack[_depth(ev, immediates[0] - 1)] = value
+
+
+@op("cover")
+def _cover(ev: Evaluation, immediates):
+    position = _depth(ev, immediates[0])
+    ev.stack.insert(position, ev.stack.pop())
+
+
+@op("uncover")
+def _uncover(ev: Evaluation, immediates):
+    ev.stack.append(ev.stack.pop(_depth(ev, immediates[0])))
+
+
+@op("swap")
+def _swap(ev: Evaluation, _):
+    b = ev.pop()
+    a = ev.pop()
+    ev.push(b)
+    ev.push(a)
+
+
+@op("select")
+def _select(ev: Evaluation, _):
+    choose_b = ev.pop_int()
+    b = ev.pop()
+    a = ev.pop()
+    ev.push(b if choose_b else a)
+
+
+# Scratch space
+@op("load")
+def _load(ev: Evaluation, immediates):
+    ev.push(ev.scratch[immediates[0]])
+
+
+@op("store")
+def _store(ev: Evaluation, immediates):
+    ev.scratch[immediates[0]] = ev.pop()
+
+
+@op("loads")
+def _loads(ev: Evaluation, _):
+    slot = ev.pop_int()
+    if slot > 255:
+        ev.fail("scratch slot out of range")
+    ev.push(ev.scratch[slot])
+
+
+@op("stores")
+def _stores(ev: Evaluation, _):
+    value = ev.pop()
+    slot = ev.pop_int()
+    if slot > 255:
+        ev.fail("scratch slot out of range")
+    ev.scratch[slot] = value
+
+
+# Flow control
+@op("err")
+def _err(ev: Evaluation, _):
+    ev.fail("err opcode executed")
+
+
+@op("assert")
+def _assert(ev: Evaluation, _):
+    if not ev.pop_int():
+        ev.fail("assert failed")
+
+
+@op("return")
+def _return(ev: Evaluation, _):
+    value = ev.pop_int()
+    return value != 0
+
+
+@op("b")
+def _branch(ev: Evaluation, target):
+    ev.pc = target
+
+
+@op("bz")
+def _branch_zero(ev: Evaluation, target):
+    if ev.pop_int() == 0:
+        ev.pc = target
+
+
+@op("bnz")
+def _branch_nonzero(ev: Evaluation, target):
+    if ev.pop_int() != 0:
+        ev.pc = target
+
+
+@op("switch")
+def _switch(ev: Evaluation, targets):
+    index = ev.pop_int()
+    if index < len(targets):
+        ev.pc = targets[index]
+
+
+@op("match")
+def _match(ev: Evaluation, targets):
+    value = ev.pop()
+    candidates = [ev.pop() for _ in targets][::-1]
+    for candidate, target in zip(candidates, targets):
+        if type(candidate) is type(value) and candidate == value:
+            ev.pc = target
+            return
+
+
+@op("callsub")
+def _callsub(ev: Evaluation, target):
+    if len(ev.frames) >= 1024:
+        ev.fail("call stack overflow")
+    ev.frames.append(Frame(ev.pc, len(ev.stack)))
+    ev.pc = target
+
+
+@op("retsub")
+def _retsub(ev: Evaluation, _):
+    if not ev.frames:
+        ev.fail("retsub with an empty call stack")
+    frame = ev.frames.pop()
+    if frame.args is not None:
+        base = frame.height - frame.args
+        if len(ev.stack) < frame.height + frame.returns:
+            ev.fail("retsub with too few return values")
+        results = ev.stack[len(ev.stack) - frame.returns:] if frame.returns else []
+        del ev.stack[base:]
+        ev.stack.extend(results)
+    ev.pc = frame.return_to
+
+
+@op("proto")
+def _proto(ev: Evaluation, immediates):
+    if not ev.frames:
+        ev.fail("proto outside a subroutine")
+    frame = ev.frames[-1]
+    args, returns = immediates
+    if frame.height < args:
+        ev.fail("proto with too few arguments on the stack")
+    frame.args = args
+    frame.returns = returns
+
+
+def _frame_index(ev: Evaluation, offset: int) -> int:
+    if not ev.frames or ev.frames[-1].args is None:
+        ev.fail("frame access without proto")
+    index = ev.frames[-1].height + offset
+    if not 0 <= index < len(ev.stack):
+        ev.fail("frame access out of range")
+    return index
+
+
+@op("frame_dig")
+def _frame_dig(ev: Evaluation, immediates):
+    ev.push(ev.stack[_frame_index(ev, immediates[0])])
+
+
+@op("frame_bury")
+def _frame_bury(ev: Evaluation, immediates):
+    value = ev.pop()
+    ev.stack[_frame_index(ev, immediates[0])] = value
+
+
+# Transaction and global fields
+def _txn_field(ev: Evaluation, txn: Dict[str, Any], field: str, index: Optional[int] = None) -> Value:
+    if field in ARRAY_FIELDS:
+        if index is None:
+            ev.fail(f"{field} needs an index")
+        if field == "Accounts":
+            values = [txn["Sender"], *txn.get("Accounts", [])]
+        elif field == "Applications":
+            values = [txn.get("ApplicationID", 0), *txn.get("Applications", [])]
+        else:
+            values = txn.get(field, [])
+        if index >= len(values):
+            ev.fail(f"{field} index {index} out of range")
+        return values[index]
+    if field.startswith("Num") and field[3:] in ("AppArgs", "Accounts", "Applications", "Assets", "Logs"):
+        key = {"AppArgs": "ApplicationArgs"}.get(field[3:], field[3:])
+        return len(txn.get(key, []))
+    if field == "Type":
+        return TYPE_NAMES.get(txn.get("TypeEnum", 0), b"")
+    if field == "GroupIndex":
+        return txn.get("GroupIndex", 0)
+    if field == "LastLog":
+        logs = txn.get("Logs", [])
+        return logs[-1] if logs else b""
+    if field in ("TxID", "GroupID"):
+        return txn.get(field, bytes(32))
+    value = txn.get(field)
+    if value is None:
+        return bytes(32) if field in ADDRESS_FIELDS else (b"" if field in ("Note", "Lease", "ApprovalProgram",
+                                                                            "ClearStateProgram") else 0)
+    if not isinstance(value, (int, bytes)):
+        return b""  # decoded programs of harness-created apps
+    return value
+
+
+@op("txn")
+def _txn(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, ev.txn, *immediates))
+
+
+@op("txna")
+def _txna(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, ev.txn, immediates[0], immediates[1]))
+
+
+@op("txnas")
+def _txnas(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, ev.txn, immediates[0], ev.pop_int()))
+
+
+def _group_txn(ev: Evaluation, index: int) -> Dict[str, Any]:
+    if index >= len(ev.group):
+        ev.fail(f"group index {index} out of range")
+    return ev.group[index]
+
+
+@op("gtxn")
+def _gtxn(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, _group_txn(ev, immediates[0]), immediates[1]))
+
+
+@op("gtxna")
+def _gtxna(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, _group_txn(ev, immediates[0]), immediates[1], immediates[2]))
+
+
+@op("gtxnas")
+def _gtxnas(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, _group_txn(ev, immediates[0]), immediates[1], ev.pop_int()))
+
+
+@op("gtxns")
+def _gtxns(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, _group_txn(ev, ev.pop_int()), immediates[0]))
+
+
+@op("gtxnsa")
+def _gtxnsa(ev: Evaluation, immediates):
+    ev.push(_txn_field(ev, _group_txn(ev, ev.pop_int()), immediates[0], immediates[1]))
+
+
+@op("gtxnsas")
+def _gtxnsas(ev: Evaluation, immediates):
+    index = ev.pop_int()
+    ev.push(_txn_field(ev, _group_txn(ev, ev.pop_int()), immediates[0], index))
+
+
+@op("global")
+def _global(ev: Evaluation, immediates):
+    ev.push(ev.ledger.global_field(ev, immediates[0]))
+
+
+@op("log")
+def _log(ev: Evaluation, _):
+    message = ev.pop_bytes()
+    if len(ev.logs) >= MAX_LOGS or ev.log_bytes + len(message) > MAX_LOG_BYTES:
+        ev.fail("too many logs")
+    ev.logs.append(message)
+    ev.log_bytes += len(message)
+
+
+# Ledger access is implemented by the ledger
+def _ledger_op(name: str):
+    def handler(ev: Evaluation, immediates):
+        return getattr(ev.ledger, f"op_{name}")(ev, immediates)
+    return handler
+
+
+for _name in ("app_global_get", "app_global_get_ex", "app_global_put", "app_global_del",
+              "app_local_get", "app_local_get_ex", "app_local_put", "app_local_del", "app_opted_in",
+              "balance", "min_balance", "asset_holding_get", "asset_params_get", "app_params_get",
+              "acct_params_get", "box_create", "box_extract", "box_replace", "box_put", "box_get",
+              "box_len", "box_del", "itxn_begin", "itxn_next", "itxn_field", "itxn_submit", "itxn", "itxna"):
+    _OPS[_name] = _ledger_op(_name)
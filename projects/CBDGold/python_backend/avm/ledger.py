@@ -0,0 +1,707 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import pyteal as pt
+from algosdk import encoding, logic, transaction
+from .interpreter import MAX_CALL_DEPTH, NAMED_INTS, TYPE_NAMES, AvmError, Evaluation, Program, Value, _txn_field
+from .contracts import load_contract
+from .opcodes import APP_CALL_BUDGET
+
+MIN_BALANCE = 100_000
+MAX_INNER_TXNS = 256
+MAX_BOX_SIZE = 32768
+MAX_KEY_VALUE_SIZE = 128
+
+PAY, AXFER, APPL = NAMED_INTS["pay"], NAMED_INTS["axfer"], NAMED_INTS["appl"]
+NOOP, OPT_IN, CLOSE_OUT, CLEAR_STATE, UPDATE, DELETE = range(6)
+ON_COMPLETION_NAMES = {v: k for k, v in NAMED_INTS.items() if k[0].isupper()}
+
+_MISSING = object()
+# Bytecode of "int 1" programs, which OpUp's inner app calls create
+_APPROVE_BYTECODE = (b"\x81\x01", b"\x20\x01\x01\x22")
+
+Address = Union[str, bytes]
+ProgramSource = Union[str, Program, pt.Expr, Callable[[], pt.Expr]]
+
+
+class Budget:
+    """Opcode budget pooled across a group's app calls, including inner ones"""
+    __slots__ = ("limit", "used")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+
+@dataclass
+class Account:
+    algo: int = 0
+    assets: Dict[int, int] = field(default_factory=dict)  # opted-in holdings
+    local: Dict[int, Dict[bytes, Value]] = field(default_factory=dict)  # opted-in apps
+
+
+@dataclass
+class App:
+    id: int
+    creator: bytes
+    address: bytes
+    approval: Program
+    clear: Program
+    global_state: Dict[bytes, Value] = field(default_factory=dict)
+    boxes: Dict[bytes, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class Asset:
+    id: int
+    creator: bytes
+    total: int
+    decimals: int = 0
+    unit_name: bytes = b""
+    name: bytes = b""
+
+
+@dataclass
+class CallResult:
+    app_id: int
+    on_completion: str
+    cost: int  # opcodes this call's own program ran
+    logs: List[bytes]
+    inner_txns: int
+
+
+@dataclass
+class GroupResult:
+    ok: bool
+    error: Optional[str]
+    failed_index: Optional[int]
+    calls: List[CallResult]
+    budget: int  # pooled limit, including inner app calls
+    cost: int  # pooled opcodes used, including inner programs
+
+    @property
+    def logs(self) -> List[bytes]:
+        return [entry for call in self.calls for entry in call.logs]
+
+
+def _pk(address: Address) -> bytes:
+    return address if isinstance(address, bytes) else encoding.decode_address(address)
+
+
+def _arg(value: Union[bytes, str, int]) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    return value.to_bytes(8, "big")
+
+
+def app_call(sender: Address, app_id: int, args: Sequence[Union[bytes, str, int]] = (),
+             on_complete: int = NOOP, accounts: Sequence[Address] = (), apps: Sequence[int] = (),
+             assets: Sequence[int] = (), approval_program: Optional[ProgramSource] = None,
+             clear_program: Optional[ProgramSource] = None) -> Dict[str, Any]:
+    """An application call in the harness's field form"""
+    txn = {
+        "TypeEnum": APPL, "Sender": _pk(sender), "ApplicationID": app_id, "OnCompletion": on_complete,
+        "ApplicationArgs": [_arg(a) for a in args], "Accounts": [_pk(a) for a in accounts],
+        "Applications": list(apps), "Assets": list(assets),
+    }
+    if approval_program is not None:
+        txn["ApprovalProgram"] = approval_program
+        txn["ClearStateProgram"] = clear_program if clear_program is not None else pt.Approve()
+    return txn
+
+
+def asset_transfer(sender: Address, receiver: Address, asset_id: int, amount: int,
+                   close_to: Optional[Address] = None) -> Dict[str, Any]:
+    txn = {"TypeEnum": AXFER, "Sender": _pk(sender), "AssetReceiver": _pk(receiver),
+           "XferAsset": asset_id, "AssetAmount": amount}
+    if close_to is not None:
+        txn["AssetCloseTo"] = _pk(close_to)
+    return txn
+
+
+def payment(sender: Address, receiver: Address, amount: int) -> Dict[str, Any]:
+    return {"TypeEnum": PAY, "Sender": _pk(sender), "Receiver": _pk(receiver), "Amount": amount}
+
+
+def from_algosdk(txn: transaction.Transaction) -> Dict[str, Any]:
+    """Field form of an unsigned algosdk payment, asset transfer or app call"""
+    fields: Dict[str, Any] = {"Sender": _pk(txn.sender), "Fee": txn.fee, "FirstValid": txn.first_valid_round,
+                              "LastValid": txn.last_valid_round, "Note": txn.note or b"",
+                              "Lease": txn.lease or b""}
+    if isinstance(txn, transaction.PaymentTxn):
+        fields.update(TypeEnum=PAY, Receiver=_pk(txn.receiver), Amount=txn.amt)
+    elif isinstance(txn, transaction.AssetTransferTxn):
+        fields.update(TypeEnum=AXFER, AssetReceiver=_pk(txn.receiver), XferAsset=txn.index,
+                      AssetAmount=txn.amount)
+        if txn.close_assets_to:
+            fields["AssetCloseTo"] = _pk(txn.close_assets_to)
+    elif isinstance(txn, transaction.ApplicationCallTxn):
+        fields.update(
+            TypeEnum=APPL, ApplicationID=txn.index or 0, OnCompletion=int(txn.on_complete),
+            ApplicationArgs=list(txn.app_args or []), Accounts=[_pk(a) for a in txn.accounts or []],
+            Applications=list(txn.foreign_apps or []), Assets=list(txn.foreign_assets or []),
+        )
+        if txn.approval_program:
+            fields["ApprovalProgram"] = txn.approval_program
+            fields["ClearStateProgram"] = txn.clear_program
+    else:
+        raise ValueError(f"Unsupported transaction type {txn.type}")
+    return fields
+
+
+def to_program(source: ProgramSource) -> Program:
+    """A harness program from TEAL, a PyTeal expression or a PyTeal program function"""
+    if isinstance(source, Program):
+        return source
+    if isinstance(source, str):
+        return Program(source)
+    if isinstance(source, bytes):
+        if source[1:] in _APPROVE_BYTECODE:
+            return Program(f"#pragma version {source[0]}\nint 1")
+        raise AvmError("Bytecode programs are not supported; create apps from TEAL or PyTeal")
+    from ..utils.teal_cache import TealCompiler
+    return Program(TealCompiler().to_teal(source))
+
+
+class Ledger:
+    """In-process ledger stand-in that runs TEAL application programs.
+
+    Groups execute atomically: every state write goes through an undo
+    journal, and a failing transaction rolls the whole group back. App calls
+    share a pooled budget of 700 opcodes per app call in the group, plus 700
+    per inner app call, as on chain. Accounts, ASA holdings, global and local
+    state, boxes, logs and inner payments, asset transfers and app calls are
+    modelled; fees, minimum balances, state schemas and reference
+    availability are not.
+    """
+
+    def __init__(self, timestamp: Optional[int] = None, round_num: int = 1):
+        self.accounts: Dict[bytes, Account] = {}
+        self.apps: Dict[int, App] = {}
+        self.assets: Dict[int, Asset] = {}
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.round = round_num
+        self._next_id = 1001
+        self._journal: Optional[List[Tuple[Any, Any, Any]]] = None
+
+    # ------------------------------------------------------------ journal
+    def _set(self, container: Dict, key: Any, value: Any):
+        if self._journal is not None:
+            self._journal.append((container, key, container.get(key, _MISSING)))
+        container[key] = value
+
+    def _delete(self, container: Dict, key: Any):
+        if key in container:
+            if self._journal is not None:
+                self._journal.append((container, key, container[key]))
+            del container[key]
+
+    def _rollback(self):
+        for container, key, previous in reversed(self._journal or []):
+            if previous is _MISSING:
+                container.pop(key, None)
+            else:
+                container[key] = previous
+        self._journal = None
+
+    def _account(self, pk: bytes) -> Account:
+        account = self.accounts.get(pk)
+        if account is None:
+            account = Account()
+            self._set(self.accounts, pk, account)
+        return account
+
+    # ------------------------------------------------------------ setup helpers
+    def advance(self, seconds: int = 0, rounds: int = 1):
+        self.timestamp += seconds
+        self.round += rounds
+
+    def create_account(self, algo: int = 10_000_000) -> str:
+        pk = os.urandom(32)
+        self.accounts[pk] = Account(algo=algo)
+        return encoding.encode_address(pk)
+
+    def fund(self, address: Address, algo: int):
+        self._account(_pk(address)).algo += algo
+
+    def create_asset(self, creator: Address, total: int, decimals: int = 0,
+                     unit_name: str = "", name: str = "") -> int:
+        asset_id = self._next_id
+        self._next_id += 1
+        self.assets[asset_id] = Asset(asset_id, _pk(creator), total, decimals, unit_name.encode(), name.encode())
+        self._account(_pk(creator)).assets[asset_id] = total
+        return asset_id
+
+    def opt_in_asset(self, address: Address, asset_id: int):
+        self._account(_pk(address)).assets.setdefault(asset_id, 0)
+
+    def create_app(self, creator: Address, approval: ProgramSource, clear: Optional[ProgramSource] = None,
+                   args: Sequence[Union[bytes, str, int]] = (), **kwargs) -> int:
+        """Create an app from TEAL or PyTeal and return its id"""
+        result = self.execute([app_call(creator, 0, args, approval_program=to_program(approval),
+                                        clear_program=to_program(clear if clear is not None else pt.Approve()),
+                                        **kwargs)])
+        if not result.ok:
+            raise AvmError(f"App creation failed: {result.error}")
+        return result.calls[0].app_id
+
+    def deploy(self, name: str, creator: Address, **kwargs) -> int:
+        """Create one of the CBD Gold contracts by short name (staking, governance, prize)"""
+        module = load_contract(name)
+        return self.create_app(creator, module.approval_program, module.clear_state_program, **kwargs)
+
+    # ------------------------------------------------------------ inspection
+    @staticmethod
+    def app_address(app_id: int) -> str:
+        return logic.get_application_address(app_id)
+
+    def global_state(self, app_id: int) -> Dict[str, Value]:
+        return {k.decode(errors="replace"): v for k, v in self.apps[app_id].global_state.items()}
+
+    def local_state(self, address: Address, app_id: int) -> Optional[Dict[str, Value]]:
+        local = self.accounts.get(_pk(address), Account()).local.get(app_id)
+        return None if local is None else {k.decode(errors="replace"): v for k, v in local.items()}
+
+    def box(self, app_id: int, name: bytes) -> Optional[bytes]:
+        return self.apps[app_id].boxes.get(name)
+
+    def asset_balance(self, address: Address, asset_id: int) -> Optional[int]:
+        return self.accounts.get(_pk(address), Account()).assets.get(asset_id)
+
+    # ------------------------------------------------------------ execution
+    def execute(self, txns: Iterable[Union[transaction.Transaction, Dict[str, Any]]]) -> GroupResult:
+        """Run a transaction group atomically"""
+        group = [from_algosdk(t) if isinstance(t, transaction.Transaction) else dict(t) for t in txns]
+        for index, txn in enumerate(group):
+            txn["GroupIndex"] = index
+        budget = Budget(APP_CALL_BUDGET * sum(1 for t in group if t.get("TypeEnum") == APPL))
+        calls: List[CallResult] = []
+        self._journal = []
+        index = 0
+        try:
+            for index in range(len(group)):
+                call = self._apply(group, index, budget)
+                if call is not None:
+                    calls.append(call)
+        except AvmError as e:
+            self._rollback()
+            return GroupResult(False, str(e), index, calls, budget.limit, budget.used)
+        self._journal = None
+        return GroupResult(True, None, None, calls, budget.limit, budget.used)
+
+    def _apply(self, group: List[Dict[str, Any]], index: int, budget: Budget, depth: int = 0,
+               caller_app_id: int = 0) -> Optional[CallResult]:
+        txn = group[index]
+        kind = txn.get("TypeEnum")
+        if kind == PAY:
+            self._pay(txn)
+        elif kind == AXFER:
+            self._asset_transfer(txn)
+        elif kind == APPL:
+            return self._app_call(group, index, budget, depth, caller_app_id)
+        else:
+            raise AvmError(f"Unsupported transaction type {TYPE_NAMES.get(kind, kind)}")
+        return None
+
+    def _pay(self, txn: Dict[str, Any]):
+        sender = self._account(txn["Sender"])
+        amount = txn.get("Amount", 0)
+        if sender.algo < amount:
+            raise AvmError(f"Overspend: {sender.algo} < {amount} microAlgos")
+        receiver = self._account(txn.get("Receiver", bytes(32)))
+        self._set(sender.__dict__, "algo", sender.algo - amount)
+        self._set(receiver.__dict__, "algo", receiver.algo + amount)
+
+    def _asset_transfer(self, txn: Dict[str, Any]):
+        asset_id = txn.get("XferAsset", 0)
+        if asset_id not in self.assets:
+            raise AvmError(f"Asset {asset_id} does not exist")
+        amount = txn.get("AssetAmount", 0)
+        sender_pk = txn["Sender"]
+        receiver_pk = txn.get("AssetReceiver", bytes(32))
+        sender = self._account(sender_pk)
+        if sender_pk == receiver_pk and amount == 0 and asset_id not in sender.assets:
+            self._set(sender.assets, asset_id, 0)  # opt-in
+            return
+        receiver = self._account(receiver_pk)
+        for pk, account in ((sender_pk, sender), (receiver_pk, receiver)):
+            if asset_id not in account.assets:
+                raise AvmError(f"{encoding.encode_address(pk)} is not opted in to asset {asset_id}")
+        if sender.assets[asset_id] < amount:
+            raise AvmError(f"Underflow on asset {asset_id}: {sender.assets[asset_id]} < {amount}")
+        self._set(sender.assets, asset_id, sender.assets[asset_id] - amount)
+        self._set(receiver.assets, asset_id, receiver.assets[asset_id] + amount)
+        close_to = txn.get("AssetCloseTo")
+        if close_to:
+            closer = self._account(close_to)
+            if asset_id not in closer.assets:
+                raise AvmError(f"Close-to account is not opted in to asset {asset_id}")
+            self._set(closer.assets, asset_id, closer.assets[asset_id] + sender.assets[asset_id])
+            self._delete(sender.assets, asset_id)
+
+    def _app_call(self, group: List[Dict[str, Any]], index: int, budget: Budget, depth: int,
+                  caller_app_id: int) -> CallResult:
+        txn = group[index]
+        sender = self._account(txn["Sender"])
+        on_completion = txn.get("OnCompletion", NOOP)
+        app_id = txn.get("ApplicationID", 0)
+        if app_id == 0:
+            app_id = self._next_id
+            self._next_id += 1
+            address = encoding.decode_address(logic.get_application_address(app_id))
+            app = App(app_id, txn["Sender"], address, to_program(txn.get("ApprovalProgram", b"")),
+                      to_program(txn.get("ClearStateProgram", pt.Approve())))
+            self._set(self.apps, app_id, app)
+            txn["CreatedApplicationID"] = app_id
+        elif app_id in self.apps:
+            app = self.apps[app_id]
+        else:
+            raise AvmError(f"Application {app_id} does not exist")
+
+        if on_completion == CLEAR_STATE:
+            if app.id not in sender.local:
+                raise AvmError(f"Not opted in to app {app.id}", app_id=app.id)
+            evaluation = Evaluation(self, app.clear, group, index, app.id, budget, depth, caller_app_id)
+            try:
+                evaluation.run()
+            except AvmError:
+                pass  # clear state always succeeds
+            self._delete(sender.local, app.id)
+            return self._result(txn, app.id, on_completion, evaluation)
+
+        if on_completion == OPT_IN:
+            if app.id in sender.local:
+                raise AvmError(f"Already opted in to app {app.id}", app_id=app.id)
+            self._set(sender.local, app.id, {})
+        evaluation = Evaluation(self, app.approval, group, index, app.id, budget, depth, caller_app_id)
+        if not evaluation.run():
+            raise AvmError("transaction rejected by ApprovalProgram", evaluation.line, app.id)
+
+        if on_completion == CLOSE_OUT:
+            self._delete(sender.local, app.id)
+        elif on_completion == UPDATE:
+            self._set(app.__dict__, "approval", to_program(txn["ApprovalProgram"]))
+            self._set(app.__dict__, "clear", to_program(txn["ClearStateProgram"]))
+        elif on_completion == DELETE:
+            self._delete(self.apps, app.id)
+        return self._result(txn, app.id, on_completion, evaluation)
+
+    @staticmethod
+    def _result(txn: Dict[str, Any], app_id: int, on_completion: int, evaluation: Evaluation) -> CallResult:
+        txn["Logs"] = evaluation.logs
+        return CallResult(app_id, ON_COMPLETION_NAMES.get(on_completion, str(on_completion)), evaluation.cost,
+                          evaluation.logs, len(evaluation.inner))
+
+    # ------------------------------------------------------------ references
+    @staticmethod
+    def _account_ref(ev: Evaluation, value: Value) -> bytes:
+        if isinstance(value, bytes):
+            if len(value) != 32:
+                ev.fail("account reference is not a 32-byte address")
+            return value
+        accounts = [ev.txn["Sender"], *ev.txn.get("Accounts", [])]
+        if value >= len(accounts):
+            ev.fail(f"account index {value} out of range")
+        return accounts[value]
+
+    def _app_ref(self, ev: Evaluation, value: int) -> int:
+        foreign = ev.txn.get("Applications", [])
+        if value == 0 or value == ev.app_id:
+            return ev.app_id
+        if value in foreign or value in self.apps:
+            return value
+        if value <= len(foreign):
+            return foreign[value - 1]
+        return value
+
+    def _asset_ref(self, ev: Evaluation, value: int) -> int:
+        foreign = ev.txn.get("Assets", [])
+        if value in foreign or value in self.assets:
+            return value
+        if value < len(foreign):
+            return foreign[value]
+        return value
+
+    def global_field(self, ev: Evaluation, name: str) -> Value:
+        app = self.apps.get(ev.app_id)
+        fields = {
+            "MinTxnFee": 1000,
+            "MinBalance": MIN_BALANCE,
+            "MaxTxnLife": 1000,
+            "ZeroAddress": bytes(32),
+            "GroupSize": len(ev.group),
+            "LogicSigVersion": 10,
+            "Round": self.round,
+            "LatestTimestamp": self.timestamp,
+            "CurrentApplicationID": ev.app_id,
+            "CreatorAddress": app.creator if app else bytes(32),
+            "CurrentApplicationAddress": app.address if app else bytes(32),
+            "GroupID": bytes(32),
+            "OpcodeBudget": ev.budget.limit - ev.budget.used,
+            "CallerApplicationID": ev.caller_app_id,
+            "CallerApplicationAddress": (encoding.decode_address(logic.get_application_address(ev.caller_app_id))
+                                         if ev.caller_app_id else bytes(32)),
+            "AssetCreateMinBalance": MIN_BALANCE,
+            "AssetOptInMinBalance": MIN_BALANCE,
+        }
+        if name not in fields:
+            ev.fail(f"global {name} is not supported")
+        return fields[name]
+
+    # ------------------------------------------------------------ state opcodes
+    def _local(self, ev: Evaluation, pk: bytes, app_id: int) -> Optional[Dict[bytes, Value]]:
+        account = self.accounts.get(pk)
+        return account.local.get(app_id) if account else None
+
+    @staticmethod
+    def _check_key_value(ev: Evaluation, key: bytes, value: Value):
+        if len(key) > 64:
+            ev.fail("key longer than 64 bytes")
+        if isinstance(value, bytes) and len(key) + len(value) > MAX_KEY_VALUE_SIZE:
+            ev.fail(f"key and value longer than {MAX_KEY_VALUE_SIZE} bytes")
+
+    def op_app_global_get(self, ev: Evaluation, _):
+        ev.push(self.apps[ev.app_id].global_state.get(ev.pop_bytes(), 0))
+
+    def op_app_global_get_ex(self, ev: Evaluation, _):
+        key = ev.pop_bytes()
+        app = self.apps.get(self._app_ref(ev, ev.pop_int()))
+        value = app.global_state.get(key, _MISSING) if app else _MISSING
+        ev.push(0 if value is _MISSING else value)
+        ev.push(int(value is not _MISSING))
+
+    def op_app_global_put(self, ev: Evaluation, _):
+        value = ev.pop()
+        key = ev.pop_bytes()
+        self._check_key_value(ev, key, value)
+        self._set(self.apps[ev.app_id].global_state, key, value)
+
+    def op_app_global_del(self, ev: Evaluation, _):
+        self._delete(self.apps[ev.app_id].global_state, ev.pop_bytes())
+
+    def op_app_local_get(self, ev: Evaluation, _):
+        key = ev.pop_bytes()
+        pk = self._account_ref(ev, ev.pop())
+        local = self._local(ev, pk, ev.app_id)
+        if local is None:
+            ev.fail(f"{encoding.encode_address(pk)} is not opted in to app {ev.app_id}")
+        ev.push(local.get(key, 0))
+
+    def op_app_local_get_ex(self, ev: Evaluation, _):
+        key = ev.pop_bytes()
+        app_id = self._app_ref(ev, ev.pop_int())
+        local = self._local(ev, self._account_ref(ev, ev.pop()), app_id)
+        value = local.get(key, _MISSING) if local is not None else _MISSING
+        ev.push(0 if value is _MISSING else value)
+        ev.push(int(value is not _MISSING))
+
+    def op_app_local_put(self, ev: Evaluation, _):
+        value = ev.pop()
+        key = ev.pop_bytes()
+        pk = self._account_ref(ev, ev.pop())
+        local = self._local(ev, pk, ev.app_id)
+        if local is None:
+            ev.fail(f"{encoding.encode_address(pk)} is not opted in to app {ev.app_id}")
+        self._check_key_value(ev, key, value)
+        self._set(local, key, value)
+
+    def op_app_local_del(self, ev: Evaluation, _):
+        key = ev.pop_bytes()
+        local = self._local(ev, self._account_ref(ev, ev.pop()), ev.app_id)
+        if local is None:
+            ev.fail("account is not opted in")
+        self._delete(local, key)
+
+    def op_app_opted_in(self, ev: Evaluation, _):
+        app_id = self._app_ref(ev, ev.pop_int())
+        ev.push(int(self._local(ev, self._account_ref(ev, ev.pop()), app_id) is not None))
+
+    def op_balance(self, ev: Evaluation, _):
+        account = self.accounts.get(self._account_ref(ev, ev.pop()))
+        ev.push(account.algo if account else 0)
+
+    def op_min_balance(self, ev: Evaluation, _):
+        account = self.accounts.get(self._account_ref(ev, ev.pop()))
+        ev.push(MIN_BALANCE * (1 + len(account.assets) + len(account.local)) if account else 0)
+
+    def op_asset_holding_get(self, ev: Evaluation, immediates):
+        asset_id = self._asset_ref(ev, ev.pop_int())
+        account = self.accounts.get(self._account_ref(ev, ev.pop()))
+        holding = account.assets.get(asset_id) if account else None
+        value = {"AssetBalance": holding or 0, "AssetFrozen": 0}.get(immediates[0])
+        if value is None:
+            ev.fail(f"asset_holding_get {immediates[0]} is not supported")
+        ev.push(value)
+        ev.push(int(holding is not None))
+
+    def op_asset_params_get(self, ev: Evaluation, immediates):
+        asset = self.assets.get(self._asset_ref(ev, ev.pop_int()))
+        fields = {
+            "AssetTotal": asset.total, "AssetDecimals": asset.decimals, "AssetDefaultFrozen": 0,
+            "AssetUnitName": asset.unit_name, "AssetName": asset.name, "AssetCreator": asset.creator,
+            "AssetManager": asset.creator, "AssetReserve": asset.creator, "AssetFreeze": bytes(32),
+            "AssetClawback": bytes(32), "AssetURL": b"", "AssetMetadataHash": b"",
+        } if asset else {}
+        ev.push(fields.get(immediates[0], 0))
+        ev.push(int(asset is not None))
+
+    def op_app_params_get(self, ev: Evaluation, immediates):
+        app = self.apps.get(self._app_ref(ev, ev.pop_int()))
+        fields = {
+            "AppCreator": app.creator, "AppAddress": app.address, "AppApprovalProgram": b"",
+            "AppClearStateProgram": b"", "AppGlobalNumUint": 0, "AppGlobalNumByteSlice": 0,
+            "AppLocalNumUint": 0, "AppLocalNumByteSlice": 0, "AppExtraProgramPages": 0,
+        } if app else {}
+        ev.push(fields.get(immediates[0], 0))
+        ev.push(int(app is not None))
+
+    def op_acct_params_get(self, ev: Evaluation, immediates):
+        account = self.accounts.get(self._account_ref(ev, ev.pop()))
+        fields = {
+            "AcctBalance": account.algo,
+            "AcctMinBalance": MIN_BALANCE * (1 + len(account.assets) + len(account.local)),
+            "AcctAuthAddr": bytes(32),
+        } if account else {}
+        ev.push(fields.get(immediates[0], 0))
+        ev.push(int(bool(account and account.algo)))
+
+    # ------------------------------------------------------------ boxes
+    def _boxes(self, ev: Evaluation) -> Dict[bytes, bytes]:
+        return self.apps[ev.app_id].boxes
+
+    @staticmethod
+    def _box_name(ev: Evaluation) -> bytes:
+        name = ev.pop_bytes()
+        if not 1 <= len(name) <= 64:
+            ev.fail("box names must be 1 to 64 bytes")
+        return name
+
+    def _box(self, ev: Evaluation, name: bytes) -> bytes:
+        value = self._boxes(ev).get(name)
+        if value is None:
+            ev.fail(f"no such box {name!r}")
+        return value
+
+    def op_box_create(self, ev: Evaluation, _):
+        size = ev.pop_int()
+        name = self._box_name(ev)
+        if size > MAX_BOX_SIZE:
+            ev.fail(f"box size {size} over {MAX_BOX_SIZE}")
+        existing = self._boxes(ev).get(name)
+        if existing is not None:
+            if len(existing) != size:
+                ev.fail("box already exists with a different size")
+            ev.push(0)
+            return
+        self._set(self._boxes(ev), name, bytes(size))
+        ev.push(1)
+
+    def op_box_extract(self, ev: Evaluation, _):
+        length = ev.pop_int()
+        start = ev.pop_int()
+        value = self._box(ev, self._box_name(ev))
+        if start + length > len(value):
+            ev.fail("box read out of range")
+        ev.push(value[start:start + length])
+
+    def op_box_replace(self, ev: Evaluation, _):
+        replacement = ev.pop_bytes()
+        start = ev.pop_int()
+        name = self._box_name(ev)
+        value = self._box(ev, name)
+        if start + len(replacement) > len(value):
+            ev.fail("box write out of range")
+        self._set(self._boxes(ev), name, value[:start] + replacement + value[start + len(replacement):])
+
+    def op_box_put(self, ev: Evaluation, _):
+        value = ev.pop_bytes()
+        name = self._box_name(ev)
+        existing = self._boxes(ev).get(name)
+        if existing is not None and len(existing) != len(value):
+            ev.fail("box_put with a different size")
+        self._set(self._boxes(ev), name, value)
+
+    def op_box_get(self, ev: Evaluation, _):
+        value = self._boxes(ev).get(self._box_name(ev))
+        ev.push(value if value is not None else b"")
+        ev.push(int(value is not None))
+
+    def op_box_len(self, ev: Evaluation, _):
+        value = self._boxes(ev).get(self._box_name(ev))
+        ev.push(len(value) if value is not None else 0)
+        ev.push(int(value is not None))
+
+    def op_box_del(self, ev: Evaluation, _):
+        name = self._box_name(ev)
+        existed = name in self._boxes(ev)
+        self._delete(self._boxes(ev), name)
+        ev.push(int(existed))
+
+    # ------------------------------------------------------------ inner transactions
+    def _inner_defaults(self, ev: Evaluation) -> Dict[str, Any]:
+        return {"Sender": self.apps[ev.app_id].address, "Fee": 0, "TypeEnum": 0,
+                "ApplicationArgs": [], "Accounts": [], "Applications": [], "Assets": []}
+
+    def op_itxn_begin(self, ev: Evaluation, _):
+        if ev.pending is not None:
+            ev.fail("itxn_begin without itxn_submit")
+        ev.pending = [self._inner_defaults(ev)]
+
+    def op_itxn_next(self, ev: Evaluation, _):
+        if ev.pending is None:
+            ev.fail("itxn_next without itxn_begin")
+        ev.pending.append(self._inner_defaults(ev))
+
+    def op_itxn_field(self, ev: Evaluation, immediates):
+        if ev.pending is None:
+            ev.fail("itxn_field without itxn_begin")
+        name = immediates[0]
+        value = ev.pop()
+        txn = ev.pending[-1]
+        if name in ("ApplicationArgs", "Accounts", "Applications", "Assets"):
+            txn[name].append(self._account_ref(ev, value) if name == "Accounts" else value)
+        elif name == "Type":
+            types = {v: k for k, v in TYPE_NAMES.items()}
+            if value not in types:
+                ev.fail(f"unknown transaction type {value!r}")
+            txn["TypeEnum"] = types[value]
+        else:
+            if name in ("Receiver", "AssetReceiver", "AssetCloseTo", "CloseRemainderTo", "Sender", "AssetSender"):
+                if not isinstance(value, bytes) or len(value) != 32:
+                    ev.fail(f"{name} must be a 32-byte address")
+            txn[name] = value
+
+    def op_itxn_submit(self, ev: Evaluation, _):
+        if not ev.pending:
+            ev.fail("itxn_submit without itxn_begin")
+        group, ev.pending = ev.pending, None
+        if len(ev.inner) + len(group) > MAX_INNER_TXNS:
+            ev.fail(f"more than {MAX_INNER_TXNS} inner transactions")
+        for index, txn in enumerate(group):
+            txn["GroupIndex"] = index
+            if txn["Sender"] != self.apps[ev.app_id].address:
+                ev.fail("inner transactions must be sent by the app account")
+            if txn.get("TypeEnum") == APPL:
+                if ev.depth + 1 > MAX_CALL_DEPTH:
+                    ev.fail("inner app call depth exceeded")
+                ev.budget.limit += APP_CALL_BUDGET
+            try:
+                self._apply(group, index, ev.budget, ev.depth + 1, ev.app_id)
+            except AvmError as e:
+                ev.fail(f"inner transaction {index} failed: {e.reason}")
+        ev.inner.extend(group)
+
+    def op_itxn(self, ev: Evaluation, immediates):
+        self._push_inner_field(ev, immediates[0], None)
+
+    def op_itxna(self, ev: Evaluation, immediates):
+        self._push_inner_field(ev, immediates[0], immediates[1])
+
+    @staticmethod
+    def _push_inner_field(ev: Evaluation, name: str, index: Optional[int]):
+        if not ev.inner:
+            ev.fail("no inner transaction submitted")
+        ev.push(_txn_field(ev, ev.inner[-1], name, index))
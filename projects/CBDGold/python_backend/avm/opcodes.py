@@ -0,0 +1,49 @@
+from typing import Sequence
+
+# Opcode budget of one application call, pooled across the app calls of a group
+APP_CALL_BUDGET = 700
+
+# Opcodes that cost more than 1 (AVM v8). Everything else costs 1.
+OPCODE_COSTS = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "sha3_256": 130,
+    "ed25519verify": 1900,
+    "ed25519verify_bare": 1900,
+    "ecdsa_pk_recover": 2000,
+    "vrf_verify": 5700,
+    "bn256_add": 70,
+    "bn256_scalar_mul": 970,
+    "bn256_pairing": 8700,
+    "divmodw": 20,
+    "sqrt": 4,
+    "expw": 10,
+    "bsqrt": 40,
+    "b+": 10,
+    "b-": 10,
+    "b*": 20,
+    "b/": 20,
+    "b%": 20,
+    "b|": 6,
+    "b&": 6,
+    "b^": 6,
+    "b~": 4,
+}
+
+# Curve-dependent costs, by the opcode's immediate
+CURVE_COSTS = {
+    "ecdsa_verify": {"Secp256k1": 1700, "Secp256r1": 2500},
+    "ecdsa_pk_decompress": {"Secp256k1": 650, "Secp256r1": 2400},
+}
+
+# Opcodes whose cost also grows with their input; the static cost is the minimum
+DYNAMIC_COST = {"base64_decode", "json_ref"}
+
+
+def opcode_cost(op: str, immediates: Sequence[str] = ()) -> int:
+    """Static opcode cost; the minimum for ``DYNAMIC_COST`` opcodes"""
+    if op in CURVE_COSTS:
+        curve = immediates[0] if immediates else "Secp256k1"
+        return CURVE_COSTS[op].get(curve, max(CURVE_COSTS[op].values()))
+    return OPCODE_COSTS.get(op, 1)
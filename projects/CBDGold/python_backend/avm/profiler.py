@@ -0,0 +1,347 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from .opcodes import APP_CALL_BUDGET, DYNAMIC_COST, opcode_cost
+from .teal import (
+    CONDITIONAL_JUMPS, EXITS, JUMPS, MULTI_JUMPS, SUBROUTINE_EXITS, Instruction, TealProgram, parse_teal
+)
+
+DEFAULT_WARN_RATIO = 0.8  # flag branches above this share of the budget
+UNBOUNDED = "unbounded"  # status of a branch whose worst path runs a loop with no given bound
+
+
+@dataclass
+class Block:
+    start: int
+    end: int  # exclusive
+    cost: int  # own opcodes, calls excluded
+    calls: List[int]  # subroutine entry blocks, in call order
+    successors: List[int]
+    fails: bool  # ends in err
+    dynamic: bool  # holds an opcode whose cost depends on its input
+
+
+@dataclass
+class LoopCost:
+    label: str
+    line: int
+    per_iteration: int
+    iterations: Optional[int]  # bound from loop_bounds; None when only loop_iterations was assumed
+
+
+@dataclass
+class BranchCost:
+    name: str
+    label: str
+    min_cost: int
+    max_cost: int
+    status: str  # ok, near or over the budget, or unbounded
+    loops: List[LoopCost] = field(default_factory=list)
+    calls: Dict[str, int] = field(default_factory=dict)  # subroutine -> calls on the worst path
+    dynamic: bool = False
+
+
+@dataclass
+class SubroutineCost:
+    name: str
+    min_cost: int
+    max_cost: int
+    call_sites: int
+    calls: int  # across the worst paths of all branches
+    total_cost: int  # calls * max_cost
+
+
+@dataclass
+class ContractProfile:
+    name: str
+    version: int
+    instructions: int
+    budget: int
+    branches: List[BranchCost]
+    subroutines: List[SubroutineCost]
+
+    def hottest(self, count: int = 5) -> List[SubroutineCost]:
+        return sorted(self.subroutines, key=lambda s: s.total_cost, reverse=True)[:count]
+
+    def flagged(self) -> List[BranchCost]:
+        return [b for b in self.branches if b.status != "ok"]
+
+
+class _Analysis:
+    """Control flow graph of one TEAL program with memoized path costs"""
+
+    def __init__(self, program: TealProgram, loop_iterations: int, loop_bounds: Dict[str, int]):
+        self.program = program
+        self.loop_iterations = loop_iterations
+        self.loop_bounds = loop_bounds
+        self.names = {index: label for label, index in reversed(list(program.labels.items()))}
+        self.blocks: Dict[int, Block] = {}
+        self._build()
+        self.entries = sorted({c for b in self.blocks.values() for c in b.calls})
+        self.loops: Dict[int, List[Tuple[int, Set[int]]]] = {}  # header -> [(latch, body)]
+        self.back_edges: Set[Tuple[int, int]] = set()
+        for entry in [0, *self.entries]:
+            self._find_loops(entry)
+        self._paths: Dict[Tuple[int, bool, Optional[int]], Tuple[Optional[int], Optional[int]]] = {}
+        self._loop_costs: Dict[Tuple[int, int], Tuple[int, List[int]]] = {}
+
+    def label(self, index: int) -> str:
+        if index in self.names:
+            return self.names[index]
+        line = self.program.instructions[index].line if index < len(self.program.instructions) else 0
+        return f"line {line}"
+
+    def iterations(self, header: int) -> int:
+        return self.loop_bounds.get(self.label(header), self.loop_iterations)
+
+    def bounded(self, header: int) -> bool:
+        return self.label(header) in self.loop_bounds
+
+    def _build(self):
+        instructions = self.program.instructions
+        if not instructions:
+            self.blocks[0] = Block(0, 0, 0, [], [], False, False)
+            return
+        leaders = {0, *self.program.labels.values()}
+        for i, instr in enumerate(instructions):
+            if instr.op in JUMPS | CONDITIONAL_JUMPS | MULTI_JUMPS | EXITS | SUBROUTINE_EXITS:
+                leaders.add(i + 1)
+        leaders = sorted(x for x in leaders if x < len(instructions))
+
+        for start, end in zip(leaders, leaders[1:] + [len(instructions)]):
+            body = instructions[start:end]
+            last = body[-1]
+            successors = self.program.targets(end - 1)
+            if last.op not in JUMPS | EXITS | SUBROUTINE_EXITS and end < len(instructions):
+                successors.append(end)
+            self.blocks[start] = Block(
+                start=start,
+                end=end,
+                cost=sum(opcode_cost(i.op, i.args) for i in body),
+                calls=[self.program.labels[i.args[0]] for i in body if i.op == "callsub"],
+                successors=successors,
+                fails=last.op == "err",
+                dynamic=any(i.op in DYNAMIC_COST for i in body),
+            )
+
+    def _find_loops(self, entry: int):
+        state: Dict[int, int] = {}  # 1 on the DFS stack, 2 done
+        stack = [(entry, iter(self.blocks[entry].successors))]
+        state[entry] = 1
+        while stack:
+            node, successors = stack[-1]
+            successor = next(successors, None)
+            if successor is None:
+                state[node] = 2
+                stack.pop()
+            elif state.get(successor) == 1:
+                self._add_loop(successor, node)
+            elif successor not in state:
+                state[successor] = 1
+                stack.append((successor, iter(self.blocks[successor].successors)))
+
+    def _add_loop(self, header: int, latch: int):
+        if (latch, header) in self.back_edges:
+            return
+        self.back_edges.add((latch, header))
+        predecessors: Dict[int, List[int]] = {}
+        for block in self.blocks.values():
+            for successor in block.successors:
+                predecessors.setdefault(successor, []).append(block.start)
+        body = {header}
+        pending = [latch]
+        while pending:
+            node = pending.pop()
+            if node not in body:
+                body.add(node)
+                pending.extend(predecessors.get(node, []))
+        self.loops.setdefault(header, []).append((latch, body))
+
+    def _weight(self, start: int, worst: bool, skip_header: Optional[int] = None) -> int:
+        block = self.blocks[start]
+        weight = block.cost
+        for entry in block.calls:
+            low, high = self.subroutine_cost(entry)
+            weight += (high if worst else low) or 0
+        if worst and start != skip_header:
+            for latch, _ in self.loops.get(start, []):
+                weight += self.iterations(start) * self.loop_cost(start, latch)[0]
+        return weight
+
+    def subroutine_cost(self, entry: int) -> Tuple[Optional[int], Optional[int]]:
+        return self.path_cost(entry, False), self.path_cost(entry, True)
+
+    def path_cost(self, start: int, worst: bool, within: Optional[Set[int]] = None,
+                  target: Optional[int] = None, skip_header: Optional[int] = None) -> Optional[int]:
+        """Cheapest or costliest cost from ``start`` to a non-failing exit (or ``target``)"""
+        return self._path(start, worst, within, target, skip_header)[0]
+
+    def _path(self, start: int, worst: bool, within: Optional[Set[int]], target: Optional[int],
+              skip_header: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+        key = (start, worst, target, skip_header)
+        if within is None and key in self._paths:
+            return self._paths[key]
+        if within is None:
+            self._paths[key] = (None, None)  # guards recursion through calls
+        block = self.blocks[start]
+        weight = self._weight(start, worst, skip_header)
+
+        if start == target:
+            result = (weight, None)
+        else:
+            best, choice = None, None
+            successors = [s for s in block.successors
+                          if (start, s) not in self.back_edges and (within is None or s in within)]
+            for successor in successors:
+                cost, _ = self._path(successor, worst, within, target, skip_header)
+                if cost is not None and (best is None or (cost > best if worst else cost < best)):
+                    best, choice = cost, successor
+            if best is not None:
+                result = (weight + best, choice)
+            elif target is None and not block.successors and not block.fails:
+                result = (weight, None)  # return, retsub or end of program
+            else:
+                result = (None, None)
+        if within is None:
+            self._paths[key] = result
+        return result
+
+    def walk(self, start: int, worst: bool = True, within: Optional[Set[int]] = None,
+             target: Optional[int] = None, skip_header: Optional[int] = None) -> List[int]:
+        """Blocks of the path ``path_cost`` chose"""
+        blocks = []
+        node: Optional[int] = start
+        while node is not None:
+            blocks.append(node)
+            node = self._path(node, worst, within, target, skip_header)[1]
+        return blocks
+
+    def loop_cost(self, header: int, latch: int) -> Tuple[int, List[int]]:
+        """Costliest single iteration of a loop and the blocks it runs"""
+        key = (header, latch)
+        if key not in self._loop_costs:
+            self._loop_costs[key] = (0, [])  # guards nested evaluation
+            body = next(b for l, b in self.loops[header] if l == latch)
+            cost = self._path(header, True, body, latch, header)[0] or 0
+            self._loop_costs[key] = (cost, self.walk(header, True, body, latch, header))
+        return self._loop_costs[key]
+
+    def tally(self, path: List[int], factor: int, calls: Counter, loops: Dict[int, int],
+              skip_header: Optional[int] = None, stack: Tuple[int, ...] = ()) -> bool:
+        """Count subroutine calls and loops along a path; True if any cost is dynamic"""
+        dynamic = False
+        for start in path:
+            block = self.blocks[start]
+            dynamic |= block.dynamic
+            for entry in block.calls:
+                calls[entry] += factor
+                if entry not in stack:
+                    dynamic |= self.tally(self.walk(entry), factor, calls, loops, None, stack + (entry,))
+            if start == skip_header:
+                continue
+            for latch, _ in self.loops.get(start, []):
+                cost, iteration = self.loop_cost(start, latch)
+                loops[start] = cost
+                dynamic |= self.tally(iteration, factor * self.iterations(start), calls, loops, start, stack)
+        return dynamic
+
+
+def _arm_name(condition: List[Instruction]) -> str:
+    for instr in condition:
+        if instr.op in ("byte", "pushbytes") and instr.args and instr.args[0].startswith('"'):
+            return instr.args[0].strip('"')
+    fields = [i.args[0] for i in condition if i.op == "txn" and i.args]
+    if "ApplicationID" in fields:
+        return "create"
+    if "OnCompletion" in fields:
+        constants = [i.args[0] for i in condition if i.op in ("int", "pushint") and i.args]
+        return constants[0] if constants else "on_completion"
+    return " ".join(str(i) for i in condition)
+
+
+def _status(cost: int, budget: int, warn_ratio: float) -> str:
+    if cost > budget:
+        return "over"
+    if cost >= budget * warn_ratio:
+        return "near"
+    return "ok"
+
+
+def profile_teal(source: str, name: str = "program", budget: int = APP_CALL_BUDGET,
+                 warn_ratio: float = DEFAULT_WARN_RATIO, loop_iterations: int = 1,
+                 loop_bounds: Optional[Dict[str, int]] = None) -> ContractProfile:
+    """Static opcode cost of each dispatch branch of a TEAL approval program.
+
+    A PyTeal ``Cond`` compiles to a chain of ``bnz`` tests at the top of the
+    program; each taken ``bnz`` is one branch. Its cost is the tests up to
+    and including its own, plus the cheapest and costliest paths from its
+    label to a ``return`` that does not end in ``err``. Subroutine calls add
+    the subroutine's own cheapest/costliest path, and each loop on a costliest
+    path is counted at its costliest iteration, times its bound in
+    ``loop_bounds`` (keyed by the loop header's label).
+
+    How often a loop runs depends on its input, which a static walk cannot
+    see, so a loop with no bound is counted ``loop_iterations`` times and its
+    branch is marked unbounded unless it is already over the budget: its
+    max_cost is then a floor, not a ceiling.
+    """
+    program = parse_teal(source)
+    analysis = _Analysis(program, loop_iterations, loop_bounds or {})
+    branches: List[BranchCost] = []
+    calls_total: Counter = Counter()
+
+    def add_branch(arm: str, label: str, prefix: Tuple[int, int], start: int):
+        low, high = analysis.path_cost(start, False), analysis.path_cost(start, True)
+        if high is None:
+            return  # every path fails
+        calls: Counter = Counter()
+        loops: Dict[int, int] = {}
+        dynamic = analysis.tally(analysis.walk(start), 1, calls, loops)
+        calls_total.update(calls)
+        max_cost = prefix[1] + high
+        status = _status(max_cost, budget, warn_ratio)
+        if status != "over" and not all(analysis.bounded(h) for h in loops):
+            status = UNBOUNDED
+        branches.append(BranchCost(
+            name=arm,
+            label=label,
+            min_cost=prefix[0] + (low or 0),
+            max_cost=max_cost,
+            status=status,
+            loops=[LoopCost(analysis.label(h), program.instructions[h].line, cost,
+                            analysis.iterations(h) if analysis.bounded(h) else None)
+                   for h, cost in loops.items()],
+            calls={analysis.label(e): n for e, n in calls.items()},
+            dynamic=dynamic,
+        ))
+
+    node: Optional[int] = 0
+    prefix = (0, 0)
+    while node is not None:
+        block = analysis.blocks[node]
+        last = program.instructions[block.end - 1] if block.end > block.start else None
+        if last is not None and last.op == "bnz" and len(block.successors) == 2:
+            prefix = (prefix[0] + analysis._weight(node, False), prefix[1] + analysis._weight(node, True))
+            condition = program.instructions[block.start:block.end - 1]
+            target = program.labels[last.args[0]]
+            add_branch(_arm_name(condition), analysis.label(target), prefix, target)
+            node = block.successors[1]
+        else:
+            if not block.fails:
+                add_branch("default" if branches else name, analysis.label(node), prefix, node)
+            node = None
+
+    subroutines = []
+    for entry in analysis.entries:
+        low, high = analysis.subroutine_cost(entry)
+        call_sites = sum(b.calls.count(entry) for b in analysis.blocks.values())
+        subroutines.append(SubroutineCost(
+            name=analysis.label(entry),
+            min_cost=low or 0,
+            max_cost=high or 0,
+            call_sites=call_sites,
+            calls=calls_total[entry],
+            total_cost=calls_total[entry] * (high or 0),
+        ))
+
+    return ContractProfile(name, program.version, len(program.instructions), budget, branches, subroutines)
@@ -0,0 +1,85 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|\S+')
+
+# Control flow
+JUMPS = {"b"}
+CONDITIONAL_JUMPS = {"bz", "bnz"}
+MULTI_JUMPS = {"switch", "match"}
+EXITS = {"return", "err"}
+SUBROUTINE_EXITS = {"retsub"}
+
+
+@dataclass
+class Instruction:
+    op: str
+    args: List[str]
+    line: int  # 1-based line in the TEAL source
+
+    def __str__(self) -> str:
+        return " ".join([self.op, *self.args])
+
+
+@dataclass
+class TealProgram:
+    version: int
+    instructions: List[Instruction]
+    labels: Dict[str, int] = field(default_factory=dict)  # label -> instruction index
+
+    def targets(self, index: int) -> List[int]:
+        """Instruction indexes a branch at ``index`` may jump to, excluding fallthrough"""
+        instr = self.instructions[index]
+        if instr.op in JUMPS or instr.op in CONDITIONAL_JUMPS:
+            return [self.labels[instr.args[0]]]
+        if instr.op in MULTI_JUMPS:
+            return [self.labels[label] for label in instr.args]
+        return []
+
+
+def _strip_comment(line: str) -> str:
+    # "//" inside a string literal is not a comment
+    in_string = False
+    escaped = False
+    for i, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == "\\" and in_string:
+            escaped = True
+        elif char == '"':
+            in_string = not in_string
+        elif not in_string and line.startswith("//", i):
+            return line[:i]
+    return line
+
+
+def parse_teal(source: str) -> TealProgram:
+    """Parse TEAL assembly into instructions and label positions"""
+    version = 1
+    instructions: List[Instruction] = []
+    labels: Dict[str, int] = {}
+    pending_labels: List[Tuple[str, int]] = []
+
+    for number, raw in enumerate(source.splitlines(), start=1):
+        line = _strip_comment(raw).strip()
+        if not line:
+            continue
+        if line.startswith("#pragma"):
+            parts = line.split()
+            if len(parts) == 3 and parts[1] == "version":
+                version = int(parts[2])
+            continue
+        tokens = _TOKEN.findall(line)
+        if len(tokens) == 1 and tokens[0].endswith(":"):
+            pending_labels.append((tokens[0][:-1], number))
+            continue
+        for label, _ in pending_labels:
+            labels[label] = len(instructions)
+        pending_labels.clear()
+        instructions.append(Instruction(tokens[0], tokens[1:], number))
+
+    # Labels at the very end point past the last instruction
+    for label, _ in pending_labels:
+        labels[label] = len(instructions)
+    return TealProgram(version, instructions, labels)
@@ -0,0 +1,4 @@
+"""Standalone benchmarks for CBD Gold ShopFi backend services
+
+Run from the project root, e.g. ``python -m python_backend.benchmarks.staking_projection``.
+"""
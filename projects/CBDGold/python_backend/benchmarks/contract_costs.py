@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Profile the static opcode cost of each contract method against the app call budget"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from typing import Dict, Optional
+
+from ..avm import APP_CALL_BUDGET, CONTRACT_MODULES, ContractProfile, load_contract, load_contract_at, profile_teal
+from ..utils.teal_cache import TealCompiler
+
+
+def profile_contract(name: str, budget: int, warn_ratio: float, loop_iterations: int,
+                     ref: Optional[str] = None, loop_bounds: Optional[Dict[str, int]] = None) -> ContractProfile:
+    module = load_contract_at(name, ref) if ref else load_contract(name)
+    teal = TealCompiler().to_teal(module.approval_program)
+    return profile_teal(teal, name, budget, warn_ratio, loop_iterations, loop_bounds)
+
+
+def loop_bound(value: str):
+    label, _, iterations = value.partition("=")
+    if not label or not iterations.isdigit():
+        raise argparse.ArgumentTypeError(f"expected LABEL=ITERATIONS, got {value!r}")
+    return label, int(iterations)
+
+
+def print_profile(profile: ContractProfile, top: int):
+    print(f"\n{profile.name} (TEAL v{profile.version}, {profile.instructions} instructions, "
+          f"budget {profile.budget})")
+    print(f"  {'branch':<20} {'min':>6} {'max':>6} {'budget':>7}  notes")
+    for branch in sorted(profile.branches, key=lambda b: b.max_cost, reverse=True):
+        notes = [f"{name} x{count}" for name, count in branch.calls.items()]
+        notes += [f"loop {loop.label} +{loop.per_iteration}/iter"
+                  + (f" x{loop.iterations}" if loop.iterations is not None else " unbounded")
+                  for loop in branch.loops]
+        if branch.dynamic:
+            notes.append("input-dependent opcodes")
+        flag = {"over": "  OVER", "near": "  NEAR", "unbounded": "  UNBOUNDED"}.get(branch.status, "")
+        print(f"  {branch.name:<20} {branch.min_cost:>6} {branch.max_cost:>6} "
+              f"{branch.max_cost / profile.budget:>6.0%}  {', '.join(notes)}{flag}")
+    hottest = [s for s in profile.hottest(top) if s.calls]
+    if hottest:
+        print("  hottest subroutines:")
+        for sub in hottest:
+            print(f"    {sub.name:<30} {sub.max_cost:>5} per call, {sub.calls} calls "
+                  f"from {sub.call_sites} sites, {sub.total_cost} total")
+
+
+def print_comparison(before: ContractProfile, after: ContractProfile, ref: str):
+    print(f"\n{after.name} vs {ref} ({before.instructions} -> {after.instructions} instructions)")
+    print(f"  {'branch':<20} {'before':>7} {'after':>7} {'change':>7}")
+    previous = {b.name: b for b in before.branches}
+    for branch in sorted(after.branches, key=lambda b: b.max_cost, reverse=True):
+        old = previous.get(branch.name)
+        if old is None:
+            print(f"  {branch.name:<20} {'-':>7} {branch.max_cost:>7} {'new':>7}")
+            continue
+        change = (branch.max_cost - old.max_cost) / old.max_cost if old.max_cost else 0
+        print(f"  {branch.name:<20} {old.max_cost:>7} {branch.max_cost:>7} {change:>+7.0%}")
+    for name in previous.keys() - {b.name for b in after.branches}:
+        print(f"  {name:<20} {previous[name].max_cost:>7} {'-':>7} {'removed':>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("contracts", nargs="*", metavar="contract",
+                        help=f"contracts to profile: {', '.join(CONTRACT_MODULES)} (default: all)")
+    parser.add_argument("--budget", type=int, default=APP_CALL_BUDGET,
+                        help="opcode budget per call (700 per app call in the group)")
+    parser.add_argument("--warn", type=float, default=0.8, help="flag branches above this share of the budget")
+    parser.add_argument("--loop-iterations", type=int, default=1,
+                        help="iterations assumed for each loop without a --loop-bound")
+    parser.add_argument("--loop-bound", type=loop_bound, action="append", default=[], metavar="LABEL=N",
+                        help="most iterations of the loop at TEAL label LABEL (repeatable)")
+    parser.add_argument("--top", type=int, default=5, help="hottest subroutines to list")
+    parser.add_argument("--json", action="store_true", help="print the profiles as JSON")
+    parser.add_argument("--compare", metavar="REF",
+                        help="also profile the contracts at this git revision and print before/after max costs")
+    args = parser.parse_args()
+    unknown = [name for name in args.contracts if name not in CONTRACT_MODULES]
+    if unknown:
+        parser.error(f"unknown contract {', '.join(unknown)}")
+
+    loop_bounds = dict(args.loop_bound)
+    profiles = [profile_contract(name, args.budget, args.warn, args.loop_iterations, loop_bounds=loop_bounds)
+                for name in args.contracts or CONTRACT_MODULES]
+    uncompared = []
+    if args.json:
+        print(json.dumps([asdict(p) for p in profiles], indent=2))
+    else:
+        for profile in profiles:
+            print_profile(profile, args.top)
+            if args.compare:
+                try:
+                    baseline = profile_contract(profile.name, args.budget, args.warn, args.loop_iterations,
+                                                args.compare, loop_bounds)
+                except Exception as e:
+                    print(f"\n{profile.name} at {args.compare} cannot be profiled: {type(e).__name__}: {e}\n"
+                          f"  Compare against a revision whose contract compiles with the installed PyTeal",
+                          file=sys.stderr)
+                    uncompared.append(profile.name)
+                    continue
+                print_comparison(baseline, profile, args.compare)
+
+    flagged = [(p.name, b.name) for p in profiles for b in p.flagged() if b.status == "over"]
+    if flagged:
+        print(f"\nOver budget: {', '.join(f'{c}.{b}' for c, b in flagged)}", file=sys.stderr)
+        sys.exit(1)
+    if uncompared:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Run stake, unstake, claim, compound, vote and prize claim scenarios against the contracts on the local AVM"""
+
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+from algosdk import encoding
+
+from ..avm.ledger import OPT_IN, Ledger, app_call, asset_transfer
+from ..services.voting_snapshot import encode_proof, leaf_hash, merkle_path
+
+HEMP_UNITS = 1_000_000
+REWARD_RATE = 1_000  # raw HEMP per second
+MIN_PRIZE_STAKE = 10_000_000  # prize contract default
+SECONDS_PER_SCENARIO = 60
+
+
+class Deployment:
+    """The three contracts wired together on a fresh ledger, with opted-in users"""
+
+    def __init__(self, users: int, seed: int):
+        self.rng = random.Random(seed)
+        self.ledger = ledger = Ledger()
+        self.admin = ledger.create_account()
+        self.hemp = ledger.create_asset(self.admin, 10 ** 15, decimals=6, unit_name="HEMP")
+
+        self.staking = ledger.deploy("staking", self.admin)
+        self.prize = ledger.deploy("prize", self.admin)
+        self.governance = ledger.deploy("governance", self.admin)
+        for app in (self.staking, self.prize, self.governance):
+            ledger.fund(ledger.app_address(app), 10 ** 9)
+            ledger.opt_in_asset(ledger.app_address(app), self.hemp)
+        self._admin([app_call(self.admin, self.staking, ["set_params", self.hemp, REWARD_RATE])])
+        # Rewards are paid out of the staking app's own HEMP holding
+        self._admin([asset_transfer(self.admin, ledger.app_address(self.staking), self.hemp, 10 ** 12)])
+        self._admin([app_call(self.admin, self.prize, ["set_staking_app", self.staking])])
+        self._admin([app_call(self.admin, self.prize, ["fund_pool"]),
+                     asset_transfer(self.admin, ledger.app_address(self.prize), self.hemp, 10 ** 12)])
+
+        self.users = [ledger.create_account() for _ in range(users)]
+        self.staked: Dict[str, int] = defaultdict(int)
+        self.last_prize: Dict[str, int] = defaultdict(int)
+        for user in self.users:
+            ledger.opt_in_asset(user, self.hemp)
+            self._admin([asset_transfer(self.admin, user, self.hemp, 10 ** 6 * HEMP_UNITS)])
+            for app in (self.staking, self.prize, self.governance):
+                self._admin([app_call(user, app, on_complete=OPT_IN)])
+
+        # One open proposal with a voting power snapshot over every user
+        self._admin([app_call(self.admin, self.governance, ["create_proposal", "Benchmark proposal"])])
+        self.power = [self.rng.randint(1, 1_000) * HEMP_UNITS for _ in self.users]
+        leaves = [leaf_hash(encoding.decode_address(u), p) for u, p in zip(self.users, self.power)]
+        root, _ = merkle_path(leaves, 0)
+        self._admin([app_call(self.admin, self.governance, ["set_snapshot", 1, root])])
+        self.proofs = [encode_proof(merkle_path(leaves, i)[1]) for i in range(len(leaves))]
+        self.voted = set()
+
+    def _admin(self, group):
+        result = self.ledger.execute(group)
+        if not result.ok:
+            raise RuntimeError(f"Benchmark setup failed: {result.error}")
+
+    def scenario(self):
+        """A random (method, group) whose checks the contracts should all pass"""
+        index = self.rng.randrange(len(self.users))
+        user = self.users[index]
+        now = self.ledger.timestamp
+        choices = ["stake", "claim"]
+        if self.staked[user]:
+            choices += ["unstake", "compound"]
+        if index not in self.voted:
+            choices.append("vote")
+        if self.staked[user] >= MIN_PRIZE_STAKE and now > self.last_prize[user] + 86400:
+            choices.append("claim_prize")
+        method = self.rng.choice(choices)
+
+        if method == "stake":
+            amount = self.rng.randint(1, 500) * HEMP_UNITS
+            self.staked[user] += amount
+            return method, [app_call(user, self.staking, ["stake"], assets=[self.hemp]),
+                            asset_transfer(user, self.ledger.app_address(self.staking), self.hemp, amount)]
+        if method == "unstake":
+            amount = self.rng.randint(1, self.staked[user])
+            self.staked[user] -= amount
+            return method, [app_call(user, self.staking, ["unstake", amount], assets=[self.hemp])]
+        if method == "claim":
+            return method, [app_call(user, self.staking, ["claim"], assets=[self.hemp])]
+        if method == "compound":
+            # Restaked rewards only add to the stake, so self.staked stays a safe lower bound
+            return method, [app_call(user, self.staking, ["compound"])]
+        if method == "vote":
+            self.voted.add(index)
+            pid = (1).to_bytes(8, "big")
+            return method, [app_call(user, self.governance,
+                                     ["vote", pid, self.rng.randint(0, 1), self.power[index], self.proofs[index]])]
+        self.last_prize[user] = now
+        return method, [app_call(user, self.prize, ["claim_prize", self.rng.randint(1, 100) * HEMP_UNITS],
+                                 apps=[self.staking])]
+
+
+def run(scenarios: int, users: int, seed: int) -> bool:
+    setup_start = time.perf_counter()
+    deployment = Deployment(users, seed)
+    setup = time.perf_counter() - setup_start
+
+    costs: Dict[str, List[int]] = defaultdict(list)
+    budgets: Dict[str, int] = {}
+    failures: List[str] = []
+    start = time.perf_counter()
+    for _ in range(scenarios):
+        method, group = deployment.scenario()
+        result = deployment.ledger.execute(group)
+        if result.ok:
+            costs[method].append(result.cost)
+            budgets[method] = max(budgets.get(method, 0), result.budget)
+        else:
+            failures.append(f"{method}: {result.error}")
+        deployment.ledger.advance(SECONDS_PER_SCENARIO)
+    elapsed = time.perf_counter() - start
+
+    print(f"Setup:       {users:,} opted-in users and a {users:,}-leaf vote snapshot in {setup:.2f} s")
+    print(f"Scenarios:   {scenarios:,} in {elapsed:.2f} s ({scenarios / elapsed:,.0f} groups/s)")
+    print(f"{'method':<12} {'calls':>7} {'min':>6} {'median':>7} {'p95':>6} {'max':>6} {'budget':>7}")
+    for method in ("stake", "unstake", "claim", "compound", "vote", "claim_prize"):
+        if not costs[method]:
+            continue
+        values = np.array(costs[method])
+        print(f"{method:<12} {len(values):>7,} {values.min():>6} {int(np.median(values)):>7} "
+              f"{int(np.percentile(values, 95)):>6} {values.max():>6} {budgets[method]:>7}")
+    for failure in failures[:10]:
+        print(f"  rejected {failure}", file=sys.stderr)
+    print(f"Result:      {'PASS' if not failures else f'FAIL ({len(failures)} rejected)'}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not run(args.scenarios, args.users, args.seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark batch prize spins and test their tier distribution against the configured odds"""
+
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from ..services.prize_engine import DEFAULT_PRIZE_TIERS, PrizeEngine, replay_round
+
+
+def chi_square_sf(statistic: float, dof: int) -> float:
+    """Upper-tail chi-square probability for small integer degrees of freedom"""
+    # Series for the regularized upper incomplete gamma function Q(dof/2, x/2)
+    half = statistic / 2
+    if dof % 2 == 0:
+        term = total = math.exp(-half)
+        for k in range(1, dof // 2):
+            term *= half / k
+            total += term
+        return total
+    total = math.erfc(math.sqrt(half))
+    term = math.sqrt(half / math.pi) * math.exp(-half) * 2
+    for k in range(dof // 2):
+        total += term
+        term *= half / (k + 1.5)
+    return total
+
+
+def run(spins: int, batch: int, alpha: float) -> bool:
+    engine = PrizeEngine(secret=b"benchmark", round_max_spins=max(spins, batch))
+    weights = np.array([t.weight for t in DEFAULT_PRIZE_TIERS], dtype=np.float64)
+    expected_share = weights / weights.sum()
+    counts = np.zeros(len(DEFAULT_PRIZE_TIERS), dtype=np.int64)
+    index = {t.tier: i for i, t in enumerate(DEFAULT_PRIZE_TIERS)}
+
+    start = time.perf_counter()
+    remaining = spins
+    while remaining:
+        size = min(batch, remaining)
+        tiers = [index[o.tier.tier] for o in engine.spin_batch(size)]
+        counts += np.bincount(tiers, minlength=len(counts))
+        remaining -= size
+    elapsed = time.perf_counter() - start
+
+    expected = expected_share * spins
+    statistic = float(((counts - expected) ** 2 / expected).sum())
+    p_value = chi_square_sf(statistic, len(counts) - 1)
+
+    print(f"Spins:       {spins:,} in batches of {batch:,}")
+    print(f"Throughput:  {spins / elapsed / 1e6:.2f} M spins/s ({elapsed:.2f} s)")
+    print(f"{'tier':<10} {'expected':>9} {'observed':>9} {'z':>7}")
+    for i, tier in enumerate(DEFAULT_PRIZE_TIERS):
+        observed = counts[i] / spins
+        stderr = math.sqrt(expected_share[i] * (1 - expected_share[i]) / spins)
+        print(f"{tier.tier:<10} {expected_share[i]:>8.4%} {observed:>8.4%} "
+              f"{(observed - expected_share[i]) / stderr:>7.2f}")
+    print(f"Chi-square:  {statistic:.3f} (dof {len(counts) - 1}), p = {p_value:.4f}")
+
+    # Replaying the revealed seed must reproduce a round drawn in uneven batches, outcome for outcome
+    engine.round_duration = 0
+    engine.current_round()  # closes the round drawn above
+    engine.round_duration = 3600
+    sample = [outcome for size in (1000, 7, 1, 8191, 333) for outcome in engine.spin_batch(size)]
+    round_id = engine.round_id
+    engine.round_duration = 0
+    seed, drawn = engine.reveal(round_id)
+    replayed = replay_round(seed, round_id, drawn)
+    reproducible = drawn == len(sample) and replayed == [o.tier.tier for o in sample]
+    print(f"Replay:      {'matches' if reproducible else 'MISMATCH'} ({drawn:,} spins in 5 batches, "
+          f"round {round_id})")
+
+    passed = p_value >= alpha and reproducible
+    print(f"Result:      {'PASS' if passed else 'FAIL'} at alpha = {alpha}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--spins", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--alpha", type=float, default=0.001)
+    args = parser.parse_args()
+    if not run(args.spins, args.batch, args.alpha):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark streaming transaction history parsing and export throughput in MB/s"""
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from ..services.tx_history_stream import filter_records, read_records, write_records
+
+HEMP_ASSET_ID = 748025551
+STAKING_APP_ID = 745588245
+
+
+def synthetic_records(count: int, accounts: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    """Indexer-shaped asset transfers, payments and app calls, generated lazily"""
+    rng = random.Random(seed)
+    addresses = [f"{i:06d}".ljust(58, "A") for i in range(accounts)]
+    for i in range(count):
+        record = {
+            "id": f"{i:052d}", "confirmed-round": 40_000_000 + i // 20, "intra-round-offset": i % 20,
+            "round-time": 1_700_000_000 + i // 5, "sender": rng.choice(addresses), "fee": 1000,
+        }
+        kind = i % 4
+        if kind == 3:
+            record["tx-type"] = "appl"
+            record["application-transaction"] = {"application-id": STAKING_APP_ID, "on-completion": "noop"}
+        elif kind == 2:
+            record["tx-type"] = "pay"
+            record["payment-transaction"] = {"receiver": rng.choice(addresses), "amount": rng.randrange(10**7)}
+        else:
+            record["tx-type"] = "axfer"
+            record["asset-transfer-transaction"] = {"receiver": rng.choice(addresses), "asset-id": HEMP_ASSET_ID,
+                                                    "amount": rng.randrange(10**9)}
+        yield record
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(label: str, size_path: Path, run) -> None:
+    """Time ``run`` and report throughput over the size of ``size_path`` once it has run"""
+    start = time.perf_counter()
+    records = run()
+    elapsed = time.perf_counter() - start
+    size = size_path.stat().st_size / 1e6
+    print(f"{label:20} {records:>10,} records {size:>8.1f} MB {elapsed:>7.2f}s "
+          f"{size / elapsed:>8.1f} MB/s  peak RSS {peak_rss_mb():,.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=500_000)
+    parser.add_argument("--accounts", type=int, default=5_000)
+    parser.add_argument("--dir", type=Path, help="Where to write the files (default: a temporary directory)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        tmp = Path(tmp)
+        document, ndjson, columnar = tmp / "history.json", tmp / "history.ndjson", tmp / "history.txc"
+        address = f"{0:06d}".ljust(58, "A")
+        count = lambda records: sum(1 for _ in records)
+
+        measure("write json", document, lambda: write_records(synthetic_records(args.records, args.accounts),
+                                                               document))
+        measure("parse json", document, lambda: count(read_records(document)))
+        measure("json -> ndjson", document, lambda: write_records(read_records(document), ndjson))
+        measure("parse ndjson", ndjson, lambda: count(read_records(ndjson)))
+        measure("filter address", ndjson, lambda: count(filter_records(read_records(ndjson), address=address)))
+        measure("filter asset", ndjson, lambda: count(filter_records(read_records(ndjson), asset_id=HEMP_ASSET_ID)))
+        measure("ndjson -> columnar", ndjson, lambda: write_records(read_records(ndjson), columnar))
+        # Against the NDJSON size, so the rate compares records per second rather than compressed bytes
+        measure("parse columnar", ndjson, lambda: count(read_records(columnar)))
+        sizes = {path.suffix: os.path.getsize(path) for path in (document, ndjson, columnar)}
+        print(f"columnar is {sizes['.txc'] / sizes['.ndjson']:.1%} of the NDJSON size")
+
+
+if __name__ == "__main__":
+    main()
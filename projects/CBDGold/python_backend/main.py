@@ -7,10 +7,11 @@ Provides API endpoints for the React frontend and smart contract integration
 import os
 import sys
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Header, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import asyncio
@@ -25,11 +26,16 @@ from .services.oracle_service import OracleService
 from .services.contract_service import ContractService
 from .services.product_service import ProductService
 from .services.wallet_service import WalletService
+from .services.staking_simulator import StakingSimulator
+from .services.portfolio_service import PortfolioService
 from .models.models import (
-    TokenPrice, Product, StakingPool, GovernanceProposal,
-    WalletInfo, TransactionRequest, StakeRequest, VoteRequest
+    TokenPrice, Product, StakingPool, GovernanceProposal, VoteReceiptQuery, VoteReceiptResult,
+    WalletInfo, PortfolioQuery, PortfolioValuation, TransactionRequest, StakeRequest, VoteRequest,
+    StakingProjectionRequest, StakingProjection, StakingLeaderboard, TrackedTransaction, TransactionStatus,
+    PrizeWinner, PrizeSpinBatchRequest, PrizeHistoryPage, TransactionHistoryPage
 )
 from .utils.security import SecurityManager
+from .utils.idempotency import IdempotencyStore, IdempotencyConflictError, lease_for_key
 from .utils.logger import get_logger
 
 # Initialize logging
@@ -58,7 +64,27 @@ oracle_service = OracleService()
 contract_service = ContractService()
 product_service = ProductService()
 wallet_service = WalletService()
+staking_simulator = StakingSimulator()
 security_manager = SecurityManager()
+idempotency_store = IdempotencyStore()
+portfolio_service = PortfolioService(wallet_service, oracle_service)
+
+def invalidate_wallets(record: TrackedTransaction):
+    """Drop cached balances for every account a confirmed transaction touched"""
+    if record.status == TransactionStatus.CONFIRMED:
+        wallet_service.invalidate(record.addresses, record.confirmed_round or 0)
+        contract_service.prize_eligibility.invalidate(record.addresses, record.confirmed_round or 0)
+
+contract_service.tracker.add_listener(invalidate_wallets)
+
+async def run_idempotent(scope: str, key: Optional[str], request: BaseModel, func):
+    """Run ``func`` once per Idempotency-Key; retries replay or await the first result"""
+    if not key:
+        return await func()
+    try:
+        return await idempotency_store.run(scope, key, jsonable_encoder(request), func)
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 # Health check endpoint
 @app.get("/health")
@@ -130,66 +156,164 @@ async def get_staking_pools():
         logger.error(f"Error fetching staking pools: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch staking pools")
 
+@app.get("/api/staking/leaderboard", response_model=StakingLeaderboard)
+async def get_staking_leaderboard(limit: int = Query(default=25, ge=1, le=500),
+                                  offset: int = Query(default=0, ge=0),
+                                  address: Optional[str] = None):
+    """Largest stakers first; pass ``address`` to include that wallet's rank"""
+    if address and not security_manager.validate_wallet_address(address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        return await contract_service.get_staking_leaderboard(limit, offset, address)
+    except Exception as e:
+        logger.error(f"Error fetching staking leaderboard: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch staking leaderboard")
+
+@app.post("/api/staking/projection", response_model=StakingProjection)
+async def project_staking_rewards(request: StakingProjectionRequest):
+    """Project rewards, tier transitions and effective APY over a scenario grid"""
+    try:
+        pool_totals = request.total_staked
+        if pool_totals is None:
+            pool_totals = [contract_service.staking_analytics.total_staked]
+
+        result = staking_simulator.project_grid(
+            amounts=request.amounts,
+            durations=request.durations,
+            reward_rates=request.reward_rates,
+            pool_totals=pool_totals,
+            compound_periods=request.compound_periods
+        )
+        return StakingProjection(
+            scenarios=int(result["amount"].size),
+            compound_periods=request.compound_periods,
+            summary=staking_simulator.summarize(result),
+            results={key: column.tolist() for key, column in result.items()}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error projecting staking rewards: {e}")
+        raise HTTPException(status_code=500, detail="Failed to project staking rewards")
+
 @app.post("/api/staking/stake")
-async def stake_tokens(request: StakeRequest):
+async def stake_tokens(request: StakeRequest,
+                       idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
     """Stake HEMP tokens"""
-    try:
-        # Validate request
-        if not security_manager.validate_wallet_address(request.wallet_address):
-            raise HTTPException(status_code=400, detail="Invalid wallet address")
+    if not security_manager.validate_wallet_address(request.wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
 
-        result = await contract_service.stake_tokens(
+    try:
+        return await run_idempotent("stake", idempotency_key, request, lambda: contract_service.stake_tokens(
             wallet_address=request.wallet_address,
             amount=request.amount,
-            pool_id=request.pool_id
-        )
-        return result
+            pool_id=request.pool_id,
+            lease=lease_for_key("stake", idempotency_key) if idempotency_key else None
+        ))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error staking tokens: {e}")
         raise HTTPException(status_code=500, detail="Failed to stake tokens")
 
 @app.post("/api/staking/unstake")
-async def unstake_tokens(request: StakeRequest):
+async def unstake_tokens(request: StakeRequest,
+                         idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
     """Unstake HEMP tokens"""
-    try:
-        if not security_manager.validate_wallet_address(request.wallet_address):
-            raise HTTPException(status_code=400, detail="Invalid wallet address")
+    if not security_manager.validate_wallet_address(request.wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
 
-        result = await contract_service.unstake_tokens(
+    try:
+        return await run_idempotent("unstake", idempotency_key, request, lambda: contract_service.unstake_tokens(
             wallet_address=request.wallet_address,
             amount=request.amount,
-            pool_id=request.pool_id
-        )
-        return result
+            pool_id=request.pool_id,
+            lease=lease_for_key("unstake", idempotency_key) if idempotency_key else None
+        ))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error unstaking tokens: {e}")
         raise HTTPException(status_code=500, detail="Failed to unstake tokens")
 
+@app.post("/api/staking/claim")
+async def claim_staking_rewards(wallet_address: str):
+    """Build a staking reward claim for wallet signing"""
+    if not security_manager.validate_wallet_address(wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        result = await contract_service.claim_rewards(wallet_address)
+        return result
+    except Exception as e:
+        logger.error(f"Error claiming staking rewards: {e}")
+        raise HTTPException(status_code=500, detail="Failed to claim staking rewards")
+
+@app.post("/api/staking/compound")
+async def compound_staking_rewards(wallet_address: str):
+    """Build a call restaking pending rewards for wallet signing"""
+    if not security_manager.validate_wallet_address(wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        result = await contract_service.compound_rewards(wallet_address)
+        return result
+    except Exception as e:
+        logger.error(f"Error compounding staking rewards: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compound staking rewards")
+
 # Governance endpoints
 @app.get("/api/governance/proposals", response_model=List[GovernanceProposal])
-async def get_governance_proposals():
-    """Get all governance proposals"""
+async def get_governance_proposals(status: Optional[str] = None,
+                                   limit: int = Query(default=50, ge=1, le=500),
+                                   offset: int = Query(default=0, ge=0)):
+    """Get governance proposals, newest first, optionally filtered by status"""
     try:
-        proposals = await contract_service.get_governance_proposals()
+        proposals = await contract_service.get_governance_proposals(status, limit, offset)
         return proposals
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching proposals: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch proposals")
 
+@app.get("/api/governance/proposals/{proposal_id}", response_model=GovernanceProposal)
+async def get_governance_proposal(proposal_id: int):
+    """Get a single governance proposal with its current tallies"""
+    proposal = await contract_service.get_governance_proposal(proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    return proposal
+
+@app.post("/api/governance/proposals/{proposal_id}/receipts", response_model=VoteReceiptResult)
+async def check_vote_receipts(proposal_id: int, request: VoteReceiptQuery):
+    """Check whether each wallet has voted on a proposal, in one call"""
+    try:
+        return await contract_service.check_vote_receipts(proposal_id, request.addresses)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error checking vote receipts: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check vote receipts")
+
 @app.post("/api/governance/vote")
-async def vote_on_proposal(request: VoteRequest):
+async def vote_on_proposal(request: VoteRequest,
+                           idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
     """Vote on a governance proposal"""
-    try:
-        if not security_manager.validate_wallet_address(request.wallet_address):
-            raise HTTPException(status_code=400, detail="Invalid wallet address")
+    if not security_manager.validate_wallet_address(request.wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
 
-        result = await contract_service.vote_on_proposal(
+    try:
+        return await run_idempotent("vote", idempotency_key, request, lambda: contract_service.vote_on_proposal(
             wallet_address=request.wallet_address,
             proposal_id=request.proposal_id,
             vote_choice=request.vote_choice,
-            weed_amount=request.weed_amount
-        )
-        return result
+            weed_amount=request.weed_amount,
+            lease=lease_for_key("vote", idempotency_key) if idempotency_key else None
+        ))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error voting on proposal: {e}")
         raise HTTPException(status_code=500, detail="Failed to vote")
@@ -198,30 +322,114 @@ async def vote_on_proposal(request: VoteRequest):
 @app.get("/api/wallet/{address}", response_model=WalletInfo)
 async def get_wallet_info(address: str):
     """Get wallet information and balances"""
-    try:
-        if not security_manager.validate_wallet_address(address):
-            raise HTTPException(status_code=400, detail="Invalid wallet address")
+    if not security_manager.validate_wallet_address(address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
 
+    try:
         wallet_info = await wallet_service.get_wallet_info(address)
         return wallet_info
     except Exception as e:
         logger.error(f"Error fetching wallet info: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch wallet info")
+        raise HTTPException(status_code=503, detail="Wallet data unavailable")
+
+@app.get("/api/portfolio/{address}", response_model=PortfolioValuation)
+async def get_portfolio(address: str, window: int = Query(default=86_400, ge=60, le=86_400),
+                        points: int = Query(default=96, ge=2, le=1000)):
+    """USD value of a wallet's holdings and stake, with its value over the last ``window`` seconds"""
+    if not security_manager.validate_wallet_address(address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        valuation = await portfolio_service.value([address], window, points)
+    except Exception as e:
+        logger.error(f"Error valuing portfolio: {e}")
+        raise HTTPException(status_code=500, detail="Failed to value portfolio")
+    if valuation.unavailable:
+        # Unlike a batch, a single wallet has nothing left to value
+        raise HTTPException(status_code=503, detail="Wallet data unavailable")
+    return valuation
+
+@app.post("/api/portfolio", response_model=PortfolioValuation)
+async def get_portfolios(request: PortfolioQuery):
+    """Value up to 1,000 wallets together, per wallet and in total"""
+    invalid = [a for a in request.addresses if not security_manager.validate_wallet_address(a)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid wallet address: {invalid[0]}")
+
+    try:
+        return await portfolio_service.value(request.addresses, request.window, request.points)
+    except Exception as e:
+        logger.error(f"Error valuing portfolios: {e}")
+        raise HTTPException(status_code=500, detail="Failed to value portfolios")
 
 # Transaction endpoints
+@app.get("/api/transactions", response_model=TransactionHistoryPage)
+async def get_transaction_history(address: Optional[str] = None,
+                                  asset_id: Optional[int] = Query(default=None, ge=1),
+                                  app_id: Optional[int] = Query(default=None, ge=1),
+                                  min_round: Optional[int] = Query(default=None, ge=0),
+                                  max_round: Optional[int] = Query(default=None, ge=0),
+                                  limit: int = Query(default=50, ge=1, le=500),
+                                  cursor: Optional[str] = None):
+    """Page through platform transactions, newest first"""
+    if address and not security_manager.validate_wallet_address(address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        return await contract_service.get_transaction_history(
+            address, asset_id, app_id, min_round, max_round, limit, cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except Exception as e:
+        logger.error(f"Error fetching transaction history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch transaction history")
+
 @app.post("/api/transactions/submit")
-async def submit_transaction(request: TransactionRequest):
+async def submit_transaction(request: TransactionRequest,
+                             idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
     """Submit a transaction to the Algorand network"""
-    try:
-        if not security_manager.validate_wallet_address(request.sender):
-            raise HTTPException(status_code=400, detail="Invalid sender address")
+    if not security_manager.validate_wallet_address(request.sender):
+        raise HTTPException(status_code=400, detail="Invalid sender address")
 
-        result = await contract_service.submit_transaction(request)
-        return result
+    try:
+        return await run_idempotent("submit", idempotency_key, request,
+                                    lambda: contract_service.submit_transaction(request))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting transaction: {e}")
         raise HTTPException(status_code=500, detail="Failed to submit transaction")
 
+@app.get("/api/transactions/stream")
+async def stream_transactions(tx_id: Optional[List[str]] = Query(default=None),
+                              address: Optional[str] = None):
+    """Server-sent events for transaction status changes.
+
+    Filter by one or more ``tx_id`` (the stream closes once all are final;
+    ids this server is not tracking get a single ``unknown`` event)
+    and/or by an involved ``address``.
+    """
+    if address and not security_manager.validate_wallet_address(address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    async def events():
+        async for record in contract_service.tracker.subscribe(set(tx_id) if tx_id else None, address):
+            yield f"event: {record.status.value}\ndata: {json.dumps(jsonable_encoder(record))}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/api/transactions/{tx_id}", response_model=TrackedTransaction)
+async def get_transaction_status(tx_id: str):
+    """Get the tracked status of a submitted transaction"""
+    if not security_manager.validate_transaction_id(tx_id):
+        raise HTTPException(status_code=400, detail="Invalid transaction id")
+
+    record = contract_service.tracker.get(tx_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Transaction not tracked")
+    return record
+
 # Prize system endpoints
 @app.post("/api/prizes/spin")
 async def spin_for_prize(wallet_address: str):
@@ -236,16 +444,77 @@ async def spin_for_prize(wallet_address: str):
         logger.error(f"Error spinning for prize: {e}")
         raise HTTPException(status_code=500, detail="Failed to spin for prize")
 
-@app.get("/api/prizes/winners")
-async def get_prize_winners():
-    """Get recent prize winners"""
+@app.get("/api/prizes/eligibility/{wallet_address}")
+async def get_prize_eligibility(wallet_address: str):
+    """Check the prize contract's cooldown and minimum stake for a wallet"""
+    if not security_manager.validate_wallet_address(wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        return await contract_service.check_prize_eligibility(wallet_address)
+    except Exception as e:
+        logger.error(f"Error checking prize eligibility: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check prize eligibility")
+
+@app.get("/api/prizes/budget")
+async def get_prize_budget():
+    """Live daily claim cap, prize pool and award pacing state"""
+    return await contract_service.get_prize_budget()
+
+@app.post("/api/prizes/spin/batch")
+async def spin_for_prizes(request: PrizeSpinBatchRequest):
+    """Resolve up to 10,000 spins in one call"""
+    invalid = [a for a in request.wallet_addresses if not security_manager.validate_wallet_address(a)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid wallet address: {invalid[0]}")
+
     try:
-        winners = await contract_service.get_prize_winners()
+        return await contract_service.spin_for_prizes(request.wallet_addresses)
+    except Exception as e:
+        logger.error(f"Error spinning prize batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to spin for prizes")
+
+@app.get("/api/prizes/round")
+async def get_prize_round():
+    """Current prize round and its seed commitment"""
+    return await contract_service.get_prize_round()
+
+@app.get("/api/prizes/rounds/{round_id}/reveal")
+async def reveal_prize_round(round_id: int):
+    """Seed of a closed prize round, for verifying its spins"""
+    revealed = await contract_service.reveal_prize_round(round_id)
+    if revealed is None:
+        raise HTTPException(status_code=404, detail="Round is still open or unknown")
+    return revealed
+
+@app.get("/api/prizes/winners", response_model=List[PrizeWinner])
+async def get_prize_winners(address: Optional[str] = None,
+                            limit: int = Query(default=25, ge=1, le=500)):
+    """Get recent prize winners, optionally for one wallet"""
+    if address and not security_manager.validate_wallet_address(address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        winners = await contract_service.get_prize_winners(address, limit)
         return winners
     except Exception as e:
         logger.error(f"Error fetching prize winners: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch prize winners")
 
+@app.get("/api/prizes/history", response_model=PrizeHistoryPage)
+async def get_prize_history(address: Optional[str] = None,
+                            limit: int = Query(default=50, ge=1, le=500),
+                            cursor: Optional[int] = Query(default=None, ge=1)):
+    """Page through every prize win, newest first"""
+    if address and not security_manager.validate_wallet_address(address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+
+    try:
+        return await contract_service.get_prize_history(address, limit, cursor)
+    except Exception as e:
+        logger.error(f"Error fetching prize history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch prize history")
+
 # Background tasks
 @app.on_event("startup")
 async def startup_event():
@@ -258,6 +527,18 @@ async def startup_event():
     # Start background price updates
     asyncio.create_task(background_price_updates())
 
+    # Keep the governance index caught up with the chain
+    asyncio.create_task(background_governance_sync())
+
+    # Keep pool totals and the staking leaderboard current
+    asyncio.create_task(background_staking_sync())
+
+    # Mirror prize claims for off-chain eligibility checks
+    asyncio.create_task(background_prize_sync())
+
+    # Store new platform transactions for the history endpoint
+    asyncio.create_task(background_tx_history_sync())
+
     logger.info("API server started successfully")
 
 async def background_price_updates():
@@ -270,6 +551,46 @@ async def background_price_updates():
             logger.error(f"Error in background price update: {e}")
             await asyncio.sleep(30)  # Wait longer on error
 
+async def background_governance_sync():
+    """Background task to replay new governance transactions every 10 seconds"""
+    while True:
+        try:
+            await contract_service.sync_governance()
+            await asyncio.sleep(10)
+        except Exception as e:
+            logger.error(f"Error in governance sync: {e}")
+            await asyncio.sleep(30)
+
+async def background_staking_sync():
+    """Background task to apply new staking transactions every 10 seconds"""
+    while True:
+        try:
+            await contract_service.sync_staking()
+            await asyncio.sleep(10)
+        except Exception as e:
+            logger.error(f"Error in staking sync: {e}")
+            await asyncio.sleep(30)
+
+async def background_prize_sync():
+    """Background task to apply new prize claims every 10 seconds"""
+    while True:
+        try:
+            await contract_service.sync_prizes()
+            await asyncio.sleep(10)
+        except Exception as e:
+            logger.error(f"Error in prize sync: {e}")
+            await asyncio.sleep(30)
+
+async def background_tx_history_sync():
+    """Background task to store new platform transactions every 10 seconds"""
+    while True:
+        try:
+            await contract_service.sync_tx_history()
+            await asyncio.sleep(10)
+        except Exception as e:
+            logger.error(f"Error in transaction history sync: {e}")
+            await asyncio.sleep(30)
+
 if __name__ == "__main__":
     import uvicorn
 
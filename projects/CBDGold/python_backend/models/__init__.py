@@ -2,14 +2,14 @@
 
 from .models import (
     TokenType, TransactionStatus, VoteChoice,
-    TokenPrice, Product, StakingPool, GovernanceProposal,
-    WalletInfo, TransactionRequest, StakeRequest, VoteRequest,
-    PrizeWinner, OracleMetadata
+    TokenPrice, Product, StakingPool, StakingLeaderboardEntry, StakingLeaderboard, StakingProjectionRequest, StakingProjection,
+    GovernanceProposal, VoteReceiptQuery, VoteReceiptResult, StakingPosition, WalletInfo, PortfolioQuery, WalletValuation, PortfolioValuation, TransactionRequest, TrackedTransaction, StakeRequest, VoteRequest,
+    PrizeWinner, PrizeSpinBatchRequest, PrizeHistoryPage, OracleMetadata
 )
 
 __all__ = [
     "TokenType", "TransactionStatus", "VoteChoice",
-    "TokenPrice", "Product", "StakingPool", "GovernanceProposal",
-    "WalletInfo", "TransactionRequest", "StakeRequest", "VoteRequest",
-    "PrizeWinner", "OracleMetadata"
+    "TokenPrice", "Product", "StakingPool", "StakingLeaderboardEntry", "StakingLeaderboard", "StakingProjectionRequest", "StakingProjection",
+    "GovernanceProposal", "VoteReceiptQuery", "VoteReceiptResult", "StakingPosition", "WalletInfo", "PortfolioQuery", "WalletValuation", "PortfolioValuation", "TransactionRequest", "TrackedTransaction", "StakeRequest", "VoteRequest",
+    "PrizeWinner", "PrizeSpinBatchRequest", "PrizeHistoryPage", "OracleMetadata"
 ]
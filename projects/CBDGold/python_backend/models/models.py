@@ -13,6 +13,7 @@ class TransactionStatus(str, Enum):
     PENDING = "pending"
     CONFIRMED = "confirmed"
     FAILED = "failed"
+    UNKNOWN = "unknown"  # not tracked by this server (never submitted here, or evicted)
 
 class VoteChoice(str, Enum):
     YES = "yes"
@@ -60,6 +61,31 @@ class StakingPool(BaseModel):
     total_stakers: Optional[int] = 0
     is_active: bool = True
 
+class StakingLeaderboardEntry(BaseModel):
+    rank: int
+    address: str
+    staked: int
+    tier: int = Field(description="0 below Bronze, then 1-3 for Bronze/Silver/Gold")
+
+class StakingLeaderboard(BaseModel):
+    total_stakers: int
+    total_staked: int
+    entries: List[StakingLeaderboardEntry]
+    position: Optional[StakingLeaderboardEntry] = Field(default=None, description="Requested address's own entry")
+
+class StakingProjectionRequest(BaseModel):
+    amounts: List[int] = Field(max_length=1000, description="Stake amounts in HEMP base units")
+    durations: List[int] = Field(max_length=1000, description="Staking durations in seconds")
+    reward_rates: List[int] = Field(max_length=1000, description="Contract reward_rate values (tokens per second)")
+    total_staked: Optional[List[int]] = Field(default=None, max_length=1000, description="Stake held by other stakers")
+    compound_periods: int = Field(default=0, ge=0, le=365, description="Re-stake rewards this many times")
+
+class StakingProjection(BaseModel):
+    scenarios: int
+    compound_periods: int
+    summary: Dict[str, float]
+    results: Dict[str, List[float]]
+
 class GovernanceProposal(BaseModel):
     id: int
     title: str
@@ -75,6 +101,20 @@ class GovernanceProposal(BaseModel):
     ends_at: datetime
     creator: Optional[str] = None
 
+class VoteReceiptQuery(BaseModel):
+    addresses: List[str] = Field(min_length=1, max_length=10_000, description="Wallets to check")
+
+class VoteReceiptResult(BaseModel):
+    proposal_id: int
+    receipts: int = Field(description="Vote receipts indexed for the proposal")
+    voted: Dict[str, bool]
+
+class StakingPosition(BaseModel):
+    staked_amount: int = 0
+    tier: int = Field(default=0, description="0 (none) to 3 (gold), as the contract last computed it")
+    pending: int = Field(default=0, description="Rewards settled into local state and not yet claimed")
+    reward_debt: int = 0
+
 class WalletInfo(BaseModel):
     address: str
     algo_balance: float
@@ -83,10 +123,41 @@ class WalletInfo(BaseModel):
     usdc_balance: float
     staked_hemp: int = 0
     staking_tier: int = 0
+    staking: Optional[StakingPosition] = Field(default=None, description="Staking app local state; None if not opted in")
     voting_power: float = 0
     last_updated: datetime
+    round: Optional[int] = Field(default=None, description="Round the account was read at")
     opted_in_assets: List[int] = []
 
+class PortfolioQuery(BaseModel):
+    addresses: List[str] = Field(min_length=1, max_length=1000, description="Wallets to value together")
+    window: int = Field(default=86_400, ge=60, le=86_400, description="Seconds of price history to cover")
+    points: int = Field(default=96, ge=2, le=1000, description="Samples in each value series")
+
+class WalletValuation(BaseModel):
+    address: str
+    balances: Dict[str, float] = Field(description="Whole tokens held, by symbol")
+    values_usd: Dict[str, float] = Field(description="USD value of each balance at current prices")
+    staked_hemp: int
+    staked_value_usd: float
+    total_usd: float = Field(description="Holdings plus staked HEMP at current prices")
+    time_weighted_usd: float = Field(description="Current holdings valued at each price, weighted by how long it held")
+    change_usd: float = Field(description="Value now minus the value at the start of the window")
+    change_pct: Optional[float] = None
+    series: List[float] = Field(description="Value at each of PortfolioValuation.timestamps")
+
+class PortfolioValuation(BaseModel):
+    wallets: List[WalletValuation]
+    unavailable: List[str] = Field(default=[], description="Wallets whose balances could not be read")
+    prices: Dict[str, float]
+    total_usd: float
+    time_weighted_usd: float
+    change_usd: float
+    change_pct: Optional[float] = None
+    timestamps: List[datetime]
+    total_series: List[float]
+    price_samples: int = Field(description="Oracle updates the series are built from")
+
 class TransactionRequest(BaseModel):
     sender: str
     transaction_type: str
@@ -96,6 +167,22 @@ class TransactionRequest(BaseModel):
     app_id: Optional[int] = None
     app_args: Optional[List[str]] = None
     note: Optional[str] = None
+    signed_transactions: Optional[List[str]] = Field(
+        default=None, description="Base64 msgpack signed transactions forming one group"
+    )
+    wait_rounds: int = Field(default=10, ge=1, le=1000)
+    wait_for_confirmation: bool = Field(
+        default=False, description="Block until confirmed instead of returning the pending status"
+    )
+
+class TrackedTransaction(BaseModel):
+    tx_id: str
+    status: TransactionStatus
+    addresses: List[str] = []
+    confirmed_round: Optional[int] = None
+    error: Optional[str] = None
+    submitted_at: datetime
+    updated_at: datetime
 
 class StakeRequest(BaseModel):
     wallet_address: str
@@ -118,6 +205,33 @@ class PrizeWinner(BaseModel):
     time: int
     tx_id: Optional[str] = None
 
+class PrizeSpinBatchRequest(BaseModel):
+    wallet_addresses: List[str] = Field(min_length=1, max_length=10_000, description="One spin per entry")
+
+class PrizeHistoryPage(BaseModel):
+    winners: List[PrizeWinner]
+    next_cursor: Optional[int] = Field(default=None, description="Pass as cursor for the next, older page")
+
+class HistoryTransaction(BaseModel):
+    tx_id: str
+    round: int
+    intra: int = Field(description="Offset within the round")
+    time: Optional[int] = None
+    type: str
+    sender: str
+    receiver: Optional[str] = None
+    amount: Optional[int] = None
+    asset_id: Optional[int] = None
+    app_id: Optional[int] = None
+    fee: Optional[int] = None
+    group_id: Optional[str] = None
+    note: Optional[str] = Field(default=None, description="Base64 note field")
+    inner_txns: int = 0
+
+class TransactionHistoryPage(BaseModel):
+    transactions: List[HistoryTransaction]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as cursor for the next, older page")
+
 class OracleMetadata(BaseModel):
     algo_usd: float
     hemp_usd: float
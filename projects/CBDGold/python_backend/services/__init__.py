@@ -4,5 +4,19 @@ from .oracle_service import OracleService
 from .contract_service import ContractService
 from .product_service import ProductService
 from .wallet_service import WalletService
+from .staking_simulator import StakingSimulator
+from .transaction_builder import TransactionBuilder
+from .transaction_tracker import TransactionTracker
+from .governance_indexer import GovernanceIndexer
+from .governance_boxes import ProposalBoxReader
+from .staking_analytics import StakingAnalytics
+from .prize_history import PrizeHistory
+from .prize_engine import PrizeEngine
+from .prize_eligibility import PrizeEligibility
+from .prize_budget import PrizeBudget
+from .portfolio_service import PortfolioService
 
-__all__ = ["OracleService", "ContractService", "ProductService", "WalletService"]
+__all__ = ["OracleService", "ContractService", "ProductService", "WalletService", "StakingSimulator",
+           "TransactionBuilder", "TransactionTracker", "GovernanceIndexer",
+           "ProposalBoxReader", "StakingAnalytics", "PrizeHistory",
+           "PrizeEngine", "PrizeEligibility", "PrizeBudget", "PortfolioService"]
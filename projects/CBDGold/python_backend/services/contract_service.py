@@ -1,15 +1,28 @@
 import asyncio
 import json
+import os
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-import random
-from algosdk.v2client import algod
-from algosdk import transaction, account, mnemonic
+from algosdk.v2client import algod, indexer
+from algosdk import transaction, account, mnemonic, encoding
 from ..models.models import (
-    StakingPool, GovernanceProposal, TransactionRequest,
-    PrizeWinner, TransactionStatus
+    StakingPool, StakingLeaderboard, GovernanceProposal, TransactionRequest,
+    PrizeWinner, PrizeHistoryPage, TransactionStatus, TransactionHistoryPage
 )
 from ..utils.logger import get_logger
+from ..utils.submission import SubmissionPipeline
+from .governance_boxes import ProposalBoxReader
+from .governance_indexer import GovernanceIndexer
+from .prize_budget import PrizeBudget
+from .prize_eligibility import PrizeEligibility
+from .prize_engine import PrizeEngine, seed_commitment
+from .prize_history import PrizeHistory
+from .staking_analytics import StakingAnalytics
+from .transaction_builder import TransactionBuilder
+from .transaction_history import TransactionHistory
+from .transaction_tracker import TransactionTracker, addresses_of
+from .voting_snapshot import SnapshotReader, snapshot_path
 
 logger = get_logger(__name__)
 
@@ -19,6 +32,9 @@ class ContractService:
         self.algod_address = "https://testnet-api.algonode.cloud"
         self.algod_token = ""
         self.algod_client = algod.AlgodClient(self.algod_token, self.algod_address)
+        self.indexer_address = "https://testnet-idx.algonode.cloud"
+        self.indexer_token = ""
+        self.indexer_client = indexer.IndexerClient(self.indexer_token, self.indexer_address)
 
         # Mock contract IDs (replace with actual deployed contracts)
         self.staking_app_id = 123456789
@@ -30,7 +46,26 @@ class ContractService:
         self.weed_asset_id = 748025552
         self.usdc_asset_id = 31566704
 
-        # Mock data
+        # Shared suggested-params cache and confirmation watcher
+        self.pipeline = SubmissionPipeline(self.algod_client)
+        self.tracker = TransactionTracker(self.pipeline.watcher)
+
+        # Unsigned transaction groups for wallet signing
+        self.tx_builder = TransactionBuilder(
+            self.algod_client,
+            staking_app_id=self.staking_app_id,
+            hemp_asset_id=self.hemp_asset_id,
+            params_cache=self.pipeline.params_cache,
+            governance_app_id=self.governance_app_id
+        )
+
+        # Proposals and tallies replayed from governance contract logs
+        self.governance_indexer = GovernanceIndexer(self.indexer_client, self.governance_app_id)
+        self.proposal_boxes = ProposalBoxReader(self.algod_client, self.governance_app_id)
+        # Voting power snapshots, verified against their on-chain roots
+        self.snapshots: Dict[int, SnapshotReader] = {}
+
+        # Pool metadata; live totals are filled in by staking_analytics
         self.mock_staking_pools = [
             StakingPool(
                 id=1,
@@ -40,9 +75,7 @@ class ContractService:
                 apy=12.0,
                 shipping="Standard",
                 benefits=["5% discount", "12% APY", "Standard shipping"],
-                color="from-orange-400 to-orange-600",
-                total_staked=50_000_000,
-                total_stakers=125
+                color="from-orange-400 to-orange-600"
             ),
             StakingPool(
                 id=2,
@@ -52,9 +85,7 @@ class ContractService:
                 apy=15.0,
                 shipping="Express",
                 benefits=["10% discount", "15% APY", "Express shipping", "Priority support"],
-                color="from-gray-400 to-gray-600",
-                total_staked=200_000_000,
-                total_stakers=85
+                color="from-gray-400 to-gray-600"
             ),
             StakingPool(
                 id=3,
@@ -64,44 +95,33 @@ class ContractService:
                 apy=20.0,
                 shipping="Next Day",
                 benefits=["15% discount", "20% APY", "Next day shipping", "VIP support", "Exclusive products"],
-                color="from-yellow-400 to-yellow-600",
-                total_staked=500_000_000,
-                total_stakers=42
+                color="from-yellow-400 to-yellow-600"
             )
         ]
 
-        self.mock_proposals = [
-            GovernanceProposal(
-                id=1,
-                title="Increase Staking Rewards",
-                description="Proposal to increase staking rewards by 2% across all pools to incentivize more participation.",
-                status="Active",
-                time_left="5 days",
-                weed_required=1000,
-                votes_yes=15420,
-                votes_no=3240,
-                votes_abstain=580,
-                total_votes=19240,
-                created_at=datetime.utcnow() - timedelta(days=2),
-                ends_at=datetime.utcnow() + timedelta(days=5)
-            ),
-            GovernanceProposal(
-                id=2,
-                title="New Product Line: Edibles",
-                description="Vote on introducing a new line of CBD edibles to the ShopFi platform.",
-                status="Active",
-                time_left="12 days",
-                weed_required=500,
-                votes_yes=8750,
-                votes_no=2100,
-                votes_abstain=450,
-                total_votes=11300,
-                created_at=datetime.utcnow() - timedelta(days=1),
-                ends_at=datetime.utcnow() + timedelta(days=12)
-            )
-        ]
-
-        self.prize_winners: List[PrizeWinner] = []
+        # Live pool totals and leaderboard from staking local state
+        self.staking_analytics = StakingAnalytics(
+            self.indexer_client, self.staking_app_id, self.mock_staking_pools
+        )
+
+        # Commit-reveal prize draws
+        secret = os.getenv("PRIZE_SEED_SECRET")
+        self.prize_engine = PrizeEngine(secret=secret.encode() if secret else None)
+        # Daily cap, pool budget and award pacing
+        self.prize_budget = PrizeBudget(max_award=max(t.amount for t in self.prize_engine.tiers))
+        # Mirror of the prize contract's claim checks
+        self.prize_eligibility = PrizeEligibility(
+            self.algod_client, self.indexer_client, self.prize_app_id, self.staking_analytics,
+            on_claim=self.prize_budget.claimed
+        )
+        # Recent-winner feed and full prize history
+        self.prize_history = PrizeHistory()
+        # Local, indexed history of every platform asset and app transaction
+        self.tx_history = TransactionHistory(
+            self.indexer_client,
+            asset_ids=[self.hemp_asset_id, self.weed_asset_id],
+            app_ids=[self.staking_app_id, self.governance_app_id, self.prize_app_id]
+        )
 
     async def health_check(self) -> Dict[str, Any]:
         """Check contract service health"""
@@ -121,10 +141,20 @@ class ContractService:
             }
 
     async def get_staking_pools(self) -> List[StakingPool]:
-        """Get all staking pools"""
-        return self.mock_staking_pools
+        """Get all staking pools with live totals"""
+        return self.staking_analytics.pools()
+
+    async def get_staking_leaderboard(self, limit: int = 25, offset: int = 0,
+                                      address: Optional[str] = None) -> StakingLeaderboard:
+        """Largest stakers first, plus the requested address's rank"""
+        return self.staking_analytics.leaderboard(limit, offset, address)
 
-    async def stake_tokens(self, wallet_address: str, amount: int, pool_id: int) -> Dict[str, Any]:
+    async def sync_staking(self) -> int:
+        """Apply new stake/unstake transactions to the staking aggregates"""
+        return await asyncio.to_thread(self.staking_analytics.catch_up)
+
+    async def stake_tokens(self, wallet_address: str, amount: int, pool_id: int,
+                           lease: Optional[bytes] = None) -> Dict[str, Any]:
         """Stake HEMP tokens in a pool"""
         try:
             # Find the pool
@@ -135,18 +165,17 @@ class ContractService:
             if amount < pool.min_stake:
                 raise ValueError(f"Amount {amount} below minimum stake {pool.min_stake}")
 
-            # Simulate transaction
-            tx_id = self._generate_mock_tx_id()
-
-            # Update pool stats
-            pool.total_staked += amount
-            pool.total_stakers += 1  # Simplified - would check if new staker
+            group = self.tx_builder.encode_group(
+                self.tx_builder.build_stake_group(wallet_address, amount, lease=lease)
+            )
 
-            logger.info(f"Staked {amount} HEMP in pool {pool_id} for {wallet_address}")
+            logger.info(f"Built stake group for {amount} HEMP in pool {pool_id} for {wallet_address}")
 
             return {
-                "status": "success",
-                "tx_id": tx_id,
+                "status": "unsigned",
+                "tx_id": group["tx_ids"][0],
+                "group_id": group["group_id"],
+                "transactions": group["transactions"],
                 "amount_staked": amount,
                 "pool_id": pool_id,
                 "new_tier": self._calculate_tier(amount)
@@ -159,7 +188,8 @@ class ContractService:
                 "error": str(e)
             }
 
-    async def unstake_tokens(self, wallet_address: str, amount: int, pool_id: int) -> Dict[str, Any]:
+    async def unstake_tokens(self, wallet_address: str, amount: int, pool_id: int,
+                             lease: Optional[bytes] = None) -> Dict[str, Any]:
         """Unstake HEMP tokens from a pool"""
         try:
             # Find the pool
@@ -167,17 +197,16 @@ class ContractService:
             if not pool:
                 raise ValueError(f"Pool {pool_id} not found")
 
-            # Simulate transaction
-            tx_id = self._generate_mock_tx_id()
-
-            # Update pool stats
-            pool.total_staked = max(0, pool.total_staked - amount)
+            group = self.tx_builder.encode_group(
+                self.tx_builder.build_unstake(wallet_address, amount, lease=lease)
+            )
 
-            logger.info(f"Unstaked {amount} HEMP from pool {pool_id} for {wallet_address}")
+            logger.info(f"Built unstake call for {amount} HEMP from pool {pool_id} for {wallet_address}")
 
             return {
-                "status": "success",
-                "tx_id": tx_id,
+                "status": "unsigned",
+                "tx_id": group["tx_ids"][0],
+                "transactions": group["transactions"],
                 "amount_unstaked": amount,
                 "pool_id": pool_id
             }
@@ -189,42 +218,144 @@ class ContractService:
                 "error": str(e)
             }
 
-    async def get_governance_proposals(self) -> List[GovernanceProposal]:
-        """Get all governance proposals"""
-        return self.mock_proposals
+    async def claim_rewards(self, wallet_address: str) -> Dict[str, Any]:
+        """Build the staking reward claim call"""
+        try:
+            group = self.tx_builder.encode_group(self.tx_builder.build_claim(wallet_address))
+
+            logger.info(f"Built claim call for {wallet_address}")
+
+            return {
+                "status": "unsigned",
+                "tx_id": group["tx_ids"][0],
+                "transactions": group["transactions"]
+            }
+
+        except Exception as e:
+            logger.error(f"Error building claim: {e}")
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
+    async def compound_rewards(self, wallet_address: str) -> Dict[str, Any]:
+        """Build the call that restakes pending staking rewards"""
+        try:
+            group = self.tx_builder.encode_group(self.tx_builder.build_compound(wallet_address))
+
+            logger.info(f"Built compound call for {wallet_address}")
+
+            return {
+                "status": "unsigned",
+                "tx_id": group["tx_ids"][0],
+                "transactions": group["transactions"]
+            }
+
+        except Exception as e:
+            logger.error(f"Error building compound: {e}")
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
+    async def get_governance_proposals(self, status: Optional[str] = None, limit: int = 50,
+                                       offset: int = 0) -> List[GovernanceProposal]:
+        """Get governance proposals from the local index, newest first"""
+        return self.governance_indexer.list_proposals(status, limit, offset)
+
+    async def get_governance_proposal(self, proposal_id: int) -> Optional[GovernanceProposal]:
+        """Get a single indexed governance proposal"""
+        return self.governance_indexer.get_proposal(proposal_id)
+
+    async def sync_governance(self) -> int:
+        """Catch the governance index up with the chain.
+
+        Open proposals are then re-read from their boxes so tallies stay exact
+        even if the indexer lags behind algod. An ended proposal is re-read
+        once more for its final tallies and then left to its finalize log.
+        """
+        applied = await asyncio.to_thread(self.governance_indexer.catch_up)
+        now = int(time.time())
+        polled = self.governance_indexer.proposals_to_poll(now)
+        if polled:
+            records = await asyncio.to_thread(self.proposal_boxes.fetch, polled)
+            self.governance_indexer.apply_records(records)
+            self.governance_indexer.mark_settled(records, now)
+        return applied
+
+    async def check_vote_receipts(self, proposal_id: int, addresses: List[str]) -> Dict[str, Any]:
+        """Which of ``addresses`` already voted on a proposal, from the incrementally synced votes table"""
+        invalid = [address for address in addresses if not encoding.is_valid_address(address)]
+        if invalid:
+            raise ValueError(f"Invalid wallet address: {invalid[0]}")
+
+        voted = await asyncio.to_thread(self.governance_indexer.voted, proposal_id, addresses)
+        return {
+            "proposal_id": proposal_id,
+            "receipts": self.governance_indexer.voter_count(proposal_id),
+            "voted": voted
+        }
+
+    async def get_voting_snapshot(self, proposal_id: int) -> SnapshotReader:
+        """Open a proposal's snapshot file once it matches the root committed on-chain"""
+        snapshot = self.snapshots.get(proposal_id)
+        if snapshot is not None:
+            return snapshot
+
+        path = snapshot_path(self.governance_app_id, proposal_id)
+        if not path.exists():
+            raise ValueError(f"No voting power snapshot for proposal {proposal_id}")
+
+        snapshot = SnapshotReader(str(path))
+        records = await asyncio.to_thread(self.proposal_boxes.fetch, [proposal_id])
+        if not records or records[0]["snapshot_root"] != snapshot.root:
+            snapshot.close()
+            raise ValueError(f"Snapshot for proposal {proposal_id} does not match the on-chain root")
+
+        self.snapshots[proposal_id] = snapshot
+        return snapshot
 
     async def vote_on_proposal(self, wallet_address: str, proposal_id: int,
-                             vote_choice: str, weed_amount: int) -> Dict[str, Any]:
-        """Vote on a governance proposal"""
+                             vote_choice: str, weed_amount: int,
+                             lease: Optional[bytes] = None) -> Dict[str, Any]:
+        """Build a governance vote call for wallet signing"""
         try:
-            # Find the proposal
-            proposal = next((p for p in self.mock_proposals if p.id == proposal_id), None)
+            proposal = self.governance_indexer.get_proposal(proposal_id)
             if not proposal:
                 raise ValueError(f"Proposal {proposal_id} not found")
 
-            if weed_amount < proposal.weed_required:
-                raise ValueError(f"Insufficient WEED tokens. Required: {proposal.weed_required}")
+            if proposal.status != "Active":
+                raise ValueError(f"Proposal {proposal_id} is not open for voting")
+
+            choice = vote_choice.lower()
+            if choice not in ("yes", "no"):
+                # The contract counts anything but 1 as a vote against
+                raise ValueError("Only yes/no votes are supported on-chain")
 
-            # Update vote counts
-            if vote_choice.lower() == "yes":
-                proposal.votes_yes += weed_amount
-            elif vote_choice.lower() == "no":
-                proposal.votes_no += weed_amount
-            else:
-                proposal.votes_abstain += weed_amount
+            if self.governance_indexer.get_vote(proposal_id, wallet_address):
+                raise ValueError(f"Already voted on proposal {proposal_id}")
 
-            proposal.total_votes += weed_amount
+            # Voting power is the WEED balance at the snapshot round, not the requested amount
+            snapshot = await self.get_voting_snapshot(proposal_id)
+            entry = snapshot.proof(wallet_address)
+            balance, proof = entry if entry else (0, b"")
+            if balance < proposal.weed_required:
+                raise ValueError(f"Insufficient WEED at snapshot round {snapshot.round_num}. "
+                                 f"Required: {proposal.weed_required}")
 
-            # Simulate transaction
-            tx_id = self._generate_mock_tx_id()
+            group = self.tx_builder.encode_group(
+                self.tx_builder.build_vote(wallet_address, proposal_id, choice == "yes", balance, proof, lease=lease)
+            )
 
-            logger.info(f"Vote recorded: {vote_choice} on proposal {proposal_id} with {weed_amount} WEED")
+            logger.info(f"Built vote call: {vote_choice} on proposal {proposal_id} for {wallet_address}")
 
             return {
-                "status": "success",
-                "tx_id": tx_id,
+                "status": "unsigned",
+                "tx_id": group["tx_ids"][0],
+                "transactions": group["transactions"],
                 "vote_choice": vote_choice,
-                "weed_used": weed_amount,
+                "weed_used": balance,
+                "snapshot_round": snapshot.round_num,
                 "proposal_id": proposal_id
             }
 
@@ -237,48 +368,88 @@ class ContractService:
 
     async def spin_for_prize(self, wallet_address: str) -> Dict[str, Any]:
         """Spin for a prize"""
+        result = await self.spin_for_prizes([wallet_address])
+        if result["status"] != "success":
+            return result
+        spin = result["spins"][0]
+        if not spin["eligible"]:
+            return {"status": "error", "error": spin["reason"], "eligible": False}
+        return {"status": "success", **spin}
+
+    async def check_prize_eligibility(self, wallet_address: str) -> Dict[str, Any]:
+        """Whether the prize contract would accept a claim from this wallet now"""
+        if self.prize_eligibility.needs_refresh(wallet_address):
+            await asyncio.to_thread(self.prize_eligibility.refresh_account, wallet_address)
+        eligible, reason = self.prize_eligibility.check(wallet_address)
+        return {"wallet_address": wallet_address, "eligible": eligible, "reason": reason}
+
+    async def spin_for_prizes(self, wallet_addresses: List[str]) -> Dict[str, Any]:
+        """Resolve one spin per eligible address from the current committed prize round"""
         try:
-            # Simple prize logic
-            rand = random.random()
-
-            if rand < 0.01:  # 1% chance for legendary
-                prize_type = "legendary"
-                prize_name = "Physical CBD Gold Vape"
-                prize_desc = "Premium vape device shipped to your door"
-            elif rand < 0.05:  # 4% chance for rare
-                prize_type = "rare"
-                prize_name = "10,000 HEMP Tokens"
-                prize_desc = "Instant HEMP token reward"
-            elif rand < 0.25:  # 20% chance for common
-                prize_type = "common"
-                prize_name = "1,000 HEMP Tokens"
-                prize_desc = "Small token reward"
-            else:  # 75% chance for nothing
-                prize_type = "none"
-                prize_name = "Better luck next time!"
-                prize_desc = "No prize this time, try again soon"
-
-            # Record winner if they won something
-            if prize_type != "none":
-                winner = PrizeWinner(
-                    id=f"prize_{random.randint(10000, 99999)}",
-                    address=wallet_address,
-                    prize=prize_name,
-                    label=prize_desc,
-                    tier=prize_type,
-                    time=int(datetime.utcnow().timestamp()),
-                    tx_id=self._generate_mock_tx_id()
-                )
-                self.prize_winners.insert(0, winner)
-                # Keep only last 50 winners
-                self.prize_winners = self.prize_winners[:50]
+            now = int(datetime.utcnow().timestamp())
+            checks, seen = [], set()
+            for address in wallet_addresses:
+                if address in seen:
+                    checks.append({"wallet_address": address, "eligible": False,
+                                   "reason": "Only one spin per wallet per batch"})
+                    continue
+                seen.add(address)
+                checks.append(await self.check_prize_eligibility(address))
+            # Spins past today's paced allowance are refused rather than drawn
+            admitted = self.prize_budget.admit(sum(1 for check in checks if check["eligible"]))
+            for check in checks:
+                if check["eligible"]:
+                    if admitted:
+                        admitted -= 1
+                        continue
+                    check.update(eligible=False, reason="Today's prize budget is paced; try again later")
+            eligible = [check["wallet_address"] for check in checks if check["eligible"]]
+            awards: Dict[str, int] = {}  # winner -> claim_prize amount
+            # Admitted tokens are returned even if the draw fails part way
+            try:
+                outcomes = iter(self.prize_engine.spin_batch(len(eligible)))
+
+                spins, winners = [], []
+                commitment = None
+                for check in checks:
+                    address = check["wallet_address"]
+                    if not check["eligible"]:
+                        spins.append(check)
+                        continue
+                    outcome = next(outcomes)
+                    commitment = outcome.commitment
+                    prize = outcome.tier
+                    spins.append({
+                        "spin_id": outcome.spin_id,
+                        "round_id": outcome.round_id,
+                        "wallet_address": address,
+                        "eligible": True,
+                        "prize_type": prize.tier,
+                        "prize_name": prize.name,
+                        "prize_description": prize.description,
+                        "prize_amount": prize.amount,
+                        "won_prize": outcome.won
+                    })
+                    # Record winner if they won something
+                    if outcome.won:
+                        self.prize_eligibility.reserve(address, now)
+                        awards[address] = prize.amount
+                        winners.append(PrizeWinner(
+                            id=outcome.spin_id,
+                            address=address,
+                            prize=prize.name,
+                            label=prize.description,
+                            tier=prize.tier,
+                            time=now
+                        ))
+            finally:
+                self.prize_budget.settle(len(eligible), awards)
+            await asyncio.to_thread(self.prize_history.record_many, winners)
 
             return {
                 "status": "success",
-                "prize_type": prize_type,
-                "prize_name": prize_name,
-                "prize_description": prize_desc,
-                "won_prize": prize_type != "none"
+                "commitment": commitment,
+                "spins": spins
             }
 
         except Exception as e:
@@ -288,29 +459,84 @@ class ContractService:
                 "error": str(e)
             }
 
-    async def get_prize_winners(self) -> List[PrizeWinner]:
-        """Get recent prize winners"""
-        return self.prize_winners[:25]  # Return last 25 winners
+    async def get_prize_budget(self) -> Dict[str, Any]:
+        """Live daily cap, pool and pacing state"""
+        return self.prize_budget.state()
+
+    async def sync_prizes(self) -> int:
+        """Refresh the prize contract's settings and apply new claims to the eligibility mirror"""
+        global_state = await asyncio.to_thread(self.prize_eligibility.refresh_globals)
+        self.prize_budget.update_chain_state(global_state)
+        return await asyncio.to_thread(self.prize_eligibility.catch_up)
+
+    async def get_prize_round(self) -> Dict[str, Any]:
+        """Current prize round id, seed commitment and spins drawn"""
+        return self.prize_engine.current_round()
+
+    async def reveal_prize_round(self, round_id: int) -> Optional[Dict[str, Any]]:
+        """Seed of a closed prize round, for replaying its outcomes"""
+        revealed = self.prize_engine.reveal(round_id)
+        if revealed is None:
+            return None
+        seed, spins = revealed
+        return {
+            "round_id": round_id,
+            "seed": seed.hex(),
+            "commitment": seed_commitment(seed),
+            "spins": spins
+        }
+
+    async def get_prize_winners(self, address: Optional[str] = None, limit: int = 25) -> List[PrizeWinner]:
+        """Get recent prize winners, optionally only one address's wins"""
+        if address is None and limit <= self.prize_history.recent.capacity:
+            return self.prize_history.latest(limit)
+        winners, _ = await asyncio.to_thread(self.prize_history.history, address, limit)
+        return winners
+
+    async def get_prize_history(self, address: Optional[str] = None, limit: int = 50,
+                                cursor: Optional[int] = None) -> PrizeHistoryPage:
+        """Page through the full prize history, newest first"""
+        winners, next_cursor = await asyncio.to_thread(self.prize_history.history, address, limit, cursor)
+        return PrizeHistoryPage(winners=winners, next_cursor=next_cursor)
+
+    async def sync_tx_history(self) -> int:
+        """Store new platform transactions from the indexer"""
+        return await asyncio.to_thread(self.tx_history.catch_up)
+
+    async def get_transaction_history(self, address: Optional[str] = None, asset_id: Optional[int] = None,
+                                      app_id: Optional[int] = None, min_round: Optional[int] = None,
+                                      max_round: Optional[int] = None, limit: int = 50,
+                                      cursor: Optional[str] = None) -> TransactionHistoryPage:
+        """Page through stored transactions, newest first"""
+        transactions, next_cursor = await asyncio.to_thread(
+            self.tx_history.history, address, asset_id, app_id, min_round, max_round, limit, cursor
+        )
+        return TransactionHistoryPage(transactions=transactions, next_cursor=next_cursor)
 
     async def submit_transaction(self, request: TransactionRequest) -> Dict[str, Any]:
-        """Submit a transaction to the network"""
+        """Submit a wallet-signed transaction group and track its confirmation"""
+        if not request.signed_transactions:
+            return {
+                "status": "error",
+                "error": "signed_transactions is required"
+            }
+
         try:
-            # This would implement actual transaction submission
-            # For now, just simulate success/failure
+            tx_id = await asyncio.to_thread(self.pipeline.send_raw, request.signed_transactions)
+            record = self.tracker.track(
+                tx_id, addresses_of(request.signed_transactions), request.wait_rounds
+            )
 
-            tx_id = self._generate_mock_tx_id()
+            logger.info(f"Transaction {tx_id} submitted")
 
-            # Simulate occasional failures
-            if random.random() < 0.05:  # 5% failure rate
-                return {
-                    "status": "failed",
-                    "error": "Transaction simulation failed"
-                }
+            if request.wait_for_confirmation:
+                record = await self.tracker.wait(tx_id)
 
             return {
-                "status": "confirmed",
+                "status": record.status.value,
                 "tx_id": tx_id,
-                "block": random.randint(1000000, 2000000)
+                "block": record.confirmed_round,
+                "error": record.error
             }
 
         except Exception as e:
@@ -320,10 +546,6 @@ class ContractService:
                 "error": str(e)
             }
 
-    def _generate_mock_tx_id(self) -> str:
-        """Generate a mock transaction ID"""
-        return "".join(random.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567", k=52))
-
     def _calculate_tier(self, staked_amount: int) -> int:
         """Calculate staking tier based on amount"""
         if staked_amount >= 1_000_000_000:  # 1B HEMP
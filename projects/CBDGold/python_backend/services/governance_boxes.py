@@ -0,0 +1,99 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from algosdk import encoding
+from algosdk.v2client import algod
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Mirrors the proposal box layout in CBDGoldGovernance/governance_contract.py
+PROPOSAL_BOX_PREFIX = b"p_"
+MAX_TITLE_LENGTH = 64
+PROPOSAL_RECORD_DTYPE = np.dtype([
+    ("votes_for", ">u8"),
+    ("votes_against", ">u8"),
+    ("end_time", ">u8"),
+    ("status", ">u8"),
+    ("creator", "V32"),
+    ("title_len", ">u8"),
+    ("title", f"V{MAX_TITLE_LENGTH}"),
+    ("snapshot_root", "V32"),
+])
+PROPOSAL_RECORD_SIZE = PROPOSAL_RECORD_DTYPE.itemsize
+
+
+def proposal_box_name(proposal_id: int) -> bytes:
+    return PROPOSAL_BOX_PREFIX + proposal_id.to_bytes(8, "big")
+
+
+def decode_proposal_records(proposal_ids: List[int], records: List[bytes]) -> List[Dict]:
+    """Decode many fixed-width proposal records with one ``frombuffer`` call"""
+    if not records:
+        return []
+    table = np.frombuffer(b"".join(records), dtype=PROPOSAL_RECORD_DTYPE)
+    votes_for = table["votes_for"].tolist()
+    votes_against = table["votes_against"].tolist()
+    end_time = table["end_time"].tolist()
+    status = table["status"].tolist()
+    title_len = np.minimum(table["title_len"], MAX_TITLE_LENGTH).tolist()
+
+    decoded = []
+    for i, proposal_id in enumerate(proposal_ids):
+        decoded.append({
+            "id": proposal_id,
+            "votes_for": votes_for[i],
+            "votes_against": votes_against[i],
+            "end_time": end_time[i],
+            "status": status[i],
+            "creator": encoding.encode_address(table["creator"][i].tobytes()),
+            "title": table["title"][i].tobytes()[:title_len[i]].decode("utf-8", errors="replace"),
+            "snapshot_root": table["snapshot_root"][i].tobytes(),
+        })
+    return decoded
+
+
+class ProposalBoxReader:
+    """Reads governance proposal boxes from algod in bulk.
+
+    Box names are listed once, records are fetched concurrently on a small
+    thread pool and decoded together as one structured array.
+    """
+
+    def __init__(self, algod_client: algod.AlgodClient, app_id: int, max_workers: int = 16):
+        self.algod_client = algod_client
+        self.app_id = app_id
+        self.max_workers = max_workers
+
+    def list_proposal_ids(self) -> List[int]:
+        """Ids of every proposal box the app holds"""
+        response = self.algod_client.application_boxes(self.app_id)
+        ids = []
+        for box in response.get("boxes") or []:
+            name = base64.b64decode(box["name"])
+            if name.startswith(PROPOSAL_BOX_PREFIX) and len(name) == len(PROPOSAL_BOX_PREFIX) + 8:
+                ids.append(int.from_bytes(name[len(PROPOSAL_BOX_PREFIX):], "big"))
+        return sorted(ids)
+
+    def fetch(self, proposal_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Fetch and decode proposal records; all proposals when ``proposal_ids`` is None"""
+        ids = list(proposal_ids) if proposal_ids is not None else self.list_proposal_ids()
+        if not ids:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ids))) as pool:
+            values = list(pool.map(self._fetch_one, ids))
+
+        found = [(pid, raw) for pid, raw in zip(ids, values)
+                 if raw is not None and len(raw) == PROPOSAL_RECORD_SIZE]
+        logger.debug(f"Fetched {len(found)}/{len(ids)} proposal boxes for app {self.app_id}")
+        return decode_proposal_records([pid for pid, _ in found], [raw for _, raw in found])
+
+    def _fetch_one(self, proposal_id: int) -> Optional[bytes]:
+        try:
+            response = self.algod_client.application_box_by_name(self.app_id, proposal_box_name(proposal_id))
+        except Exception as e:
+            logger.warning(f"Failed to read proposal box {proposal_id}: {e}")
+            return None
+        return base64.b64decode(response["value"])
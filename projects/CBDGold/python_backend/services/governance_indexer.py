@@ -0,0 +1,384 @@
+import base64
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+from algosdk.v2client import indexer
+from ..models.models import GovernanceProposal
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "governance_index.sqlite3"
+
+# Mirrors CBDGoldGovernance/governance_contract.py
+PROPOSAL_CREATED_PREFIX = b"proposal_created:"
+VOTE_CAST_PREFIX = b"vote_cast:"
+PROPOSAL_FINALIZED_PREFIX = b"proposal_finalized:"
+VOTING_PERIOD = 604800  # seconds
+DEFAULT_MIN_WEED_REQUIRED = 1_000_000
+
+# Addresses per IN (...) probe, below SQLite's default bound-parameter limit
+_LOOKUP_CHUNK = 900
+
+STATUS_ACTIVE = 0
+STATUS_PASSED = 1
+STATUS_REJECTED = 2
+
+# Legacy global-state layout: per-proposal fields suffixed with Itob(proposal_id)
+_PROPOSAL_FIELDS = {
+    b"proposal_votes_for_": "votes_for",
+    b"proposal_votes_against_": "votes_against",
+    b"proposal_end_time_": "ends_at",
+    b"proposal_status_": "status",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS proposals (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    creator TEXT,
+    created_round INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    ends_at INTEGER NOT NULL,
+    status INTEGER NOT NULL DEFAULT 0,
+    votes_for INTEGER NOT NULL DEFAULT 0,
+    votes_against INTEGER NOT NULL DEFAULT 0,
+    voter_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS proposals_status ON proposals (status, ends_at);
+CREATE TABLE IF NOT EXISTS votes (
+    proposal_id INTEGER NOT NULL,
+    voter TEXT NOT NULL,
+    choice INTEGER NOT NULL,
+    weight INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    tx_id TEXT NOT NULL,
+    PRIMARY KEY (proposal_id, voter)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    round INTEGER NOT NULL
+);
+"""
+
+
+def _decode_uint(raw: bytes) -> int:
+    return int.from_bytes(raw, "big")
+
+
+class GovernanceIndexer:
+    """Replays governance app calls from the indexer into a local SQLite index.
+
+    ``proposal_created:`` logs create proposal rows, ``vote_cast:`` logs
+    insert one vote row per (proposal, voter) and bump the tally by the logged
+    voting power only when that row is new, and ``proposal_finalized:`` logs
+    set the outcome, so replaying a round twice is harmless. Deployments of
+    the older global-state layout log no power; there tallies, end time and
+    status come from the transaction's global-state delta instead.
+
+    ``catch_up`` resumes from the checkpointed round and commits one indexer
+    page per SQLite transaction. The checkpoint only advances past rounds that
+    were fully read, so a restart mid-round re-applies that round's tail.
+    """
+
+    def __init__(self, indexer_client: indexer.IndexerClient, app_id: int,
+                 db_path: Optional[str] = None, page_size: int = 1000,
+                 min_weed_required: int = DEFAULT_MIN_WEED_REQUIRED):
+        self.indexer_client = indexer_client
+        self.app_id = app_id
+        self.page_size = page_size
+        self.min_weed_required = min_weed_required
+        self.checkpoint_name = f"governance:{app_id}"
+
+        path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        # Ended, unfinalized proposals whose final tallies were read from their boxes
+        self._settled: Set[int] = set()
+
+    @property
+    def checkpoint(self) -> int:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT round FROM checkpoints WHERE name = ?", (self.checkpoint_name,)
+            ).fetchone()
+        return row["round"] if row else 0
+
+    def catch_up(self, max_pages: Optional[int] = None) -> int:
+        """Apply every governance transaction after the checkpoint; returns the count"""
+        min_round = self.checkpoint + 1
+        next_page = None
+        applied = 0
+        pages = 0
+
+        while max_pages is None or pages < max_pages:
+            response = self.indexer_client.search_transactions(
+                application_id=self.app_id, min_round=min_round,
+                limit=self.page_size, next_page=next_page
+            )
+            txns = response.get("transactions") or []
+            next_page = response.get("next-token")
+            pages += 1
+
+            if txns and next_page:
+                # The page may end mid-round; keep the last round open
+                checkpoint = txns[-1]["confirmed-round"] - 1
+            else:
+                checkpoint = response.get("current-round", 0)
+
+            with self._lock, self._db:
+                applied += self.apply_transactions(txns)
+                if checkpoint >= min_round:
+                    self._db.execute(
+                        "INSERT INTO checkpoints (name, round) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET round = excluded.round",
+                        (self.checkpoint_name, checkpoint)
+                    )
+
+            if not txns or not next_page:
+                break
+
+        if applied:
+            logger.info(f"Indexed {applied} governance transactions up to round {self.checkpoint}")
+        return applied
+
+    def apply_transactions(self, txns: Iterable[Dict[str, Any]]) -> int:
+        """Apply indexer transaction records in round order (caller commits)"""
+        applied = 0
+        for txn in txns:
+            app_call = txn.get("application-transaction") or {}
+            if app_call.get("application-id") != self.app_id:
+                continue
+            for log in txn.get("logs") or []:
+                raw = base64.b64decode(log)
+                if raw.startswith(PROPOSAL_CREATED_PREFIX):
+                    self._apply_created(txn, raw)
+                elif raw.startswith(VOTE_CAST_PREFIX):
+                    self._apply_vote(txn, raw)
+                elif raw.startswith(PROPOSAL_FINALIZED_PREFIX):
+                    self._apply_finalized(raw)
+            self._apply_state_delta(txn)
+            applied += 1
+        return applied
+
+    def _apply_created(self, txn: Dict[str, Any], raw: bytes):
+        # proposal_created:<itob id>,title:<title>
+        body = raw[len(PROPOSAL_CREATED_PREFIX):]
+        proposal_id = _decode_uint(body[:8])
+        title = body[8 + len(b",title:"):].decode("utf-8", errors="replace")
+        created_at = txn.get("round-time", 0)
+        self._db.execute(
+            "INSERT OR IGNORE INTO proposals (id, title, creator, created_round, created_at, ends_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (proposal_id, title, txn.get("sender"), txn["confirmed-round"],
+             created_at, created_at + VOTING_PERIOD)
+        )
+
+    def _apply_vote(self, txn: Dict[str, Any], raw: bytes):
+        # vote_cast:<itob id>,vote:<choice>[,power:<itob power>]; apps deployed before the choice
+        # was re-encoded log the raw argument, which may be shorter than 8 bytes
+        body = raw[len(VOTE_CAST_PREFIX):]
+        proposal_id = _decode_uint(body[:8])
+        logged_power = len(body) >= 14 + 15 and body[-15:-8] == b",power:"
+        power = body[-15:] if logged_power else b""
+        choice = _decode_uint(body[14:-15] if logged_power else body[14:])
+        field = "votes_for" if choice == 1 else "votes_against"
+
+        if logged_power:
+            weight = _decode_uint(power[7:15])
+        else:
+            # A vote always bumps one tally by the voter's power: recover it from the delta
+            row = self._db.execute(f"SELECT {field} FROM proposals WHERE id = ?", (proposal_id,)).fetchone()
+            new_tally = self._delta_uint(txn, field, proposal_id)
+            weight = max(new_tally - row[field], 0) if row is not None and new_tally is not None else 0
+
+        cursor = self._db.execute(
+            "INSERT OR IGNORE INTO votes (proposal_id, voter, choice, weight, round, tx_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (proposal_id, txn["sender"], 1 if choice == 1 else 0, weight,
+             txn["confirmed-round"], txn["id"])
+        )
+        if cursor.rowcount:
+            tally = f", {field} = {field} + ?" if logged_power else ""
+            self._db.execute(f"UPDATE proposals SET voter_count = voter_count + 1{tally} WHERE id = ?",
+                             (weight, proposal_id) if logged_power else (proposal_id,))
+
+    def _apply_finalized(self, raw: bytes):
+        # proposal_finalized:<itob id>,status:<itob status>
+        body = raw[len(PROPOSAL_FINALIZED_PREFIX):]
+        self._db.execute("UPDATE proposals SET status = ? WHERE id = ?",
+                         (_decode_uint(body[16:24]), _decode_uint(body[:8])))
+
+    def apply_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Overwrite tallies, end time and status with decoded proposal box records"""
+        rows = [(r["votes_for"], r["votes_against"], r["end_time"], r["status"], r["id"]) for r in records]
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE proposals SET votes_for = ?, votes_against = ?, ends_at = ?, status = ? WHERE id = ?",
+                rows
+            )
+        return len(rows)
+
+    def proposals_to_poll(self, now: Optional[int] = None) -> List[int]:
+        """Proposals whose boxes can still change: open ones, plus ended ones not yet re-read.
+
+        No votes land after a proposal's end time, so one box read after it
+        settles the tallies; finalization then arrives as a
+        ``proposal_finalized`` log through ``catch_up``. Each poll stays
+        proportional to the open proposals instead of every proposal never
+        finalized.
+        """
+        now = int(time.time()) if now is None else now
+        with self._lock:
+            open_rows = self._db.execute(
+                "SELECT id FROM proposals WHERE status = ? AND ends_at > ?", (STATUS_ACTIVE, now)
+            ).fetchall()
+            ended_rows = self._db.execute(
+                "SELECT id FROM proposals WHERE status = ? AND ends_at <= ?", (STATUS_ACTIVE, now)
+            ).fetchall()
+        return [row["id"] for row in open_rows] + [row["id"] for row in ended_rows
+                                                   if row["id"] not in self._settled]
+
+    def mark_settled(self, records: Iterable[Dict[str, Any]], now: Optional[int] = None):
+        """Stop polling proposals whose box showed them ended"""
+        now = int(time.time()) if now is None else now
+        self._settled.update(r["id"] for r in records if r["end_time"] <= now)
+
+    def _apply_state_delta(self, txn: Dict[str, Any]):
+        for key, value in self._proposal_deltas(txn):
+            prefix, proposal_id = key
+            field = _PROPOSAL_FIELDS[prefix]
+            self._db.execute(f"UPDATE proposals SET {field} = ? WHERE id = ?", (value, proposal_id))
+
+    def _proposal_deltas(self, txn: Dict[str, Any]):
+        for entry in txn.get("global-state-delta") or []:
+            key = base64.b64decode(entry.get("key", ""))
+            value = entry.get("value") or {}
+            if value.get("action") != 2:  # SetUint
+                continue
+            for prefix in _PROPOSAL_FIELDS:
+                if key.startswith(prefix) and len(key) == len(prefix) + 8:
+                    yield (prefix, _decode_uint(key[len(prefix):])), value.get("uint", 0)
+                    break
+
+    def _delta_uint(self, txn: Dict[str, Any], field: str, proposal_id: int) -> Optional[int]:
+        for (prefix, pid), value in self._proposal_deltas(txn):
+            if pid == proposal_id and _PROPOSAL_FIELDS[prefix] == field:
+                return value
+        return None
+
+    def list_proposals(self, status: Optional[str] = None, limit: int = 50,
+                       offset: int = 0) -> List[GovernanceProposal]:
+        """Newest proposals first, optionally filtered by display status"""
+        now = int(time.time())
+        where, params = "", []
+        if status:
+            status = status.lower()
+            if status == "active":
+                where, params = "WHERE status = ? AND ends_at > ?", [STATUS_ACTIVE, now]
+            elif status == "ended":
+                where, params = "WHERE status = ? AND ends_at <= ?", [STATUS_ACTIVE, now]
+            elif status == "passed":
+                where, params = "WHERE status = ?", [STATUS_PASSED]
+            elif status == "rejected":
+                where, params = "WHERE status = ?", [STATUS_REJECTED]
+            else:
+                raise ValueError(f"Unknown proposal status {status!r}")
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM proposals {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return [self._to_model(row, now) for row in rows]
+
+    def get_proposal(self, proposal_id: int) -> Optional[GovernanceProposal]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM proposals WHERE id = ?", (proposal_id,)).fetchone()
+        return self._to_model(row, int(time.time())) if row else None
+
+    def created_round(self, proposal_id: int) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute("SELECT created_round FROM proposals WHERE id = ?", (proposal_id,)).fetchone()
+        return row["created_round"] if row else None
+
+    def get_vote(self, proposal_id: int, voter: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT choice, weight, round, tx_id FROM votes WHERE proposal_id = ? AND voter = ?",
+                (proposal_id, voter)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def voted(self, proposal_id: int, addresses: Iterable[str]) -> Dict[str, bool]:
+        """Map each address to whether it has voted on ``proposal_id``.
+
+        Each chunk of addresses is a probe of the ``votes`` primary key for
+        that one proposal.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        found: Set[str] = set()
+        with self._lock:
+            for start in range(0, len(addresses), _LOOKUP_CHUNK):
+                chunk = addresses[start:start + _LOOKUP_CHUNK]
+                rows = self._db.execute(
+                    f"SELECT voter FROM votes WHERE proposal_id = ? AND voter IN ({', '.join('?' * len(chunk))})",
+                    (proposal_id, *chunk)
+                ).fetchall()
+                found.update(row["voter"] for row in rows)
+        return {address: address in found for address in addresses}
+
+    def voter_count(self, proposal_id: int) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT voter_count FROM proposals WHERE id = ?", (proposal_id,)).fetchone()
+        return row["voter_count"] if row else 0
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM proposals").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def _to_model(self, row: sqlite3.Row, now: int) -> GovernanceProposal:
+        if row["status"] == STATUS_PASSED:
+            status = "Passed"
+        elif row["status"] == STATUS_REJECTED:
+            status = "Rejected"
+        elif row["ends_at"] > now:
+            status = "Active"
+        else:
+            status = "Ended"
+
+        remaining = max(row["ends_at"] - now, 0)
+        if remaining >= 86400:
+            time_left = f"{remaining // 86400} days"
+        elif remaining > 0:
+            time_left = f"{remaining // 3600} hours"
+        else:
+            time_left = "Ended"
+
+        return GovernanceProposal(
+            id=row["id"],
+            title=row["title"],
+            description=row["title"],
+            status=status,
+            time_left=time_left,
+            weed_required=self.min_weed_required,
+            votes_yes=row["votes_for"],
+            votes_no=row["votes_against"],
+            votes_abstain=0,
+            total_votes=row["votes_for"] + row["votes_against"],
+            created_at=datetime.utcfromtimestamp(row["created_at"]),
+            ends_at=datetime.utcfromtimestamp(row["ends_at"]),
+            creator=row["creator"]
+        )
@@ -1,21 +1,29 @@
 import asyncio
 import aiohttp
 import json
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 import logging
+import numpy as np
 from ..models.models import TokenPrice, OracleMetadata
 from ..utils.logger import get_logger
+from ..utils.ring_buffer import RingBuffer
 
 logger = get_logger(__name__)
 
+# Column order of each price history sample after its unix timestamp
+PRICE_SYMBOLS = ("ALGO", "HEMP", "WEED", "USDC")
+
 class OracleService:
-    def __init__(self):
+    def __init__(self, history_size: int = 8640):
         self.prices: Dict[str, TokenPrice] = {}
         self.metadata: Optional[OracleMetadata] = None
         self.last_update = datetime.utcnow()
         self.update_interval = 10  # seconds
         self.session: Optional[aiohttp.ClientSession] = None
+        # (unix time, *PRICE_SYMBOLS USD prices) per live update; 24 h at the 10 s update interval
+        self.history = RingBuffer(history_size)
 
         # API endpoints
         self.coingecko_url = "https://api.coingecko.com/api/v3/simple/price"
@@ -55,6 +63,18 @@ class OracleService:
         """Get oracle metadata"""
         return self.metadata
 
+    def price_history(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, prices) of the live updates in force from ``since`` on, oldest first.
+
+        That is every update after ``since`` plus the last one before it.
+        ``prices`` has one column per entry of PRICE_SYMBOLS.
+        """
+        samples = np.array(list(self.history), dtype=np.float64).reshape(-1, 1 + len(PRICE_SYMBOLS))
+        if since is not None:
+            first = max(np.searchsorted(samples[:, 0], since, side="right") - 1, 0)
+            samples = samples[first:]
+        return samples[:, 0], samples[:, 1:]
+
     async def update_prices(self):
         """Update all token prices from various sources"""
         try:
@@ -119,6 +139,7 @@ class OracleService:
             )
 
             self.last_update = now
+            self.history.append((time.time(), algo_price, hemp_price, weed_price, usdc_price))
             logger.debug(f"Updated prices: ALGO=${algo_price:.4f}, HEMP=${hemp_price:.6f}")
 
         except Exception as e:
@@ -0,0 +1,115 @@
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+import numpy as np
+
+from ..models.models import PortfolioValuation, WalletInfo, WalletValuation
+from .oracle_service import PRICE_SYMBOLS, OracleService
+from .wallet_service import WalletService
+
+_HEMP = PRICE_SYMBOLS.index("HEMP")
+
+
+def holdings_matrix(wallets: List[WalletInfo]) -> np.ndarray:
+    """Whole tokens held, one row per wallet and one column per PRICE_SYMBOLS entry"""
+    holdings = np.empty((len(wallets), len(PRICE_SYMBOLS)), dtype=np.float64)
+    for row, wallet in enumerate(wallets):
+        # HEMP has no decimals; WEED has 6; ALGO and USDC are already converted
+        holdings[row] = (wallet.algo_balance, wallet.hemp_balance, wallet.weed_balance / 1_000_000,
+                         wallet.usdc_balance)
+    return holdings
+
+
+def value_series(exposure: np.ndarray, timestamps: np.ndarray, prices: np.ndarray, now: float,
+                 start: float, points: int):
+    """Value every wallet's ``exposure`` over a step-wise price history.
+
+    Each price sample holds until the next one (the last until ``now``);
+    before the first sample its prices stand in. Returns the time-weighted
+    value over ``start``..``now``, the value at ``start``, the values at
+    ``points`` evenly spaced times and those times, for all wallets at once.
+    """
+    values = exposure @ prices.T  # wallets x samples
+    held_from = np.maximum(timestamps, start)
+    held = np.diff(np.append(held_from, now))
+    total_held = held.sum()
+    if total_held > 0:
+        time_weighted = values @ held / total_held
+    else:
+        time_weighted = values[:, -1]
+
+    sample_times = np.linspace(start, now, points)
+    # Latest price at or before each sample time, or the first price before any
+    index = np.clip(np.searchsorted(timestamps, sample_times, side="right") - 1, 0, len(timestamps) - 1)
+    return time_weighted, values[:, index[0]], values[:, index], sample_times
+
+
+class PortfolioService:
+    """USD valuation of wallets from cached balances, staking and oracle prices.
+
+    Balances and staking local state come through the wallet cache, read
+    together at one round, and prices from the oracle's ring of live
+    updates. However many wallets are requested, valuation is a handful of
+    matrix operations: holdings (wallets x tokens) against prices (tokens x
+    samples).
+    """
+
+    def __init__(self, wallet_service: WalletService, oracle_service: OracleService):
+        self.wallet_service = wallet_service
+        self.oracle_service = oracle_service
+
+    async def value(self, addresses: Iterable[str], window: int = 86_400, points: int = 96) -> PortfolioValuation:
+        wallets, unavailable = await self.wallet_service.get_wallets_info(addresses)
+        wallets = list(wallets.values())
+        current = await self.oracle_service.get_token_prices()
+        prices = np.array([current[symbol].price_usd if symbol in current else 0.0 for symbol in PRICE_SYMBOLS])
+
+        now = time.time()
+        start = now - window
+        timestamps, history = self.oracle_service.price_history(since=start)
+        # The current snapshot is the last sample, in force until now
+        timestamps = np.append(timestamps, now)
+        history = np.vstack([history, prices])
+
+        holdings = holdings_matrix(wallets)
+        staked = np.array([wallet.staked_hemp for wallet in wallets], dtype=np.float64)
+        exposure = holdings.copy()
+        exposure[:, _HEMP] += staked
+
+        values = holdings * prices
+        staked_values = staked * prices[_HEMP]
+        totals = values.sum(axis=1) + staked_values
+        time_weighted, opening, series, sample_times = value_series(
+            exposure, timestamps, history, now, start, points
+        )
+        change = totals - opening
+
+        valuations = [
+            WalletValuation(
+                address=wallet.address,
+                balances=dict(zip(PRICE_SYMBOLS, holdings[row].tolist())),
+                values_usd=dict(zip(PRICE_SYMBOLS, values[row].tolist())),
+                staked_hemp=int(staked[row]),
+                staked_value_usd=float(staked_values[row]),
+                total_usd=float(totals[row]),
+                time_weighted_usd=float(time_weighted[row]),
+                change_usd=float(change[row]),
+                change_pct=float(change[row] / opening[row] * 100) if opening[row] else None,
+                series=series[row].tolist(),
+            )
+            for row, wallet in enumerate(wallets)
+        ]
+        total_opening = float(opening.sum())
+        return PortfolioValuation(
+            wallets=valuations,
+            unavailable=unavailable,
+            prices=dict(zip(PRICE_SYMBOLS, prices.tolist())),
+            total_usd=float(totals.sum()),
+            time_weighted_usd=float(time_weighted.sum()),
+            change_usd=float(change.sum()),
+            change_pct=float(change.sum() / total_opening * 100) if total_opening else None,
+            timestamps=[datetime.fromtimestamp(t, tz=timezone.utc) for t in sample_times],
+            total_series=series.sum(axis=0).tolist(),
+            price_samples=len(timestamps),
+        )
@@ -0,0 +1,167 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SECONDS_PER_DAY = 86400
+DEFAULT_BURST_SECONDS = 3600  # bucket holds at most an hour's worth of awards
+
+
+class PrizeBudget:
+    """Paces prize awards against the prize contract's daily cap and pool.
+
+    Everything here is O(1) per spin: day counters that reset when the UTC
+    day (``timestamp // 86400``, as in the contract) rolls over, a running
+    total of awards not yet claimed on-chain, and a token bucket that refills
+    at ``daily_max / 86400`` awards per second up to ``burst_seconds`` of
+    refill. Each admitted spin holds one token because it might win; a spin
+    that loses hands it straight back, so only wins use up the day's
+    allowance and a burst of traffic cannot award faster than the schedule.
+
+    ``daily_max``, ``prize_pool_balance`` and ``claims_today`` come from the
+    contract's global state via ``update_chain_state``. Spins are refused
+    once today's claims plus outstanding awards reach ``daily_max``, or once
+    the pool cannot cover another award of ``max_award`` after outstanding
+    awards are paid.
+    """
+
+    def __init__(self, max_award: int, burst_seconds: int = DEFAULT_BURST_SECONDS):
+        self.max_award = max_award
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+
+        # Chain state
+        self.daily_max = 0  # 0 = no cap, as in the contract
+        self.pool_balance: Optional[int] = None  # unknown until the first refresh
+        self.chain_claims_today = 0
+
+        # Backend counters
+        self.day = self._today()
+        self.awarded_today = 0
+        self.awarded_amount_today = 0
+        self._outstanding: Dict[str, Tuple[int, int]] = {}  # address -> (amount, awarded_at)
+        self.outstanding_amount = 0
+        self._tokens = 0.0
+        self._refilled_at = time.monotonic()
+
+    @staticmethod
+    def _today(now: Optional[float] = None) -> int:
+        return int(now if now is not None else time.time()) // SECONDS_PER_DAY
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self.daily_max * self.burst_seconds / SECONDS_PER_DAY)
+
+    def _roll_day(self):
+        today = self._today()
+        if today == self.day:
+            return
+        self.day = today
+        self.awarded_today = 0
+        self.awarded_amount_today = 0
+        self.chain_claims_today = 0
+        # Awards past their claim window can no longer be claimed
+        cutoff = int(time.time()) - SECONDS_PER_DAY
+        for address, (amount, awarded_at) in list(self._outstanding.items()):
+            if awarded_at < cutoff:
+                del self._outstanding[address]
+                self.outstanding_amount -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.daily_max:
+            rate = self.daily_max / SECONDS_PER_DAY
+            self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+    def update_chain_state(self, global_state: Dict[str, int]):
+        """Apply the prize app's global state (key name -> uint)"""
+        with self._lock:
+            self._roll_day()
+            self.pool_balance = global_state.get("prize_pool_balance", 0)
+            previous_max = self.daily_max
+            self.daily_max = global_state.get("daily_max", 0)
+            if global_state.get("claim_day") == self.day:
+                self.chain_claims_today = global_state.get("claims_today", 0)
+            if self.daily_max != previous_max:
+                self._refill()
+                # A newly set cap starts with a full bucket
+                self._tokens = self.capacity if not previous_max else min(self._tokens, self.capacity)
+
+    def remaining_today(self) -> Optional[int]:
+        """Awards still allowed today; None when there is no daily cap"""
+        if not self.daily_max:
+            return None
+        return max(0, self.daily_max - self.chain_claims_today - len(self._outstanding))
+
+    def remaining_pool(self) -> Optional[int]:
+        if self.pool_balance is None:
+            return None
+        return max(0, self.pool_balance - self.outstanding_amount)
+
+    def admit(self, count: int) -> int:
+        """How many of ``count`` spins may be drawn now; holds one token each"""
+        with self._lock:
+            self._roll_day()
+            self._refill()
+            allowed = count
+            remaining = self.remaining_today()
+            if remaining is not None:
+                allowed = min(allowed, remaining, int(self._tokens))
+            pool = self.remaining_pool()
+            if pool is not None and self.max_award:
+                allowed = min(allowed, pool // self.max_award)
+            allowed = max(0, allowed)
+            if self.daily_max:
+                self._tokens -= allowed
+            return allowed
+
+    def settle(self, admitted: int, awards: Dict[str, int]):
+        """Return the tokens of losing spins and record each winner's award"""
+        with self._lock:
+            if self.daily_max:
+                self._tokens = min(self.capacity, self._tokens + admitted - len(awards))
+            now = int(time.time())
+            for address, amount in awards.items():
+                previous, _ = self._outstanding.get(address, (0, 0))
+                self._outstanding[address] = (amount, now)
+                self.outstanding_amount += amount - previous
+                self.awarded_today += 1
+                self.awarded_amount_today += amount
+
+    def claimed(self, address: str):
+        """An award was claimed on-chain; it now counts in the chain's counters.
+
+        The chain counters are adjusted here as well, so the award is not
+        missing from both sides until the next ``update_chain_state``
+        replaces them with the contract's own values.
+        """
+        with self._lock:
+            entry = self._outstanding.pop(address, None)
+            if entry:
+                self.outstanding_amount -= entry[0]
+                self.chain_claims_today += 1
+                if self.pool_balance is not None:
+                    self.pool_balance = max(0, self.pool_balance - entry[0])
+
+    def state(self) -> Dict[str, Any]:
+        """Live budget snapshot for the API"""
+        with self._lock:
+            self._roll_day()
+            self._refill()
+            return {
+                "day": self.day,
+                "daily_max": self.daily_max,
+                "claims_today": self.chain_claims_today,
+                "awarded_today": self.awarded_today,
+                "awarded_amount_today": self.awarded_amount_today,
+                "outstanding_awards": len(self._outstanding),
+                "outstanding_amount": self.outstanding_amount,
+                "remaining_today": self.remaining_today(),
+                "pool_balance": self.pool_balance,
+                "remaining_pool": self.remaining_pool(),
+                "tokens": round(self._tokens, 3) if self.daily_max else None,
+                "capacity": round(self.capacity, 3) if self.daily_max else None,
+            }
@@ -0,0 +1,237 @@
+import base64
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client import algod, indexer
+from ..utils.logger import get_logger
+from .staking_analytics import StakingAnalytics
+
+logger = get_logger(__name__)
+
+# Mirrors CBDGoldPrize/prize_contract.py
+LAST_CLAIM_KEY = base64.b64encode(b"last_claim").decode()
+CLAIM_COOLDOWN = 86400  # seconds
+DEFAULT_MIN_STAKE = 10_000_000
+_EXIT_ON_COMPLETIONS = {"closeout", "clear"}
+
+
+class PrizeEligibility:
+    """Off-chain mirror of the prize contract's ``claim_prize`` checks.
+
+    ``last_claim`` for every opted-in account is loaded from the prize app's
+    local state and then followed through ``last_claim`` local-state deltas;
+    stakes come from the shared ``StakingAnalytics`` mirror and the contract's
+    switches and minimum stake from its global state. A check is a handful of
+    dict lookups and never calls algod.
+
+    Accounts whose own transaction confirmed in a round the mirrors have not
+    reached yet are marked dirty with that round. Their state is re-read from
+    algod on the next check, and the mark clears once both mirrors have
+    caught up past it, so a wallet that just staked or claimed is never
+    judged on state older than its own transaction.
+    """
+
+    def __init__(self, algod_client: algod.AlgodClient, indexer_client: indexer.IndexerClient,
+                 app_id: int, stakes: StakingAnalytics, page_size: int = 1000,
+                 on_claim: Optional[Callable[[str], None]] = None):
+        self.algod_client = algod_client
+        self.indexer_client = indexer_client
+        self.app_id = app_id
+        self.stakes = stakes
+        self.page_size = page_size
+        self.on_claim = on_claim  # called with the address of each claim applied
+
+        self._lock = threading.Lock()
+        self._last_claim: Dict[str, int] = {}  # opted-in accounts only
+        self._reserved_until: Dict[str, int] = {}  # prizes awarded but not yet claimed
+        self._dirty: Dict[str, int] = {}  # address -> round the mirrors must reach
+        self._overrides: Dict[str, Tuple[Optional[int], int]] = {}  # algod reads for dirty accounts
+        self.claims_enabled = True
+        self.min_stake = DEFAULT_MIN_STAKE
+        self.staking_app_id: Optional[int] = None  # unknown until refresh_globals
+        self.checkpoint: Optional[int] = None
+
+    @property
+    def synced_round(self) -> int:
+        """Round both the prize and staking mirrors have fully applied"""
+        return min(self.checkpoint or 0, self.stakes.checkpoint or 0)
+
+    def _is_dirty(self, address: str) -> bool:
+        dirty_round = self._dirty.get(address)
+        if dirty_round is None:
+            return False
+        if dirty_round <= self.synced_round:
+            with self._lock:
+                self._dirty.pop(address, None)
+                self._overrides.pop(address, None)
+            return False
+        return True
+
+    def needs_refresh(self, address: str) -> bool:
+        """Whether ``check`` would have to read this account from algod first"""
+        return self._is_dirty(address) and address not in self._overrides
+
+    def check(self, address: str, now: Optional[int] = None) -> Tuple[bool, Optional[str]]:
+        """(eligible, reason) for a claim by ``address`` at unix time ``now``"""
+        now = int(time.time()) if now is None else now
+        if not self.claims_enabled:
+            return False, "Prize claims are disabled"
+        if self.staking_app_id == 0:
+            return False, "Prize contract has no staking app configured"
+
+        if self._is_dirty(address):
+            if address not in self._overrides:
+                self.refresh_account(address)
+            last_claim, staked = self._overrides[address]
+        else:
+            last_claim, staked = self._last_claim.get(address), self.stakes.stake_of(address)
+
+        if last_claim is None:
+            return False, "Wallet has not opted in to the prize contract"
+        reserved = self._reserved_until.get(address)
+        if reserved is not None and reserved < now:
+            self._reserved_until.pop(address, None)
+            reserved = None
+        next_claim = max(last_claim + CLAIM_COOLDOWN, reserved or 0)
+        if now <= next_claim:
+            return False, f"Next prize can be claimed after {next_claim}"
+        if staked < self.min_stake:
+            return False, f"Staked HEMP {staked} is below the required {self.min_stake}"
+        return True, None
+
+    def reserve(self, address: str, now: Optional[int] = None):
+        """Hold the address's daily claim for a prize it was just awarded"""
+        now = int(time.time()) if now is None else now
+        self._reserved_until[address] = now + CLAIM_COOLDOWN
+
+    def invalidate(self, addresses: Iterable[str], confirmed_round: int):
+        """Mark accounts whose transaction confirmed in ``confirmed_round``"""
+        with self._lock:
+            for address in addresses:
+                self._dirty[address] = max(confirmed_round, self._dirty.get(address, 0))
+                self._overrides.pop(address, None)
+
+    def refresh_account(self, address: str):
+        """Read one account's prize and staking local state from algod"""
+        last_claim = self._read_local(address, self.app_id, b"last_claim")
+        staking_app_id = self.staking_app_id or self.stakes.app_id
+        staked = self._read_local(address, staking_app_id, b"staked_amount") or 0
+        with self._lock:
+            self._overrides[address] = (last_claim, staked)
+
+    def _read_local(self, address: str, app_id: int, key: bytes) -> Optional[int]:
+        try:
+            info = self.algod_client.account_application_info(address, app_id)
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return None  # not opted in
+            raise
+        for entry in (info.get("app-local-state") or {}).get("key-value") or []:
+            if base64.b64decode(entry["key"]) == key:
+                return entry["value"].get("uint", 0)
+        return 0
+
+    def refresh_globals(self) -> Dict[str, int]:
+        """Reload claims_enabled, min_stake_req and staking_app_id from algod.
+
+        Returns every uint global of the prize app by key name.
+        """
+        info = self.algod_client.application_info(self.app_id)
+        values = {}
+        for entry in info.get("params", {}).get("global-state") or []:
+            if entry["value"].get("type") != 1:  # skip byte slices
+                values[base64.b64decode(entry["key"]).decode(errors="replace")] = entry["value"].get("uint", 0)
+        self.claims_enabled = bool(values.get("claims_enabled", 1))
+        self.min_stake = values.get("min_stake_req", self.min_stake)
+        self.staking_app_id = values.get("staking_app_id", 0)
+        if self.staking_app_id and self.staking_app_id != self.stakes.app_id:
+            logger.warning(f"Prize app {self.app_id} reads stakes from app {self.staking_app_id}, "
+                           f"but the staking mirror follows app {self.stakes.app_id}")
+        return values
+
+    def bootstrap(self) -> int:
+        """Load last_claim for every opted-in account; returns the count"""
+        last_claim: Dict[str, int] = {}
+        next_page = None
+        current_round = None
+        while True:
+            response = self.indexer_client.accounts(
+                application_id=self.app_id, limit=self.page_size, next_page=next_page
+            )
+            if current_round is None:
+                current_round = response.get("current-round", 0)
+            for account in response.get("accounts") or []:
+                for app in account.get("apps-local-state") or []:
+                    if app.get("id") == self.app_id and not app.get("deleted"):
+                        last_claim[account["address"]] = next(
+                            (kv["value"].get("uint", 0) for kv in app.get("key-value") or []
+                             if kv.get("key") == LAST_CLAIM_KEY), 0
+                        )
+            next_page = response.get("next-token")
+            if not next_page or not response.get("accounts"):
+                break
+
+        with self._lock:
+            self._last_claim = last_claim
+        self.checkpoint = current_round
+        logger.info(f"Loaded {len(last_claim)} prize accounts for app {self.app_id} at round {current_round}")
+        return len(last_claim)
+
+    def catch_up(self, max_pages: Optional[int] = None) -> int:
+        """Apply prize app calls after the checkpoint; returns the count"""
+        if self.checkpoint is None:
+            self.bootstrap()
+
+        min_round = self.checkpoint + 1
+        next_page = None
+        applied = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            response = self.indexer_client.search_transactions(
+                application_id=self.app_id, min_round=min_round,
+                limit=self.page_size, next_page=next_page
+            )
+            txns = response.get("transactions") or []
+            next_page = response.get("next-token")
+            pages += 1
+
+            applied += self.apply_transactions(txns)
+            if txns and next_page:
+                # The page may end mid-round; keep the last round open
+                checkpoint = txns[-1]["confirmed-round"] - 1
+            else:
+                checkpoint = response.get("current-round", 0)
+            self.checkpoint = max(self.checkpoint, checkpoint)
+
+            if not txns or not next_page:
+                break
+        return applied
+
+    def apply_transactions(self, txns: Iterable[Dict[str, Any]]) -> int:
+        """Apply indexer transaction records in round order"""
+        applied = 0
+        claimed = []
+        with self._lock:
+            for txn in txns:
+                app_call = txn.get("application-transaction") or {}
+                if app_call.get("application-id") != self.app_id:
+                    continue
+                for account in txn.get("local-state-delta") or []:
+                    for entry in account.get("delta") or []:
+                        if entry.get("key") == LAST_CLAIM_KEY:
+                            value = entry.get("value") or {}
+                            # SetUint deltas omit "uint" when the new value is zero
+                            self._last_claim[account["address"]] = value.get("uint", 0)
+                            self._reserved_until.pop(account["address"], None)
+                            if value.get("uint"):
+                                claimed.append(account["address"])
+                if app_call.get("on-completion") == "optin":
+                    self._last_claim.setdefault(txn["sender"], 0)
+                elif app_call.get("on-completion") in _EXIT_ON_COMPLETIONS:
+                    self._last_claim.pop(txn["sender"], None)
+                applied += 1
+        if self.on_claim:
+            for address in claimed:
+                self.on_claim(address)
+        return applied
@@ -0,0 +1,248 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class PrizeTier:
+    tier: str
+    name: str
+    description: str
+    weight: int  # out of the sum of all weights
+    amount: int = 0  # claim_prize amount; 0 for no prize
+
+
+# 1% legendary / 4% rare / 20% common / 75% no prize
+DEFAULT_PRIZE_TIERS = (
+    PrizeTier("legendary", "Physical CBD Gold Vape", "Premium vape device shipped to your door", 100, 1),
+    PrizeTier("rare", "10,000 HEMP Tokens", "Instant HEMP token reward", 400, 10_000),
+    PrizeTier("common", "1,000 HEMP Tokens", "Small token reward", 2000, 1_000),
+    PrizeTier("none", "Better luck next time!", "No prize this time, try again soon", 7500),
+)
+NO_PRIZE = "none"
+
+DRBG_PERSONALIZATION = b"cbdgold-prize-v2"  # v2: draws taken from fixed-size DRBG blocks
+DEFAULT_ROUND_DURATION = 3600  # seconds
+DEFAULT_ROUND_MAX_SPINS = 1_000_000
+_MAX_REQUEST_BYTES = 1 << 16  # SP 800-90A limit per generate call (2^19 bits)
+DRAWS_PER_BLOCK = _MAX_REQUEST_BYTES // 8  # 64-bit draws per generate call
+
+
+class HmacDrbg:
+    """HMAC-DRBG with SHA-256 (NIST SP 800-90A), without prediction resistance"""
+
+    def __init__(self, entropy: bytes, nonce: bytes = b"", personalization: bytes = b""):
+        self._key = b"\x00" * 32
+        self._value = b"\x01" * 32
+        self._update(entropy + nonce + personalization)
+
+    def _hmac(self, data: bytes) -> bytes:
+        return hmac.new(self._key, data, hashlib.sha256).digest()
+
+    def _update(self, provided: bytes = b""):
+        self._key = self._hmac(self._value + b"\x00" + provided)
+        self._value = self._hmac(self._value)
+        if provided:
+            self._key = self._hmac(self._value + b"\x01" + provided)
+            self._value = self._hmac(self._value)
+
+    def generate(self, size: int) -> bytes:
+        chunks = []
+        while size > 0:
+            request = min(size, _MAX_REQUEST_BYTES)
+            output = bytearray()
+            while len(output) < request:
+                self._value = self._hmac(self._value)
+                output += self._value
+            chunks.append(bytes(output[:request]))
+            self._update()
+            size -= request
+        return b"".join(chunks)
+
+
+class DrawStream:
+    """A round's 64-bit draws, generated in fixed blocks of ``DRAWS_PER_BLOCK``.
+
+    ``HmacDrbg.generate`` updates its state after every call, so its output
+    depends on how requests are sized. Always requesting whole blocks and
+    buffering the rest makes draw ``i`` the same however the round's spins
+    were split into batches.
+    """
+
+    def __init__(self, seed: bytes, round_id: int):
+        self._drbg = HmacDrbg(seed, round_id.to_bytes(8, "big"), DRBG_PERSONALIZATION)
+        self._buffer = np.empty(0, dtype=np.uint64)
+
+    def take(self, count: int) -> np.ndarray:
+        if count > len(self._buffer):
+            blocks = -(-(count - len(self._buffer)) // DRAWS_PER_BLOCK)
+            fresh = [np.frombuffer(self._drbg.generate(_MAX_REQUEST_BYTES), dtype=">u8").astype(np.uint64)
+                     for _ in range(blocks)]
+            self._buffer = np.concatenate([self._buffer, *fresh])
+        draws, self._buffer = self._buffer[:count], self._buffer[count:]
+        return draws
+
+
+class AliasTable:
+    """Vose alias table over integer weights: one uniform draw per sample, O(1).
+
+    Built with exact integer arithmetic, so sampled probabilities equal
+    ``weight / total`` up to the bias of reducing a 64-bit draw (< 2^-50).
+    """
+
+    def __init__(self, weights: Sequence[int]):
+        if not weights or any(w < 0 for w in weights) or sum(weights) <= 0:
+            raise ValueError("weights must be non-negative with a positive sum")
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n for w in weights]  # compare against total instead of 1.0
+        self.size = n
+        self.total = total
+        self.threshold = [total] * n
+        self.alias = list(range(n))
+
+        small = [i for i, s in enumerate(scaled) if s < total]
+        large = [i for i, s in enumerate(scaled) if s >= total]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.threshold[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= total - scaled[less]
+            (small if scaled[more] < total else large).append(more)
+
+        self._threshold = np.array(self.threshold, dtype=np.uint64)
+        self._alias = np.array(self.alias, dtype=np.int64)
+
+    def sample(self, draw: int) -> int:
+        column = draw % self.size
+        return column if (draw // self.size) % self.total < self.threshold[column] else self.alias[column]
+
+    def sample_many(self, draws: np.ndarray) -> np.ndarray:
+        columns = (draws % np.uint64(self.size)).astype(np.int64)
+        coins = (draws // np.uint64(self.size)) % np.uint64(self.total)
+        return np.where(coins < self._threshold[columns], columns, self._alias[columns])
+
+
+def round_seed(secret: bytes, round_id: int) -> bytes:
+    return hmac.new(secret, b"prize-round:" + round_id.to_bytes(8, "big"), hashlib.sha256).digest()
+
+
+def seed_commitment(seed: bytes) -> str:
+    return hashlib.sha256(seed).hexdigest()
+
+
+def replay_round(seed: bytes, round_id: int, spins: int,
+                 tiers: Sequence[PrizeTier] = DEFAULT_PRIZE_TIERS) -> List[str]:
+    """Recompute the tier of every spin in a revealed round, in spin order"""
+    table = AliasTable([t.weight for t in tiers])
+    draws = DrawStream(seed, round_id).take(spins)
+    return [tiers[i].tier for i in table.sample_many(draws).tolist()]
+
+
+@dataclass
+class SpinOutcome:
+    spin_id: str
+    round_id: int
+    index: int
+    tier: PrizeTier
+    commitment: str
+
+    @property
+    def won(self) -> bool:
+        return self.tier.tier != NO_PRIZE
+
+
+class PrizeEngine:
+    """Commit-reveal prize draws, resolved in batches.
+
+    Each round draws from an HMAC-DRBG seeded with ``HMAC(secret, round_id)``.
+    ``sha256(seed)`` is published before the round's first spin and the seed
+    is revealed once the round closes, so anyone can replay the round with
+    ``replay_round`` and check every outcome in spin order. Each spin consumes
+    one 64-bit draw, mapped to a tier through an alias table, so a batch of
+    thousands is at most a DRBG block and a few vectorized array operations.
+    Draws come from the round's ``DrawStream``, so batch sizes do not change
+    which draw a spin gets.
+
+    Rounds rotate after ``round_duration`` seconds or ``round_max_spins``
+    spins. Round ids are the round's start time in milliseconds, so a restart
+    never reuses a round, and any round older than the current one is closed.
+    Without a configured secret a random one is drawn per process, and rounds
+    from before a restart can no longer be revealed.
+    """
+
+    def __init__(self, tiers: Sequence[PrizeTier] = DEFAULT_PRIZE_TIERS, secret: Optional[bytes] = None,
+                 round_duration: int = DEFAULT_ROUND_DURATION,
+                 round_max_spins: int = DEFAULT_ROUND_MAX_SPINS):
+        self.tiers = tuple(tiers)
+        self.table = AliasTable([t.weight for t in self.tiers])
+        self.round_duration = round_duration
+        self.round_max_spins = round_max_spins
+        if secret is None:
+            logger.warning("No prize seed secret configured; rounds are only revealable until restart")
+        self._secret = secret or os.urandom(32)
+        self._lock = threading.Lock()
+        self._closed: Dict[int, int] = {}  # round id -> spins drawn, this process only
+        self._start_round()
+        self._first_round = self.round_id if secret is None else 0
+
+    def _start_round(self):
+        self.round_id = max(int(time.time() * 1000), getattr(self, "round_id", 0) + 1)
+        self._round_started = time.monotonic()
+        seed = round_seed(self._secret, self.round_id)
+        self.commitment = seed_commitment(seed)
+        self._draws = DrawStream(seed, self.round_id)
+        self.spins = 0
+        logger.info(f"Prize round {self.round_id} committed to {self.commitment}")
+
+    def _rotate_if_due(self, upcoming: int):
+        if self.spins and (self.spins + upcoming > self.round_max_spins
+                           or time.monotonic() - self._round_started >= self.round_duration):
+            self._closed[self.round_id] = self.spins
+            self._start_round()
+
+    def spin_batch(self, count: int) -> List[SpinOutcome]:
+        """Resolve ``count`` spins; a batch is never split across rounds"""
+        if count <= 0:
+            return []
+        if count > self.round_max_spins:
+            raise ValueError(f"At most {self.round_max_spins} spins per batch")
+        with self._lock:
+            self._rotate_if_due(count)
+            draws = self._draws.take(count)
+            first = self.spins
+            self.spins += count
+            round_id, commitment = self.round_id, self.commitment
+
+        tiers = self.table.sample_many(draws).tolist()
+        return [
+            SpinOutcome(f"{round_id}-{first + i}", round_id, first + i, self.tiers[tier], commitment)
+            for i, tier in enumerate(tiers)
+        ]
+
+    def spin(self) -> SpinOutcome:
+        return self.spin_batch(1)[0]
+
+    def current_round(self) -> Dict:
+        with self._lock:
+            self._rotate_if_due(0)
+            return {"round_id": self.round_id, "commitment": self.commitment, "spins": self.spins}
+
+    def reveal(self, round_id: int) -> Optional[Tuple[bytes, Optional[int]]]:
+        """(seed, spins) of a closed round, spins None if it predates this process.
+
+        None while the round is still open or its seed is unrecoverable.
+        """
+        with self._lock:
+            self._rotate_if_due(0)
+            if round_id >= self.round_id or round_id < self._first_round:
+                return None
+            return round_seed(self._secret, round_id), self._closed.get(round_id)
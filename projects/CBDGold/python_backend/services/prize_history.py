@@ -0,0 +1,129 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+from ..models.models import PrizeWinner
+from ..utils.logger import get_logger
+from ..utils.ring_buffer import RingBuffer
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "prize_history.sqlite3"
+DEFAULT_RECENT_SIZE = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS winners (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    prize TEXT NOT NULL,
+    label TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    tx_id TEXT
+);
+CREATE INDEX IF NOT EXISTS winners_address ON winners (address, seq);
+"""
+
+_COLUMNS = "seq, id, address, prize, label, tier, time, tx_id"
+
+
+def _to_model(row: sqlite3.Row) -> PrizeWinner:
+    return PrizeWinner(
+        id=row["id"], address=row["address"], prize=row["prize"], label=row["label"],
+        tier=row["tier"], time=row["time"], tx_id=row["tx_id"]
+    )
+
+
+class PrizeHistory:
+    """Every prize win, kept in an append-only SQLite log.
+
+    Rows are only ever inserted, in ``seq`` order, and ``(address, seq)`` is
+    indexed, so one wallet's wins and any history page are index range scans
+    addressed by a ``seq`` cursor rather than an OFFSET. The newest wins are
+    also held in a ring buffer that serves the public feed without touching
+    the database.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, recent_size: int = DEFAULT_RECENT_SIZE):
+        path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+        self.recent = RingBuffer(recent_size)
+        rows = self._db.execute(
+            f"SELECT {_COLUMNS} FROM winners ORDER BY seq DESC LIMIT ?", (recent_size,)
+        ).fetchall()
+        for row in reversed(rows):
+            self.recent.append(_to_model(row))
+
+    def record(self, winner: PrizeWinner) -> int:
+        """Append a win; returns its sequence number"""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO winners (id, address, prize, label, tier, time, tx_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (winner.id, winner.address, winner.prize, winner.label,
+                 winner.tier, winner.time, winner.tx_id)
+            )
+            self.recent.append(winner)
+        return cursor.lastrowid
+
+    def record_many(self, winners: List[PrizeWinner]):
+        """Append a batch of wins in one transaction"""
+        if not winners:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO winners (id, address, prize, label, tier, time, tx_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(w.id, w.address, w.prize, w.label, w.tier, w.time, w.tx_id) for w in winners]
+            )
+            for winner in winners:
+                self.recent.append(winner)
+
+    def latest(self, limit: int = 25) -> List[PrizeWinner]:
+        """Newest wins from the in-memory feed"""
+        return self.recent.latest(limit)
+
+    def history(self, address: Optional[str] = None, limit: int = 50,
+                cursor: Optional[int] = None) -> Tuple[List[PrizeWinner], Optional[int]]:
+        """One page of wins, newest first, optionally for one address.
+
+        Pass the returned cursor back to get the next (older) page; it is
+        None once the history is exhausted.
+        """
+        clauses, params = [], []
+        if address:
+            clauses.append("address = ?")
+            params.append(address)
+        if cursor is not None:
+            clauses.append("seq < ?")
+            params.append(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM winners {where} ORDER BY seq DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        next_cursor = rows[limit - 1]["seq"] if len(rows) > limit else None
+        return [_to_model(row) for row in rows[:limit]], next_cursor
+
+    def count(self, address: Optional[str] = None) -> int:
+        with self._lock:
+            if address:
+                row = self._db.execute("SELECT COUNT(*) FROM winners WHERE address = ?", (address,)).fetchone()
+            else:
+                # Append-only, so the last sequence number is the row count
+                row = self._db.execute("SELECT MAX(seq) FROM winners").fetchone()
+        return row[0] or 0
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,206 @@
+import base64
+import bisect
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from algosdk.v2client import indexer
+from ..models.models import StakingLeaderboard, StakingLeaderboardEntry, StakingPool
+from ..utils.logger import get_logger
+from ..utils.skiplist import IndexableSkipList
+
+logger = get_logger(__name__)
+
+# Mirrors the local state of CBDGoldStaking/staking_contract.py
+STAKED_AMOUNT_KEY = base64.b64encode(b"staked_amount").decode()
+# Leaving the app drops the account's local state without a staked_amount delta
+_EXIT_ON_COMPLETIONS = {"closeout", "clear"}
+
+
+class StakingAnalytics:
+    """Incrementally maintained staking totals and leaderboard.
+
+    The contract keeps every stake in one app; its bronze/silver/gold tiers
+    (``calculate_tier`` thresholds, the ``min_stake`` of each pool template)
+    are what the API reports as pools. Stakes are loaded once from account
+    local state and then kept current from ``staked_amount`` local-state
+    deltas, which carry absolute values, so replaying a round is harmless.
+
+    Every change updates the per-tier counters and a skiplist ordered by
+    stake, so pool totals are O(1), a top-N page is O(log n + N) and an
+    address's rank is O(log n).
+    """
+
+    def __init__(self, indexer_client: indexer.IndexerClient, app_id: int,
+                 pools: List[StakingPool], page_size: int = 1000):
+        self.indexer_client = indexer_client
+        self.app_id = app_id
+        self.page_size = page_size
+        self._pools = sorted(pools, key=lambda p: p.min_stake)
+        self._thresholds = [p.min_stake for p in self._pools]
+
+        self._lock = threading.Lock()
+        self._stakes: Dict[str, int] = {}
+        self._ranking = IndexableSkipList()  # (-amount, address), largest stake first
+        self._tier_stakers = [0] * (len(self._pools) + 1)
+        self._tier_staked = [0] * (len(self._pools) + 1)
+        self.total_staked = 0
+        self.checkpoint: Optional[int] = None
+
+    @property
+    def total_stakers(self) -> int:
+        return len(self._stakes)
+
+    def stake_of(self, address: str) -> int:
+        return self._stakes.get(address, 0)
+
+    def tier_of(self, amount: int) -> int:
+        """0 below the first pool's minimum, otherwise the 1-based pool tier"""
+        return bisect.bisect_right(self._thresholds, amount)
+
+    def apply_stake(self, address: str, amount: int):
+        """Set an address's staked amount, adjusting every aggregate in O(log n)"""
+        with self._lock:
+            self._set_stake(address, amount)
+
+    def _set_stake(self, address: str, amount: int):
+        previous = self._stakes.get(address, 0)
+        if previous == amount:
+            return
+        if previous:
+            self._ranking.remove((-previous, address))
+            tier = self.tier_of(previous)
+            self._tier_stakers[tier] -= 1
+            self._tier_staked[tier] -= previous
+            del self._stakes[address]
+        if amount:
+            self._ranking.insert((-amount, address))
+            tier = self.tier_of(amount)
+            self._tier_stakers[tier] += 1
+            self._tier_staked[tier] += amount
+            self._stakes[address] = amount
+        self.total_staked += amount - previous
+
+    def bootstrap(self) -> int:
+        """Load every opted-in account's stake; returns the number of stakers"""
+        next_page = None
+        current_round = None
+        while True:
+            response = self.indexer_client.accounts(
+                application_id=self.app_id, limit=self.page_size, next_page=next_page
+            )
+            if current_round is None:
+                current_round = response.get("current-round", 0)
+            with self._lock:
+                for account in response.get("accounts") or []:
+                    self._set_stake(account["address"], self._local_stake(account))
+            next_page = response.get("next-token")
+            if not next_page or not response.get("accounts"):
+                break
+
+        # Pages read after current_round may already include later stakes;
+        # replaying from here only rewrites them with the same values
+        self.checkpoint = current_round
+        logger.info(f"Loaded {self.total_stakers} stakers for app {self.app_id} at round {current_round}")
+        return self.total_stakers
+
+    def _local_stake(self, account: Dict[str, Any]) -> int:
+        for app in account.get("apps-local-state") or []:
+            if app.get("id") != self.app_id or app.get("deleted"):
+                continue
+            for entry in app.get("key-value") or []:
+                if entry.get("key") == STAKED_AMOUNT_KEY:
+                    return entry.get("value", {}).get("uint", 0)
+        return 0
+
+    def catch_up(self, max_pages: Optional[int] = None) -> int:
+        """Apply staking transactions after the checkpoint; returns the count"""
+        if self.checkpoint is None:
+            self.bootstrap()
+
+        min_round = self.checkpoint + 1
+        next_page = None
+        applied = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            response = self.indexer_client.search_transactions(
+                application_id=self.app_id, min_round=min_round,
+                limit=self.page_size, next_page=next_page
+            )
+            txns = response.get("transactions") or []
+            next_page = response.get("next-token")
+            pages += 1
+
+            applied += self.apply_transactions(txns)
+            if txns and next_page:
+                # The page may end mid-round; keep the last round open
+                checkpoint = txns[-1]["confirmed-round"] - 1
+            else:
+                checkpoint = response.get("current-round", 0)
+            self.checkpoint = max(self.checkpoint, checkpoint)
+
+            if not txns or not next_page:
+                break
+
+        if applied:
+            logger.debug(f"Applied {applied} staking transactions up to round {self.checkpoint}")
+        return applied
+
+    def apply_transactions(self, txns: Iterable[Dict[str, Any]]) -> int:
+        """Apply indexer transaction records in round order"""
+        applied = 0
+        with self._lock:
+            for txn in txns:
+                app_call = txn.get("application-transaction") or {}
+                if app_call.get("application-id") != self.app_id:
+                    continue
+                for address, amount in self._stake_deltas(txn):
+                    self._set_stake(address, amount)
+                if app_call.get("on-completion") in _EXIT_ON_COMPLETIONS:
+                    self._set_stake(txn["sender"], 0)
+                applied += 1
+        return applied
+
+    @staticmethod
+    def _stake_deltas(txn: Dict[str, Any]) -> List[Tuple[str, int]]:
+        changes = []
+        for account in txn.get("local-state-delta") or []:
+            for entry in account.get("delta") or []:
+                if entry.get("key") != STAKED_AMOUNT_KEY:
+                    continue
+                value = entry.get("value") or {}
+                # SetUint deltas omit "uint" when the new value is zero
+                amount = value.get("uint", 0) if value.get("action") == 2 else 0
+                changes.append((account["address"], amount))
+        return changes
+
+    def pools(self) -> List[StakingPool]:
+        """Pool templates with live staked totals and staker counts"""
+        with self._lock:
+            return [
+                pool.model_copy(update={
+                    "total_staked": self._tier_staked[tier],
+                    "total_stakers": self._tier_stakers[tier],
+                })
+                for tier, pool in enumerate(self._pools, start=1)
+            ]
+
+    def leaderboard(self, limit: int = 25, offset: int = 0,
+                    address: Optional[str] = None) -> StakingLeaderboard:
+        """One page of stakers by stake, plus ``address``'s own position if given"""
+        with self._lock:
+            entries = [
+                self._entry(offset + i + 1, holder, -neg_amount)
+                for i, (neg_amount, holder) in enumerate(self._ranking.slice(offset, limit))
+            ]
+            position = None
+            amount = self._stakes.get(address) if address else None
+            if amount:
+                position = self._entry(self._ranking.rank((-amount, address)) + 1, address, amount)
+            return StakingLeaderboard(
+                total_stakers=self.total_stakers,
+                total_staked=self.total_staked,
+                entries=entries,
+                position=position,
+            )
+
+    def _entry(self, rank: int, address: str, amount: int) -> StakingLeaderboardEntry:
+        return StakingLeaderboardEntry(rank=rank, address=address, staked=amount, tier=self.tier_of(amount))
@@ -0,0 +1,134 @@
+import math
+from typing import Dict, Iterable, Optional
+import numpy as np
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Mirrors the constants in CBDGoldStaking/staking_contract.py
+REWARD_SCALE = 1_000_000_000
+TIER_THRESHOLDS = (10_000_000, 100_000_000, 1_000_000_000)  # Bronze, Silver, Gold
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class StakingSimulator:
+    """Vectorized projection of the staking contract's reward accumulator.
+
+    The contract accrues ``acc_rpt += elapsed * reward_rate * SCALE / total_staked``
+    and pays ``staked * acc_rpt / SCALE - reward_debt``. Every array argument is
+    broadcast against the others, so one call evaluates any number of
+    (amount, duration, reward_rate, total_staked) scenarios.
+    """
+
+    def __init__(self, max_scenarios: int = 100_000):
+        # Upper bound for API requests; direct callers may project any size
+        self.max_scenarios = max_scenarios
+        self.tier_thresholds = np.asarray(TIER_THRESHOLDS, dtype=np.float64)
+
+    def build_grid(self, amounts: Iterable[int], durations: Iterable[int],
+                   reward_rates: Iterable[int], pool_totals: Iterable[int]) -> Dict[str, np.ndarray]:
+        """Cartesian product of scenario axes as flat columns"""
+        axes = [np.asarray(list(values), dtype=np.float64)
+                for values in (amounts, durations, reward_rates, pool_totals)]
+        grid = np.meshgrid(*axes, indexing="ij")
+        return {
+            "amount": grid[0].ravel(),
+            "duration": grid[1].ravel(),
+            "reward_rate": grid[2].ravel(),
+            "pool_total": grid[3].ravel(),
+        }
+
+    def calculate_tiers(self, staked: np.ndarray) -> np.ndarray:
+        """Vectorized equivalent of the contract's calculate_tier subroutine"""
+        return np.searchsorted(self.tier_thresholds, staked, side="right").astype(np.int8)
+
+    def project(self, amount, duration, reward_rate, pool_total,
+                compound_periods: int = 0) -> Dict[str, np.ndarray]:
+        """Project rewards for each scenario row.
+
+        ``pool_total`` is the stake held by everyone else; the projected stake is
+        added on top of it, as it would be after ``on_stake``. With
+        ``compound_periods > 0`` the duration is split into that many equal
+        windows and each window's rewards are re-staked before the next one.
+        """
+        amount, duration, reward_rate, pool_total = np.broadcast_arrays(
+            np.asarray(amount, dtype=np.float64),
+            np.asarray(duration, dtype=np.float64),
+            np.asarray(reward_rate, dtype=np.float64),
+            np.asarray(pool_total, dtype=np.float64),
+        )
+        if np.any(amount < 0) or np.any(duration < 0) or np.any(reward_rate < 0) or np.any(pool_total < 0):
+            raise ValueError("Projection inputs must be non-negative")
+
+        periods = max(1, int(compound_periods))
+        staked = amount.copy()
+        rewards = np.zeros_like(amount)
+        tier_start = self.calculate_tiers(amount)
+        tier_change_at = np.full(amount.shape, -1.0)
+        elapsed_total = np.zeros_like(amount)
+
+        for period in range(periods):
+            # Whole seconds per window, remainder lands in the last one
+            elapsed = np.floor(duration * (period + 1) / periods) - np.floor(duration * period / periods)
+            total = pool_total + staked
+            with np.errstate(divide="ignore", invalid="ignore"):
+                acc = np.where(total > 0, np.floor(elapsed * reward_rate * REWARD_SCALE / total), 0.0)
+            earned = np.floor(staked * acc / REWARD_SCALE)
+            rewards += earned
+            elapsed_total += elapsed
+
+            if compound_periods > 0:
+                staked += earned
+                changed = (tier_change_at < 0) & (self.calculate_tiers(staked) != tier_start)
+                tier_change_at[changed] = elapsed_total[changed]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effective_apy = np.where(
+                (amount > 0) & (duration > 0),
+                rewards / amount * (SECONDS_PER_YEAR / duration) * 100,
+                0.0,
+            )
+
+        return {
+            "amount": amount,
+            "duration": duration,
+            "reward_rate": reward_rate,
+            "pool_total": pool_total,
+            "rewards": rewards,
+            "final_stake": staked,
+            "tier_start": tier_start,
+            "tier_end": self.calculate_tiers(staked),
+            "tier_change_at": tier_change_at,
+            "effective_apy": effective_apy,
+        }
+
+    def project_grid(self, amounts: Iterable[int], durations: Iterable[int],
+                     reward_rates: Iterable[int], pool_totals: Iterable[int],
+                     compound_periods: int = 0,
+                     max_scenarios: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Build a scenario grid and project it in one pass"""
+        axes = [list(values) for values in (amounts, durations, reward_rates, pool_totals)]
+        limit = max_scenarios if max_scenarios is not None else self.max_scenarios
+        # Checked from the axis lengths, before the grid is allocated
+        scenarios = math.prod(len(axis) for axis in axes)
+        if limit and scenarios > limit:
+            raise ValueError(f"Scenario grid has {scenarios} rows, limit is {limit}")
+        grid = self.build_grid(*axes)
+
+        result = self.project(compound_periods=compound_periods, **grid)
+        logger.debug(f"Projected {scenarios} staking scenarios ({compound_periods} compound periods)")
+        return result
+
+    def summarize(self, result: Dict[str, np.ndarray]) -> Dict[str, float]:
+        """Aggregate statistics over a projection"""
+        apy = result["effective_apy"]
+        if apy.size == 0:
+            return {"scenarios": 0}
+        return {
+            "scenarios": int(apy.size),
+            "total_rewards": float(result["rewards"].sum()),
+            "apy_min": float(apy.min()),
+            "apy_mean": float(apy.mean()),
+            "apy_max": float(apy.max()),
+            "tier_upgrades": int(np.count_nonzero(result["tier_end"] > result["tier_start"])),
+        }
@@ -0,0 +1,200 @@
+import base64
+import copy
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from algosdk import constants, encoding, logic, transaction
+from algosdk.v2client import algod
+from ..utils.logger import get_logger
+from ..utils.submission import SuggestedParamsCache
+
+logger = get_logger(__name__)
+
+MIN_TXN_FEE = 1000  # microAlgos
+# Generous upper bound on an encoded staking transaction, used to turn a
+# per-byte fee into a flat one without a dummy-signed size estimate per txn
+ESTIMATED_TXN_BYTES = 300
+# Mirrors the governance contract's snapshot proof budgeting
+PROOF_STEP_SIZE = 33
+PROOF_STEP_BUDGET = 60
+PROOF_BASE_BUDGET = 300
+# batch_harvest settles the accounts in its foreign accounts array
+MAX_HARVEST_ACCOUNTS = 4
+MAX_GROUP_SIZE = 16
+
+
+class TransactionBuilder:
+    """Builds unsigned staking transaction groups for wallet signing.
+
+    The staking contract's ``on_stake`` branch expects the app call at group
+    index 0 followed by the HEMP transfer to the application address.
+    ``unstake`` and ``claim`` pay out through an inner asset transfer, so their
+    app calls carry a doubled flat fee and reference the HEMP asset.
+    ``compound`` restakes pending rewards in place and needs neither.
+
+    All fees are flat: the SDK's per-byte path signs every transaction with a
+    throwaway key just to measure it, which dominates bulk build time.
+    """
+
+    def __init__(self, algod_client: algod.AlgodClient, staking_app_id: int,
+                 hemp_asset_id: int, params_cache: Optional[SuggestedParamsCache] = None,
+                 governance_app_id: Optional[int] = None):
+        self.algod_client = algod_client
+        self.staking_app_id = staking_app_id
+        self.hemp_asset_id = hemp_asset_id
+        self.governance_app_id = governance_app_id
+        self.staking_app_address = logic.get_application_address(staking_app_id)
+        self.params_cache = params_cache or SuggestedParamsCache(algod_client)
+
+    def get_suggested_params(self, refresh: bool = False) -> transaction.SuggestedParams:
+        """Get suggested params from the shared round-aware cache"""
+        return self.params_cache.get(refresh)
+
+    def _flat_fee_params(self, sp: transaction.SuggestedParams, txn_count: int = 1) -> transaction.SuggestedParams:
+        """Copy params with a flat fee covering ``txn_count`` transactions"""
+        if sp.flat_fee and txn_count == 1:
+            return sp
+        per_txn = sp.fee if sp.flat_fee else max(sp.min_fee or MIN_TXN_FEE, sp.fee * ESTIMATED_TXN_BYTES)
+        flat = copy.copy(sp)
+        flat.flat_fee = True
+        flat.fee = max(per_txn, MIN_TXN_FEE) * txn_count
+        return flat
+
+    def build_opt_in(self, sender: str, sp: Optional[transaction.SuggestedParams] = None) -> List[transaction.Transaction]:
+        """Opt the sender into the staking app's local state"""
+        sp = self._flat_fee_params(sp or self.get_suggested_params())
+        return [transaction.ApplicationOptInTxn(sender, sp, self.staking_app_id)]
+
+    def build_stake_group(self, sender: str, amount: int,
+                          sp: Optional[transaction.SuggestedParams] = None,
+                          lease: Optional[bytes] = None) -> List[transaction.Transaction]:
+        """Build the [app call, HEMP transfer] group expected by ``on_stake``"""
+        if amount <= 0:
+            raise ValueError("Stake amount must be positive")
+
+        sp = self._flat_fee_params(sp or self.get_suggested_params())
+        app_call = transaction.ApplicationNoOpTxn(
+            sender, sp, self.staking_app_id,
+            app_args=[b"stake"],
+            foreign_assets=[self.hemp_asset_id],
+            lease=lease
+        )
+        transfer = transaction.AssetTransferTxn(
+            sender, sp, self.staking_app_address, amount, self.hemp_asset_id
+        )
+        return transaction.assign_group_id([app_call, transfer])
+
+    def build_unstake(self, sender: str, amount: int,
+                      sp: Optional[transaction.SuggestedParams] = None,
+                      lease: Optional[bytes] = None) -> List[transaction.Transaction]:
+        """Build the ``unstake`` app call; the fee covers the inner transfer"""
+        if amount <= 0:
+            raise ValueError("Unstake amount must be positive")
+
+        sp = sp or self.get_suggested_params()
+        return [transaction.ApplicationNoOpTxn(
+            sender, self._flat_fee_params(sp, 2), self.staking_app_id,
+            app_args=[b"unstake", amount.to_bytes(8, "big")],
+            foreign_assets=[self.hemp_asset_id],
+            lease=lease
+        )]
+
+    def build_claim(self, sender: str, sp: Optional[transaction.SuggestedParams] = None,
+                    lease: Optional[bytes] = None) -> List[transaction.Transaction]:
+        """Build the ``claim`` app call; the fee covers the inner transfer"""
+        sp = sp or self.get_suggested_params()
+        return [transaction.ApplicationNoOpTxn(
+            sender, self._flat_fee_params(sp, 2), self.staking_app_id,
+            app_args=[b"claim"],
+            foreign_assets=[self.hemp_asset_id],
+            lease=lease
+        )]
+
+    def build_compound(self, sender: str, sp: Optional[transaction.SuggestedParams] = None,
+                       lease: Optional[bytes] = None) -> List[transaction.Transaction]:
+        """Build the ``compound`` app call, restaking pending rewards in one transaction"""
+        sp = self._flat_fee_params(sp or self.get_suggested_params())
+        return [transaction.ApplicationNoOpTxn(
+            sender, sp, self.staking_app_id,
+            app_args=[b"compound"],
+            lease=lease
+        )]
+
+    def build_batch_harvest(self, admin: str, accounts: Sequence[str], compound: bool = False,
+                            sp: Optional[transaction.SuggestedParams] = None) -> List[List[transaction.Transaction]]:
+        """Build admin ``batch_harvest`` groups settling rewards for ``accounts``.
+
+        Each app call covers up to four accounts through its accounts array
+        and each group holds up to 16 calls, so one group settles 64 stakers
+        for 16 fees instead of a claim (and a stake group to compound) each.
+        """
+        sp = self._flat_fee_params(sp or self.get_suggested_params())
+        flag = (1 if compound else 0).to_bytes(8, "big")
+        calls = [
+            transaction.ApplicationNoOpTxn(
+                admin, sp, self.staking_app_id,
+                app_args=[b"batch_harvest", flag],
+                accounts=list(accounts[i:i + MAX_HARVEST_ACCOUNTS])
+            )
+            for i in range(0, len(accounts), MAX_HARVEST_ACCOUNTS)
+        ]
+        groups = [calls[i:i + MAX_GROUP_SIZE] for i in range(0, len(calls), MAX_GROUP_SIZE)]
+        return [transaction.assign_group_id(group) if len(group) > 1 else group for group in groups]
+
+    def build_vote(self, sender: str, proposal_id: int, approve: bool, balance: int, proof: bytes,
+                   sp: Optional[transaction.SuggestedParams] = None,
+                   lease: Optional[bytes] = None) -> List[transaction.Transaction]:
+        """Build the governance ``vote`` call with its snapshot balance proof.
+
+        Proof verification pools opcode budget through inner app calls paid
+        from this transaction's fee, so the fee covers one per 700 units needed.
+        """
+        if self.governance_app_id is None:
+            raise ValueError("Governance app id not configured")
+
+        pid = proposal_id.to_bytes(8, "big")
+        receipt = b"v_" + pid + encoding.decode_address(sender)
+        budget = len(proof) // PROOF_STEP_SIZE * PROOF_STEP_BUDGET + PROOF_BASE_BUDGET
+        sp = self._flat_fee_params(sp or self.get_suggested_params(), 1 + -(-budget // 700))
+        return [transaction.ApplicationNoOpTxn(
+            sender, sp, self.governance_app_id,
+            app_args=[b"vote", pid, (1 if approve else 0).to_bytes(8, "big"), balance.to_bytes(8, "big"), proof],
+            boxes=[(0, b"p_" + pid), (0, receipt)],
+            lease=lease
+        )]
+
+    def build_stake_groups(self, stakes: Iterable[Tuple[str, int]],
+                           encode: bool = True) -> List[Any]:
+        """Build many stake groups against a single suggested-params fetch"""
+        sp = self._flat_fee_params(self.get_suggested_params())
+        groups = [self.build_stake_group(sender, amount, sp) for sender, amount in stakes]
+        logger.debug(f"Built {len(groups)} stake groups")
+        return [self.encode_group(group) for group in groups] if encode else groups
+
+    def build_unstakes(self, unstakes: Iterable[Tuple[str, int]], encode: bool = True) -> List[Any]:
+        """Build many unstake calls against a single suggested-params fetch"""
+        sp = self.get_suggested_params()
+        groups = [self.build_unstake(sender, amount, sp) for sender, amount in unstakes]
+        return [self.encode_group(group) for group in groups] if encode else groups
+
+    def build_claims(self, senders: Iterable[str], encode: bool = True) -> List[Any]:
+        """Build many claim calls against a single suggested-params fetch"""
+        sp = self.get_suggested_params()
+        groups = [self.build_claim(sender, sp) for sender in senders]
+        return [self.encode_group(group) for group in groups] if encode else groups
+
+    @staticmethod
+    def encode_group(txns: List[transaction.Transaction]) -> Dict[str, Any]:
+        """Encode an unsigned group as base64 msgpack for wallet signing"""
+        group_id = txns[0].group
+        encoded = [encoding.msgpack_encode(txn) for txn in txns]
+        # Derive tx ids from the same encoding instead of re-encoding via get_txid()
+        tx_ids = [
+            base64.b32encode(
+                encoding.checksum(constants.txid_prefix + base64.b64decode(raw))
+            ).decode().rstrip("=")
+            for raw in encoded
+        ]
+        return {
+            "group_id": base64.b64encode(group_id).decode() if group_id else None,
+            "tx_ids": tx_ids,
+            "transactions": encoded,
+        }
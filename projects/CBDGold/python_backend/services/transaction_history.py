@@ -0,0 +1,339 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from algosdk.v2client import indexer
+from ..models.models import HistoryTransaction
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "tx_history.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_id TEXT PRIMARY KEY,
+    round INTEGER NOT NULL,
+    intra INTEGER NOT NULL,
+    time INTEGER,
+    type TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    receiver TEXT,
+    amount INTEGER,
+    asset_id INTEGER,
+    app_id INTEGER,
+    fee INTEGER,
+    group_id TEXT,
+    note TEXT,
+    inner_txns INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transactions_round ON transactions (round, intra, tx_id);
+CREATE TABLE IF NOT EXISTS tx_addresses (
+    address TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    intra INTEGER NOT NULL,
+    tx_id TEXT NOT NULL,
+    PRIMARY KEY (address, round, intra, tx_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tx_assets (
+    asset_id INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    intra INTEGER NOT NULL,
+    tx_id TEXT NOT NULL,
+    PRIMARY KEY (asset_id, round, intra, tx_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tx_apps (
+    app_id INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    intra INTEGER NOT NULL,
+    tx_id TEXT NOT NULL,
+    PRIMARY KEY (app_id, round, intra, tx_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    round INTEGER NOT NULL
+);
+"""
+
+# Matches counted per filter when choosing which index drives a multi-filter page
+SELECTIVITY_PROBE = 10_000
+
+_COLUMNS = "tx_id, round, intra, time, type, sender, receiver, amount, asset_id, app_id, fee, group_id, note, inner_txns"
+
+
+def _collect(txn: Dict[str, Any], addresses: Set[str], assets: Set[int], apps: Set[int]):
+    addresses.add(txn.get("sender") or "")
+    pay = txn.get("payment-transaction") or {}
+    axfer = txn.get("asset-transfer-transaction") or {}
+    appl = txn.get("application-transaction") or {}
+    acfg = txn.get("asset-config-transaction") or {}
+    afrz = txn.get("asset-freeze-transaction") or {}
+    addresses.update((pay.get("receiver"), pay.get("close-remainder-to"), axfer.get("receiver"),
+                      axfer.get("close-to"), axfer.get("sender"), afrz.get("address")))
+    assets.update((axfer.get("asset-id"), acfg.get("asset-id") or txn.get("created-asset-index"),
+                   afrz.get("asset-id")))
+    apps.add(appl.get("application-id") or txn.get("created-application-index"))
+    for inner in txn.get("inner-txns") or []:
+        _collect(inner, addresses, assets, apps)
+
+
+def transaction_references(txn: Dict[str, Any]) -> Tuple[Set[str], Set[int], Set[int]]:
+    """Every address, asset and app a transaction and its inner transactions touch.
+
+    Accepts indexer records and flattened rows (as exported by the history).
+    """
+    addresses: Set[str] = set()
+    assets: Set[int] = set()
+    apps: Set[int] = set()
+    _collect(txn, addresses, assets, apps)
+    addresses.update((txn.get("receiver"), txn.get("address")))
+    assets.add(txn.get("asset_id"))
+    apps.add(txn.get("app_id"))
+    addresses.discard(None)
+    addresses.discard("")
+    assets.discard(None)
+    assets.discard(0)
+    apps.discard(None)
+    apps.discard(0)
+    return addresses, assets, apps
+
+
+def flatten_transaction(txn: Dict[str, Any]) -> Dict[str, Any]:
+    """One ``transactions`` row from an indexer record or an already flattened row"""
+    pay = txn.get("payment-transaction") or {}
+    axfer = txn.get("asset-transfer-transaction") or {}
+    appl = txn.get("application-transaction") or {}
+    acfg = txn.get("asset-config-transaction") or {}
+    return {
+        "tx_id": txn.get("id") or txn.get("tx_id"),
+        "round": txn.get("confirmed-round") or txn.get("round") or 0,
+        "intra": txn.get("intra-round-offset") or txn.get("intra") or 0,
+        "time": txn.get("round-time") or txn.get("time"),
+        "type": txn.get("tx-type") or txn.get("type") or "unknown",
+        "sender": txn.get("sender") or txn.get("address") or "",
+        "receiver": pay.get("receiver") or axfer.get("receiver") or txn.get("receiver"),
+        "amount": pay.get("amount") if pay else axfer.get("amount") if axfer else txn.get("amount"),
+        "asset_id": axfer.get("asset-id") or acfg.get("asset-id") or txn.get("created-asset-index")
+                    or txn.get("asset_id"),
+        "app_id": appl.get("application-id") or txn.get("created-application-index") or txn.get("app_id"),
+        "fee": txn.get("fee"),
+        "group_id": txn.get("group") or txn.get("group_id"),
+        "note": txn.get("note"),
+        "inner_txns": len(txn["inner-txns"]) if txn.get("inner-txns") else txn.get("inner_txns") or 0,
+    }
+
+
+def _to_model(row: sqlite3.Row) -> HistoryTransaction:
+    return HistoryTransaction(**{key: row[key] for key in row.keys()})
+
+
+def encode_cursor(row: sqlite3.Row) -> str:
+    return f"{row['round']}:{row['intra']}:{row['tx_id']}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int, str]:
+    """Split a ``round:intra:tx_id`` cursor; raises ValueError if malformed"""
+    round_num, intra, tx_id = cursor.split(":", 2)
+    return int(round_num), int(intra), tx_id
+
+
+class TransactionHistory:
+    """Append-only local history of the platform's on-chain transactions.
+
+    Each transaction is stored once, keyed by tx id and ordered by
+    ``(round, intra-round offset, tx id)``. Side tables index that key by
+    every address, asset and app a transaction or its inner transactions
+    touch. A page for one wallet, asset or app is an index range scan that
+    continues from a keyset cursor rather than an OFFSET.
+
+    ``catch_up`` reads each configured asset and app from the indexer from
+    its own checkpoint, like the governance indexer. Transactions found
+    through several sources are stored once.
+    """
+
+    def __init__(self, indexer_client: Optional[indexer.IndexerClient] = None,
+                 asset_ids: Sequence[int] = (), app_ids: Sequence[int] = (),
+                 db_path: Optional[str] = None, page_size: int = 1000):
+        self.indexer_client = indexer_client
+        self.sources = [("asset_id", asset_id) for asset_id in asset_ids] + \
+                       [("application_id", app_id) for app_id in app_ids]
+        self.page_size = page_size
+
+        path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------ ingest
+    def record_many(self, txns: Iterable[Dict[str, Any]]) -> int:
+        """Store indexer transaction records; returns how many were new"""
+        with self._lock, self._db:
+            return self._insert(txns)
+
+    def _insert(self, txns: Iterable[Dict[str, Any]]) -> int:
+        """Insert without committing (caller holds the lock and transaction)"""
+        rows, addresses, assets, apps = [], [], [], []
+        for txn in txns:
+            row = flatten_transaction(txn)
+            if not row["tx_id"]:
+                continue
+            rows.append(tuple(row.values()))
+            key = row["round"], row["intra"], row["tx_id"]
+            txn_addresses, txn_assets, txn_apps = transaction_references(txn)
+            addresses.extend((address, *key) for address in txn_addresses)
+            assets.extend((asset_id, *key) for asset_id in txn_assets)
+            apps.extend((app_id, *key) for app_id in txn_apps)
+        if not rows:
+            return 0
+        before = self._db.total_changes
+        self._db.executemany(
+            f"INSERT OR IGNORE INTO transactions ({_COLUMNS}) VALUES ({', '.join('?' * 14)})", rows
+        )
+        inserted = self._db.total_changes - before
+        self._db.executemany("INSERT OR IGNORE INTO tx_addresses VALUES (?, ?, ?, ?)", addresses)
+        self._db.executemany("INSERT OR IGNORE INTO tx_assets VALUES (?, ?, ?, ?)", assets)
+        self._db.executemany("INSERT OR IGNORE INTO tx_apps VALUES (?, ?, ?, ?)", apps)
+        return inserted
+
+    def checkpoint(self, source: str) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT round FROM checkpoints WHERE name = ?", (source,)).fetchone()
+        return row["round"] if row else 0
+
+    def catch_up(self, max_pages: Optional[int] = None) -> int:
+        """Store every transaction after each source's checkpoint; returns the count of new ones"""
+        return sum(self._catch_up_source(field, value, max_pages) for field, value in self.sources)
+
+    def _catch_up_source(self, field: str, value: int, max_pages: Optional[int]) -> int:
+        name = f"tx_history:{field}:{value}"
+        min_round = self.checkpoint(name) + 1
+        next_page = None
+        stored = 0
+        pages = 0
+
+        while max_pages is None or pages < max_pages:
+            response = self.indexer_client.search_transactions(
+                min_round=min_round, limit=self.page_size, next_page=next_page, **{field: value}
+            )
+            txns = response.get("transactions") or []
+            next_page = response.get("next-token")
+            pages += 1
+
+            if txns and next_page:
+                # The page may end mid-round; keep the last round open
+                checkpoint = txns[-1]["confirmed-round"] - 1
+            else:
+                checkpoint = response.get("current-round", 0)
+
+            with self._lock, self._db:
+                stored += self._insert(txns)
+                if checkpoint >= min_round:
+                    self._db.execute(
+                        "INSERT INTO checkpoints (name, round) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET round = excluded.round",
+                        (name, checkpoint)
+                    )
+
+            if not txns or not next_page:
+                break
+
+        if stored:
+            logger.info(f"Stored {stored} new transactions for {field} {value}")
+        return stored
+
+    def import_records(self, records: Iterable[Dict[str, Any]], batch_size: int = 10_000) -> int:
+        """Store a stream of records in batches, one SQLite transaction each; returns how many were new"""
+        imported = 0
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                imported += self.record_many(batch)
+                batch = []
+        return imported + self.record_many(batch)
+
+    # ------------------------------------------------------------ queries
+    def history(self, address: Optional[str] = None, asset_id: Optional[int] = None,
+                app_id: Optional[int] = None, min_round: Optional[int] = None,
+                max_round: Optional[int] = None, limit: int = 50,
+                cursor: Optional[str] = None) -> Tuple[List[HistoryTransaction], Optional[str]]:
+        """One page of transactions, newest first.
+
+        Pass the returned cursor back to get the next (older) page; it is
+        None once the history is exhausted.
+
+        With several filters, the one with the fewest matching rows (counted
+        up to ``SELECTIVITY_PROBE``) drives the index range scan and the others
+        are probed by full key, so a wallet's few transfers of a busy asset
+        are not found by walking the asset's whole history.
+        """
+        filters = [(table, column, value) for table, column, value in (
+            ("tx_addresses", "address", address), ("tx_assets", "asset_id", asset_id), ("tx_apps", "app_id", app_id)
+        ) if value is not None]
+        if len(filters) > 1:
+            with self._lock:
+                matches = {table: self._db.execute(
+                    f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {column} = ? LIMIT ?)",
+                    (value, SELECTIVITY_PROBE)
+                ).fetchone()[0] for table, column, value in filters}
+            filters.sort(key=lambda f: matches[f[0]])
+        if filters:
+            table, column, value = filters[0]
+            source, alias = f"{table} k JOIN transactions t ON t.tx_id = k.tx_id", "t"
+            clauses, params = [f"k.{column} = ?"], [value]
+        else:
+            source, alias = "transactions k", "k"
+            clauses, params = [], []
+        for table, column, value in filters[1:]:
+            clauses.append(f"EXISTS (SELECT 1 FROM {table} f WHERE f.{column} = ? AND f.round = k.round "
+                           f"AND f.intra = k.intra AND f.tx_id = k.tx_id)")
+            params.append(value)
+        if min_round is not None:
+            clauses.append("k.round >= ?")
+            params.append(min_round)
+        if max_round is not None:
+            clauses.append("k.round <= ?")
+            params.append(max_round)
+        if cursor is not None:
+            clauses.append("(k.round, k.intra, k.tx_id) < (?, ?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        columns = ", ".join(f"{alias}.{column}" for column in _COLUMNS.split(", "))
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {columns} FROM {source} {where} "
+                f"ORDER BY k.round DESC, k.intra DESC, k.tx_id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [_to_model(row) for row in rows[:limit]], next_cursor
+
+    def iter_history(self, address: Optional[str] = None, asset_id: Optional[int] = None,
+                     app_id: Optional[int] = None, min_round: Optional[int] = None,
+                     max_round: Optional[int] = None, page_size: int = 5_000) -> Iterator[Dict[str, Any]]:
+        """Every matching row, newest first, read one keyset page at a time"""
+        cursor = None
+        while True:
+            page, cursor = self.history(address, asset_id, app_id, min_round, max_round, page_size, cursor)
+            for txn in page:
+                yield txn.model_dump()
+            if cursor is None:
+                return
+
+    def get(self, tx_id: str) -> Optional[HistoryTransaction]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM transactions WHERE tx_id = ?", (tx_id,)).fetchone()
+        return _to_model(row) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,153 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+from algosdk import encoding
+from ..models.models import TrackedTransaction, TransactionStatus
+from ..utils.logger import get_logger
+from ..utils.submission import ConfirmationWatcher, TransactionSubmissionError
+
+logger = get_logger(__name__)
+
+# Transaction fields that name an account whose balances the txn can change
+_ADDRESS_FIELDS = ("sender", "receiver", "close_remainder_to", "close_assets_to", "revocation_target")
+
+
+def addresses_of(encoded_txns: Iterable[str]) -> List[str]:
+    """Accounts touched by a group of base64 msgpack signed transactions"""
+    addresses: List[str] = []
+    for encoded in encoded_txns:
+        txn = encoding.msgpack_decode(encoded).transaction
+        candidates = [getattr(txn, field, None) for field in _ADDRESS_FIELDS]
+        candidates.extend(getattr(txn, "accounts", None) or [])
+        for address in candidates:
+            if address and address not in addresses:
+                addresses.append(address)
+    return addresses
+
+
+class TransactionTracker:
+    """Follows submitted transactions through the shared confirmation watcher.
+
+    Status records live in a bounded LRU map for ``GET /api/transactions/{tx_id}``.
+    Every status change is fanned out to registered listeners (e.g. wallet cache
+    invalidation) and to streaming subscribers.
+    """
+
+    def __init__(self, watcher: ConfirmationWatcher, max_records: int = 50_000,
+                 subscriber_queue_size: int = 1000):
+        self.watcher = watcher
+        self.max_records = max_records
+        self.subscriber_queue_size = subscriber_queue_size
+        self._records: "OrderedDict[str, TrackedTransaction]" = OrderedDict()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listeners: List[Callable[[TrackedTransaction], None]] = []
+        self._followers: Dict[str, asyncio.Task] = {}
+
+    def add_listener(self, listener: Callable[[TrackedTransaction], None]):
+        """Register a callback invoked on every confirmation or failure"""
+        self._listeners.append(listener)
+
+    def track(self, tx_id: str, addresses: Optional[List[str]] = None,
+              wait_rounds: int = 10) -> TrackedTransaction:
+        """Start following ``tx_id``; returns its (pending) status record"""
+        record = self._records.get(tx_id)
+        if record is not None:
+            return record
+
+        now = datetime.utcnow()
+        record = TrackedTransaction(
+            tx_id=tx_id,
+            status=TransactionStatus.PENDING,
+            addresses=addresses or [],
+            submitted_at=now,
+            updated_at=now
+        )
+        self._records[tx_id] = record
+        while len(self._records) > self.max_records:
+            self._records.popitem(last=False)
+
+        task = asyncio.create_task(self._follow(record, wait_rounds))
+        self._followers[tx_id] = task
+        task.add_done_callback(lambda _: self._followers.pop(tx_id, None))
+        return record
+
+    def get(self, tx_id: str) -> Optional[TrackedTransaction]:
+        return self._records.get(tx_id)
+
+    async def wait(self, tx_id: str) -> TrackedTransaction:
+        """Wait for a tracked transaction to leave the pending state"""
+        record = self._records[tx_id]
+        follower = self._followers.get(tx_id)
+        if follower is not None:
+            await asyncio.shield(follower)
+        return record
+
+    async def subscribe(self, tx_ids: Optional[Set[str]] = None,
+                        address: Optional[str] = None) -> AsyncIterator[TrackedTransaction]:
+        """Yield status updates, optionally filtered by tx id or involved address.
+
+        When ``tx_ids`` is given, known records are replayed first and the stream
+        ends once all of them are final. Ids this tracker does not know get one
+        ``unknown`` record and are not waited for. Each status of a transaction
+        is yielded once, even if it changed while the replay was being read.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        self._subscribers.add(queue)
+        sent: Dict[str, TransactionStatus] = {}
+        try:
+            remaining = set(tx_ids or ())
+            for tx_id in sorted(remaining):
+                record = self._records.get(tx_id)
+                if record is None:
+                    now = datetime.utcnow()
+                    record = TrackedTransaction(tx_id=tx_id, status=TransactionStatus.UNKNOWN,
+                                                submitted_at=now, updated_at=now)
+                # Records change in place, so act on the status that was sent
+                status = sent[tx_id] = record.status
+                yield record
+                if status != TransactionStatus.PENDING:
+                    remaining.discard(tx_id)
+            if tx_ids and not remaining:
+                return
+
+            while True:
+                record = await queue.get()
+                if tx_ids and record.tx_id not in tx_ids:
+                    continue
+                if address and address not in record.addresses:
+                    continue
+                if sent.get(record.tx_id) == record.status:
+                    continue  # already sent by the replay
+                status = sent[record.tx_id] = record.status
+                yield record
+                if status != TransactionStatus.PENDING:
+                    remaining.discard(record.tx_id)
+                if tx_ids and not remaining:
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+    async def _follow(self, record: TrackedTransaction, wait_rounds: int):
+        try:
+            info = await self.watcher.wait(record.tx_id, wait_rounds)
+            record.status = TransactionStatus.CONFIRMED
+            record.confirmed_round = info.get("confirmed-round")
+        except TransactionSubmissionError as e:
+            record.status = TransactionStatus.FAILED
+            record.error = e.reason
+        record.updated_at = datetime.utcnow()
+        self._publish(record)
+
+    def _publish(self, record: TrackedTransaction):
+        for listener in self._listeners:
+            try:
+                listener(record)
+            except Exception as e:
+                logger.error(f"Transaction listener failed for {record.tx_id}: {e}")
+
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(record)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropping update for {record.tx_id}: subscriber queue full")
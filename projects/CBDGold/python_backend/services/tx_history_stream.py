@@ -0,0 +1,255 @@
+import io
+import json
+import re
+import struct
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .transaction_history import flatten_transaction, transaction_references
+
+# Record formats: a {"txs": [...]} document, one JSON record per line, or column blocks
+JSON, NDJSON, COLUMNAR = "json", "ndjson", "columnar"
+COLUMNAR_MAGIC = b"CBDTXC1\n"
+DEFAULT_BLOCK_SIZE = 65_536
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_BLOCK_HEADER = struct.Struct("<Q")
+# Integer columns of the columnar format; missing values are stored as 0 alongside a presence mask
+_INT_COLUMNS = {"round": np.uint64, "intra": np.uint32, "time": np.int64, "amount": np.uint64,
+                "asset_id": np.uint64, "app_id": np.uint64, "fee": np.uint64, "inner_txns": np.uint32}
+_TEXT_COLUMNS = ("tx_id", "group_id", "note")
+_DICTIONARY_COLUMNS = ("type", "sender", "receiver")
+
+
+def detect_format(path: Union[str, Path]) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix in (".ndjson", ".jsonl"):
+        return NDJSON
+    if suffix in (".txc", ".columnar"):
+        return COLUMNAR
+    return JSON
+
+
+def iter_json_document(fp: IO[str], key: str = "txs", chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """Yield the elements of ``document[key]`` (or of a top-level array) one at a time.
+
+    Only the current chunk and the record being decoded are held in memory,
+    whatever the size of the document. Other top-level keys are skipped.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            fill()
+
+    def expect(char: str):
+        nonlocal pos
+        if peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON document, found {buf[pos:pos + 20]!r}")
+        pos += 1
+
+    def value() -> Any:
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if end == len(buf) and not eof:
+                # A number at the end of the chunk may continue in the next one
+                fill()
+                continue
+            pos = end
+            return obj
+
+    fill()
+    if peek() == "{":
+        pos += 1
+        while True:
+            if peek() == "}":
+                return
+            name = value()
+            expect(":")
+            if name == key:
+                break
+            value()
+            if peek() == ",":
+                pos += 1
+    expect("[")
+    if peek() == "]":
+        return
+    while True:
+        yield value()
+        separator = peek()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' between records, found {separator!r}")
+
+
+def iter_ndjson(fp: IO[str]) -> Iterator[Dict[str, Any]]:
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_columnar(fp: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yield flattened rows from a columnar export, one block in memory at a time"""
+    if fp.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar transaction history file")
+    while True:
+        header = fp.read(_BLOCK_HEADER.size)
+        if not header:
+            return
+        (size,) = _BLOCK_HEADER.unpack(header)
+        with np.load(io.BytesIO(fp.read(size)), allow_pickle=False) as block:
+            columns: Dict[str, List[Any]] = {}
+            for name in _INT_COLUMNS:
+                values = block[name].tolist()
+                present = block[f"{name}_present"].tolist()
+                columns[name] = [v if p else None for v, p in zip(values, present)]
+            for name in _TEXT_COLUMNS:
+                columns[name] = [v.decode() or None for v in block[name].tolist()]
+            for name in _DICTIONARY_COLUMNS:
+                words = [w.decode() or None for w in block[f"{name}_values"].tolist()]
+                columns[name] = [words[i] for i in block[name].tolist()]
+        names = list(columns)
+        for row in zip(*columns.values()):
+            yield dict(zip(names, row))
+
+
+def read_records(path: Union[str, Path], fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream records from a history file in any supported format"""
+    fmt = fmt or detect_format(path)
+    if fmt == COLUMNAR:
+        with open(path, "rb") as f:
+            yield from iter_columnar(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from iter_json_document(f) if fmt == JSON else iter_ndjson(f)
+
+
+def filter_records(records: Iterable[Dict[str, Any]], address: Optional[str] = None,
+                   asset_id: Optional[int] = None, app_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Keep records touching ``address``, ``asset_id`` and ``app_id``, inner transactions included"""
+    if address is None and asset_id is None and app_id is None:
+        yield from records
+        return
+    for record in records:
+        addresses, assets, apps = transaction_references(record)
+        if (address is None or address in addresses) and (asset_id is None or asset_id in assets) \
+                and (app_id is None or app_id in apps):
+            yield record
+
+
+class NdjsonWriter:
+    def __init__(self, fp: IO[str]):
+        self.fp = fp
+        self.count = 0
+
+    def write(self, record: Dict[str, Any]):
+        self.fp.write(json.dumps(record, separators=(",", ":")))
+        self.fp.write("\n")
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class JsonDocumentWriter:
+    """Writes the ``{"txs": [...]}`` document incrementally"""
+
+    def __init__(self, fp: IO[str], key: str = "txs"):
+        self.fp = fp
+        self.count = 0
+        fp.write(f"{{{json.dumps(key)}: [")
+
+    def write(self, record: Dict[str, Any]):
+        self.fp.write(",\n" if self.count else "\n")
+        self.fp.write(json.dumps(record, separators=(",", ":")))
+        self.count += 1
+
+    def close(self):
+        self.fp.write("\n]}\n")
+
+
+class ColumnarWriter:
+    """Flattened rows in compressed column blocks of ``block_size`` rows.
+
+    Integer fields are fixed-width arrays with a presence mask. Transaction
+    type, sender and receiver are dictionary-encoded per block, since a few
+    accounts account for most rows. Each block is a compressed ``.npz``
+    archive behind a length prefix, so readers stream it block by block.
+    """
+
+    def __init__(self, fp: IO[bytes], block_size: int = DEFAULT_BLOCK_SIZE):
+        self.fp = fp
+        self.block_size = block_size
+        self.count = 0
+        self._rows: List[Dict[str, Any]] = []
+        fp.write(COLUMNAR_MAGIC)
+
+    def write(self, record: Dict[str, Any]):
+        self._rows.append(flatten_transaction(record))
+        self.count += 1
+        if len(self._rows) >= self.block_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        arrays: Dict[str, np.ndarray] = {}
+        for name, dtype in _INT_COLUMNS.items():
+            values = [row[name] for row in rows]
+            arrays[f"{name}_present"] = np.array([v is not None for v in values], dtype=bool)
+            arrays[name] = np.array([v or 0 for v in values], dtype=dtype)
+        for name in _TEXT_COLUMNS:
+            arrays[name] = np.array([(row[name] or "").encode() for row in rows], dtype=bytes)
+        for name in _DICTIONARY_COLUMNS:
+            words, codes = np.unique(np.array([(row[name] or "").encode() for row in rows], dtype=bytes),
+                                     return_inverse=True)
+            arrays[f"{name}_values"] = words
+            arrays[name] = codes.astype(np.uint32)
+        block = io.BytesIO()
+        np.savez_compressed(block, **arrays)
+        self.fp.write(_BLOCK_HEADER.pack(block.tell()))
+        self.fp.write(block.getbuffer())
+
+    def close(self):
+        self._flush()
+
+
+def write_records(records: Iterable[Dict[str, Any]], path: Union[str, Path], fmt: Optional[str] = None,
+                  block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """Stream records into a history file; returns how many were written"""
+    fmt = fmt or detect_format(path)
+    with open(path, "wb") if fmt == COLUMNAR else open(path, "w", encoding="utf-8") as f:
+        if fmt == COLUMNAR:
+            writer = ColumnarWriter(f, block_size)
+        elif fmt == NDJSON:
+            writer = NdjsonWriter(f)
+        else:
+            writer = JsonDocumentWriter(f)
+        for record in records:
+            writer.write(record)
+        writer.close()
+    return writer.count
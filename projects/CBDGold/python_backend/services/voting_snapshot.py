@@ -0,0 +1,305 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from algosdk import encoding
+from algosdk.v2client import indexer
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Merkle commitment shared with the governance contract's vote verification:
+#   leaf = sha256(0x00 || public key || Itob(balance))
+#   node = sha256(0x01 || left || right), a trailing odd node is promoted as is
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+PROOF_STEP_SIZE = 33  # 1 byte "sibling is on the left" flag + 32 byte sibling
+
+# File layout: header | count fixed-width leaves sorted by public key | chunk roots
+SNAPSHOT_MAGIC = b"CBDSNAP1"
+HEADER = struct.Struct(">8sQQQI32s")  # magic, asset id, round, leaf count, chunk size, root
+LEAF = struct.Struct(">32sQ")  # public key, balance
+DEFAULT_CHUNK_SIZE = 1024  # must be a power of two
+DEFAULT_SNAPSHOT_DIR = Path(__file__).parent.parent / "data" / "snapshots"
+
+ProofStep = Tuple[bool, bytes]
+
+
+def snapshot_path(app_id: int, proposal_id: int, directory: Optional[Path] = None) -> Path:
+    """Where the snapshot job writes, and the backend looks for, a proposal's snapshot"""
+    return Path(directory or DEFAULT_SNAPSHOT_DIR) / f"governance_{app_id}_{proposal_id}.snap"
+
+
+def leaf_hash(public_key: bytes, balance: int) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + public_key + balance.to_bytes(8, "big")).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def merkle_path(hashes: List[bytes], index: int) -> Tuple[bytes, List[ProofStep]]:
+    """Root of ``hashes`` and the proof steps for the node at ``index``"""
+    if not hashes:
+        return hashlib.sha256(b"").digest(), []
+    steps: List[ProofStep] = []
+    level = hashes
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            steps.append((sibling < index, level[sibling]))
+        level = [node_hash(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+        index //= 2
+    return level[0], steps
+
+
+def merkle_root(hashes: List[bytes]) -> bytes:
+    return merkle_path(hashes, 0)[0]
+
+
+def encode_proof(steps: List[ProofStep]) -> bytes:
+    """Pack proof steps into the byte string the contract's vote call expects"""
+    return b"".join((b"\x01" if left else b"\x00") + sibling for left, sibling in steps)
+
+
+def decode_proof(proof: bytes) -> List[ProofStep]:
+    if len(proof) % PROOF_STEP_SIZE:
+        raise ValueError("Proof length is not a multiple of 33 bytes")
+    return [(proof[i] == 1, proof[i + 1:i + PROOF_STEP_SIZE]) for i in range(0, len(proof), PROOF_STEP_SIZE)]
+
+
+def verify_proof(root: bytes, address: str, balance: int, proof: bytes) -> bool:
+    """Check that ``address`` held ``balance`` in the snapshot committed to by ``root``"""
+    node = leaf_hash(encoding.decode_address(address), balance)
+    for left, sibling in decode_proof(proof):
+        node = node_hash(sibling, node) if left else node_hash(node, sibling)
+    return node == root
+
+
+class SnapshotWriter:
+    """Streams sorted (public key, balance) leaves into a snapshot file.
+
+    Only the current chunk's leaf hashes and one root per finished chunk are
+    held in memory; every chunk is an aligned power-of-two subtree, so the
+    root over chunk roots equals the root over all leaves.
+    """
+
+    def __init__(self, path: str, asset_id: int, round_num: int,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size & (chunk_size - 1):
+            raise ValueError("chunk_size must be a power of two")
+        self.path = Path(path)
+        self.asset_id = asset_id
+        self.round_num = round_num
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.total_balance = 0
+        self._chunk: List[bytes] = []
+        self._chunk_roots: List[bytes] = []
+        self._last_key = b""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(b"\0" * HEADER.size)
+
+    def add(self, public_key: bytes, balance: int):
+        if public_key <= self._last_key:
+            raise ValueError("Snapshot leaves must be added in strictly increasing key order")
+        self._last_key = public_key
+        self._file.write(LEAF.pack(public_key, balance))
+        self._chunk.append(leaf_hash(public_key, balance))
+        self.count += 1
+        self.total_balance += balance
+        if len(self._chunk) == self.chunk_size:
+            self._chunk_roots.append(merkle_root(self._chunk))
+            self._chunk = []
+
+    def finish(self) -> bytes:
+        """Write chunk roots and the header; returns the Merkle root"""
+        if self._chunk:
+            self._chunk_roots.append(merkle_root(self._chunk))
+            self._chunk = []
+        root = merkle_root(self._chunk_roots)
+        self._file.write(b"".join(self._chunk_roots))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(SNAPSHOT_MAGIC, self.asset_id, self.round_num,
+                                     self.count, self.chunk_size, root))
+        self._file.close()
+        logger.info(f"Wrote snapshot of {self.count} holders at round {self.round_num} to {self.path}")
+        return root
+
+
+class SnapshotReader:
+    """Memory-mapped lookups and Merkle proofs against a snapshot file.
+
+    Address lookups binary-search the sorted fixed-width leaves. A proof hashes
+    one chunk of leaves plus the in-memory chunk roots, never the whole file.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.asset_id, self.round_num, self.count, self.chunk_size, self.root = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a voting power snapshot")
+        chunks_at = HEADER.size + self.count * LEAF.size
+        chunk_count = -(-self.count // self.chunk_size)
+        self._chunk_roots = [bytes(self._map[chunks_at + i * 32:chunks_at + (i + 1) * 32])
+                             for i in range(chunk_count)]
+
+    def _leaf(self, index: int) -> Tuple[bytes, int]:
+        return LEAF.unpack_from(self._map, HEADER.size + index * LEAF.size)
+
+    def _find(self, public_key: bytes) -> Optional[int]:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._leaf(mid)[0] < public_key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._leaf(lo)[0] == public_key:
+            return lo
+        return None
+
+    def balance_of(self, address: str) -> int:
+        index = self._find(encoding.decode_address(address))
+        return self._leaf(index)[1] if index is not None else 0
+
+    def proof(self, address: str) -> Optional[Tuple[int, bytes]]:
+        """(balance, encoded proof) for ``address``; None if it held nothing"""
+        index = self._find(encoding.decode_address(address))
+        if index is None:
+            return None
+        chunk, offset = divmod(index, self.chunk_size)
+        first = chunk * self.chunk_size
+        leaves = [leaf_hash(*self._leaf(i)) for i in range(first, min(first + self.chunk_size, self.count))]
+        _, inner = merkle_path(leaves, offset)
+        _, outer = merkle_path(self._chunk_roots, chunk)
+        return self._leaf(index)[1], encode_proof(inner + outer)
+
+    def holders(self) -> Iterator[Tuple[str, int]]:
+        for i in range(self.count):
+            public_key, balance = self._leaf(i)
+            yield encoding.encode_address(public_key), balance
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def _transfers(txn: Dict) -> Iterator[Dict]:
+    """Asset transfers in a transaction and all of its inner transactions"""
+    if txn.get("tx-type") == "axfer":
+        yield txn
+    for inner in txn.get("inner-txns") or []:
+        yield from _transfers(inner)
+
+
+def net_changes_after(indexer_client: indexer.IndexerClient, asset_id: int, round_num: int,
+                      max_round: Optional[int] = None, page_size: int = 1000) -> Dict[str, int]:
+    """Net balance change per address from asset transfers after ``round_num``"""
+    changes: Dict[str, int] = {}
+    seen: Set[str] = set()
+    next_page = None
+    while True:
+        response = indexer_client.search_asset_transactions(
+            asset_id, min_round=round_num + 1, max_round=max_round,
+            limit=page_size, next_page=next_page
+        )
+        for root in response.get("transactions") or []:
+            # A root txn is returned once per matching inner txn page; count it once
+            if root.get("id") in seen:
+                continue
+            seen.add(root.get("id"))
+            for txn in _transfers(root):
+                xfer = txn["asset-transfer-transaction"]
+                if xfer.get("asset-id") != asset_id:
+                    continue
+                source = xfer.get("sender") or txn["sender"]  # clawback moves the revocation target's funds
+                amount = xfer.get("amount", 0)
+                if amount:
+                    changes[source] = changes.get(source, 0) - amount
+                    changes[xfer["receiver"]] = changes.get(xfer["receiver"], 0) + amount
+                close_amount = xfer.get("close-amount", 0)
+                if close_amount:
+                    changes[source] = changes.get(source, 0) - close_amount
+                    changes[xfer["close-to"]] = changes.get(xfer["close-to"], 0) + close_amount
+        next_page = response.get("next-token")
+        if not next_page or not response.get("transactions"):
+            return changes
+
+
+def _write_run(entries: List[Tuple[bytes, int]], directory: str) -> str:
+    entries.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(LEAF.pack(key, balance) for key, balance in entries))
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[bytes, int]]:
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(LEAF.size * 4096)
+            if not block:
+                return
+            yield from LEAF.iter_unpack(block)
+
+
+def build_snapshot(indexer_client: indexer.IndexerClient, asset_id: int, round_num: int,
+                   path: str, exclude: Iterable[str] = (), page_size: int = 1000,
+                   run_size: int = 250_000, chunk_size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+    """Snapshot every holder's ``asset_id`` balance at ``round_num``; returns the root.
+
+    Current balances are streamed from the indexer and rolled back by the net
+    transfers after ``round_num``. Holders are sorted externally in runs of
+    ``run_size`` and merged into the snapshot file, so memory is bounded by
+    one run plus the addresses active since the snapshot round.
+    """
+    current_round = indexer_client.health().get("round")
+    changes = net_changes_after(indexer_client, asset_id, round_num, current_round, page_size)
+    excluded = set(exclude)
+    run_dir = tempfile.mkdtemp(prefix="snapshot-", dir=str(Path(path).parent))
+    runs: List[str] = []
+    entries: List[Tuple[bytes, int]] = []
+
+    def collect(address: str, balance: int):
+        if balance > 0 and address not in excluded:
+            entries.append((encoding.decode_address(address), balance))
+            if len(entries) >= run_size:
+                runs.append(_write_run(entries, run_dir))
+                entries.clear()
+
+    try:
+        next_page = None
+        while True:
+            response = indexer_client.asset_balances(asset_id, limit=page_size, next_page=next_page)
+            for holder in response.get("balances") or []:
+                address = holder["address"]
+                collect(address, holder.get("amount", 0) - changes.pop(address, 0))
+            next_page = response.get("next-token")
+            if not next_page or not response.get("balances"):
+                break
+
+        # Accounts that closed out after the snapshot round no longer show up
+        for address, change in changes.items():
+            collect(address, -change)
+        if entries:
+            runs.append(_write_run(entries, run_dir))
+            entries.clear()
+
+        writer = SnapshotWriter(path, asset_id, round_num, chunk_size)
+        for public_key, balance in heapq.merge(*(_read_run(run) for run in runs)):
+            writer.add(public_key, balance)
+        return writer.finish()
+    finally:
+        for run in runs:
+            os.remove(run)
+        os.rmdir(run_dir)
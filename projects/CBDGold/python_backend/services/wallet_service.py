@@ -1,12 +1,29 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
-import random
+import asyncio
+import base64
+from algosdk.error import AlgodHTTPError
 from algosdk.v2client import algod, indexer
-from ..models.models import WalletInfo
+from ..models.models import StakingPosition, WalletInfo
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Local state of CBDGoldStaking/staking_contract.py reported per wallet
+STAKING_LOCAL_KEYS = ("staked_amount", "tier", "pending", "reward_debt")
+
+
+def staking_position(local_state: Optional[Dict[str, Any]]) -> Optional[StakingPosition]:
+    """Decode the staking app's ``app-local-state``; None if the account has not opted in"""
+    if local_state is None or local_state.get("deleted"):
+        return None
+    values = {}
+    for entry in local_state.get("key-value") or []:
+        key = base64.b64decode(entry["key"]).decode(errors="replace")
+        if key in STAKING_LOCAL_KEYS:
+            values[key] = entry["value"].get("uint", 0)
+    return StakingPosition(**values)
+
 class WalletService:
     def __init__(self):
         # Algorand TestNet configuration
@@ -23,103 +40,166 @@ class WalletService:
         self.weed_asset_id = 748025552
         self.usdc_asset_id = 31566704
 
-        # Cache for wallet info
+        # Staking contract whose local state is read with the balances
+        self.staking_app_id = 123456789
+
+        # Cache for wallet info, each entry tagged with the round it was read at
         self.wallet_cache: Dict[str, WalletInfo] = {}
         self.cache_duration = 30  # seconds
+        self.max_concurrent_fetches = 16
+        self.page_size = 1000
 
-    async def get_wallet_info(self, address: str) -> WalletInfo:
-        """Get comprehensive wallet information"""
-        try:
-            # Check cache first
-            if address in self.wallet_cache:
-                cached = self.wallet_cache[address]
-                age = (datetime.utcnow() - cached.last_updated).total_seconds()
-                if age < self.cache_duration:
-                    return cached
-
-            # Fetch account information
-            account_info = self.algod_client.account_information(address)
-
-            # Parse balances
-            algo_balance = account_info.get("amount", 0) / 1_000_000  # Convert microAlgos
-
-            # Initialize asset balances
-            hemp_balance = 0
-            weed_balance = 0
-            usdc_balance = 0.0
-            opted_in_assets = []
-
-            # Parse assets
-            assets = account_info.get("assets", [])
-            for asset in assets:
-                asset_id = asset.get("asset-id")
-                amount = asset.get("amount", 0)
-
-                opted_in_assets.append(asset_id)
-
-                if asset_id == self.hemp_asset_id:
-                    hemp_balance = amount
-                elif asset_id == self.weed_asset_id:
-                    weed_balance = amount
-                elif asset_id == self.usdc_asset_id:
-                    usdc_balance = amount / 1_000_000  # USDC has 6 decimal places
-
-            # Calculate derived values
-            staked_hemp = self._get_staked_hemp(address)  # Mock for now
-            staking_tier = self._calculate_staking_tier(staked_hemp)
-            voting_power = weed_balance / 1_000_000  # 1M WEED = 1 vote
-
-            wallet_info = WalletInfo(
-                address=address,
-                algo_balance=algo_balance,
-                hemp_balance=hemp_balance,
-                weed_balance=weed_balance,
-                usdc_balance=usdc_balance,
-                staked_hemp=staked_hemp,
-                staking_tier=staking_tier,
-                voting_power=voting_power,
-                last_updated=datetime.utcnow(),
-                opted_in_assets=opted_in_assets
-            )
-
-            # Cache the result
-            self.wallet_cache[address] = wallet_info
+    def _cached(self, address: str) -> Optional[WalletInfo]:
+        cached = self.wallet_cache.get(address)
+        if cached and (datetime.utcnow() - cached.last_updated).total_seconds() < self.cache_duration:
+            return cached
+        return None
 
-            logger.info(f"Fetched wallet info for {address[:8]}...")
-            return wallet_info
+    async def get_wallet_info(self, address: str) -> WalletInfo:
+        """Get comprehensive wallet information; raises if algod cannot be read"""
+        # Check cache first
+        cached = self._cached(address)
+        if cached:
+            return cached
 
+        try:
+            return await asyncio.to_thread(self._fetch_wallet_info, address)
         except Exception as e:
             logger.error(f"Error fetching wallet info for {address}: {e}")
-
-            # Return mock data on error
-            return WalletInfo(
-                address=address,
-                algo_balance=100.0 + random.uniform(0, 100),
-                hemp_balance=random.randint(1000000, 50000000),
-                weed_balance=random.randint(1000, 10000),
-                usdc_balance=random.uniform(50, 500),
-                staked_hemp=random.randint(0, 10000000),
-                staking_tier=random.randint(0, 3),
-                voting_power=random.uniform(1, 10),
-                last_updated=datetime.utcnow(),
-                opted_in_assets=[self.hemp_asset_id, self.weed_asset_id, self.usdc_asset_id]
+            raise
+
+    async def get_wallets_info(self, addresses: Iterable[str]) -> Tuple[Dict[str, WalletInfo], List[str]]:
+        """Wallet information for many addresses: (found, unavailable).
+
+        Cached wallets are served as is; the rest are read from algod
+        concurrently. An account that cannot be read is reported as
+        unavailable rather than failing the whole batch.
+        """
+        found: Dict[str, WalletInfo] = {}
+        missing: List[str] = []
+        for address in dict.fromkeys(addresses):
+            cached = self._cached(address)
+            if cached:
+                found[address] = cached
+            else:
+                missing.append(address)
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+
+        async def fetch(address: str):
+            async with semaphore:
+                return await asyncio.to_thread(self._fetch_wallet_info, address)
+
+        results = await asyncio.gather(*(fetch(address) for address in missing), return_exceptions=True)
+        unavailable = []
+        for address, result in zip(missing, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching wallet info for {address}: {result}")
+                unavailable.append(address)
+            else:
+                found[address] = result
+        return found, unavailable
+
+    def _fetch_wallet_info(self, address: str) -> WalletInfo:
+        """Read and cache one account, staking local state included, from algod"""
+        # Fetch account information
+        account_info, assets, staking_state = self._read_account(address)
+
+        # Parse balances
+        algo_balance = account_info.get("amount", 0) / 1_000_000  # Convert microAlgos
+
+        # Initialize asset balances
+        hemp_balance = 0
+        weed_balance = 0
+        usdc_balance = 0.0
+        opted_in_assets = []
+
+        # Parse assets
+        for asset in assets:
+            asset_id = asset.get("asset-id")
+            amount = asset.get("amount", 0)
+
+            opted_in_assets.append(asset_id)
+
+            if asset_id == self.hemp_asset_id:
+                hemp_balance = amount
+            elif asset_id == self.weed_asset_id:
+                weed_balance = amount
+            elif asset_id == self.usdc_asset_id:
+                usdc_balance = amount / 1_000_000  # USDC has 6 decimal places
+
+        # Calculate derived values
+        staking = staking_position(staking_state)
+        voting_power = weed_balance / 1_000_000  # 1M WEED = 1 vote
+
+        wallet_info = WalletInfo(
+            address=address,
+            algo_balance=algo_balance,
+            hemp_balance=hemp_balance,
+            weed_balance=weed_balance,
+            usdc_balance=usdc_balance,
+            staked_hemp=staking.staked_amount if staking else 0,
+            staking_tier=staking.tier if staking else 0,
+            staking=staking,
+            voting_power=voting_power,
+            last_updated=datetime.utcnow(),
+            round=account_info.get("round"),
+            opted_in_assets=opted_in_assets
+        )
+
+        # Cache the result
+        self.wallet_cache[address] = wallet_info
+
+        logger.info(f"Fetched wallet info for {address[:8]}...")
+        return wallet_info
+
+    def _read_account(self, address: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(account, asset holdings, staking app-local-state) in as few algod calls as possible.
+
+        The account response normally carries every holding and app local
+        state, so balances and staking state cost one call. Accounts with
+        more resources than algod returns inline are read with ``exclude``
+        and their holdings and local states paged separately.
+        """
+        try:
+            account_info = self.algod_client.account_info(address)
+        except AlgodHTTPError as e:
+            if e.code != 400:
+                raise
+            # Too many resources to list inline
+            account_info = self.algod_client.account_info(address, exclude="all")
+            return account_info, self._paged_assets(address), self._paged_staking_state(address)
+
+        staking_state = next(
+            (app for app in account_info.get("apps-local-state") or [] if app.get("id") == self.staking_app_id), None
+        )
+        if staking_state is None and len(account_info.get("apps-local-state") or []) < \
+                account_info.get("total-apps-opted-in", 0):
+            staking_state = self._paged_staking_state(address)
+        return account_info, account_info.get("assets") or [], staking_state
+
+    def _paged_assets(self, address: str) -> List[Dict[str, Any]]:
+        holdings: List[Dict[str, Any]] = []
+        next_page = None
+        while True:
+            response = self.algod_client.account_assets_info(address, limit=self.page_size, next_page=next_page)
+            holdings.extend(h["asset-holding"] for h in response.get("asset-holdings") or [])
+            next_page = response.get("next-token")
+            if not next_page or not response.get("asset-holdings"):
+                return holdings
+
+    def _paged_staking_state(self, address: str) -> Optional[Dict[str, Any]]:
+        next_page = None
+        while True:
+            response = self.algod_client.account_applications_info(
+                address, limit=self.page_size, next_page=next_page
             )
-
-    def _get_staked_hemp(self, address: str) -> int:
-        """Get staked HEMP amount (mock implementation)"""
-        # In production, this would query the staking contract
-        return random.randint(0, 100_000_000)
-
-    def _calculate_staking_tier(self, staked_amount: int) -> int:
-        """Calculate staking tier based on staked amount"""
-        if staked_amount >= 1_000_000_000:  # 1B HEMP
-            return 3  # Gold
-        elif staked_amount >= 100_000_000:  # 100M HEMP
-            return 2  # Silver
-        elif staked_amount >= 10_000_000:   # 10M HEMP
-            return 1  # Bronze
-        else:
-            return 0  # None
+            for resource in response.get("application-resources") or []:
+                if resource.get("id") == self.staking_app_id:
+                    return resource.get("app-local-state")
+            next_page = response.get("next-token")
+            if not next_page or not response.get("application-resources"):
+                return None
 
     async def check_asset_opt_in(self, address: str, asset_id: int) -> bool:
         """Check if an address is opted into an asset"""
@@ -130,6 +210,13 @@ class WalletService:
             logger.error(f"Error checking opt-in for {address}, asset {asset_id}: {e}")
             return False
 
+    def invalidate(self, addresses: Iterable[str], confirmed_round: int):
+        """Drop cached wallets read before a transaction touching them confirmed"""
+        for address in addresses:
+            cached = self.wallet_cache.get(address)
+            if cached and (cached.round or 0) < confirmed_round:
+                self.wallet_cache.pop(address, None)
+
     def clear_cache(self, address: str = None):
         """Clear wallet cache"""
         if address:
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the backend as the python_backend package, as the scripts do
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
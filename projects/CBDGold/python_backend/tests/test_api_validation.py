@@ -0,0 +1,13 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from python_backend import main
+
+client = TestClient(main.app)
+
+
+@pytest.mark.parametrize("path", ["/api/staking/claim", "/api/staking/compound"])
+def test_invalid_wallet_address_is_rejected_with_400(path):
+    response = client.post(path, params={"wallet_address": "not-an-address"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid wallet address"
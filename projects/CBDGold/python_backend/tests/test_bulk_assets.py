@@ -0,0 +1,120 @@
+import asyncio
+
+from algosdk import account, transaction
+from algosdk.error import AlgodHTTPError
+
+from python_backend.utils.bulk_assets import AssetMint, AssetTransfer, BulkAssetEngine, BulkCheckpoint, sign_groups
+
+PRIVATE_KEY, SENDER = account.generate_account()
+_, RECEIVER = account.generate_account()
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+
+
+class FakeAlgod:
+    def __init__(self, last_round):
+        self.last_round = last_round
+        self.known = {}
+
+    def status(self):
+        return {"last-round": self.last_round}
+
+    def pending_transaction_info(self, tx_id):
+        if tx_id not in self.known:
+            raise AlgodHTTPError("transaction not found", 404)
+        return self.known[tx_id]
+
+
+class FakeIndexer:
+    def __init__(self, current_round):
+        self.current_round = current_round
+        self.transactions = {}
+
+    def search_transactions(self, txid):
+        found = [self.transactions[txid]] if txid in self.transactions else []
+        return {"current-round": self.current_round, "transactions": found}
+
+
+class FakePipeline:
+    """Confirms whatever it is sent at round 50, or raises ``error``"""
+
+    def __init__(self, algod_client, error=None):
+        self.algod_client = algod_client
+        self.error = error
+        self.sent = []
+
+    def suggested_params(self):
+        return transaction.SuggestedParams(1000, 1, 100, GENESIS_HASH, flat_fee=True)
+
+    async def submit_raw(self, encoded_txns, wait_rounds=10):
+        self.sent.append(encoded_txns)
+        if self.error:
+            raise self.error
+        return {"confirmed-round": 50}
+
+
+def sent_mint(checkpoint, last_valid=100):
+    """A mint an earlier run signed and sent, then died before confirming"""
+    mint = AssetMint(SENDER, "CBD Gold HEMP", "HEMP", 1_000)
+    checkpoint.add([mint])
+    sp = transaction.SuggestedParams(1000, 1, last_valid, GENESIS_HASH, flat_fee=True)
+    txns = sign_groups([[mint]], sp, {SENDER: PRIVATE_KEY})[0]
+    checkpoint.mark_sent([([mint], txns)], last_valid)
+    return mint, txns[0][0]
+
+
+def engine_for(checkpoint, pipeline, indexer_client=None):
+    return BulkAssetEngine(pipeline, {SENDER: PRIVATE_KEY}, checkpoint, indexer_client=indexer_client)
+
+
+def test_add_keeps_progress_and_retry_failed_returns_to_pending():
+    checkpoint = BulkCheckpoint(":memory:")
+    ops = [AssetTransfer(SENDER, RECEIVER, 7, 10), AssetTransfer(SENDER, SENDER, 7, 5)]
+    assert checkpoint.add(ops) == 2
+    checkpoint.mark(ops[:1], "failed", "rejected")
+    checkpoint.mark(ops[1:], "skipped", "not opted in")
+    assert checkpoint.add(ops) == 0
+    assert checkpoint.counts() == {"failed": 1, "skipped": 1}
+    assert checkpoint.retry_failed() == 2
+    assert checkpoint.pending() == ops
+
+
+def test_expired_group_stays_sent_while_the_indexer_lags():
+    checkpoint = BulkCheckpoint(":memory:")
+    sent_mint(checkpoint, last_valid=100)
+    pipeline = FakePipeline(FakeAlgod(last_round=120))
+    asyncio.run(engine_for(checkpoint, pipeline, FakeIndexer(current_round=90)).run())
+    assert checkpoint.counts() == {"sent": 1}
+    assert not pipeline.sent
+
+
+def test_expired_group_missing_from_a_caught_up_indexer_is_sent_again():
+    checkpoint = BulkCheckpoint(":memory:")
+    sent_mint(checkpoint, last_valid=100)
+    pipeline = FakePipeline(FakeAlgod(last_round=120))
+    asyncio.run(engine_for(checkpoint, pipeline, FakeIndexer(current_round=120)).run())
+    assert checkpoint.counts() == {"confirmed": 1}
+    assert len(pipeline.sent) == 1
+
+
+def test_expired_group_found_by_the_indexer_keeps_its_asset_id():
+    checkpoint = BulkCheckpoint(":memory:")
+    mint, tx_id = sent_mint(checkpoint, last_valid=100)
+    indexer_client = FakeIndexer(current_round=120)
+    indexer_client.transactions[tx_id] = {"confirmed-round": 95, "created-asset-index": 4242}
+    pipeline = FakePipeline(FakeAlgod(last_round=120))
+    asyncio.run(engine_for(checkpoint, pipeline, indexer_client).run())
+    [result] = checkpoint.results()
+    assert (result["status"], result["confirmed_round"], result["asset_id"]) == ("confirmed", 95, 4242)
+    assert not pipeline.sent
+
+
+def test_group_already_in_ledger_takes_asset_id_from_the_indexer():
+    checkpoint = BulkCheckpoint(":memory:")
+    mint, tx_id = sent_mint(checkpoint, last_valid=100)
+    indexer_client = FakeIndexer(current_round=60)
+    indexer_client.transactions[tx_id] = {"confirmed-round": 55, "created-asset-index": 4243}
+    pipeline = FakePipeline(FakeAlgod(last_round=60),
+                            error=AlgodHTTPError(f"TransactionPool.Remember: transaction already in ledger: {tx_id}"))
+    asyncio.run(engine_for(checkpoint, pipeline, indexer_client).run())
+    [result] = checkpoint.results()
+    assert (result["status"], result["confirmed_round"], result["asset_id"]) == ("confirmed", 55, 4243)
@@ -0,0 +1,58 @@
+import math
+from collections import defaultdict
+
+import pytest
+
+from python_backend.avm import APP_CALL_BUDGET, load_contract, profile_teal
+from python_backend.benchmarks.contract_scenarios import Deployment
+from python_backend.utils.teal_cache import TealCompiler
+
+USERS = 20
+
+# Static worst-case cost of the staking hot paths; a contract change that raises one fails here
+STAKING_CEILINGS = {"stake": 138, "unstake": 141, "claim": 99, "compound": 129}
+
+
+@pytest.fixture(scope="module")
+def compiler(tmp_path_factory):
+    return TealCompiler(cache_dir=tmp_path_factory.mktemp("teal_cache"))
+
+
+def profile(compiler, name, **kwargs):
+    teal = compiler.to_teal(load_contract(name).approval_program)
+    return {branch.name: branch for branch in profile_teal(teal, name, **kwargs).branches}
+
+
+@pytest.fixture(scope="module")
+def measured():
+    deployment = Deployment(USERS, seed=1)
+    costs = defaultdict(list)
+    for _ in range(300):
+        method, group = deployment.scenario()
+        result = deployment.ledger.execute(group)
+        assert result.ok, f"{method}: {result.error}"
+        costs[method].append(result.cost)
+        deployment.ledger.advance(60)
+    return costs
+
+
+def test_staking_hot_paths_stay_within_their_static_cost(compiler):
+    branches = profile(compiler, "staking")
+    for method, ceiling in STAKING_CEILINGS.items():
+        assert branches[method].max_cost <= ceiling, method
+        assert branches[method].status == "ok"
+
+
+def test_measured_staking_costs_match_the_profile(compiler, measured):
+    branches = profile(compiler, "staking")
+    for method in STAKING_CEILINGS:
+        assert measured[method], method
+        assert max(measured[method]) <= branches[method].max_cost, method
+
+
+def test_bounded_vote_profile_covers_the_measured_cost(compiler, measured):
+    depth = math.ceil(math.log2(USERS))
+    vote = profile(compiler, "governance")["vote"]
+    assert vote.status == "unbounded"
+    bounded = profile(compiler, "governance", loop_bounds={"verifysnapshotproof_0_l1": depth})["vote"]
+    assert max(measured["vote"]) <= bounded.max_cost <= APP_CALL_BUDGET
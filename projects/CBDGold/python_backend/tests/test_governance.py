@@ -0,0 +1,102 @@
+import base64
+
+from python_backend.avm.ledger import app_call
+from python_backend.benchmarks.contract_scenarios import Deployment
+from python_backend.services.governance_indexer import STATUS_ACTIVE, STATUS_PASSED, GovernanceIndexer
+
+
+def make_indexer(proposals):
+    governance = GovernanceIndexer(None, app_id=1, db_path=":memory:")
+    with governance._db:
+        governance._db.executemany(
+            "INSERT INTO proposals (id, title, created_round, created_at, ends_at, status) VALUES (?, '', 1, 0, ?, ?)",
+            proposals
+        )
+    return governance
+
+
+def box(proposal_id, end_time):
+    return {"id": proposal_id, "votes_for": 5, "votes_against": 1, "end_time": end_time, "status": STATUS_ACTIVE}
+
+
+def test_ended_proposals_are_polled_once_more():
+    now = 1_000
+    governance = make_indexer([(1, 2_000, STATUS_ACTIVE), (2, 500, STATUS_ACTIVE), (3, 400, STATUS_PASSED)])
+
+    polled = governance.proposals_to_poll(now)
+    assert sorted(polled) == [1, 2]
+
+    records = [box(1, 2_000), box(2, 500)]
+    governance.apply_records(records)
+    governance.mark_settled(records, now)
+    assert governance.proposals_to_poll(now) == [1]
+    assert governance.get_proposal(2).votes_yes == 5
+
+    # Once proposal 1 ends it gets its final read, then polling stops
+    assert governance.proposals_to_poll(3_000) == [1]
+    governance.mark_settled([box(1, 2_000)], 3_000)
+    assert governance.proposals_to_poll(3_000) == []
+
+
+def test_box_end_time_keeps_extended_proposal_open():
+    governance = make_indexer([(1, 500, STATUS_ACTIVE)])
+    records = [box(1, 5_000)]
+    governance.apply_records(records)
+    governance.mark_settled(records, 1_000)
+    assert governance.proposals_to_poll(1_000) == [1]
+
+
+def vote_txn(proposal_id, voter, round_num, power=10, choice=(1).to_bytes(8, "big")):
+    log = b"vote_cast:" + proposal_id.to_bytes(8, "big") + b",vote:" + choice
+    if power is not None:
+        log += b",power:" + power.to_bytes(8, "big")
+    return {"id": f"{voter}-{round_num}", "sender": voter, "confirmed-round": round_num,
+            "application-transaction": {"application-id": 1}, "logs": [base64.b64encode(log).decode()]}
+
+
+def test_vote_receipts_come_from_the_incremental_votes_table():
+    governance = make_indexer([(1, 2_000, STATUS_ACTIVE), (2, 2_000, STATUS_ACTIVE)])
+    with governance._db:
+        governance.apply_transactions([vote_txn(1, "ALICE", 10), vote_txn(2, "BOB", 11)])
+        # Replaying a round is harmless
+        governance.apply_transactions([vote_txn(1, "ALICE", 10)])
+
+    assert governance.voted(1, ["ALICE", "BOB", "CAROL"]) == {"ALICE": True, "BOB": False, "CAROL": False}
+    assert governance.voted(2, ["BOB"]) == {"BOB": True}
+    assert governance.voter_count(1) == 1
+    assert governance.get_proposal(1).votes_yes == 10
+
+
+def test_vote_receipt_lookup_spans_chunks():
+    governance = make_indexer([(1, 2_000, STATUS_ACTIVE)])
+    voters = [f"VOTER{i}" for i in range(2_500)]
+    with governance._db:
+        governance.apply_transactions([vote_txn(1, voter, 10) for voter in voters[::2]])
+
+    voted = governance.voted(1, voters)
+    assert sum(voted.values()) == 1_250
+    assert voted["VOTER0"] and not voted["VOTER1"]
+
+
+def test_short_choice_argument_keeps_choice_and_weight():
+    # Apps deployed before the contract re-encoded the choice logged the raw argument
+    governance = make_indexer([(1, 2_000, STATUS_ACTIVE)])
+    with governance._db:
+        governance.apply_transactions([vote_txn(1, "ALICE", 10, power=40, choice=b"\x01"),
+                                       vote_txn(1, "BOB", 11, power=7, choice=b"")])
+    rows = governance._db.execute("SELECT voter, choice, weight FROM votes ORDER BY voter").fetchall()
+    assert [tuple(row) for row in rows] == [("ALICE", 1, 40), ("BOB", 0, 7)]
+    proposal = governance.get_proposal(1)
+    assert (proposal.votes_yes, proposal.votes_no) == (40, 7)
+
+
+def test_contract_logs_a_short_choice_as_eight_bytes():
+    deployment = Deployment(4, seed=1)
+    result = deployment.ledger.execute([app_call(
+        deployment.users[0], deployment.governance,
+        ["vote", (1).to_bytes(8, "big"), b"\x01", deployment.power[0], deployment.proofs[0]]
+    )])
+    assert result.ok, result.error
+    [log] = [entry for entry in result.logs if entry.startswith(b"vote_cast:")]
+    assert log == (b"vote_cast:" + (1).to_bytes(8, "big") + b",vote:" + (1).to_bytes(8, "big")
+                   + b",power:" + deployment.power[0].to_bytes(8, "big"))
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+from fastapi.testclient import TestClient
+
+from python_backend import main
+from python_backend.models.models import WalletInfo
+from python_backend.services.portfolio_service import holdings_matrix, value_series
+
+_, ADDRESS = account.generate_account()
+
+
+def test_unreadable_wallet_portfolio_is_503(monkeypatch):
+    def fail(address):
+        raise AlgodHTTPError("algod unavailable", 502)
+
+    async def prices():
+        return {}
+
+    monkeypatch.setattr(main.wallet_service, "_fetch_wallet_info", fail)
+    monkeypatch.setattr(main.oracle_service, "get_token_prices", prices)
+    client = TestClient(main.app)
+    assert client.get(f"/api/portfolio/{ADDRESS}").status_code == 503
+
+    response = client.post("/api/portfolio", json={"addresses": [ADDRESS]})
+    assert response.status_code == 200
+    assert response.json()["unavailable"] == [ADDRESS]
+
+
+def test_value_series_weights_each_price_by_how_long_it_held():
+    # Two wallets: 1 ALGO, and 10 HEMP plus 2 ALGO
+    exposure = np.array([[1.0, 0.0, 0.0, 0.0], [2.0, 10.0, 0.0, 0.0]])
+    timestamps = np.array([0.0, 60.0])
+    prices = np.array([[2.0, 0.5, 0.0, 1.0], [5.0, 0.25, 0.0, 1.0]])
+
+    time_weighted, opening, series, sample_times = value_series(exposure, timestamps, prices, now=100.0,
+                                                                start=0.0, points=3)
+    # ALGO at $2 for 60s then $5 for 40s
+    assert time_weighted[0] == pytest.approx((2 * 60 + 5 * 40) / 100)
+    assert time_weighted[1] == pytest.approx((9 * 60 + 12.5 * 40) / 100)
+    assert opening.tolist() == [2.0, 9.0]
+    assert sample_times.tolist() == [0.0, 50.0, 100.0]
+    assert series.tolist() == [[2.0, 2.0, 5.0], [9.0, 9.0, 12.5]]
+
+    # A sample from before the window only counts from its start
+    time_weighted, opening, _, _ = value_series(exposure, timestamps, prices, now=100.0, start=30.0, points=2)
+    assert time_weighted[0] == pytest.approx((2 * 30 + 5 * 40) / 70)
+    assert opening[0] == 2.0
+
+
+def test_holdings_matrix_converts_weed_decimals():
+    wallet = WalletInfo(address=ADDRESS, algo_balance=1.5, hemp_balance=20, weed_balance=3_000_000,
+                        usdc_balance=4.0, last_updated=datetime.utcnow())
+    assert holdings_matrix([wallet]).tolist() == [[1.5, 20.0, 3.0, 4.0]]
@@ -0,0 +1,24 @@
+import asyncio
+
+from python_backend import main
+
+
+def test_failed_spin_batch_returns_admitted_tokens(monkeypatch):
+    service = main.contract_service
+    budget = service.prize_budget
+    budget.update_chain_state({"daily_max": 240, "prize_pool_balance": 10 ** 12})
+    before = budget._tokens
+
+    async def eligible(address):
+        return {"wallet_address": address, "eligible": True, "reason": None}
+
+    def fail(count):
+        raise RuntimeError("round not committed")
+
+    monkeypatch.setattr(service, "check_prize_eligibility", eligible)
+    monkeypatch.setattr(service.prize_engine, "spin_batch", fail)
+    result = asyncio.run(service.spin_for_prizes(["A", "B", "C"]))
+
+    assert result["status"] == "error"
+    assert budget._tokens >= before
+    assert budget.outstanding_amount == 0
@@ -0,0 +1,15 @@
+from python_backend.services.prize_engine import DRAWS_PER_BLOCK, PrizeEngine, replay_round
+
+
+def test_replay_reproduces_a_round_drawn_in_uneven_batches():
+    engine = PrizeEngine(secret=b"test")
+    sizes = [1, 5, 200, DRAWS_PER_BLOCK - 3, 7, DRAWS_PER_BLOCK + 11, 1]
+    outcomes = [outcome for size in sizes for outcome in engine.spin_batch(size)]
+    round_id = engine.round_id
+    engine.round_duration = 0
+    seed, spins = engine.reveal(round_id)
+
+    assert spins == sum(sizes)
+    assert [o.index for o in outcomes] == list(range(spins))
+    assert replay_round(seed, round_id, spins) == [o.tier.tier for o in outcomes]
+
@@ -0,0 +1,31 @@
+from python_backend.avm import profile_teal
+
+LOOP = """#pragma version 8
+int 0
+store 0
+loop:
+load 0
+int 1
++
+dup
+store 0
+int 10
+<
+bnz loop
+int 1
+return
+"""
+
+
+def test_unbounded_loop_marks_branch():
+    branch = profile_teal(LOOP).branches[0]
+    assert branch.status == "unbounded"
+    assert branch.loops[0].iterations is None
+
+
+def test_loop_bound_multiplies_iteration_cost():
+    once = profile_teal(LOOP).branches[0]
+    bounded = profile_teal(LOOP, loop_bounds={"loop": 10}).branches[0]
+    assert bounded.status == "ok"
+    assert bounded.loops[0].iterations == 10
+    assert bounded.max_cost - once.max_cost == 9 * once.loops[0].per_iteration
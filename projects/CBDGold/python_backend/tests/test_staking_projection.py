@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from python_backend import main
+from python_backend.services.staking_simulator import StakingSimulator
+
+client = TestClient(main.app)
+
+
+def test_oversized_grid_is_rejected_before_it_is_built(monkeypatch):
+    def build_grid(*axes):
+        raise AssertionError("grid allocated for an over-limit request")
+
+    monkeypatch.setattr(main.staking_simulator, "build_grid", build_grid)
+    axis = list(range(1, 101))
+    response = client.post("/api/staking/projection", json={
+        "amounts": axis, "durations": axis, "reward_rates": axis, "total_staked": axis,
+    })
+    assert response.status_code == 400
+    assert "limit is 100000" in response.json()["detail"]
+
+
+def test_axis_longer_than_the_request_limit_is_rejected():
+    response = client.post("/api/staking/projection", json={
+        "amounts": list(range(1001)), "durations": [86_400], "reward_rates": [1],
+    })
+    assert response.status_code == 422
+
+
+def test_grid_within_the_limit_is_projected():
+    result = StakingSimulator(max_scenarios=8).project_grid([10, 20], [60, 120], [1, 2], [0])
+    assert result["amount"].size == 8
+    with pytest.raises(ValueError):
+        StakingSimulator(max_scenarios=7).project_grid([10, 20], [60, 120], [1, 2], [0])
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from python_backend.models.models import TransactionStatus
+from python_backend.services.transaction_tracker import TransactionTracker
+from python_backend.utils.submission import ConfirmationWatcher, TransactionSubmissionError
+
+
+class FakeAlgod:
+    """Chain at ``round``; each status_after_block call produces the next block"""
+
+    def __init__(self, round_num: int):
+        self.round = round_num
+        self.blocks = {}  # round -> tx ids confirmed in it
+        self.confirm_at = {}  # tx id -> round it lands in
+
+    def status(self):
+        return {"last-round": self.round}
+
+    def status_after_block(self, round_num):
+        self.round = max(self.round, round_num) + 1
+        for tx_id, confirm_round in self.confirm_at.items():
+            if confirm_round == self.round:
+                self.blocks.setdefault(self.round, []).append(tx_id)
+        return {"last-round": self.round}
+
+    def get_block_txids(self, round_num):
+        return {"blockTxids": self.blocks.get(round_num, [])}
+
+    def pending_transaction_info(self, tx_id):
+        confirm_round = self.confirm_at.get(tx_id)
+        if confirm_round is not None and confirm_round <= self.round:
+            return {"confirmed-round": confirm_round}
+        return {"pool-error": ""}
+
+
+def test_watcher_confirms_transaction_in_a_later_round():
+    algod = FakeAlgod(100)
+    algod.confirm_at["TX"] = 103
+    info = asyncio.run(ConfirmationWatcher(algod).wait("TX", wait_rounds=10))
+    assert info["confirmed-round"] == 103
+
+
+def test_watcher_gives_up_after_wait_rounds():
+    algod = FakeAlgod(100)
+    with pytest.raises(TransactionSubmissionError, match="not confirmed after 3 rounds"):
+        asyncio.run(ConfirmationWatcher(algod).wait("TX", wait_rounds=3))
+    assert algod.round == 103
+
+
+def test_watcher_deadline_after_idle_gap():
+    algod = FakeAlgod(100)
+    watcher = ConfirmationWatcher(algod)
+
+    async def scenario():
+        algod.confirm_at["FIRST"] = 101
+        await watcher.wait("FIRST", wait_rounds=5)
+        # The watcher sits idle while the chain moves far past its last deadline
+        algod.round = 500
+        algod.confirm_at["SECOND"] = 502
+        return await watcher.wait("SECOND", wait_rounds=5)
+
+    assert asyncio.run(scenario())["confirmed-round"] == 502
+
+
+def test_tracker_confirms_after_idle_gap():
+    algod = FakeAlgod(100)
+    tracker = TransactionTracker(ConfirmationWatcher(algod))
+    confirmed = []
+    tracker.add_listener(confirmed.append)
+
+    async def scenario():
+        algod.confirm_at["FIRST"] = 101
+        tracker.track("FIRST", wait_rounds=5)
+        await tracker.wait("FIRST")
+        algod.round = 500
+        algod.confirm_at["SECOND"] = 503
+        tracker.track("SECOND", wait_rounds=5)
+        return await tracker.wait("SECOND")
+
+    record = asyncio.run(scenario())
+    assert record.status == TransactionStatus.CONFIRMED
+    assert record.confirmed_round == 503
+    assert [r.tx_id for r in confirmed] == ["FIRST", "SECOND"]
+
+
+def test_stream_closes_for_untracked_id():
+    tracker = TransactionTracker(ConfirmationWatcher(FakeAlgod(100)))
+
+    async def scenario():
+        return [record async for record in tracker.subscribe(tx_ids=["NEVER-SEEN"])]
+
+    events = asyncio.run(scenario())
+    assert [(r.tx_id, r.status) for r in events] == [("NEVER-SEEN", TransactionStatus.UNKNOWN)]
+
+
+def test_stream_skips_updates_already_replayed():
+    algod = FakeAlgod(100)
+    tracker = TransactionTracker(ConfirmationWatcher(algod))
+
+    async def scenario():
+        algod.confirm_at["B"] = 101
+        algod.confirm_at["A"] = 101
+        tracker.track("A", wait_rounds=1000)
+        tracker.track("B", wait_rounds=1000)
+        stream = tracker.subscribe(tx_ids=["A", "B"])
+        first = await stream.__anext__()
+        events = [(first.tx_id, first.status)]
+        # Both finish before B is replayed, so B's replay is already final
+        await tracker.wait("B")
+        await tracker.wait("A")
+        events.extend([(record.tx_id, record.status) async for record in stream])
+        return events
+
+    assert asyncio.run(scenario()) == [
+        ("A", TransactionStatus.PENDING),
+        ("B", TransactionStatus.CONFIRMED),
+        ("A", TransactionStatus.CONFIRMED),
+    ]
@@ -0,0 +1,16 @@
+from algosdk import account
+
+from python_backend.benchmarks.transaction_builder import OfflineAlgod
+from python_backend.services.transaction_builder import TransactionBuilder
+
+
+def test_encode_group_tx_ids_match_algosdk():
+    builder = TransactionBuilder(OfflineAlgod(), staking_app_id=123456789, hemp_asset_id=748025551)
+    sender = account.generate_account()[1]
+    group = builder.build_stake_group(sender, 10_000_000)
+
+    encoded = TransactionBuilder.encode_group(group)
+
+    assert encoded["tx_ids"] == [txn.get_txid() for txn in group]
+    assert len(encoded["transactions"]) == 2
+    assert encoded["group_id"] is not None
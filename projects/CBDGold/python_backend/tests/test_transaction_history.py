@@ -0,0 +1,52 @@
+from python_backend.services.transaction_history import TransactionHistory
+
+WALLET = "W" * 58
+OTHER = "O" * 58
+HEMP = 7
+APP = 9
+
+
+def transfer(n, receiver, round_num, intra=0):
+    return {"id": f"TX{n:04d}", "confirmed-round": round_num, "intra-round-offset": intra, "tx-type": "axfer",
+            "sender": OTHER, "asset-transfer-transaction": {"asset-id": HEMP, "receiver": receiver, "amount": n}}
+
+
+def make_history():
+    history = TransactionHistory(db_path=":memory:")
+    # Several transactions per round, so pages end mid-round
+    history.record_many(transfer(n, WALLET if n % 10 == 0 else OTHER, 100 + n // 3, n % 3) for n in range(60))
+    return history
+
+
+def pages(history, limit, **filters):
+    seen, cursor = [], None
+    while True:
+        page, cursor = history.history(limit=limit, cursor=cursor, **filters)
+        seen.append([txn.tx_id for txn in page])
+        if cursor is None:
+            return seen
+
+
+def test_keyset_pages_cover_the_history_newest_first():
+    history = make_history()
+    result = pages(history, limit=7)
+    tx_ids = [tx_id for page in result for tx_id in page]
+    assert tx_ids == [f"TX{n:04d}" for n in reversed(range(60))]
+    assert all(len(page) == 7 for page in result[:-1])
+
+
+def test_cursor_is_unaffected_by_newer_transactions():
+    history = make_history()
+    first, cursor = history.history(limit=10)
+    history.record_many([transfer(n, OTHER, 500) for n in range(100, 105)])
+    second, _ = history.history(limit=10, cursor=cursor)
+    assert second[0].tx_id == "TX0049"
+    assert {txn.tx_id for txn in first}.isdisjoint(txn.tx_id for txn in second)
+
+
+def test_combined_filters_page_through_the_smaller_set():
+    history = make_history()
+    result = pages(history, limit=2, address=WALLET, asset_id=HEMP)
+    assert [tx_id for page in result for tx_id in page] == ["TX0050", "TX0040", "TX0030", "TX0020", "TX0010",
+                                                            "TX0000"]
+    assert pages(history, limit=5, address=WALLET, app_id=APP) == [[]]
@@ -0,0 +1,60 @@
+import io
+import json
+
+from python_backend.services.transaction_history import flatten_transaction
+from python_backend.services.tx_history_stream import (
+    filter_records, iter_json_document, read_records, write_records
+)
+
+WALLET = "W" * 58
+OTHER = "O" * 58
+HEMP = 7
+APP = 9
+
+
+def transfer(n, receiver, asset_id=HEMP):
+    return {"id": f"TX{n:04d}", "confirmed-round": 1000 + n, "intra-round-offset": n % 3, "tx-type": "axfer",
+            "round-time": 1_700_000_000 + n, "fee": 1000, "sender": OTHER, "note": "e30=" if n % 2 else None,
+            "asset-transfer-transaction": {"asset-id": asset_id, "receiver": receiver, "amount": 123_456_789 + n}}
+
+
+def app_call(n, inner_receiver):
+    return {"id": f"APP{n:04d}", "confirmed-round": 2000 + n, "tx-type": "appl", "sender": OTHER,
+            "application-transaction": {"application-id": APP},
+            "inner-txns": [transfer(10_000 + n, inner_receiver)]}
+
+
+def test_json_document_parses_across_tiny_chunks():
+    records = [transfer(n, WALLET) for n in range(5)] + [app_call(0, WALLET)]
+    # Keys before "txs", strings holding brackets and numbers split between chunks
+    document = json.dumps({"current-round": 123456789, "next-token": "a]b}c,", "txs": records,
+                           "trailer": [1, 2]}, indent=1)
+    for chunk_size in (1, 2, 3, 7):
+        assert list(iter_json_document(io.StringIO(document), chunk_size=chunk_size)) == records
+    assert list(iter_json_document(io.StringIO('{"txs": []}'), chunk_size=1)) == []
+    assert list(iter_json_document(io.StringIO(json.dumps(records)), chunk_size=2)) == records
+
+
+def test_columnar_round_trip_across_blocks(tmp_path):
+    records = [transfer(n, WALLET if n % 2 else OTHER) for n in range(10)] + [app_call(1, WALLET)]
+    path = tmp_path / "history.txc"
+    assert write_records(records, path, block_size=4) == len(records)
+    assert list(read_records(path)) == [flatten_transaction(record) for record in records]
+
+
+def test_filters_match_addresses_assets_and_inner_transactions(tmp_path):
+    records = [transfer(0, WALLET), transfer(1, OTHER), transfer(2, WALLET, asset_id=8), app_call(3, WALLET)]
+
+    def ids(rows, **filters):
+        return [row.get("id") or row.get("tx_id") for row in filter_records(rows, **filters)]
+
+    assert ids(records, address=WALLET) == ["TX0000", "TX0002", "APP0003"]
+    assert ids(records, asset_id=HEMP) == ["TX0000", "TX0001", "APP0003"]
+    assert ids(records, address=WALLET, asset_id=HEMP) == ["TX0000", "APP0003"]
+    assert ids(records, app_id=APP) == ["APP0003"]
+    assert ids(records) == ["TX0000", "TX0001", "TX0002", "APP0003"]
+
+    # Flattened rows keep the top-level references only
+    path = tmp_path / "history.ndjson"
+    write_records((flatten_transaction(record) for record in records), path)
+    assert ids(read_records(path), address=WALLET, asset_id=HEMP) == ["TX0000"]
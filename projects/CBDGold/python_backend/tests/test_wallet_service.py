@@ -0,0 +1,91 @@
+import asyncio
+import base64
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+from fastapi.testclient import TestClient
+
+from python_backend import main
+from python_backend.models.models import StakingPosition
+from python_backend.services.wallet_service import WalletService, staking_position
+
+_, ADDRESS = account.generate_account()
+STAKING_APP = 123456789
+
+
+def local_state(**values):
+    return {"id": STAKING_APP, "key-value": [
+        {"key": base64.b64encode(key.encode()).decode(), "value": {"type": 2, "uint": value}}
+        for key, value in values.items()
+    ]}
+
+
+class FakeAlgod:
+    """An account holding HEMP and staked in the staking app, with ``apps`` other local states before it"""
+
+    def __init__(self, apps=0, inline_limit=None):
+        self.inline_limit = inline_limit
+        self.states = [{"id": app_id, "key-value": []} for app_id in range(1, apps + 1)]
+        self.states.append(local_state(staked_amount=5_000, tier=2, pending=7, reward_debt=3, other=1))
+        self.assets = [{"asset-id": 748025551, "amount": 42}]
+        self.calls = []
+
+    def account_info(self, address, exclude=None):
+        self.calls.append(("account_info", exclude))
+        info = {"address": address, "amount": 2_000_000, "round": 500,
+                "total-apps-opted-in": len(self.states), "total-assets-opted-in": len(self.assets)}
+        if exclude == "all":
+            return info
+        if self.inline_limit is not None and len(self.states) > self.inline_limit:
+            raise AlgodHTTPError("too many resources", 400)
+        return {**info, "assets": self.assets, "apps-local-state": self.states[:self.inline_limit]}
+
+    def account_assets_info(self, address, limit, next_page=None):
+        self.calls.append(("account_assets_info", next_page))
+        return {"asset-holdings": [{"asset-holding": holding} for holding in self.assets]}
+
+    def account_applications_info(self, address, limit, next_page=None):
+        self.calls.append(("account_applications_info", next_page))
+        start = int(next_page or 0)
+        page = self.states[start:start + limit]
+        next_token = str(start + limit) if start + limit < len(self.states) else None
+        return {"application-resources": [{"id": s["id"], "app-local-state": s} for s in page],
+                "next-token": next_token}
+
+
+def service(algod_client):
+    wallet_service = WalletService()
+    wallet_service.algod_client = algod_client
+    wallet_service.page_size = 2
+    return wallet_service
+
+
+def test_staking_position_decodes_contract_keys():
+    assert staking_position(local_state(staked_amount=5_000, tier=2, pending=7, reward_debt=3, other=1)) == \
+        StakingPosition(staked_amount=5_000, tier=2, pending=7, reward_debt=3)
+    assert staking_position({"id": STAKING_APP}) == StakingPosition()
+    assert staking_position({**local_state(staked_amount=1), "deleted": True}) is None
+    assert staking_position(None) is None
+
+
+@pytest.mark.parametrize("algod_client, paged", [
+    (FakeAlgod(), False),
+    (FakeAlgod(apps=3, inline_limit=2), True),  # local states truncated inline
+    (FakeAlgod(apps=5, inline_limit=1), True),  # account too large to list inline
+])
+def test_wallet_reads_staking_local_state(algod_client, paged):
+    wallet = asyncio.run(service(algod_client).get_wallet_info(ADDRESS))
+    assert (wallet.hemp_balance, wallet.staked_hemp, wallet.staking_tier, wallet.round) == (42, 5_000, 2, 500)
+    assert wallet.staking.pending == 7
+    assert any(call[0] == "account_applications_info" for call in algod_client.calls) == paged
+
+
+def test_unreadable_wallet_is_503(monkeypatch):
+    def fail(address):
+        raise AlgodHTTPError("algod unavailable", 502)
+
+    monkeypatch.setattr(main.wallet_service, "_fetch_wallet_info", fail)
+    client = TestClient(main.app)
+    assert client.get(f"/api/wallet/{ADDRESS}").status_code == 503
+    assert client.get("/api/wallet/not-an-address").status_code == 400
@@ -2,5 +2,21 @@
 
 from .logger import get_logger, setup_logging, SecurityLogger
 from .security import SecurityManager
+from .submission import (
+    SubmissionPipeline, SuggestedParamsCache, ConfirmationWatcher, TransactionSubmissionError
+)
+from .idempotency import IdempotencyStore, IdempotencyConflictError, lease_for_key
+from .skiplist import IndexableSkipList
+from .ring_buffer import RingBuffer
+from .teal_cache import TealCompiler, CompiledProgram
+from .deployment import DeploymentOrchestrator, DeploymentError
+from .bulk_assets import BulkAssetEngine, BulkCheckpoint, AssetMint, AssetOptIn, AssetTransfer
 
-__all__ = ["get_logger", "setup_logging", "SecurityLogger", "SecurityManager"]
+__all__ = [
+    "get_logger", "setup_logging", "SecurityLogger", "SecurityManager",
+    "SubmissionPipeline", "SuggestedParamsCache", "ConfirmationWatcher", "TransactionSubmissionError",
+    "IdempotencyStore", "IdempotencyConflictError", "lease_for_key",
+    "IndexableSkipList", "RingBuffer", "TealCompiler", "CompiledProgram",
+    "DeploymentOrchestrator", "DeploymentError",
+    "BulkAssetEngine", "BulkCheckpoint", "AssetMint", "AssetOptIn", "AssetTransfer"
+]
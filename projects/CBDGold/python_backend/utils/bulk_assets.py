@@ -0,0 +1,486 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from algosdk import constants, encoding, transaction
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client import indexer
+from .idempotency import lease_for_key
+from .logger import get_logger
+from .submission import SubmissionPipeline, TransactionSubmissionError
+
+logger = get_logger(__name__)
+
+MAX_GROUP_SIZE = constants.tx_group_limit
+LEASE_SCOPE = "bulk_assets"
+# algod: "... receiver error: must optin, asset 123 missing from ADDRESS"
+_NOT_OPTED_IN = re.compile(r"missing from ([A-Z2-7]{58})")
+
+
+@dataclass(frozen=True)
+class AssetMint:
+    """Create an ASA with ``sender`` as manager, reserve, freeze and clawback"""
+    kind: ClassVar[str] = "mint"
+    sender: str
+    name: str
+    unit: str
+    total: int
+    decimals: int = 0
+    url: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"mint:{self.sender}:{self.unit}"
+
+    @property
+    def account(self) -> str:
+        return self.sender
+
+    def build(self, sp: transaction.SuggestedParams) -> transaction.Transaction:
+        return transaction.AssetConfigTxn(
+            sender=self.sender, sp=sp, total=self.total, decimals=self.decimals, default_frozen=False,
+            unit_name=self.unit, asset_name=self.name, manager=self.sender, reserve=self.sender,
+            freeze=self.sender, clawback=self.sender, url=self.url, lease=lease_for_key(LEASE_SCOPE, self.key)
+        )
+
+
+@dataclass(frozen=True)
+class AssetOptIn:
+    kind: ClassVar[str] = "opt_in"
+    sender: str
+    asset_id: int
+
+    @property
+    def key(self) -> str:
+        return f"opt_in:{self.asset_id}:{self.sender}"
+
+    @property
+    def account(self) -> str:
+        return self.sender
+
+    def build(self, sp: transaction.SuggestedParams) -> transaction.Transaction:
+        return transaction.AssetOptInTxn(self.sender, sp, self.asset_id, lease=lease_for_key(LEASE_SCOPE, self.key))
+
+
+@dataclass(frozen=True)
+class AssetTransfer:
+    kind: ClassVar[str] = "transfer"
+    sender: str
+    receiver: str
+    asset_id: int
+    amount: int
+
+    @property
+    def key(self) -> str:
+        return f"transfer:{self.asset_id}:{self.sender}:{self.receiver}"
+
+    @property
+    def account(self) -> str:
+        return self.receiver
+
+    def build(self, sp: transaction.SuggestedParams) -> transaction.Transaction:
+        return transaction.AssetTransferTxn(self.sender, sp, self.receiver, self.amount, self.asset_id,
+                                            lease=lease_for_key(LEASE_SCOPE, self.key))
+
+
+Operation = Union[AssetMint, AssetOptIn, AssetTransfer]
+OPERATIONS = {op.kind: op for op in (AssetMint, AssetOptIn, AssetTransfer)}
+
+
+def operation_from_payload(payload: Dict[str, Any]) -> Operation:
+    fields = dict(payload)
+    return OPERATIONS[fields.pop("kind")](**fields)
+
+
+def pack_groups(operations: Sequence[Operation], group_size: int = MAX_GROUP_SIZE) -> List[List[Operation]]:
+    """Pack operations into atomic groups in order.
+
+    Consecutive operations on the same account (an opt-in followed by the
+    transfer to it, or a manager's mints) stay in one group where they fit.
+    Groups are confirmed independently, so splitting them could send the
+    transfer before the opt-in.
+    """
+    groups: List[List[Operation]] = []
+    current: List[Operation] = []
+    run: List[Operation] = []
+
+    def flush_run():
+        nonlocal current
+        if current and len(current) + len(run) > group_size:
+            groups.append(current)
+            current = []
+        current.extend(run)
+        while len(current) > group_size:
+            groups.append(current[:group_size])
+            current = current[group_size:]
+
+    for op in operations:
+        if run and run[-1].account != op.account:
+            flush_run()
+            run = []
+        run.append(op)
+    flush_run()
+    if current:
+        groups.append(current)
+    return groups
+
+
+# Signing keys of a pool worker, installed once by the pool initializer
+_WORKER_SIGNERS: Dict[str, str] = {}
+
+
+def _init_signer(signers: Dict[str, str]):
+    global _WORKER_SIGNERS
+    _WORKER_SIGNERS = signers
+
+
+def sign_groups(groups: Sequence[Sequence[Operation]], sp: transaction.SuggestedParams,
+                signers: Optional[Dict[str, str]] = None) -> List[List[Tuple[str, str]]]:
+    """Build, group and sign; returns (tx id, base64 msgpack) pairs per group"""
+    keys = _WORKER_SIGNERS if signers is None else signers
+    signed = []
+    for group in groups:
+        txns = [op.build(sp) for op in group]
+        if len(txns) > 1:
+            transaction.assign_group_id(txns)
+        signed.append([(stxn.get_txid(), encoding.msgpack_encode(stxn))
+                       for stxn in (txn.sign(keys[txn.sender]) for txn in txns)])
+    return signed
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    group_tx TEXT,
+    tx_id TEXT,
+    signed TEXT,
+    last_valid INTEGER,
+    confirmed_round INTEGER,
+    asset_id INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS operations_status ON operations (status, seq);
+"""
+
+
+class BulkCheckpoint:
+    """Per-operation progress of a bulk job, kept in SQLite.
+
+    Operations move from ``pending`` to ``sent`` and then to ``confirmed``,
+    ``skipped`` (the receiver is not opted in) or ``failed``. The signed
+    bytes are written before a group is sent. After a crash, the same group
+    can be re-broadcast or looked up, and is never rebuilt and sent twice.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        path = Path(db_path)
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def add(self, operations: Iterable[Operation]) -> int:
+        """Register operations; keys already in the checkpoint keep their progress"""
+        rows = [(op.key, json.dumps({"kind": op.kind, **asdict(op)})) for op in operations]
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO operations (key, payload) VALUES (?, ?)", rows)
+            return self._db.total_changes - before
+
+    def pending(self) -> List[Operation]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT payload FROM operations WHERE status = 'pending' ORDER BY seq"
+            ).fetchall()
+        return [operation_from_payload(json.loads(row[0])) for row in rows]
+
+    def sent_groups(self) -> List[Tuple[List[Operation], List[Tuple[str, str]], int]]:
+        """Groups sent but never seen confirmed: (operations, signed txns, last valid round)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT group_tx, payload, tx_id, signed, last_valid FROM operations "
+                "WHERE status = 'sent' ORDER BY seq"
+            ).fetchall()
+        groups: Dict[str, Tuple[List[Operation], List[Tuple[str, str]], int]] = {}
+        for group_tx, payload, tx_id, signed, last_valid in rows:
+            ops, txns, _ = groups.setdefault(group_tx, ([], [], last_valid))
+            ops.append(operation_from_payload(json.loads(payload)))
+            txns.append((tx_id, signed))
+        return list(groups.values())
+
+    def mark_sent(self, groups: Sequence[Tuple[Sequence[Operation], Sequence[Tuple[str, str]]]], last_valid: int):
+        rows = []
+        for ops, txns in groups:
+            group_tx = txns[0][0]
+            rows.extend((group_tx, tx_id, signed, last_valid, op.key) for op, (tx_id, signed) in zip(ops, txns))
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE operations SET status = 'sent', group_tx = ?, tx_id = ?, signed = ?, last_valid = ?, "
+                "error = NULL WHERE key = ?", rows
+            )
+
+    def mark_confirmed(self, ops: Sequence[Operation], confirmed_round: Optional[int],
+                       asset_ids: Optional[Dict[str, int]] = None):
+        asset_ids = asset_ids or {}
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE operations SET status = 'confirmed', confirmed_round = ?, asset_id = ?, signed = NULL "
+                "WHERE key = ?",
+                [(confirmed_round, asset_ids.get(op.key), op.key) for op in ops]
+            )
+
+    def mark(self, ops: Sequence[Operation], status: str, error: Optional[str] = None):
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE operations SET status = ?, error = ?, signed = NULL WHERE key = ?",
+                [(status, error, op.key) for op in ops]
+            )
+
+    def retry_failed(self) -> int:
+        """Return failed and skipped operations to pending"""
+        with self._lock, self._db:
+            return self._db.execute(
+                "UPDATE operations SET status = 'pending', error = NULL WHERE status IN ('failed', 'skipped')"
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM operations GROUP BY status").fetchall()
+        return dict(rows)
+
+    def results(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        where = "WHERE status = ?" if status else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, status, tx_id, confirmed_round, asset_id, error FROM operations {where} ORDER BY seq",
+                (status,) if status else ()
+            ).fetchall()
+        return [dict(zip(("key", "status", "tx_id", "confirmed_round", "asset_id", "error"), row)) for row in rows]
+
+    def close(self):
+        self._db.close()
+
+
+class BulkAssetEngine:
+    """Mints, opt-ins and transfers packed into atomic groups of 16.
+
+    Groups are built and signed in sign batches on a process pool. Each batch
+    is signed while earlier batches are still being submitted. At most
+    ``concurrency`` groups are unconfirmed at once, and all of them are
+    confirmed through the pipeline's shared watcher.
+
+    A group that algod rejects because a receiver has not opted in is retried
+    without that receiver, who is marked ``skipped``. Groups sent before an
+    interruption are re-broadcast on the next run. algod reports those that
+    already landed, and ``indexer_client`` looks up the ones whose validity
+    window has closed. A group the indexer has not found counts as never
+    landed only once the indexer has caught up to its last valid round;
+    until then it stays ``sent`` for the next run.
+    """
+
+    def __init__(self, pipeline: SubmissionPipeline, signers: Dict[str, str], checkpoint: BulkCheckpoint,
+                 workers: int = 0, concurrency: int = 32, sign_batch: int = 64, wait_rounds: int = 10,
+                 indexer_client: Optional[indexer.IndexerClient] = None):
+        self.pipeline = pipeline
+        self.signers = signers
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.concurrency = concurrency
+        self.sign_batch = sign_batch
+        self.wait_rounds = wait_rounds
+        self.indexer_client = indexer_client
+        self._confirmed_txns = 0
+
+    async def run(self, operations: Iterable[Operation] = ()) -> Dict[str, Any]:
+        """Add ``operations`` to the checkpoint and drive every unfinished one; returns status counts"""
+        added = self.checkpoint.add(operations)
+        if added:
+            logger.info(f"Added {added} operations to the checkpoint")
+        started = time.perf_counter()
+        self._confirmed_txns = 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        await self._recover(semaphore)
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_signer, initargs=(self.signers,)) \
+            if self.workers > 1 else None
+        try:
+            while True:
+                pending = self.checkpoint.pending()
+                if not pending:
+                    break
+                missing = {op.sender for op in pending} - self.signers.keys()
+                if missing:
+                    raise KeyError(f"No signing key for {', '.join(sorted(missing))}")
+                # Rejected groups return their other operations to pending for another pass
+                await self._process(pack_groups(pending), semaphore, pool)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        counts = self.checkpoint.counts()
+        logger.info(f"Bulk job: {counts} ({self._confirmed_txns / max(elapsed, 1e-9):,.0f} txn/s confirmed)")
+        return {"counts": counts, "confirmed_txns": self._confirmed_txns, "elapsed": elapsed}
+
+    async def _process(self, groups: List[List[Operation]], semaphore: asyncio.Semaphore,
+                       pool: Optional[ProcessPoolExecutor]):
+        loop = asyncio.get_running_loop()
+        batches = [groups[i:i + self.sign_batch] for i in range(0, len(groups), self.sign_batch)]
+        lookahead = max(2, 2 * self.workers)
+        signing: deque = deque()
+        tasks: List[asyncio.Task] = []
+
+        def start_signing(batch: List[List[Operation]]):
+            sp = self.pipeline.suggested_params()
+            if pool:
+                future = loop.run_in_executor(pool, sign_groups, batch, sp)
+            else:
+                future = asyncio.to_thread(sign_groups, batch, sp, self.signers)
+            signing.append((batch, sp.last, future))
+
+        next_batch = signed_groups = 0
+        while signing or next_batch < len(batches):
+            while len(signing) < lookahead and next_batch < len(batches):
+                start_signing(batches[next_batch])
+                next_batch += 1
+            batch, last_valid, future = signing.popleft()
+            signed = await future
+            self.checkpoint.mark_sent(list(zip(batch, signed)), last_valid)
+            signed_groups += len(batch)
+            for ops, txns in zip(batch, signed):
+                await semaphore.acquire()
+                task = asyncio.create_task(self._submit(ops, txns))
+                task.add_done_callback(lambda _: semaphore.release())
+                tasks.append(task)
+            logger.info(f"Signed {signed_groups:,}/{len(groups):,} groups; "
+                        f"{self._confirmed_txns:,} txns confirmed")
+        await asyncio.gather(*tasks)
+
+    async def _submit(self, ops: List[Operation], txns: List[Tuple[str, str]]):
+        try:
+            info = await self.pipeline.submit_raw([signed for _, signed in txns], self.wait_rounds)
+        except (AlgodHTTPError, TransactionSubmissionError) as e:
+            if isinstance(e, TransactionSubmissionError) and e.reason.startswith("not confirmed"):
+                # May still land; the next run re-broadcasts or looks it up
+                logger.warning(f"Group {txns[0][0]} unconfirmed after {self.wait_rounds} rounds")
+                return
+            self._rejected(ops, str(e))
+            return
+        await self._confirmed(ops, txns, info.get("confirmed-round"))
+
+    async def _confirmed(self, ops: List[Operation], txns: List[Tuple[str, str]], confirmed_round: Optional[int],
+                         asset_ids: Optional[Dict[str, int]] = None):
+        if asset_ids is not None:
+            self.checkpoint.mark_confirmed(ops, confirmed_round, asset_ids)
+            self._confirmed_txns += len(ops)
+            return
+        asset_ids = {}
+        for op, (tx_id, _) in zip(ops, txns):
+            if isinstance(op, AssetMint):
+                try:
+                    info = await asyncio.to_thread(self.pipeline.algod_client.pending_transaction_info, tx_id)
+                    asset_ids[op.key] = info.get("asset-index")
+                except AlgodHTTPError:
+                    logger.warning(f"Asset id of {op.unit} unavailable; look up transaction {tx_id}")
+        self.checkpoint.mark_confirmed(ops, confirmed_round, asset_ids)
+        self._confirmed_txns += len(ops)
+
+    def _rejected(self, ops: List[Operation], error: str):
+        match = _NOT_OPTED_IN.search(error)
+        if match:
+            receiver = match.group(1)
+            skipped = [op for op in ops if isinstance(op, AssetTransfer) and op.receiver == receiver]
+            if skipped:
+                self.checkpoint.mark(skipped, "skipped", f"{receiver} is not opted in")
+                self.checkpoint.mark([op for op in ops if op not in skipped], "pending")
+                return
+        logger.error(f"Group of {len(ops)} rejected: {error}")
+        self.checkpoint.mark(ops, "failed", error)
+
+    async def _recover(self, semaphore: asyncio.Semaphore):
+        """Settle groups left ``sent`` by an earlier run"""
+        sent = self.checkpoint.sent_groups()
+        if not sent:
+            return
+        logger.info(f"Re-checking {len(sent)} groups sent by an earlier run")
+        status = await asyncio.to_thread(self.pipeline.algod_client.status)
+
+        async def recover(ops: List[Operation], txns: List[Tuple[str, str]], last_valid: int):
+            async with semaphore:
+                if last_valid < status["last-round"]:
+                    await self._look_up(ops, txns, last_valid)
+                    return
+                try:
+                    info = await self.pipeline.submit_raw([signed for _, signed in txns], self.wait_rounds)
+                except (AlgodHTTPError, TransactionSubmissionError) as e:
+                    if "already in ledger" in str(e):
+                        await self._landed(ops, txns)
+                    elif isinstance(e, TransactionSubmissionError) and e.reason.startswith("not confirmed"):
+                        logger.warning(f"Group {txns[0][0]} still unconfirmed")
+                    else:
+                        self._rejected(ops, str(e))
+                    return
+                await self._confirmed(ops, txns, info.get("confirmed-round"))
+
+        await asyncio.gather(*(recover(*group) for group in sent))
+
+    async def _indexed(self, ops: List[Operation],
+                       txns: List[Tuple[str, str]]) -> Tuple[int, Optional[int], Dict[str, int]]:
+        """The indexer's current round, and the group's confirmed round and created asset ids if it has them"""
+        found = await asyncio.to_thread(self.indexer_client.search_transactions, txid=txns[0][0])
+        landed = found.get("transactions") or []
+        if not landed:
+            return found.get("current-round", 0), None, {}
+        asset_ids = {}
+        for op, (tx_id, _) in zip(ops, txns):
+            if isinstance(op, AssetMint):
+                if tx_id != txns[0][0]:
+                    minted = await asyncio.to_thread(self.indexer_client.search_transactions, txid=tx_id)
+                    txn = (minted.get("transactions") or [{}])[0]
+                else:
+                    txn = landed[0]
+                asset_ids[op.key] = txn.get("created-asset-index")
+        return found.get("current-round", 0), landed[0].get("confirmed-round"), asset_ids
+
+    async def _landed(self, ops: List[Operation], txns: List[Tuple[str, str]]):
+        """Record a group algod reports as already in the ledger, with its round and created asset ids"""
+        try:
+            info = await asyncio.to_thread(self.pipeline.algod_client.pending_transaction_info, txns[0][0])
+        except AlgodHTTPError:
+            info = {}  # algod no longer remembers the txn
+        if info.get("confirmed-round") or self.indexer_client is None:
+            await self._confirmed(ops, txns, info.get("confirmed-round"))
+            return
+        _, confirmed_round, asset_ids = await self._indexed(ops, txns)
+        if confirmed_round is None:
+            logger.warning(f"Group {txns[0][0]} is in the ledger but not yet indexed; re-checking on the next run")
+            return
+        await self._confirmed(ops, txns, confirmed_round, asset_ids)
+
+    async def _look_up(self, ops: List[Operation], txns: List[Tuple[str, str]], last_valid: int):
+        """Resolve a group whose validity window closed: it either landed or never will"""
+        if self.indexer_client is None:
+            self.checkpoint.mark(ops, "failed", f"expired before confirmation was seen; check tx {txns[0][0]}")
+            return
+        current_round, confirmed_round, asset_ids = await self._indexed(ops, txns)
+        if confirmed_round is not None:
+            await self._confirmed(ops, txns, confirmed_round, asset_ids)
+        elif current_round < last_valid:
+            # The group may sit in a block the indexer has not reached; resending could pay twice
+            logger.warning(f"Indexer at round {current_round}, before group {txns[0][0]}'s last valid round "
+                           f"{last_valid}; re-checking on the next run")
+        else:
+            self.checkpoint.mark(ops, "pending")
@@ -0,0 +1,353 @@
+import asyncio
+import base64
+import json
+import os
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from algosdk import account, encoding, logic, transaction
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client import algod
+from ..avm.contracts import load_contract
+from .logger import get_logger
+from .submission import SubmissionPipeline
+from .teal_cache import TealCompiler
+
+logger = get_logger(__name__)
+
+MANIFEST_FORMAT = 1
+GLOBAL_SCHEMA = transaction.StateSchema(num_uints=64, num_byte_slices=16)
+LOCAL_SCHEMA = transaction.StateSchema(num_uints=16, num_byte_slices=16)
+# App account minimum balance plus headroom for inner transaction fees
+DEFAULT_APP_FUNDING = 300_000
+
+
+@dataclass
+class ContractSpec:
+    name: str  # manifest key
+    module: str  # avm.load_contract short name
+    description: str
+
+
+CONTRACTS = [
+    ContractSpec("CBDGoldStaking", "staking", "HEMP token staking with reward tiers"),
+    ContractSpec("CBDGoldGovernance", "governance", "WEED token governance and voting"),
+    ContractSpec("CBDGoldPrize", "prize", "Prize distribution and NFT rewards"),
+]
+
+
+class DeploymentError(Exception):
+    pass
+
+
+@dataclass
+class Step:
+    """One deployment action: a transaction group plus a check of its on-chain effect"""
+    name: str
+    requires: Tuple[str, ...]
+    build: Callable[[transaction.SuggestedParams], List[transaction.Transaction]]
+    done: Callable[[], bool]
+    confirmed: Optional[Callable[[Dict[str, Any]], None]] = None
+
+
+def dependency_levels(steps: Sequence[Step]) -> List[List[Step]]:
+    """Group steps into levels whose dependencies all sit in earlier levels"""
+    names = {step.name for step in steps}
+    for step in steps:
+        missing = [r for r in step.requires if r not in names]
+        if missing:
+            raise ValueError(f"Step {step.name} requires unknown steps {missing}")
+    levels: List[List[Step]] = []
+    placed: set = set()
+    remaining = list(steps)
+    while remaining:
+        level = [step for step in remaining if all(r in placed for r in step.requires)]
+        if not level:
+            raise ValueError(f"Dependency cycle between {[step.name for step in remaining]}")
+        levels.append(level)
+        placed.update(step.name for step in level)
+        remaining = [step for step in remaining if step.name not in placed]
+    return levels
+
+
+class DeploymentOrchestrator:
+    """Deploys and wires the staking, governance and prize contracts.
+
+    All three contracts are compiled concurrently. Deployment then runs as a
+    dependency graph in levels: the app creations go out together, then
+    app funding, the staking ``set_params`` and the prize ``set_staking_app``
+    go out together. A full deploy therefore waits for two confirmations
+    rather than one per step.
+
+    Each step checks its effect on chain before it sends anything. An app
+    from the manifest still runs the same approval program, its account
+    holds the funding, and its global state already has the wiring. Re-running
+    after a failure or an interruption only sends what is missing. The
+    manifest (``deployment.json``) is rewritten atomically after every level.
+
+    The signed groups of a level are saved to the manifest as ``pending``
+    before they are sent. A run that dies between submitting and recording
+    leaves them there, and the next run settles them first: it re-sends the
+    identical group (same tx id, so it cannot apply twice) and records its
+    confirmation. A group that has expired unseen falls back to the chain
+    checks; for an app creation that includes looking for an app the deployer
+    created with the same approval program, so the app is not created twice.
+    """
+
+    def __init__(self, algod_client: algod.AlgodClient, private_key: str,
+                 manifest_path: Union[str, Path], hemp_asset_id: int, reward_rate: int = 0,
+                 app_funding: int = DEFAULT_APP_FUNDING, network: str = "testnet",
+                 compiler: Optional[TealCompiler] = None, pipeline: Optional[SubmissionPipeline] = None,
+                 wait_rounds: int = 4):
+        self.algod_client = algod_client
+        self.private_key = private_key
+        self.sender = account.address_from_private_key(private_key)
+        self.manifest_path = Path(manifest_path)
+        self.hemp_asset_id = hemp_asset_id
+        self.reward_rate = reward_rate
+        self.app_funding = app_funding
+        self.network = network
+        self.compiler = compiler or TealCompiler(algod_client)
+        self.pipeline = pipeline or SubmissionPipeline(algod_client)
+        self.wait_rounds = wait_rounds
+        self.manifest = self._load_manifest()
+
+    # ------------------------------------------------------------ manifest
+    def _new_manifest(self) -> Dict[str, Any]:
+        return {
+            "manifest_format": MANIFEST_FORMAT,
+            "deployment_timestamp": int(time.time()),
+            "deployer_address": self.sender,
+            "network": self.network,
+            "contracts": {},
+            "steps": {},
+            "asset_ids": {"HEMP": self.hemp_asset_id},
+        }
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if not self.manifest_path.exists():
+            return self._new_manifest()
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("deployer_address") != self.sender or manifest.get("network") != self.network:
+            # Apps created by another admin cannot be wired by this one
+            logger.warning(f"{self.manifest_path} belongs to another deployer or network; starting a new deployment")
+            return self._new_manifest()
+        manifest.setdefault("contracts", {})
+        manifest.setdefault("steps", {})
+        manifest.setdefault("asset_ids", {})["HEMP"] = self.hemp_asset_id
+        return manifest
+
+    def save_manifest(self):
+        self.manifest["deployment_timestamp"] = int(time.time())
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def app_id(self, name: str) -> int:
+        return self.manifest["contracts"].get(name, {}).get("app_id", 0)
+
+    # ------------------------------------------------------------ chain reads
+    def _app_params(self, app_id: int) -> Optional[Dict[str, Any]]:
+        if not app_id:
+            return None
+        try:
+            return self.algod_client.application_info(app_id)["params"]
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def _global_state(self, app_id: int) -> Dict[str, Any]:
+        state = {}
+        for entry in (self._app_params(app_id) or {}).get("global-state") or []:
+            value = entry["value"]
+            state[base64.b64decode(entry["key"]).decode(errors="replace")] = (
+                base64.b64decode(value.get("bytes", "")) if value.get("type") == 1 else value.get("uint", 0)
+            )
+        return state
+
+    # ------------------------------------------------------------ steps
+    def _create(self, spec: ContractSpec, compiled: Dict[str, Any],
+                sp: transaction.SuggestedParams) -> List[transaction.Transaction]:
+        return [transaction.ApplicationCreateTxn(
+            sender=self.sender,
+            sp=sp,
+            on_complete=transaction.OnComplete.NoOpOC,
+            approval_program=compiled["approval_program"],
+            clear_program=compiled["clear_program"],
+            global_schema=GLOBAL_SCHEMA,
+            local_schema=LOCAL_SCHEMA,
+        )]
+
+    def _adopt_created(self, spec: ContractSpec, compiled: Dict[str, Any]):
+        """Record the newest app the deployer created with this approval program"""
+        created = self.algod_client.account_info(self.sender).get("created-apps") or []
+        matches = [app["id"] for app in created
+                   if base64.b64decode(app["params"].get("approval-program", "")) == compiled["approval_program"]]
+        if matches and max(matches) != self.app_id(spec.name):
+            logger.info(f"{spec.name}: found app {max(matches)} from an unrecorded earlier submission")
+            self._on_created(spec, {"application-index": max(matches)})
+
+    def _is_created(self, spec: ContractSpec, compiled: Dict[str, Any]) -> bool:
+        if self._pending(f"create:{spec.name}"):
+            self._adopt_created(spec, compiled)
+        params = self._app_params(self.app_id(spec.name))
+        if params is None:
+            return False
+        if base64.b64decode(params.get("approval-program", "")) != compiled["approval_program"]:
+            logger.info(f"{spec.name} changed since app {self.app_id(spec.name)}; creating a new app")
+            return False
+        return True
+
+    def _on_created(self, spec: ContractSpec, result: Dict[str, Any]):
+        app_id = result["application-index"]
+        self.manifest["contracts"][spec.name] = {
+            "app_id": app_id,
+            "app_address": logic.get_application_address(app_id),
+            "name": spec.name,
+            "description": spec.description,
+        }
+
+    def _app_balance(self, name: str) -> int:
+        address = logic.get_application_address(self.app_id(name))
+        return self.algod_client.account_info(address).get("amount", 0)
+
+    def _fund(self, spec: ContractSpec, sp: transaction.SuggestedParams) -> List[transaction.Transaction]:
+        address = logic.get_application_address(self.app_id(spec.name))
+        return [transaction.PaymentTxn(self.sender, sp, address, self.app_funding - self._app_balance(spec.name))]
+
+    def _set_params(self, sp: transaction.SuggestedParams) -> List[transaction.Transaction]:
+        return [transaction.ApplicationNoOpTxn(
+            self.sender, sp, self.app_id("CBDGoldStaking"),
+            app_args=[b"set_params", self.hemp_asset_id.to_bytes(8, "big"), self.reward_rate.to_bytes(8, "big")]
+        )]
+
+    def _params_set(self) -> bool:
+        state = self._global_state(self.app_id("CBDGoldStaking"))
+        if state.get("asset_id") not in (None, 0, self.hemp_asset_id):
+            # set_params only assigns the staking asset once
+            raise DeploymentError(f"Staking app already uses asset {state['asset_id']}, not {self.hemp_asset_id}")
+        return state.get("asset_id") == self.hemp_asset_id and state.get("reward_rate") == self.reward_rate
+
+    def _set_staking_app(self, sp: transaction.SuggestedParams) -> List[transaction.Transaction]:
+        return [transaction.ApplicationNoOpTxn(
+            self.sender, sp, self.app_id("CBDGoldPrize"),
+            app_args=[b"set_staking_app", self.app_id("CBDGoldStaking").to_bytes(8, "big")]
+        )]
+
+    def _staking_app_set(self) -> bool:
+        state = self._global_state(self.app_id("CBDGoldPrize"))
+        return state.get("staking_app_id") == self.app_id("CBDGoldStaking")
+
+    def plan(self, compiled: Dict[str, Dict[str, Any]]) -> List[Step]:
+        """The deployment graph: creations, then funding and wiring"""
+        steps = []
+        for spec in CONTRACTS:
+            create = f"create:{spec.name}"
+            steps.append(Step(create, (), partial(self._create, spec, compiled[spec.name]),
+                              partial(self._is_created, spec, compiled[spec.name]), partial(self._on_created, spec)))
+            if self.app_funding:
+                steps.append(Step(f"fund:{spec.name}", (create,), partial(self._fund, spec),
+                                  lambda name=spec.name: self._app_balance(name) >= self.app_funding))
+        steps.append(Step("set_params", ("create:CBDGoldStaking",), self._set_params, self._params_set))
+        steps.append(Step("set_staking_app", ("create:CBDGoldStaking", "create:CBDGoldPrize"),
+                          self._set_staking_app, self._staking_app_set))
+        return steps
+
+    # ------------------------------------------------------------ execution
+    def _pending(self, name: str) -> Optional[Dict[str, Any]]:
+        return (self.manifest["steps"].get(name) or {}).get("pending")
+
+    def _record(self, step: Step, result: Dict[str, Any]):
+        if step.confirmed:
+            step.confirmed(result)
+        self.manifest["steps"][step.name] = {
+            "tx_id": result["tx-id"],
+            "confirmed_round": result.get("confirmed-round"),
+        }
+
+    def _confirmed_info(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            info = self.algod_client.pending_transaction_info(tx_id)
+        except AlgodHTTPError:
+            return None  # algod no longer knows the txn
+        if info.get("confirmed-round", 0) > 0:
+            return {"tx-id": tx_id, **info}
+        return None
+
+    async def _resume(self, step: Step):
+        """Settle a group an earlier run sent but did not record"""
+        pending = self._pending(step.name)
+        if not pending:
+            return
+        try:
+            # The same signed group has the same tx id; it is refused if already in the ledger
+            result = await self.pipeline.submit_raw(pending["group"], self.wait_rounds)
+        except Exception as e:
+            result = await asyncio.to_thread(self._confirmed_info, pending["tx_id"])
+            if result is None:
+                logger.info(f"{step.name}: earlier submission {pending['tx_id']} not found ({e}); checking chain state")
+                return
+        logger.info(f"{step.name}: earlier submission {pending['tx_id']} confirmed")
+        self._record(step, result)
+
+    async def compile_all(self) -> Dict[str, Dict[str, Any]]:
+        """Compile every contract concurrently (cached builds return immediately)"""
+        async def compile_one(spec: ContractSpec) -> Dict[str, Any]:
+            module = load_contract(spec.module)
+            return await asyncio.to_thread(self.compiler.compile_contract, spec.name,
+                                           module.approval_program, module.clear_state_program)
+
+        results = await asyncio.gather(*(compile_one(spec) for spec in CONTRACTS))
+        return {spec.name: result for spec, result in zip(CONTRACTS, results)}
+
+    async def run(self) -> Dict[str, Any]:
+        """Bring the deployment up to date; returns the manifest"""
+        started = time.perf_counter()
+        compiled = await self.compile_all()
+        for depth, level in enumerate(dependency_levels(self.plan(compiled))):
+            await asyncio.gather(*(self._resume(step) for step in level))
+            done = await asyncio.gather(*(asyncio.to_thread(step.done) for step in level))
+            pending = [step for step, finished in zip(level, done) if not finished]
+            skipped = [step.name for step, finished in zip(level, done) if finished]
+            for name in skipped:
+                (self.manifest["steps"].get(name) or {}).pop("pending", None)
+            if skipped:
+                logger.info(f"Level {depth}: already applied {', '.join(skipped)}")
+            if not pending:
+                self.save_manifest()
+                continue
+
+            sp = self.pipeline.suggested_params()
+            groups = [[txn.sign(self.private_key) for txn in step.build(sp)] for step in pending]
+            # Saved before sending, so a crash before the results are recorded cannot lead to a second send
+            for step, group in zip(pending, groups):
+                self.manifest["steps"][step.name] = {"pending": {
+                    "tx_id": group[0].get_txid(),
+                    "last_valid": sp.last,
+                    "group": [encoding.msgpack_encode(txn) for txn in group],
+                }}
+            self.save_manifest()
+            logger.info(f"Level {depth}: submitting {', '.join(step.name for step in pending)}")
+            results = await asyncio.gather(*(self.pipeline.submit(group, self.wait_rounds) for group in groups),
+                                           return_exceptions=True)
+
+            failed = []
+            for step, result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    failed.append(f"{step.name}: {result}")
+                    continue
+                self._record(step, result)
+            # Confirmed steps are kept even if a sibling failed, so a re-run resumes here
+            self.save_manifest()
+            if failed:
+                raise DeploymentError(f"Level {depth} failed ({'; '.join(failed)}); re-run to resume")
+
+        self.save_manifest()
+        logger.info(f"Deployment up to date in {time.perf_counter() - started:.1f} s")
+        return self.manifest
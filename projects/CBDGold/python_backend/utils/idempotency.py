@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused for a different request body"""
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a JSON-serializable request payload"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def lease_for_key(scope: str, key: str) -> bytes:
+    """32-byte transaction lease derived from an idempotency key.
+
+    Algorand rejects a second transaction from the same sender carrying the
+    same lease while the first one's validity window is open, so retries that
+    slip past this store still cannot land twice on-chain.
+    """
+    return hashlib.sha256(f"{scope}:{key}".encode()).digest()
+
+
+class IdempotencyStore:
+    """Bounded TTL map of (scope, key) to request fingerprint and result.
+
+    Duplicates that arrive while the first request is still running await the
+    same future instead of executing again. Completed entries are kept for
+    ``ttl`` seconds, oldest evicted first once ``max_entries`` is reached.
+    Results with ``status == "error"`` are not retained so clients can retry.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run(self, scope: str, key: str, payload: Any,
+                  func: Callable[[], Awaitable[Any]]) -> Any:
+        """Execute ``func`` once per (scope, key); replay its result afterwards"""
+        now = time.monotonic()
+        self._purge(now)
+
+        entry_key = f"{scope}:{key}"
+        fingerprint = request_fingerprint(payload)
+        entry = self._entries.get(entry_key)
+
+        if entry is not None:
+            if entry["fingerprint"] != fingerprint:
+                raise IdempotencyConflictError(f"Idempotency key {key!r} was used with a different request")
+            logger.debug(f"Replaying idempotent result for {entry_key}")
+            return await asyncio.shield(entry["future"])
+
+        future = asyncio.get_running_loop().create_future()
+        self._entries[entry_key] = {"fingerprint": fingerprint, "future": future, "expires": now + self.ttl}
+        self._evict()
+
+        try:
+            result = await func()
+        except BaseException as e:
+            self._entries.pop(entry_key, None)
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not reported as unhandled
+            future.exception()
+            raise
+
+        future.set_result(result)
+        if isinstance(result, dict) and result.get("status") == "error":
+            self._entries.pop(entry_key, None)
+        return result
+
+    def _purge(self, now: float):
+        while self._entries:
+            entry_key, entry = next(iter(self._entries.items()))
+            if entry["expires"] > now:
+                break
+            self._entries.popitem(last=False)
+
+    def _evict(self):
+        # Never evict in-flight entries: their waiters still need the result
+        while len(self._entries) > self.max_entries:
+            for entry_key, entry in self._entries.items():
+                if entry["future"].done():
+                    del self._entries[entry_key]
+                    break
+            else:
+                break
@@ -0,0 +1,33 @@
+from typing import Any, Iterator, List, Optional
+
+
+class RingBuffer:
+    """Fixed-capacity buffer that overwrites its oldest item, O(1) per append"""
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._items: List[Optional[Any]] = [None] * capacity
+        self._next = 0  # slot the next append writes
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, item: Any):
+        self._items[self._next] = item
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def latest(self, count: Optional[int] = None) -> List[Any]:
+        """Up to ``count`` items, newest first"""
+        count = self._size if count is None else max(0, min(count, self._size))
+        return [self._items[(self._next - 1 - i) % self.capacity] for i in range(count)]
+
+    def __iter__(self) -> Iterator[Any]:
+        """Oldest to newest"""
+        start = (self._next - self._size) % self.capacity
+        for i in range(self._size):
+            yield self._items[(start + i) % self.capacity]
@@ -0,0 +1,146 @@
+import random
+from typing import Any, List, Optional
+
+
+class _Infinity:
+    """Sentinel value greater than anything it is compared with"""
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return other is self
+
+    def __gt__(self, other):
+        return other is not self
+
+    def __ge__(self, other):
+        return True
+
+
+_INF = _Infinity()
+
+
+class _Node:
+    __slots__ = ("value", "next", "width")
+
+    def __init__(self, value: Any, levels: int):
+        self.value = value
+        self.next: List[Optional["_Node"]] = [None] * levels
+        self.width: List[int] = [1] * levels
+
+
+class IndexableSkipList:
+    """Sorted multiset with O(log n) insert, remove, index and rank.
+
+    Each forward link stores how many positions it skips, so the i-th value
+    and the position of a value are found by one descent from the top level.
+    """
+
+    def __init__(self, max_levels: int = 32, seed: Optional[int] = None):
+        self.max_levels = max_levels
+        self._random = random.Random(seed)
+        self._size = 0
+        self._level = 1  # levels currently linked; higher head links are untouched
+        self._tail = _Node(_INF, 0)
+        self._head = _Node(None, max_levels)
+        self._head.next = [self._tail] * max_levels
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _levels(self) -> int:
+        # Geometric distribution: each extra level with probability 1/2
+        bits = self._random.getrandbits(self.max_levels - 1)
+        levels = 1
+        while bits & 1:
+            levels += 1
+            bits >>= 1
+        return levels
+
+    def insert(self, value: Any):
+        levels = self._levels()
+        if levels > self._level:
+            for level in range(self._level, levels):
+                self._head.width[level] = self._size + 1
+            self._level = levels
+
+        chain = [self._head] * self._level
+        steps_at_level = [0] * self._level
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.next[level].value <= value:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        new_node = _Node(value, levels)
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self._level):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, value: Any):
+        """Remove one occurrence of ``value``; raises KeyError if absent"""
+        chain = [self._head] * self._level
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.next[level].value < value:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is self._tail or target.value != value:
+            raise KeyError(value)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self._level):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def _node_at(self, index: int) -> _Node:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(self._level)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int) -> Any:
+        return self._node_at(index).value
+
+    def rank(self, value: Any) -> int:
+        """Zero-based position of ``value``; raises KeyError if absent"""
+        node = self._head
+        position = 0
+        for level in reversed(range(self._level)):
+            while node.next[level].value < value:
+                position += node.width[level]
+                node = node.next[level]
+        if node.next[0] is self._tail or node.next[0].value != value:
+            raise KeyError(value)
+        return position
+
+    def slice(self, start: int, count: int) -> List[Any]:
+        """Up to ``count`` values from position ``start`` in order"""
+        if count <= 0 or start >= self._size:
+            return []
+        node = self._node_at(max(start, 0))
+        values = []
+        while node is not self._tail and len(values) < count:
+            values.append(node.value)
+            node = node.next[0]
+        return values
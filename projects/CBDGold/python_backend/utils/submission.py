@@ -0,0 +1,245 @@
+import asyncio
+import base64
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+from algosdk import encoding, transaction
+from algosdk.v2client import algod
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+SignedTxn = Union[transaction.SignedTransaction, transaction.LogicSigTransaction,
+                  transaction.MultisigTransaction]
+
+
+class TransactionSubmissionError(Exception):
+    """Raised when a submitted transaction is rejected or never confirms"""
+
+    def __init__(self, tx_id: str, reason: str):
+        super().__init__(f"Transaction {tx_id} failed: {reason}")
+        self.tx_id = tx_id
+        self.reason = reason
+
+
+class SuggestedParamsCache:
+    """Round-aware cache of algod suggested params.
+
+    Params fetched at round ``first`` are reused until the estimated current
+    round passes ``first + max_age_rounds``. The estimate advances from the
+    last observed round at ``round_time`` seconds per round, and the
+    confirmation watcher feeds it real rounds as blocks arrive.
+    """
+
+    def __init__(self, algod_client: algod.AlgodClient, max_age_rounds: int = 50,
+                 round_time: float = 2.8):
+        self.algod_client = algod_client
+        self.max_age_rounds = max_age_rounds
+        self.round_time = round_time
+        self._params: Optional[transaction.SuggestedParams] = None
+        self._last_round = 0
+        self._last_round_at = 0.0
+
+    def observe_round(self, round_num: int):
+        """Record a round seen elsewhere (status calls, confirmations)"""
+        if round_num >= self._last_round:
+            self._last_round = round_num
+            self._last_round_at = time.monotonic()
+
+    def estimated_round(self) -> int:
+        if not self._last_round:
+            return 0
+        return self._last_round + int((time.monotonic() - self._last_round_at) / self.round_time)
+
+    def get(self, refresh: bool = False) -> transaction.SuggestedParams:
+        """Return cached params, refetching once they are ``max_age_rounds`` old"""
+        if refresh or self._params is None or \
+                self.estimated_round() - self._params.first >= self.max_age_rounds:
+            self._params = self.algod_client.suggested_params()
+            self.observe_round(self._params.first)
+            logger.debug(f"Refreshed suggested params at round {self._params.first}")
+        return self._params
+
+    def invalidate(self):
+        self._params = None
+
+
+class ConfirmationWatcher:
+    """Single polling loop that confirms every pending transaction.
+
+    Newly registered tx ids get one pending-info lookup (they may already be
+    confirmed). After that, each new round costs one ``status_after_block`` call
+    and one ``get_block_txids`` call, matched against the whole pending set;
+    pending info is fetched again only for matches (for ``application-index``
+    and friends) and for entries reaching their deadline.
+    """
+
+    def __init__(self, algod_client: algod.AlgodClient,
+                 params_cache: Optional[SuggestedParamsCache] = None):
+        self.algod_client = algod_client
+        self.params_cache = params_cache
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._round = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def last_round(self) -> int:
+        return self._round
+
+    async def wait(self, tx_id: str, wait_rounds: int = 10) -> Dict[str, Any]:
+        """Wait until ``tx_id`` is confirmed; returns its pending-transaction info"""
+        entry = self._pending.get(tx_id)
+        if entry is None:
+            loop = asyncio.get_running_loop()
+            entry = {"future": loop.create_future(), "wait_rounds": wait_rounds,
+                     "deadline": None, "checked": False}
+            self._pending[tx_id] = entry
+            if self._task is not None and not self._task.done():
+                # The running loop's round is current; an idle watcher's is not,
+                # so a new loop sets the deadline from a fresh status call
+                entry["deadline"] = self._round + wait_rounds
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await asyncio.shield(entry["future"])
+
+    async def wait_all(self, tx_ids: Sequence[str], wait_rounds: int = 10) -> List[Dict[str, Any]]:
+        return list(await asyncio.gather(*(self.wait(tx_id, wait_rounds) for tx_id in tx_ids)))
+
+    async def _run(self):
+        try:
+            status = await asyncio.to_thread(self.algod_client.status)
+            self._advance(status["last-round"])
+            while self._pending:
+                unchecked = [tx_id for tx_id, entry in self._pending.items() if not entry["checked"]]
+                await self._check_info(unchecked)
+                if not self._pending:
+                    break
+
+                status = await asyncio.to_thread(self.algod_client.status_after_block, self._round)
+                new_round = status["last-round"]
+                await self._scan_blocks(self._round + 1, new_round)
+                self._advance(new_round)
+
+                expired = [tx_id for tx_id, entry in self._pending.items()
+                           if entry["checked"] and self._round >= entry["deadline"]]
+                await self._check_info(expired)
+        except Exception as e:
+            logger.error(f"Confirmation watcher stopped: {e}")
+            for tx_id in list(self._pending):
+                self._resolve(tx_id, error=TransactionSubmissionError(tx_id, f"watcher error: {e}"))
+        finally:
+            self._task = None
+
+    def _advance(self, round_num: int):
+        self._round = round_num
+        if self.params_cache:
+            self.params_cache.observe_round(round_num)
+        for entry in self._pending.values():
+            if entry["deadline"] is None:
+                entry["deadline"] = round_num + entry["wait_rounds"]
+
+    async def _scan_blocks(self, first_round: int, last_round: int):
+        """Match the pending set against every block in [first_round, last_round]"""
+        for round_num in range(first_round, last_round + 1):
+            if not self._pending:
+                return
+            block = await asyncio.to_thread(self.algod_client.get_block_txids, round_num)
+            confirmed = self._pending.keys() & set(block.get("blockTxids") or [])
+            if confirmed:
+                await self._check_info(list(confirmed), confirmed_round=round_num)
+
+    async def _check_info(self, tx_ids: List[str], confirmed_round: Optional[int] = None):
+        """Resolve tx ids from their pending-transaction info"""
+        if not tx_ids:
+            return
+        infos = await asyncio.gather(
+            *(asyncio.to_thread(self.algod_client.pending_transaction_info, tx_id) for tx_id in tx_ids),
+            return_exceptions=True
+        )
+        for tx_id, info in zip(tx_ids, infos):
+            entry = self._pending.get(tx_id)
+            if entry is None:
+                continue
+            entry["checked"] = True
+            if confirmed_round is not None:
+                # Seen in a block; details are best effort once algod forgets the txn
+                details = info if isinstance(info, dict) else {}
+                self._resolve(tx_id, result={**details, "confirmed-round": confirmed_round})
+            elif isinstance(info, Exception):
+                self._resolve(tx_id, error=TransactionSubmissionError(tx_id, str(info)))
+            elif info.get("confirmed-round", 0) > 0:
+                self._resolve(tx_id, result=info)
+            elif info.get("pool-error"):
+                self._resolve(tx_id, error=TransactionSubmissionError(tx_id, info["pool-error"]))
+            elif self._round >= entry["deadline"]:
+                self._resolve(tx_id, error=TransactionSubmissionError(
+                    tx_id, f"not confirmed after {entry['wait_rounds']} rounds"))
+
+    def _resolve(self, tx_id: str, result: Optional[Dict[str, Any]] = None,
+                 error: Optional[Exception] = None):
+        entry = self._pending.pop(tx_id, None)
+        if entry is None or entry["future"].done():
+            return
+        if error is not None:
+            entry["future"].set_exception(error)
+        else:
+            entry["future"].set_result(result)
+
+
+class SubmissionPipeline:
+    """Shared send-and-confirm path for the backend and the deploy scripts"""
+
+    def __init__(self, algod_client: algod.AlgodClient, max_age_rounds: int = 50):
+        self.algod_client = algod_client
+        self.params_cache = SuggestedParamsCache(algod_client, max_age_rounds=max_age_rounds)
+        self.watcher = ConfirmationWatcher(algod_client, self.params_cache)
+
+    def suggested_params(self, refresh: bool = False) -> transaction.SuggestedParams:
+        return self.params_cache.get(refresh)
+
+    def send(self, signed_txns: Sequence[SignedTxn]) -> str:
+        """Send one atomic group in a single request; returns the first tx id"""
+        return self.algod_client.send_transactions(list(signed_txns))
+
+    def send_raw(self, encoded_txns: Sequence[str]) -> str:
+        """Send base64 msgpack signed transactions (as produced by wallets) as one group"""
+        raw = b"".join(base64.b64decode(txn) for txn in encoded_txns)
+        return self.algod_client.send_raw_transaction(base64.b64encode(raw))
+
+    async def submit(self, signed_txns: Sequence[SignedTxn], wait_rounds: int = 10) -> Dict[str, Any]:
+        """Send a group and wait for its confirmation through the shared watcher.
+
+        Returns algod's pending-transaction info plus the group's first ``tx-id``.
+        """
+        tx_id = await asyncio.to_thread(self.send, signed_txns)
+        return {"tx-id": tx_id, **await self.watcher.wait(tx_id, wait_rounds)}
+
+    async def submit_raw(self, encoded_txns: Sequence[str], wait_rounds: int = 10) -> Dict[str, Any]:
+        tx_id = await asyncio.to_thread(self.send_raw, encoded_txns)
+        return {"tx-id": tx_id, **await self.watcher.wait(tx_id, wait_rounds)}
+
+    async def submit_many(self, groups: Sequence[Sequence[SignedTxn]],
+                          wait_rounds: int = 10) -> List[Dict[str, Any]]:
+        """Send independent groups concurrently and confirm them together"""
+        return list(await asyncio.gather(*(self.submit(group, wait_rounds) for group in groups)))
+
+    def confirm(self, tx_id: str, wait_rounds: int = 10) -> Dict[str, Any]:
+        """Blocking wait for an already-sent transaction"""
+        return asyncio.run(self.watcher.wait(tx_id, wait_rounds))
+
+    def submit_and_wait(self, signed_txns: Sequence[SignedTxn], wait_rounds: int = 10) -> Dict[str, Any]:
+        """Blocking wrapper for scripts without an event loop"""
+        return asyncio.run(self.submit(signed_txns, wait_rounds))
+
+    def submit_many_and_wait(self, groups: Sequence[Sequence[SignedTxn]],
+                             wait_rounds: int = 10) -> List[Dict[str, Any]]:
+        return asyncio.run(self.submit_many(groups, wait_rounds))
+
+    @staticmethod
+    def tx_id_of(encoded_txn: str) -> str:
+        """Transaction id of a base64 msgpack signed transaction"""
+        return encoding.msgpack_decode(encoded_txn).get_txid()
@@ -0,0 +1,182 @@
+import base64
+import hashlib
+import inspect
+import json
+import os
+import sys
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+import pyteal as pt
+from algosdk.v2client import algod
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "teal_cache"
+CACHE_FORMAT = 1  # bump when the entry layout changes
+
+Program = Union[pt.Expr, Callable[[], pt.Expr]]
+
+
+@dataclass
+class CompiledProgram:
+    name: str
+    teal: str
+    bytecode: bytes
+    source_map: Dict[str, Any]
+    program_hash: str  # algod's program address
+    cache_key: str
+    cached: bool  # served without compiling
+
+
+class TealCompiler:
+    """PyTeal -> TEAL -> bytecode with an on-disk cache.
+
+    A program given as a function (``approval_program`` of a contract
+    module) is keyed by the sha256 of its module's source, the function
+    name, the pyteal version and the compile options, so an unchanged
+    contract is loaded from the cache without running PyTeal or calling
+    algod. A program given as an expression has no source to hash and is
+    keyed by its generated TEAL instead, which still skips algod.
+
+    Entries hold the TEAL, the bytecode and algod's source map, one JSON
+    file per key, written atomically so parallel deploys can share a
+    cache directory.
+    """
+
+    def __init__(self, algod_client: Optional[algod.AlgodClient] = None,
+                 cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR, version: int = 8,
+                 mode: pt.Mode = pt.Mode.Application, assemble_constants: bool = False,
+                 optimize: Optional[pt.OptimizeOptions] = None, retries: int = 3):
+        self.algod_client = algod_client
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.mode = mode
+        self.assemble_constants = assemble_constants
+        self.optimize = optimize
+        self.retries = retries
+        self.pyteal_version = metadata.version("pyteal")
+        self.hits = 0
+        self.misses = 0
+
+    def _options(self) -> Dict[str, Any]:
+        optimize = self.optimize
+        return {
+            "format": CACHE_FORMAT,
+            "pyteal": self.pyteal_version,
+            "version": self.version,
+            "mode": self.mode.name,
+            "assemble_constants": self.assemble_constants,
+            "scratch_slots": optimize.optimize_scratch_slots(self.version) if optimize else None,
+            "frame_pointers": optimize.use_frame_pointers(self.version) if optimize else None,
+        }
+
+    def _digest(self, *parts: str) -> str:
+        digest = hashlib.sha256(json.dumps(self._options(), sort_keys=True).encode())
+        for part in parts:
+            digest.update(b"\x00" + part.encode())
+        return digest.hexdigest()
+
+    def cache_key(self, program: Program) -> str:
+        """Key of a program function's module source, or of an expression's TEAL"""
+        if callable(program):
+            module = sys.modules[program.__module__]
+            return self._digest("source", inspect.getsource(module), program.__qualname__)
+        return self._digest("teal", self.to_teal(program))
+
+    def to_teal(self, program: Program) -> str:
+        expr = program() if callable(program) else program
+        return pt.compileTeal(expr, self.mode, version=self.version,
+                              assembleConstants=self.assemble_constants, optimize=self.optimize)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load(self, name: str, key: str) -> Optional[CompiledProgram]:
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable TEAL cache entry {key}: {e}")
+            return None
+        return CompiledProgram(
+            name=name,
+            teal=entry["teal"],
+            bytecode=base64.b64decode(entry["bytecode"]),
+            source_map=entry["source_map"],
+            program_hash=entry["program_hash"],
+            cache_key=key,
+            cached=True,
+        )
+
+    def _store(self, compiled: CompiledProgram):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "name": compiled.name,
+            "options": self._options(),
+            "teal": compiled.teal,
+            "bytecode": base64.b64encode(compiled.bytecode).decode(),
+            "source_map": compiled.source_map,
+            "program_hash": compiled.program_hash,
+        }
+        path = self._path(compiled.cache_key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def _assemble(self, teal: str) -> Dict[str, Any]:
+        if self.algod_client is None:
+            raise RuntimeError("An algod client is needed to assemble uncached programs")
+        for attempt in range(self.retries):
+            try:
+                return self.algod_client.compile(teal, source_map=True)
+            except Exception as e:
+                if attempt == self.retries - 1:
+                    raise
+                logger.warning(f"TEAL compile failed, retrying ({attempt + 1}/{self.retries}): {e}")
+
+    def compile(self, name: str, program: Program) -> CompiledProgram:
+        """Compiled ``program``, from the cache when its key is unchanged"""
+        key = self.cache_key(program)
+        compiled = self._load(name, key)
+        if compiled is not None:
+            self.hits += 1
+            logger.debug(f"TEAL cache hit for {name} ({key[:12]})")
+            return compiled
+
+        self.misses += 1
+        teal = self.to_teal(program)
+        result = self._assemble(teal)
+        compiled = CompiledProgram(
+            name=name,
+            teal=teal,
+            bytecode=base64.b64decode(result["result"]),
+            source_map=result.get("sourcemap") or {},
+            program_hash=result["hash"],
+            cache_key=key,
+            cached=False,
+        )
+        self._store(compiled)
+        logger.info(f"Compiled {name}: {len(compiled.bytecode)} bytes ({key[:12]})")
+        return compiled
+
+    def compile_contract(self, name: str, approval_program: Program,
+                         clear_program: Program) -> Dict[str, Any]:
+        """Approval and clear programs in the shape the deploy scripts use"""
+        approval = self.compile(f"{name}.approval", approval_program)
+        clear = self.compile(f"{name}.clear", clear_program)
+        return {
+            "name": name,
+            "approval_program": approval.bytecode,
+            "clear_program": clear.bytecode,
+            "approval_teal": approval.teal,
+            "clear_teal": clear.teal,
+            "approval_source_map": approval.source_map,
+            "clear_source_map": clear.source_map,
+            "cached": approval.cached and clear.cached,
+        }
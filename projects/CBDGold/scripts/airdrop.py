@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Airdrop an ASA to a CSV of recipients in atomic groups, resumable from a checkpoint."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Set
+
+from algosdk import account, constants, mnemonic
+from algosdk.v2client import algod, indexer
+
+sys.path.append(str(Path(__file__).parent.parent))
+from python_backend.utils.bulk_assets import (
+    MAX_GROUP_SIZE, AssetOptIn, AssetTransfer, BulkAssetEngine, BulkCheckpoint, Operation, pack_groups
+)
+from python_backend.utils.submission import SubmissionPipeline
+
+ALGOD_SERVER = os.getenv("ALGOD_SERVER", "https://testnet-api.algonode.cloud")
+ALGOD_TOKEN = os.getenv("ALGOD_TOKEN", "")
+INDEXER_SERVER = os.getenv("INDEXER_SERVER", "https://testnet-idx.algonode.cloud")
+INDEXER_TOKEN = os.getenv("INDEXER_TOKEN", "")
+AIRDROP_MNEMONIC = os.getenv("AIRDROP_MNEMONIC")
+CHECKPOINT_DIR = Path(__file__).parent.parent / "python_backend" / "data" / "airdrops"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recipients", type=Path,
+                        help="CSV with address,amount columns (raw units) and an optional mnemonic column; "
+                             "rows with a mnemonic are opted in within the same group")
+    parser.add_argument("--asset", type=int, required=True, help="ASA id to distribute")
+    parser.add_argument("--checkpoint", type=Path,
+                        help="Progress database (default: python_backend/data/airdrops/<csv name>-<asset>.sqlite3)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Signing processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="Unconfirmed groups in flight")
+    parser.add_argument("--no-holder-check", action="store_true",
+                        help="Send to every recipient instead of leaving out those the indexer shows not opted in")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Send failed and skipped (not opted in) recipients again")
+    parser.add_argument("--dry-run", action="store_true", help="Count recipients and groups without sending")
+    return parser.parse_args()
+
+
+def load_operations(path: Path, sender: str, asset_id: int) -> tuple[List[Operation], Dict[str, str]]:
+    """Transfers (amounts summed per address) and opt-ins with the recipient keys that sign them"""
+    amounts: "OrderedDict[str, int]" = OrderedDict()
+    keys: Dict[str, str] = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            address = row["address"].strip()
+            amounts[address] = amounts.get(address, 0) + int(row["amount"])
+            if row.get("mnemonic"):
+                keys[address] = mnemonic.to_private_key(row["mnemonic"].strip())
+
+    operations: List[Operation] = []
+    for address, amount in amounts.items():
+        if address in keys:
+            operations.append(AssetOptIn(address, asset_id))
+        operations.append(AssetTransfer(sender, address, asset_id, amount))
+    return operations, keys
+
+
+def opted_in(indexer_client: indexer.IndexerClient, asset_id: int) -> Set[str]:
+    """Every account holding the asset, paged from the indexer"""
+    holders: Set[str] = set()
+    next_page = None
+    while True:
+        response = indexer_client.asset_balances(asset_id, limit=1000, next_page=next_page)
+        holders.update(balance["address"] for balance in response.get("balances") or [])
+        next_page = response.get("next-token")
+        if not next_page or not response.get("balances"):
+            return holders
+
+
+def main() -> None:
+    args = parse_args()
+    if not AIRDROP_MNEMONIC and not args.dry_run:
+        sys.exit("Set AIRDROP_MNEMONIC to the distributor account before running this script.")
+
+    private_key = mnemonic.to_private_key(AIRDROP_MNEMONIC) if AIRDROP_MNEMONIC else None
+    sender = account.address_from_private_key(private_key) if private_key else "DRY-RUN"
+    operations, signers = load_operations(args.recipients, sender, args.asset)
+    indexer_client = indexer.IndexerClient(INDEXER_TOKEN, INDEXER_SERVER)
+    if not args.no_holder_check:
+        # algod names one non-opted-in receiver per rejected group, so filtering up front saves resends
+        holders = opted_in(indexer_client, args.asset)
+        kept = [op for op in operations
+                if not isinstance(op, AssetTransfer) or op.receiver in holders or op.receiver in signers]
+        print(f"Leaving out {len(operations) - len(kept):,} recipients not opted in to {args.asset}")
+        operations = kept
+    transfers = sum(isinstance(op, AssetTransfer) for op in operations)
+    groups = len(pack_groups(operations))
+    print(f"{transfers:,} recipients, {len(operations) - transfers:,} opt-ins -> {groups:,} groups of up to "
+          f"{MAX_GROUP_SIZE} ({len(operations) * constants.MIN_TXN_FEE / 1e6:.3f} ALGO in minimum fees)")
+    if args.dry_run:
+        return
+
+    checkpoint = BulkCheckpoint(args.checkpoint or CHECKPOINT_DIR / f"{args.recipients.stem}-{args.asset}.sqlite3")
+    if args.retry_failed:
+        print(f"Retrying {checkpoint.retry_failed():,} failed or skipped operations")
+
+    signers[sender] = private_key
+    algod_client = algod.AlgodClient(ALGOD_TOKEN, ALGOD_SERVER)
+    engine = BulkAssetEngine(
+        SubmissionPipeline(algod_client), signers, checkpoint, workers=args.workers,
+        concurrency=args.concurrency, indexer_client=indexer_client,
+    )
+    summary = asyncio.run(engine.run(operations))
+
+    counts = summary["counts"]
+    print(f"Confirmed {summary['confirmed_txns']:,} transactions in {summary['elapsed']:.1f} s")
+    print("Status: " + ", ".join(f"{status} {count:,}" for status, count in sorted(counts.items())))
+    if counts.get("sent"):
+        print("Some groups are still unconfirmed; run again to re-check them.")
+    for result in checkpoint.results("failed")[:10]:
+        print(f"  failed {result['key']}: {result['error']}", file=sys.stderr)
+    if counts.get("failed") or counts.get("sent"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Settle (and optionally restake) staking rewards for every staker with admin batch_harvest calls."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from algosdk import account, mnemonic
+from algosdk.v2client import algod, indexer
+
+sys.path.append(str(Path(__file__).parent.parent))
+from python_backend.services.staking_analytics import STAKED_AMOUNT_KEY
+from python_backend.services.transaction_builder import MAX_GROUP_SIZE, MAX_HARVEST_ACCOUNTS, TransactionBuilder
+from python_backend.utils.submission import SubmissionPipeline
+
+ALGOD_SERVER = os.getenv("ALGOD_SERVER", "https://testnet-api.algonode.cloud")
+ALGOD_TOKEN = os.getenv("ALGOD_TOKEN", "")
+INDEXER_SERVER = os.getenv("INDEXER_SERVER", "https://testnet-idx.algonode.cloud")
+INDEXER_TOKEN = os.getenv("INDEXER_TOKEN", "")
+STAKING_APP_ID = int(os.getenv("STAKING_CONTRACT_ID", "123456789"))
+HEMP_ASSET_ID = int(os.getenv("HEMP_ASSET_ID", "748025551"))
+ADMIN_MNEMONIC = os.getenv("STAKING_ADMIN_MNEMONIC")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--compound", action="store_true",
+                        help="Restake each staker's pending rewards instead of only settling them")
+    parser.add_argument("--batch", type=int, default=8,
+                        help="Groups of up to 64 stakers submitted concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="List the stakers and groups without sending")
+    return parser.parse_args()
+
+
+def stakers(indexer_client: indexer.IndexerClient) -> List[str]:
+    """Addresses opted in to the staking app with a non-zero staked_amount"""
+    found: List[str] = []
+    next_page = None
+    while True:
+        response = indexer_client.accounts(application_id=STAKING_APP_ID, limit=1000, next_page=next_page)
+        for acct in response.get("accounts") or []:
+            for app in acct.get("apps-local-state") or []:
+                if app.get("id") != STAKING_APP_ID or app.get("deleted"):
+                    continue
+                if any(kv.get("key") == STAKED_AMOUNT_KEY and kv.get("value", {}).get("uint")
+                       for kv in app.get("key-value") or []):
+                    found.append(acct["address"])
+        next_page = response.get("next-token")
+        if not next_page or not response.get("accounts"):
+            return found
+
+
+def main() -> None:
+    args = parse_args()
+    if not ADMIN_MNEMONIC and not args.dry_run:
+        sys.exit("Set STAKING_ADMIN_MNEMONIC to send batch_harvest calls.")
+
+    addresses = stakers(indexer.IndexerClient(INDEXER_TOKEN, INDEXER_SERVER))
+    calls = -(-len(addresses) // MAX_HARVEST_ACCOUNTS)
+    print(f"{len(addresses)} stakers -> {calls} batch_harvest calls in {-(-calls // MAX_GROUP_SIZE)} groups "
+          f"({'compounding' if args.compound else 'settling'} rewards)")
+    if args.dry_run or not addresses:
+        return
+
+    algod_client = algod.AlgodClient(ALGOD_TOKEN, ALGOD_SERVER)
+    pipeline = SubmissionPipeline(algod_client)
+    builder = TransactionBuilder(algod_client, STAKING_APP_ID, HEMP_ASSET_ID, pipeline.params_cache)
+    private_key = mnemonic.to_private_key(ADMIN_MNEMONIC)
+    groups = builder.build_batch_harvest(account.address_from_private_key(private_key), addresses, args.compound)
+
+    for start in range(0, len(groups), args.batch):
+        chunk = [[txn.sign(private_key) for txn in group] for group in groups[start:start + args.batch]]
+        results = pipeline.submit_many_and_wait(chunk, 4)
+        print(f"Confirmed groups {start + 1}-{start + len(chunk)} "
+              f"(last in round {results[-1].get('confirmed-round')})")
+
+
+if __name__ == "__main__":
+    main()
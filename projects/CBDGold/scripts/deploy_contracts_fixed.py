@@ -23,6 +23,10 @@ ssl._create_default_https_context = ssl._create_unverified_context
 project_root = Path(__file__).parent.parent
 contracts_path = project_root / "contracts"
 sys.path.append(str(contracts_path))
+sys.path.append(str(project_root))
+
+from python_backend.utils.submission import SubmissionPipeline
+from python_backend.utils.teal_cache import TealCompiler
 
 class ContractDeployer:
     def __init__(self):
@@ -30,6 +34,8 @@ class ContractDeployer:
         self.algod_address = "https://testnet-api.algonode.cloud"
         self.algod_token = ""
         self.algod_client = algod.AlgodClient(self.algod_token, self.algod_address)
+        self.pipeline = SubmissionPipeline(self.algod_client)
+        self.compiler = TealCompiler(self.algod_client)
         
         # Deployment account (will be generated)
         self.deployer_private_key: Optional[str] = None
@@ -78,22 +84,10 @@ class ContractDeployer:
         clear_program = pt.Approve()
         
         try:
-            # Compile programs
-            approval_teal = pt.compileTeal(approval_program, pt.Mode.Application, version=8)
-            approval_result = self.algod_client.compile(approval_teal)
-            
-            clear_teal = pt.compileTeal(clear_program, pt.Mode.Application, version=8)
-            clear_result = self.algod_client.compile(clear_teal)
-            
-            contract_info = {
-                'name': name,
-                'approval_program': approval_result['result'],
-                'clear_program': clear_result['result'],
-                'approval_teal': approval_teal,
-                'clear_teal': clear_teal
-            }
+            contract_info = self.compiler.compile_contract(name, approval_program, clear_program)
             
-            print(f"✅ {name} compiled successfully")
+            source = "cache" if contract_info['cached'] else "algod"
+            print(f"✅ {name} compiled successfully ({source})")
             return contract_info
             
         except Exception as e:
@@ -106,16 +100,16 @@ class ContractDeployer:
         print(f"🚀 Deploying {name} to TestNet...")
         
         try:
-            # Get suggested parameters
-            sp = self.algod_client.suggested_params()
+            # Get suggested parameters (cached across deployments)
+            sp = self.pipeline.suggested_params()
             
             # Create application transaction
             txn = transaction.ApplicationCreateTxn(
                 sender=self.deployer_address,
                 sp=sp,
                 on_complete=transaction.OnComplete.NoOpOC,
-                approval_program=bytes.fromhex(contract_info['approval_program']),
-                clear_program=bytes.fromhex(contract_info['clear_program']),
+                approval_program=contract_info['approval_program'],
+                clear_program=contract_info['clear_program'],
                 global_schema=transaction.StateSchema(num_uints=64, num_byte_slices=16),
                 local_schema=transaction.StateSchema(num_uints=16, num_byte_slices=16),
             )
@@ -123,12 +117,10 @@ class ContractDeployer:
             # Sign transaction
             signed_txn = txn.sign(self.deployer_private_key)
             
-            # Submit transaction
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            print(f"📤 Transaction submitted: {tx_id}")
-            
-            # Wait for confirmation
-            confirmed_txn = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
+            # Submit transaction and wait for confirmation
+            confirmed_txn = self.pipeline.submit_and_wait([signed_txn], 4)
+            tx_id = confirmed_txn['tx-id']
+            print(f"📤 Transaction confirmed: {tx_id}")
             app_id = confirmed_txn['application-index']
             
             print(f"✅ {name} deployed successfully!")
@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 import json
 import ssl
-import base64
 import urllib3
+from pathlib import Path
 from typing import Dict, Any, Optional
 from algosdk.v2client import algod
 from algosdk import account, mnemonic, transaction
 from algosdk.encoding import decode_address
 import pyteal as pt
 
+sys.path.append(str(Path(__file__).parent.parent))
+from python_backend.utils.submission import SubmissionPipeline
+from python_backend.utils.teal_cache import TealCompiler
+
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -25,6 +30,8 @@ class ContractDeployer:
             "https://testnet-api.algonode.cloud",
             headers={}
         )
+        self.pipeline = SubmissionPipeline(self.algod_client)
+        self.compiler = TealCompiler(self.algod_client)
         
         self.account_mnemonic = None
         self.account_address = None
@@ -92,31 +99,13 @@ class ContractDeployer:
             # Simple clear state program
             clear_program = pt.Approve()
             
-            # Compile to TEAL
-            approval_teal = pt.compileTeal(approval_program, pt.Mode.Application, version=8)
-            clear_teal = pt.compileTeal(clear_program, pt.Mode.Application, version=8)
-            
-            print(f"📝 Generated TEAL code for {name}")
-            print(f"   Approval program: {len(approval_teal)} characters")
-            print(f"   Clear program: {len(clear_teal)} characters")
-            
-            # Compile TEAL to bytecode using algosdk with retry
-            for attempt in range(3):
-                try:
-                    print(f"🔄 Compiling {name} (attempt {attempt + 1}/3)...")
-                    approval_bytecode = self.algod_client.compile(approval_teal)
-                    clear_bytecode = self.algod_client.compile(clear_teal)
-                    break
-                except Exception as e:
-                    if attempt == 2:
-                        raise e
-                    print(f"Compilation failed, retrying... ({e})")
-            
-            # Extract the compiled bytecode
-            approval_bytes = base64.b64decode(approval_bytecode['result'])
-            clear_bytes = base64.b64decode(clear_bytecode['result'])
+            # Compile to bytecode, reusing the cached build when unchanged
+            contract_info = self.compiler.compile_contract(name, approval_program, clear_program)
+            approval_bytes = contract_info['approval_program']
+            clear_bytes = contract_info['clear_program']
             
-            print(f"✅ {name} compiled successfully")
+            source = "cache" if contract_info['cached'] else "algod"
+            print(f"✅ {name} compiled successfully ({source})")
             print(f"   Approval bytecode: {len(approval_bytes)} bytes")
             print(f"   Clear bytecode: {len(clear_bytes)} bytes")
             
@@ -139,7 +128,7 @@ class ContractDeployer:
             # Get suggested parameters with retry
             for attempt in range(3):
                 try:
-                    params = self.algod_client.suggested_params()
+                    params = self.pipeline.suggested_params()
                     break
                 except Exception as e:
                     if attempt == 2:
@@ -163,7 +152,7 @@ class ContractDeployer:
             # Submit transaction with retry
             for attempt in range(3):
                 try:
-                    tx_id = self.algod_client.send_transaction(signed_txn)
+                    tx_id = self.pipeline.send([signed_txn])
                     print(f"📤 Transaction sent: {tx_id}")
                     break
                 except Exception as e:
@@ -173,7 +162,7 @@ class ContractDeployer:
             
             # Wait for confirmation
             print("⏳ Waiting for confirmation...")
-            confirmed_txn = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
+            confirmed_txn = self.pipeline.confirm(tx_id, 4)
             
             # Get application ID
             app_id = confirmed_txn.get('application-index')
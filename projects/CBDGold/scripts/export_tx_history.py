@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Export transaction history as JSON, NDJSON or the compact columnar format.
+
+Reads the backend's history store (newest first, one keyset page at a time)
+or re-encodes another history file with --source, filtering as it streams.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from python_backend.services.transaction_history import DEFAULT_DB_PATH, TransactionHistory
+from python_backend.services.tx_history_stream import (
+    COLUMNAR, DEFAULT_BLOCK_SIZE, JSON, NDJSON, filter_records, read_records, write_records
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path, help="File to write; the suffix picks the format (.ndjson, .txc, .json)")
+    parser.add_argument("--format", choices=(JSON, NDJSON, COLUMNAR), help="Output format (default: from the suffix)")
+    parser.add_argument("--source", type=Path, help="Convert this history file instead of reading the database")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="History database to export")
+    parser.add_argument("--address", help="Only export transactions touching this address")
+    parser.add_argument("--asset-id", type=int, help="Only export transactions touching this asset")
+    parser.add_argument("--app-id", type=int, help="Only export transactions calling this application")
+    parser.add_argument("--min-round", type=int, help="Oldest round to export (database only)")
+    parser.add_argument("--max-round", type=int, help="Newest round to export (database only)")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Rows per columnar block")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    history = None
+    if args.source:
+        if not args.source.exists():
+            sys.exit(f"{args.source} not found")
+        records = filter_records(read_records(args.source), args.address, args.asset_id, args.app_id)
+    else:
+        history = TransactionHistory(db_path=str(args.db))
+        records = history.iter_history(args.address, args.asset_id, args.app_id, args.min_round, args.max_round)
+    written = write_records(records, args.output, args.format, args.block_size)
+    if history:
+        history.close()
+    elapsed = time.perf_counter() - started
+    size = args.output.stat().st_size
+    print(f"Wrote {written:,} transactions to {args.output} ({size / 1e6:.1f} MB) in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
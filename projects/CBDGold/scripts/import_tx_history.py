@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Stream a transaction history file into the backend's history store.
+
+Accepts a {"txs": [...]} JSON document, NDJSON (.ndjson/.jsonl) or a columnar
+export (.txc); records are read and stored in batches, never all at once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from python_backend.services.transaction_history import DEFAULT_DB_PATH, TransactionHistory
+from python_backend.services.tx_history_stream import COLUMNAR, JSON, NDJSON, filter_records, read_records
+
+# artifacts/ sits at the repository root, above projects/CBDGold
+DEFAULT_SOURCE = Path(__file__).resolve().parents[3] / "artifacts" / "tx_history.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, nargs="?", default=DEFAULT_SOURCE, help="History file to import")
+    parser.add_argument("--format", choices=(JSON, NDJSON, COLUMNAR), help="Source format (default: from the suffix)")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="History database to import into")
+    parser.add_argument("--address", help="Only import transactions touching this address")
+    parser.add_argument("--asset-id", type=int, help="Only import transactions touching this asset")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Records per SQLite transaction")
+    args = parser.parse_args()
+
+    if not args.source.exists():
+        sys.exit(f"{args.source} not found")
+    history = TransactionHistory(db_path=str(args.db))
+    started = time.perf_counter()
+    records = filter_records(read_records(args.source, args.format), address=args.address, asset_id=args.asset_id)
+    imported = history.import_records(records, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Imported {imported:,} new transactions from {args.source} in {elapsed:.1f} s; "
+          f"{history.count():,} stored in {args.db}")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
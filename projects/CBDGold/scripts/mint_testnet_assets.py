@@ -3,20 +3,26 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Iterable
 
 from algosdk import account
 from algosdk import mnemonic
-from algosdk import transaction
 from algosdk.v2client import algod
 
+sys.path.append(str(Path(__file__).parent.parent))
+from python_backend.utils.bulk_assets import AssetMint, BulkAssetEngine, BulkCheckpoint
+from python_backend.utils.submission import SubmissionPipeline
+
 ALGOD_SERVER = os.getenv("ALGOD_SERVER", "https://testnet-api.algonode.cloud")
 ALGOD_PORT = os.getenv("ALGOD_PORT", "")
 ALGOD_TOKEN = os.getenv("ALGOD_TOKEN", "")
 ASA_MANAGER_MNEMONIC = os.getenv("ASA_MANAGER_MNEMONIC")
+CHECKPOINT_PATH = Path(__file__).parent.parent / "python_backend" / "data" / "airdrops" / "mint_testnet_assets.sqlite3"
 
 if not ASA_MANAGER_MNEMONIC:
     sys.exit("Set ASA_MANAGER_MNEMONIC in your environment before running this script.")
@@ -26,6 +32,7 @@ MANAGER_ADDRESS = account.address_from_private_key(MANAGER_PRIVATE_KEY)
 
 HEADERS = {"X-Algo-API-Token": ALGOD_TOKEN}
 client = algod.AlgodClient(ALGOD_TOKEN, ALGOD_SERVER, headers=HEADERS)
+pipeline = SubmissionPipeline(client)
 
 
 @dataclass(frozen=True)
@@ -43,39 +50,32 @@ ASSET_SPECS: Iterable[AssetSpec] = (
 )
 
 
-def mint_asset(spec: AssetSpec) -> int:
-    params = client.suggested_params()
-    txn = transaction.AssetConfigTxn(
-        sender=MANAGER_ADDRESS,
-        sp=params,
-        total=spec.total,
-        decimals=spec.decimals,
-        unit_name=spec.unit,
-        asset_name=spec.name,
-        manager=MANAGER_ADDRESS,
-        reserve=MANAGER_ADDRESS,
-        freeze=MANAGER_ADDRESS,
-        clawback=MANAGER_ADDRESS,
-        default_frozen=False,
-        url=spec.url,
-    )
-    signed = txn.sign(MANAGER_PRIVATE_KEY)
-    txid = client.send_transaction(signed)
-    transaction.wait_for_confirmation(client, txid, 4)
-    pending = client.pending_transaction_info(txid)
-    asset_id = pending.get("asset-index")
-    if not asset_id:
-        raise RuntimeError(f"Mint failed for {spec.unit}; tx {txid}")
-    return asset_id
+def mint_assets(specs: Iterable[AssetSpec]) -> dict[str, int]:
+    """Mint every asset in one atomic group; re-running after a failure resumes from the checkpoint."""
+    specs = list(specs)
+    mints = [AssetMint(MANAGER_ADDRESS, spec.name, spec.unit, spec.total, spec.decimals, spec.url) for spec in specs]
+    checkpoint = BulkCheckpoint(CHECKPOINT_PATH)
+    # A failed mint raised below; re-running is the retry
+    checkpoint.retry_failed()
+    engine = BulkAssetEngine(pipeline, {MANAGER_ADDRESS: MANAGER_PRIVATE_KEY}, checkpoint, wait_rounds=4)
+    asyncio.run(engine.run(mints))
+
+    results = {result["key"]: result for result in checkpoint.results()}
+    minted: dict[str, int] = {}
+    for spec, mint in zip(specs, mints):
+        result = results[mint.key]
+        if result["status"] != "confirmed" or not result["asset_id"]:
+            raise RuntimeError(f"Mint failed for {spec.unit}: {result['error'] or result['status']}; "
+                               f"tx {result['tx_id']}")
+        minted[spec.unit] = result["asset_id"]
+    return minted
 
 
 def main() -> None:
     print(f"Minting ASAs with manager {MANAGER_ADDRESS} on {ALGOD_SERVER}")
-    minted: dict[str, int] = {}
+    minted = mint_assets(ASSET_SPECS)
     for spec in ASSET_SPECS:
-        asset_id = mint_asset(spec)
-        minted[spec.unit] = asset_id
-        print(f"Created {spec.unit} ({spec.name}) with id {asset_id}")
+        print(f"Created {spec.unit} ({spec.name}) with id {minted[spec.unit]}")
     print("\nUpdate .env and src/data/constants.ts with the new asset ids:")
     for unit, asset_id in minted.items():
         print(f"  VITE_{unit}_ASA_ID={asset_id}")
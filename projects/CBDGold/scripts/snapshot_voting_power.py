@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Build a proposal's WEED voting power snapshot and commit its Merkle root."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from algosdk import account, mnemonic, transaction
+from algosdk.v2client import algod, indexer
+
+sys.path.append(str(Path(__file__).parent.parent))
+from python_backend.services.governance_indexer import DEFAULT_DB_PATH, GovernanceIndexer
+from python_backend.services.voting_snapshot import SnapshotReader, build_snapshot, snapshot_path
+from python_backend.utils.submission import SubmissionPipeline
+
+ALGOD_SERVER = os.getenv("ALGOD_SERVER", "https://testnet-api.algonode.cloud")
+ALGOD_TOKEN = os.getenv("ALGOD_TOKEN", "")
+INDEXER_SERVER = os.getenv("INDEXER_SERVER", "https://testnet-idx.algonode.cloud")
+INDEXER_TOKEN = os.getenv("INDEXER_TOKEN", "")
+GOVERNANCE_APP_ID = int(os.getenv("GOVERNANCE_CONTRACT_ID", "123456790"))
+WEED_ASSET_ID = int(os.getenv("WEED_ASSET_ID", "748025552"))
+ADMIN_MNEMONIC = os.getenv("GOVERNANCE_ADMIN_MNEMONIC")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("proposal_id", type=int)
+    parser.add_argument("--round", type=int, default=None,
+                        help="Snapshot round (default: the proposal's creation round from the governance index)")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Address to leave out, e.g. the WEED reserve (repeatable)")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--commit", action="store_true",
+                        help="Send set_snapshot with GOVERNANCE_ADMIN_MNEMONIC")
+    return parser.parse_args()
+
+
+def commit_root(proposal_id: int, root: bytes) -> str:
+    """Send the admin-only set_snapshot call and wait for it to confirm."""
+    private_key = mnemonic.to_private_key(ADMIN_MNEMONIC)
+    sender = account.address_from_private_key(private_key)
+    pipeline = SubmissionPipeline(algod.AlgodClient(ALGOD_TOKEN, ALGOD_SERVER))
+    pid = proposal_id.to_bytes(8, "big")
+    txn = transaction.ApplicationNoOpTxn(
+        sender, pipeline.suggested_params(), GOVERNANCE_APP_ID,
+        app_args=[b"set_snapshot", pid, root],
+        boxes=[(0, b"p_" + pid)],
+    )
+    return pipeline.submit_and_wait([txn.sign(private_key)], 4)["tx-id"]
+
+
+def main() -> None:
+    args = parse_args()
+    indexer_client = indexer.IndexerClient(INDEXER_TOKEN, INDEXER_SERVER)
+
+    round_num = args.round
+    if round_num is None:
+        round_num = GovernanceIndexer(indexer_client, GOVERNANCE_APP_ID, str(DEFAULT_DB_PATH)) \
+            .created_round(args.proposal_id)
+        if round_num is None:
+            sys.exit(f"Proposal {args.proposal_id} is not indexed yet; pass --round explicitly.")
+
+    output = args.output or snapshot_path(GOVERNANCE_APP_ID, args.proposal_id)
+    print(f"Snapshotting WEED ({WEED_ASSET_ID}) holders at round {round_num} into {output}")
+    root = build_snapshot(indexer_client, WEED_ASSET_ID, round_num, str(output), exclude=args.exclude)
+
+    snapshot = SnapshotReader(str(output))
+    print(f"Holders: {snapshot.count}")
+    print(f"Root:    {root.hex()}")
+    snapshot.close()
+
+    if args.commit:
+        if not ADMIN_MNEMONIC:
+            sys.exit("Set GOVERNANCE_ADMIN_MNEMONIC to commit the snapshot root.")
+        print(f"Committed root in transaction {commit_root(args.proposal_id, root)}")
+    else:
+        print("\nRe-run with --commit (or call set_snapshot yourself) to publish the root on-chain.")
+
+
+if __name__ == "__main__":
+    main()
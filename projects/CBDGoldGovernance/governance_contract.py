@@ -1,5 +1,29 @@
 import pyteal as pt
 
+# Proposal box "p_" + Itob(id): one fixed-width record per proposal
+#   [0:8) votes_for | [8:16) votes_against | [16:24) end_time | [24:32) status
+#   [32:64) creator | [64:72) title length | [72:136) title (zero padded)
+#   [136:168) voting power snapshot Merkle root (zero until set_snapshot)
+PROPOSAL_BOX_PREFIX = b"p_"
+VOTES_FOR_OFFSET = 0
+VOTES_AGAINST_OFFSET = 8
+END_TIME_OFFSET = 16
+STATUS_OFFSET = 24
+CREATOR_OFFSET = 32
+TITLE_LEN_OFFSET = 64
+TITLE_OFFSET = 72
+MAX_TITLE_LENGTH = 64
+SNAPSHOT_ROOT_OFFSET = TITLE_OFFSET + MAX_TITLE_LENGTH
+PROPOSAL_RECORD_SIZE = SNAPSHOT_ROOT_OFFSET + 32
+# Fields read together by vote/finalize in a single BoxExtract
+PROPOSAL_HEADER_SIZE = CREATOR_OFFSET
+# Snapshot proofs (python_backend/services/voting_snapshot.py):
+#   leaf = sha256(0x00 || address || Itob(balance)), node = sha256(0x01 || left || right)
+#   proof = 33-byte steps of [sibling-is-left flag][sibling]
+PROOF_STEP_SIZE = 33
+PROOF_STEP_BUDGET = 60  # sha256 (35) plus extract/concat/branching per step
+PROOF_BASE_BUDGET = 300  # leaf hash, receipt box and tally update after the check
+
 def approval_program():
     """CBDGold Governance Contract - Manages community voting and proposals"""
 
@@ -11,27 +35,37 @@ def approval_program():
     min_weed_required = pt.Bytes("min_weed_required")
     quorum_min_votes = pt.Bytes("quorum_min")
 
-    # Proposal state keys (using proposal ID as suffix)
-    proposal_title = pt.Bytes("proposal_title_")
-    proposal_description = pt.Bytes("proposal_description_")
-    proposal_votes_for = pt.Bytes("proposal_votes_for_")
-    proposal_votes_against = pt.Bytes("proposal_votes_against_")
-    proposal_end_time = pt.Bytes("proposal_end_time_")
-    proposal_status = pt.Bytes("proposal_status_")
 
     # Local state keys for users
-    user_voting_power = pt.Bytes("voting_power")
     user_total_votes = pt.Bytes("total_votes")
 
     @pt.Subroutine(pt.TealType.uint64)
-    def get_voting_power(user_addr):
-        return pt.App.localGet(user_addr, user_voting_power)
+    def verify_snapshot_proof(root, addr, balance, proof):
+        """1 if ``addr`` held ``balance`` in the snapshot committed to by ``root``"""
+        i = pt.ScratchVar(pt.TealType.uint64)
+        node = pt.ScratchVar(pt.TealType.bytes)
+        sibling = pt.Extract(proof, i.load() + pt.Int(1), pt.Int(32))
+        return pt.Seq([
+            pt.Assert(pt.Len(balance) == pt.Int(8)),
+            pt.Assert(pt.Len(proof) % pt.Int(PROOF_STEP_SIZE) == pt.Int(0)),
+            node.store(pt.Sha256(pt.Concat(pt.Bytes("base16", "00"), addr, balance))),
+            pt.For(i.store(pt.Int(0)), i.load() < pt.Len(proof), i.store(i.load() + pt.Int(PROOF_STEP_SIZE))).Do(
+                node.store(pt.If(pt.GetByte(proof, i.load()) == pt.Int(1))
+                           .Then(pt.Sha256(pt.Concat(pt.Bytes("base16", "01"), sibling, node.load())))
+                           .Else(pt.Sha256(pt.Concat(pt.Bytes("base16", "01"), node.load(), sibling))))
+            ),
+            node.load() == root
+        ])
 
     # Box key helpers
     @pt.Subroutine(pt.TealType.bytes)
     def vote_receipt_key(pid, addr):
         return pt.Concat(pt.Bytes("v_"), pid, addr)
 
+    @pt.Subroutine(pt.TealType.bytes)
+    def proposal_key(pid):
+        return pt.Concat(pt.Bytes(PROPOSAL_BOX_PREFIX), pid)
+
     # Initialize contract
     on_creation = pt.Seq([
         pt.App.globalPut(total_proposals, pt.Int(0)),
@@ -45,89 +79,118 @@ def approval_program():
 
     # Opt-in to local storage
     on_opt_in = pt.Seq([
-        pt.App.localPut(pt.Txn.sender(), user_voting_power, pt.Int(0)),
         pt.App.localPut(pt.Txn.sender(), user_total_votes, pt.Int(0)),
         pt.Approve()
     ])
 
     # Create new proposal (admin only)
+    # Args: ["create_proposal", title]
+    create_key = pt.ScratchVar()
     on_create_proposal = pt.Seq([
         pt.Assert(pt.Txn.sender() == pt.App.globalGet(admin_address)),
+        pt.Assert(pt.Len(pt.Txn.application_args[1]) <= pt.Int(MAX_TITLE_LENGTH)),
         pt.App.globalPut(total_proposals, pt.App.globalGet(total_proposals) + pt.Int(1)),
         pt.App.globalPut(active_proposals, pt.App.globalGet(active_proposals) + pt.Int(1)),
-        pt.App.globalPut(pt.Concat(proposal_title, pt.Itob(pt.App.globalGet(total_proposals))), pt.Txn.application_args[1]),
-        pt.App.globalPut(pt.Concat(proposal_votes_for, pt.Itob(pt.App.globalGet(total_proposals))), pt.Int(0)),
-        pt.App.globalPut(pt.Concat(proposal_votes_against, pt.Itob(pt.App.globalGet(total_proposals))), pt.Int(0)),
-        pt.App.globalPut(pt.Concat(proposal_end_time, pt.Itob(pt.App.globalGet(total_proposals))), pt.Global.latest_timestamp() + pt.Int(604800)),
-        pt.App.globalPut(pt.Concat(proposal_status, pt.Itob(pt.App.globalGet(total_proposals))), pt.Int(0)),
+        create_key.store(proposal_key(pt.Itob(pt.App.globalGet(total_proposals)))),
+        # New boxes are zero filled: both tallies start at 0
+        pt.Assert(pt.BoxCreate(create_key.load(), pt.Int(PROPOSAL_RECORD_SIZE))),
+        pt.BoxReplace(create_key.load(), pt.Int(END_TIME_OFFSET), pt.Concat(
+            pt.Itob(pt.Global.latest_timestamp() + pt.Int(604800)),
+            pt.Itob(pt.Int(0)),
+            pt.Txn.sender(),
+            pt.Itob(pt.Len(pt.Txn.application_args[1])),
+            pt.Txn.application_args[1]
+        )),
         pt.Log(pt.Concat(pt.Bytes("proposal_created:"), pt.Itob(pt.App.globalGet(total_proposals)), pt.Bytes(",title:"), pt.Txn.application_args[1])),
         pt.Approve()
     ])
 
-    # Vote on proposal
-    # Args: ["vote", proposal_id, vote(1/0)]
+    # Vote on proposal with WEED balance proven against the proposal's snapshot
+    # Args: ["vote", proposal_id, vote(1/0), Itob(balance), proof]
     on_vote_key = pt.ScratchVar()
+    vote_proposal = pt.ScratchVar()
+    vote_header = pt.ScratchVar()
+    vote_power = pt.ScratchVar()
+    vote_offset = pt.ScratchVar()
     on_vote = pt.Seq([
         pt.Assert(pt.App.globalGet(voting_enabled) == pt.Int(1)),
-        pt.Assert(get_voting_power(pt.Txn.sender()) >= pt.App.globalGet(min_weed_required)),
-        pt.Assert(pt.App.globalGet(pt.Concat(proposal_status, pt.Txn.application_args[1])) == pt.Int(0)),
-        pt.Assert(pt.Global.latest_timestamp() < pt.App.globalGet(pt.Concat(proposal_end_time, pt.Txn.application_args[1]))),
-        on_vote_key.store(vote_receipt_key(pt.Txn.application_args[1], pt.Txn.sender())),
-        pt.Assert(pt.Not(pt.BoxExists(on_vote_key.load()))),
-        pt.If(pt.Btoi(pt.Txn.application_args[2]) == pt.Int(1)).Then(
-            pt.App.globalPut(pt.Concat(proposal_votes_for, pt.Txn.application_args[1]), pt.App.globalGet(pt.Concat(proposal_votes_for, pt.Txn.application_args[1])) + get_voting_power(pt.Txn.sender()))
-        ).Else(
-            pt.App.globalPut(pt.Concat(proposal_votes_against, pt.Txn.application_args[1]), pt.App.globalGet(pt.Concat(proposal_votes_against, pt.Txn.application_args[1])) + get_voting_power(pt.Txn.sender()))
+        vote_power.store(pt.Btoi(pt.Txn.application_args[3])),
+        pt.Assert(vote_power.load() >= pt.App.globalGet(min_weed_required)),
+        vote_proposal.store(proposal_key(pt.Txn.application_args[1])),
+        # Each proof step costs ~PROOF_STEP_BUDGET; inner OpUp calls are paid by the caller's fee
+        pt.OpUp(pt.OpUpMode.OnCall).ensure_budget(
+            pt.Len(pt.Txn.application_args[4]) / pt.Int(PROOF_STEP_SIZE) * pt.Int(PROOF_STEP_BUDGET) + pt.Int(PROOF_BASE_BUDGET),
+            pt.OpUpFeeSource.GroupCredit
         ),
+        pt.Assert(verify_snapshot_proof(
+            pt.BoxExtract(vote_proposal.load(), pt.Int(SNAPSHOT_ROOT_OFFSET), pt.Int(32)),
+            pt.Txn.sender(),
+            pt.Txn.application_args[3],
+            pt.Txn.application_args[4]
+        )),
+        vote_header.store(pt.BoxExtract(vote_proposal.load(), pt.Int(0), pt.Int(PROPOSAL_HEADER_SIZE))),
+        pt.Assert(pt.ExtractUint64(vote_header.load(), pt.Int(STATUS_OFFSET)) == pt.Int(0)),
+        pt.Assert(pt.Global.latest_timestamp() < pt.ExtractUint64(vote_header.load(), pt.Int(END_TIME_OFFSET))),
+        on_vote_key.store(vote_receipt_key(pt.Txn.application_args[1], pt.Txn.sender())),
+        vote_offset.store(pt.If(pt.Btoi(pt.Txn.application_args[2]) == pt.Int(1))
+                          .Then(pt.Int(VOTES_FOR_OFFSET))
+                          .Else(pt.Int(VOTES_AGAINST_OFFSET))),
+        pt.BoxReplace(vote_proposal.load(), vote_offset.load(),
+                      pt.Itob(pt.ExtractUint64(vote_header.load(), vote_offset.load()) + vote_power.load())),
         pt.App.localPut(pt.Txn.sender(), user_total_votes, pt.App.localGet(pt.Txn.sender(), user_total_votes) + pt.Int(1)),
-        pt.BoxCreate(on_vote_key.load(), pt.Int(1)),
+        # BoxCreate returns 0 when the receipt already exists: one vote per address
+        pt.Assert(pt.BoxCreate(on_vote_key.load(), pt.Int(1))),
         pt.BoxPut(on_vote_key.load(), pt.Bytes("1")),
-        pt.Log(pt.Concat(pt.Bytes("vote_cast:"), pt.Txn.application_args[1], pt.Bytes(",vote:"), pt.Txn.application_args[2])),
+        # The choice is logged re-encoded: the raw argument may be shorter than 8 bytes
+        pt.Log(pt.Concat(pt.Bytes("vote_cast:"), pt.Txn.application_args[1], pt.Bytes(",vote:"),
+                         pt.Itob(pt.Btoi(pt.Txn.application_args[2])), pt.Bytes(",power:"), pt.Itob(vote_power.load()))),
         pt.Approve()
     ])
 
     # Finalize proposal (check results and update status)
     # Args: ["finalize_proposal", proposal_id]
+    fin_key = pt.ScratchVar()
+    fin_header = pt.ScratchVar()
     fv = pt.ScratchVar()
     av = pt.ScratchVar()
-    tot = pt.ScratchVar()
+    outcome = pt.ScratchVar()
     on_finalize_proposal = pt.Seq([
-        pt.Assert(pt.Global.latest_timestamp() >= pt.App.globalGet(pt.Concat(proposal_end_time, pt.Txn.application_args[1]))),
-        pt.Assert(pt.App.globalGet(pt.Concat(proposal_status, pt.Txn.application_args[1])) == pt.Int(0)),
-        fv.store(pt.App.globalGet(pt.Concat(proposal_votes_for, pt.Txn.application_args[1]))),
-        av.store(pt.App.globalGet(pt.Concat(proposal_votes_against, pt.Txn.application_args[1]))),
-        tot.store(fv.load() + av.load()),
-        pt.If(tot.load() < pt.App.globalGet(quorum_min_votes)).Then(
-            pt.App.globalPut(pt.Concat(proposal_status, pt.Txn.application_args[1]), pt.Int(2))
-        ).Else(
-            pt.If(fv.load() > av.load()).Then(
-                pt.App.globalPut(pt.Concat(proposal_status, pt.Txn.application_args[1]), pt.Int(1))
-            ).Else(
-                pt.App.globalPut(pt.Concat(proposal_status, pt.Txn.application_args[1]), pt.Int(2))
-            )
-        ),
+        fin_key.store(proposal_key(pt.Txn.application_args[1])),
+        fin_header.store(pt.BoxExtract(fin_key.load(), pt.Int(0), pt.Int(PROPOSAL_HEADER_SIZE))),
+        pt.Assert(pt.Global.latest_timestamp() >= pt.ExtractUint64(fin_header.load(), pt.Int(END_TIME_OFFSET))),
+        pt.Assert(pt.ExtractUint64(fin_header.load(), pt.Int(STATUS_OFFSET)) == pt.Int(0)),
+        fv.store(pt.ExtractUint64(fin_header.load(), pt.Int(VOTES_FOR_OFFSET))),
+        av.store(pt.ExtractUint64(fin_header.load(), pt.Int(VOTES_AGAINST_OFFSET))),
+        pt.If(pt.And(fv.load() + av.load() >= pt.App.globalGet(quorum_min_votes), fv.load() > av.load()))
+        .Then(outcome.store(pt.Int(1)))
+        .Else(outcome.store(pt.Int(2))),
+        pt.BoxReplace(fin_key.load(), pt.Int(STATUS_OFFSET), pt.Itob(outcome.load())),
         pt.App.globalPut(active_proposals, pt.App.globalGet(active_proposals) - pt.Int(1)),
+        pt.Log(pt.Concat(pt.Bytes("proposal_finalized:"), pt.Txn.application_args[1], pt.Bytes(",status:"), pt.Itob(outcome.load()))),
         pt.Approve()
     ])
 
-    # Get proposal info
+    # Get proposal info: logs the raw fixed-width record
     on_get_proposal = pt.Seq([
         pt.Log(pt.Concat(
             pt.Bytes("proposal:"),
             pt.Txn.application_args[1],
-            pt.Bytes(",votes_for:"),
-            pt.Itob(pt.App.globalGet(pt.Concat(proposal_votes_for, pt.Txn.application_args[1]))),
-            pt.Bytes(",votes_against:"),
-            pt.Itob(pt.App.globalGet(pt.Concat(proposal_votes_against, pt.Txn.application_args[1]))),
-            pt.Bytes(",status:"),
-            pt.Itob(pt.App.globalGet(pt.Concat(proposal_status, pt.Txn.application_args[1])))
+            pt.Bytes(",record:"),
+            pt.BoxExtract(proposal_key(pt.Txn.application_args[1]), pt.Int(0), pt.Int(PROPOSAL_RECORD_SIZE))
         )),
         pt.Approve()
     ])
 
-    # Update user voting power (when WEED balance changes)
-    on_update_voting_power = pt.Seq([
-        pt.App.localPut(pt.Txn.sender(), user_voting_power, pt.Btoi(pt.Txn.application_args[1])),
+    # Commit a proposal's voting power snapshot root (admin only, once)
+    # Args: ["set_snapshot", proposal_id, root]
+    snap_key = pt.ScratchVar()
+    on_set_snapshot = pt.Seq([
+        pt.Assert(pt.Txn.sender() == pt.App.globalGet(admin_address)),
+        pt.Assert(pt.Len(pt.Txn.application_args[2]) == pt.Int(32)),
+        snap_key.store(proposal_key(pt.Txn.application_args[1])),
+        pt.Assert(pt.BoxExtract(snap_key.load(), pt.Int(SNAPSHOT_ROOT_OFFSET), pt.Int(32)) == pt.BytesZero(pt.Int(32))),
+        pt.BoxReplace(snap_key.load(), pt.Int(SNAPSHOT_ROOT_OFFSET), pt.Txn.application_args[2]),
+        pt.Log(pt.Concat(pt.Bytes("snapshot_set:"), pt.Txn.application_args[1], pt.Bytes(",root:"), pt.Txn.application_args[2])),
         pt.Approve()
     ])
 
@@ -139,12 +202,12 @@ def approval_program():
 
     program = pt.Cond(
         [pt.Txn.application_id() == pt.Int(0), on_creation],
-        [pt.Txn.on_completion() == pt.OnCall.OptIn, on_opt_in],
+        [pt.Txn.on_completion() == pt.OnComplete.OptIn, on_opt_in],
         [pt.Txn.application_args[0] == pt.Bytes("create_proposal"), on_create_proposal],
         [pt.Txn.application_args[0] == pt.Bytes("vote"), on_vote],
         [pt.Txn.application_args[0] == pt.Bytes("finalize_proposal"), on_finalize_proposal],
         [pt.Txn.application_args[0] == pt.Bytes("get_proposal"), on_get_proposal],
-        [pt.Txn.application_args[0] == pt.Bytes("update_voting_power"), on_update_voting_power],
+        [pt.Txn.application_args[0] == pt.Bytes("set_snapshot"), on_set_snapshot],
         [pt.Txn.application_args[0] == pt.Bytes("set_quorum"), on_set_quorum]
     )
 
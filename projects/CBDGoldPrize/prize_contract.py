@@ -7,6 +7,8 @@ def approval_program():
     - Staking-based eligibility (requires minimum staked HEMP in external staking app)
     - Daily claim throttle (cooldown already present) and configurable minimum stake
     - Admin set staking app id & min stake
+    - Daily claim cap (daily_max, 0 = unlimited) counted per UTC day
+    - Claims are paid out of prize_pool_balance and can never overdraw it
     - Asset funding & logging stays similar
     """
 
@@ -18,6 +20,8 @@ def approval_program():
     staking_app_id = pt.Bytes("staking_app_id")
     min_stake_required = pt.Bytes("min_stake_req")
     daily_max_claims = pt.Bytes("daily_max")
+    claim_day = pt.Bytes("claim_day")             # latest_timestamp / 86400 of the last claim
+    claims_today = pt.Bytes("claims_today")       # claims counted against daily_max on claim_day
 
     # Local state keys
     user_total_claims = pt.Bytes("total_claims")
@@ -29,7 +33,7 @@ def approval_program():
     def verify_prize_eligibility(user_addr):
         staking_app = pt.App.globalGet(staking_app_id)
         min_req = pt.App.globalGet(min_stake_required)
-        staked = pt.App.localGetEx(staking_app, user_addr, staked_key)
+        staked = pt.App.localGetEx(user_addr, staking_app, staked_key)
         return pt.Seq([
             staked,
             pt.If(staked.hasValue()).Then(
@@ -46,6 +50,8 @@ def approval_program():
         pt.App.globalPut(staking_app_id, pt.Int(0)),
         pt.App.globalPut(min_stake_required, pt.Int(10_000_000)),
         pt.App.globalPut(daily_max_claims, pt.Int(0)),
+        pt.App.globalPut(claim_day, pt.Int(0)),
+        pt.App.globalPut(claims_today, pt.Int(0)),
         pt.Approve()
     ])
 
@@ -57,11 +63,28 @@ def approval_program():
     ])
 
     # Claim prize (Args: ["claim_prize", amount])
+    today = pt.ScratchVar(pt.TealType.uint64)
+    claim_amount = pt.ScratchVar(pt.TealType.uint64)
     on_claim_prize = pt.Seq([
         pt.Assert(pt.App.globalGet(claims_enabled) == pt.Int(1)),
         pt.Assert(pt.App.globalGet(staking_app_id) != pt.Int(0)),
         pt.Assert(pt.Global.latest_timestamp() > pt.App.localGet(pt.Txn.sender(), user_last_claim) + pt.Int(86400)),
         pt.Assert(verify_prize_eligibility(pt.Txn.sender()) == pt.Int(1)),
+        # Daily cap: restart the count on the first claim of each UTC day
+        today.store(pt.Global.latest_timestamp() / pt.Int(86400)),
+        pt.If(pt.App.globalGet(claim_day) != today.load()).Then(pt.Seq([
+            pt.App.globalPut(claim_day, today.load()),
+            pt.App.globalPut(claims_today, pt.Int(0)),
+        ])),
+        pt.Assert(pt.Or(
+            pt.App.globalGet(daily_max_claims) == pt.Int(0),
+            pt.App.globalGet(claims_today) < pt.App.globalGet(daily_max_claims)
+        )),
+        pt.App.globalPut(claims_today, pt.App.globalGet(claims_today) + pt.Int(1)),
+        # Pool budget
+        claim_amount.store(pt.Btoi(pt.Txn.application_args[1])),
+        pt.Assert(claim_amount.load() <= pt.App.globalGet(prize_pool_balance)),
+        pt.App.globalPut(prize_pool_balance, pt.App.globalGet(prize_pool_balance) - claim_amount.load()),
         pt.App.localPut(pt.Txn.sender(), user_total_claims, pt.App.localGet(pt.Txn.sender(), user_total_claims) + pt.Int(1)),
         pt.App.localPut(pt.Txn.sender(), user_last_claim, pt.Global.latest_timestamp()),
         pt.App.globalPut(total_prizes_claimed, pt.App.globalGet(total_prizes_claimed) + pt.Int(1)),
@@ -107,16 +130,22 @@ def approval_program():
         pt.App.globalPut(min_stake_required, pt.Btoi(pt.Txn.application_args[1])),
         pt.Approve()
     ])
+    on_set_daily_max = pt.Seq([
+        pt.Assert(pt.Txn.sender() == pt.App.globalGet(admin_address)),
+        pt.App.globalPut(daily_max_claims, pt.Btoi(pt.Txn.application_args[1])),
+        pt.Approve()
+    ])
 
     program = pt.Cond(
         [pt.Txn.application_id() == pt.Int(0), on_creation],
-        [pt.Txn.on_completion() == pt.OnCall.OptIn, on_opt_in],
+        [pt.Txn.on_completion() == pt.OnComplete.OptIn, on_opt_in],
         [pt.Txn.application_args[0] == pt.Bytes("claim_prize"), on_claim_prize],
         [pt.Txn.application_args[0] == pt.Bytes("fund_pool"), on_fund_pool],
         [pt.Txn.application_args[0] == pt.Bytes("get_prize_info"), on_get_prize_info],
         [pt.Txn.application_args[0] == pt.Bytes("admin_toggle"), on_admin_toggle],
         [pt.Txn.application_args[0] == pt.Bytes("set_staking_app"), on_set_staking],
-        [pt.Txn.application_args[0] == pt.Bytes("set_min_stake"), on_set_min_stake]
+        [pt.Txn.application_args[0] == pt.Bytes("set_min_stake"), on_set_min_stake],
+        [pt.Txn.application_args[0] == pt.Bytes("set_daily_max"), on_set_daily_max]
     )
 
     return program
@@ -8,10 +8,41 @@ Adds:
 - Configurable staking asset ID (one-time set), emission rate, and admin controls
 - Correct unstake validation (Btoi) and HEMP asset usage
 - Tier recalculation post stake/unstake
+- Compound (restake pending rewards) and admin batch harvest over the accounts array
+- Stake/unstake/claim read state once into scratch and use 128-bit mulw/divw for reward math
 
 DISCLAIMER: This is a reference implementation; audit before production.
 """
 
+class MulDivW(pt.Expr):
+    """``a * b / c`` through a 128-bit product (``mulw`` then ``divw``).
+
+    Fails like ``divw`` when the quotient does not fit in 64 bits.
+    """
+
+    def __init__(self, a: pt.Expr, b: pt.Expr, c: pt.Expr):
+        super().__init__()
+        for arg in (a, b, c):
+            pt.types.require_type(arg, pt.TealType.uint64)
+        self.a, self.b, self.c = a, b, c
+
+    def __teal__(self, options):
+        start, end = pt.TealBlock.FromOp(options, pt.TealOp(self, pt.Op.mulw), self.a, self.b)
+        divisor_start, divisor_end = self.c.__teal__(options)
+        divide = pt.TealSimpleBlock([pt.TealOp(self, pt.Op.divw)])
+        end.setNextBlock(divisor_start)
+        divisor_end.setNextBlock(divide)
+        return start, divide
+
+    def __str__(self):
+        return f"(MulDivW {self.a} {self.b} {self.c})"
+
+    def type_of(self):
+        return pt.TealType.uint64
+
+    def has_return(self):
+        return False
+
 def approval_program():
     # ------------------ Global Keys ------------------
     total_staked = pt.Bytes("total_staked")            # uint (raw token units)
@@ -35,52 +66,64 @@ def approval_program():
     silver_threshold = pt.Int(100_000_000)
     gold_threshold = pt.Int(1_000_000_000)
 
-    @pt.Subroutine(pt.TealType.uint64)
+    # ------------------ Scratch Caches ---------------
+    # The stake, unstake and claim paths read each state value once into
+    # scratch and reuse it, instead of repeating app_global_get/app_local_get.
+    total = pt.ScratchVar(pt.TealType.uint64)           # total_staked
+    acc = pt.ScratchVar(pt.TealType.uint64)             # acc_rpt after update_rewards
+    elapsed = pt.ScratchVar(pt.TealType.uint64)
+    staked = pt.ScratchVar(pt.TealType.uint64)          # sender's staked_amount
+    accrued = pt.ScratchVar(pt.TealType.uint64)         # staked * acc / scale
+    pending = pt.ScratchVar(pt.TealType.uint64)         # sender's pending after settling
+    amount = pt.ScratchVar(pt.TealType.uint64)
+    user = pt.ScratchVar(pt.TealType.bytes)
+    index = pt.ScratchVar(pt.TealType.uint64)
+
     def calculate_tier(staked_amount):
-        return pt.If(staked_amount >= gold_threshold).Then(pt.Int(3)).ElseIf(
-            staked_amount >= silver_threshold
-        ).Then(pt.Int(2)).ElseIf(
-            staked_amount >= bronze_threshold
-        ).Then(pt.Int(1)).Else(pt.Int(0))
-
-    # Update global reward accumulator
-    @pt.Subroutine(pt.TealType.none)
+        # Thresholds are nested, so the tier is the number of them cleared
+        return pt.Add(
+            staked_amount >= bronze_threshold,
+            staked_amount >= silver_threshold,
+            staked_amount >= gold_threshold,
+        )
+
+    # Update the global reward accumulator, leaving total_staked and acc_rpt in scratch
     def update_rewards():
-        current = pt.Global.latest_timestamp()
-        elapsed = pt.ScratchVar()
-        increment = pt.ScratchVar()
+        now = pt.Global.latest_timestamp()
         return pt.Seq(
-            pt.If(pt.App.globalGet(total_staked) > pt.Int(0)).Then(
+            total.store(pt.App.globalGet(total_staked)),
+            acc.store(pt.App.globalGet(acc_reward_per_token)),
+            elapsed.store(now - pt.App.globalGet(last_reward_time)),
+            pt.If(pt.And(total.load() > pt.Int(0), elapsed.load() > pt.Int(0))).Then(
                 pt.Seq(
-                    elapsed.store(current - pt.App.globalGet(last_reward_time)),
-                    pt.If(elapsed.load() > pt.Int(0)).Then(
-                        pt.Seq(
-                            increment.store(
-                                (elapsed.load() * pt.App.globalGet(reward_rate) * scale_const) / pt.App.globalGet(total_staked)
-                            ),
-                            pt.App.globalPut(acc_reward_per_token, pt.App.globalGet(acc_reward_per_token) + increment.load())
-                        )
-                    )
+                    acc.store(acc.load() + MulDivW(
+                        elapsed.load() * pt.App.globalGet(reward_rate), scale_const, total.load()
+                    )),
+                    pt.App.globalPut(acc_reward_per_token, acc.load())
                 )
             ),
-            pt.App.globalPut(last_reward_time, current)
+            pt.App.globalPut(last_reward_time, now)
         )
 
-    @pt.Subroutine(pt.TealType.none)
-    def harvest(user):
-        staked = pt.ScratchVar()
-        acc = pt.ScratchVar()
-        debt = pt.ScratchVar()
-        pending_calc = pt.ScratchVar()
+    # Settle the user's rewards up to acc into scratch; callers write pending and reward_debt
+    def settle(user):
         return pt.Seq(
             staked.store(pt.App.localGet(user, user_staked_amount)),
-            acc.store(pt.App.globalGet(acc_reward_per_token)),
-            debt.store(pt.App.localGet(user, user_reward_debt)),
-            pending_calc.store((staked.load() * acc.load()) / scale_const - debt.load()),
-            pt.If(pending_calc.load() > pt.Int(0)).Then(
-                pt.App.localPut(user, user_pending, pt.App.localGet(user, user_pending) + pending_calc.load())
-            ),
-            pt.App.localPut(user, user_reward_debt, (staked.load() * acc.load()) / scale_const)
+            accrued.store(MulDivW(staked.load(), acc.load(), scale_const)),
+            pending.store(
+                pt.App.localGet(user, user_pending) + accrued.load() - pt.App.localGet(user, user_reward_debt)
+            )
+        )
+
+    # Move settled pending rewards into the stake; the caller writes total_staked
+    def compound_pending(account):
+        return pt.Seq(
+            staked.store(staked.load() + pending.load()),
+            total.store(total.load() + pending.load()),
+            pt.App.localPut(account, user_staked_amount, staked.load()),
+            pt.App.localPut(account, user_pending, pt.Int(0)),
+            pt.App.localPut(account, user_tier, calculate_tier(staked.load())),
+            pt.App.localPut(account, user_reward_debt, MulDivW(staked.load(), acc.load(), scale_const))
         )
 
     # ------------------ On Creation ------------------
@@ -122,52 +165,55 @@ def approval_program():
         pt.Assert(pt.Gtxn[1].xfer_asset() == pt.App.globalGet(asset_id)),
         pt.Assert(pt.Gtxn[1].asset_receiver() == pt.Global.current_application_address()),
         update_rewards(),
-        harvest(pt.Txn.sender()),
-        pt.App.localPut(pt.Txn.sender(), user_staked_amount, pt.App.localGet(pt.Txn.sender(), user_staked_amount) + pt.Gtxn[1].asset_amount()),
-        pt.App.globalPut(total_staked, pt.App.globalGet(total_staked) + pt.Gtxn[1].asset_amount()),
+        settle(pt.Txn.sender()),
+        amount.store(pt.Gtxn[1].asset_amount()),
+        staked.store(staked.load() + amount.load()),
+        pt.App.localPut(pt.Txn.sender(), user_staked_amount, staked.load()),
+        pt.App.localPut(pt.Txn.sender(), user_pending, pending.load()),
+        pt.App.globalPut(total_staked, total.load() + amount.load()),
         pt.App.localPut(pt.Txn.sender(), user_stake_timestamp, pt.Global.latest_timestamp()),
-        pt.App.localPut(pt.Txn.sender(), user_tier, calculate_tier(pt.App.localGet(pt.Txn.sender(), user_staked_amount))),
-        pt.App.localPut(pt.Txn.sender(), user_reward_debt, (pt.App.localGet(pt.Txn.sender(), user_staked_amount) * pt.App.globalGet(acc_reward_per_token)) / scale_const),
+        pt.App.localPut(pt.Txn.sender(), user_tier, calculate_tier(staked.load())),
+        pt.App.localPut(pt.Txn.sender(), user_reward_debt, MulDivW(staked.load(), acc.load(), scale_const)),
         pt.Approve()
     )
 
     # ------------------ Unstake ----------------------
     # Args: ["unstake", amount]
-    on_unstake_amt = pt.ScratchVar()
     on_unstake = pt.Seq(
         pt.Assert(pt.App.globalGet(staking_enabled) == pt.Int(1)),
-        on_unstake_amt.store(pt.Btoi(pt.Txn.application_args[1])),
-        pt.Assert(pt.App.localGet(pt.Txn.sender(), user_staked_amount) >= on_unstake_amt.load()),
+        amount.store(pt.Btoi(pt.Txn.application_args[1])),
         update_rewards(),
-        harvest(pt.Txn.sender()),
-        pt.App.localPut(pt.Txn.sender(), user_staked_amount, pt.App.localGet(pt.Txn.sender(), user_staked_amount) - on_unstake_amt.load()),
-        pt.App.globalPut(total_staked, pt.App.globalGet(total_staked) - on_unstake_amt.load()),
-        pt.App.localPut(pt.Txn.sender(), user_tier, calculate_tier(pt.App.localGet(pt.Txn.sender(), user_staked_amount))),
+        settle(pt.Txn.sender()),
+        pt.Assert(staked.load() >= amount.load()),
+        staked.store(staked.load() - amount.load()),
+        pt.App.localPut(pt.Txn.sender(), user_staked_amount, staked.load()),
+        pt.App.localPut(pt.Txn.sender(), user_pending, pending.load()),
+        pt.App.globalPut(total_staked, total.load() - amount.load()),
+        pt.App.localPut(pt.Txn.sender(), user_tier, calculate_tier(staked.load())),
         pt.InnerTxnBuilder.Begin(),
         pt.InnerTxnBuilder.SetFields({
             pt.TxnField.type_enum: pt.TxnType.AssetTransfer,
             pt.TxnField.asset_receiver: pt.Txn.sender(),
-            pt.TxnField.asset_amount: on_unstake_amt.load(),
+            pt.TxnField.asset_amount: amount.load(),
             pt.TxnField.xfer_asset: pt.App.globalGet(asset_id)
         }),
         pt.InnerTxnBuilder.Submit(),
-        pt.App.localPut(pt.Txn.sender(), user_reward_debt, (pt.App.localGet(pt.Txn.sender(), user_staked_amount) * pt.App.globalGet(acc_reward_per_token)) / scale_const),
+        pt.App.localPut(pt.Txn.sender(), user_reward_debt, MulDivW(staked.load(), acc.load(), scale_const)),
         pt.Approve()
     )
 
     # ------------------ Claim Rewards ----------------
-    claim_pending = pt.ScratchVar()
     on_claim = pt.Seq(
         update_rewards(),
-        harvest(pt.Txn.sender()),
-        claim_pending.store(pt.App.localGet(pt.Txn.sender(), user_pending)),
-        pt.If(claim_pending.load() > pt.Int(0)).Then(
+        settle(pt.Txn.sender()),
+        pt.App.localPut(pt.Txn.sender(), user_reward_debt, accrued.load()),
+        pt.If(pending.load() > pt.Int(0)).Then(
             pt.Seq(
                 pt.InnerTxnBuilder.Begin(),
                 pt.InnerTxnBuilder.SetFields({
                     pt.TxnField.type_enum: pt.TxnType.AssetTransfer,
                     pt.TxnField.asset_receiver: pt.Txn.sender(),
-                    pt.TxnField.asset_amount: claim_pending.load(),
+                    pt.TxnField.asset_amount: pending.load(),
                     pt.TxnField.xfer_asset: pt.App.globalGet(asset_id)
                 }),
                 pt.InnerTxnBuilder.Submit(),
@@ -177,6 +223,49 @@ def approval_program():
         pt.Approve()
     )
 
+    # ------------------ Compound ---------------------
+    # Restakes the sender's pending rewards, which already sit in the app's
+    # HEMP holding, without a claim and a new stake group
+    on_compound = pt.Seq(
+        pt.Assert(pt.App.globalGet(staking_enabled) == pt.Int(1)),
+        update_rewards(),
+        settle(pt.Txn.sender()),
+        compound_pending(pt.Txn.sender()),
+        pt.App.globalPut(total_staked, total.load()),
+        pt.Approve()
+    )
+
+    # ------------------ Batch Harvest (Admin) --------
+    # Args: ["batch_harvest", Itob(compound)]; settles every account in
+    # Txn.accounts, restaking the rewards when compound is 1. Accounts that
+    # are not opted in are skipped.
+    on_batch_harvest = pt.Seq(
+        pt.Assert(pt.Txn.sender() == pt.App.globalGet(admin_address)),
+        amount.store(pt.Btoi(pt.Txn.application_args[1])),
+        pt.If(amount.load()).Then(pt.Assert(pt.App.globalGet(staking_enabled) == pt.Int(1))),
+        update_rewards(),
+        pt.For(index.store(pt.Int(1)), index.load() <= pt.Txn.accounts.length(), index.store(index.load() + pt.Int(1))).Do(
+            pt.Seq(
+                user.store(pt.Txn.accounts[index.load()]),
+                pt.If(pt.App.optedIn(user.load(), pt.Global.current_application_id())).Then(
+                    pt.Seq(
+                        settle(user.load()),
+                        pt.If(amount.load()).Then(
+                            compound_pending(user.load())
+                        ).Else(
+                            pt.Seq(
+                                pt.App.localPut(user.load(), user_pending, pending.load()),
+                                pt.App.localPut(user.load(), user_reward_debt, accrued.load())
+                            )
+                        )
+                    )
+                )
+            )
+        ),
+        pt.App.globalPut(total_staked, total.load()),
+        pt.Approve()
+    )
+
     # ------------------ Info -------------------------
     on_get_info = pt.Seq(
         pt.Log(pt.Concat(
@@ -196,11 +285,14 @@ def approval_program():
 
     program = pt.Cond(
         [pt.Txn.application_id() == pt.Int(0), on_creation],
-        [pt.Txn.on_completion() == pt.OnCall.OptIn, on_opt_in],
-        [pt.Txn.application_args[0] == pt.Bytes("set_params"), on_set_params],
+        [pt.Txn.on_completion() == pt.OnComplete.OptIn, on_opt_in],
+        # Hot paths first: each Cond test costs every branch after it
         [pt.Txn.application_args[0] == pt.Bytes("stake"), on_stake],
-        [pt.Txn.application_args[0] == pt.Bytes("unstake"), on_unstake],
         [pt.Txn.application_args[0] == pt.Bytes("claim"), on_claim],
+        [pt.Txn.application_args[0] == pt.Bytes("unstake"), on_unstake],
+        [pt.Txn.application_args[0] == pt.Bytes("compound"), on_compound],
+        [pt.Txn.application_args[0] == pt.Bytes("batch_harvest"), on_batch_harvest],
+        [pt.Txn.application_args[0] == pt.Bytes("set_params"), on_set_params],
         [pt.Txn.application_args[0] == pt.Bytes("get_info"), on_get_info],
         [pt.Txn.application_args[0] == pt.Bytes("admin_toggle"), on_admin_toggle]
     )